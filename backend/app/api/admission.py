@@ -0,0 +1,230 @@
+"""
+Контроль допуска для тяжёлых эндпоинтов отчётов.
+
+- Размер тела запроса проверяется по ходу его чтения, а число блоков и
+  глубина вложенности — по ходу потокового разбора (``report_parser``), до
+  построения остальных моделей Report.
+- Число одновременно обрабатываемых отчётов ограничено; остальные запросы
+  ждут в очереди ограниченной длины не дольше заданного времени. При
+  переполнении очереди сразу возвращается ``429``, при истечении ожидания —
+  ``503``; оба ответа с заголовком ``Retry-After``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import math
+from collections import deque
+from contextlib import asynccontextmanager
+from dataclasses import asdict, dataclass
+from threading import Lock
+from typing import Any, AsyncIterator, Deque, Dict, List
+
+from fastapi import HTTPException, Request
+
+from app.services.reports.parser import ReportParser
+from app.settings import Settings, settings
+
+
+@dataclass(frozen=True)
+class ReportLimits:
+    """
+    Ограничения на один отчёт в запросе.
+
+    - max_body_bytes: размер тела запроса, байт;
+    - max_blocks: число блоков с учётом вложенных;
+    - max_depth: глубина вложенности блоков (1 — только верхний уровень).
+    """
+
+    max_body_bytes: int
+    max_blocks: int
+    max_depth: int
+
+
+def _too_large(detail: str) -> HTTPException:
+    return HTTPException(status_code=413, detail=detail)
+
+
+class _Waiter:
+    __slots__ = ("future", "granted")
+
+    def __init__(self, future: asyncio.Future[None]) -> None:
+        self.future = future
+        self.granted = False
+
+
+def _wake(future: asyncio.Future[None]) -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+class Admission:
+    """Занятое место в обработке; ``release`` можно вызывать повторно."""
+
+    __slots__ = ("_controller", "_released")
+
+    def __init__(self, controller: AdmissionController) -> None:
+        self._controller = controller
+        self._released = False
+
+    def release(self) -> None:
+        if not self._released:
+            self._released = True
+            self._controller._release()
+
+
+class AdmissionController:
+    """
+    Ограничения отчётов и очередь на обработку.
+
+    Не больше ``concurrency`` отчётов обрабатываются одновременно, не больше
+    ``queue_size`` ждут своей очереди, и каждый ждёт не дольше
+    ``queue_timeout`` секунд. Освободившееся место передаётся первому в
+    очереди. Освобождать место можно из любого потока (например, из
+    генератора потокового ответа, который выполняется в пуле потоков).
+    """
+
+    def __init__(
+        self,
+        limits: ReportLimits,
+        concurrency: int,
+        queue_size: int,
+        queue_timeout: float,
+    ) -> None:
+        self.limits = limits
+        self.concurrency = max(1, concurrency)
+        self.queue_size = max(0, queue_size)
+        self.queue_timeout = queue_timeout
+        self._lock = Lock()
+        self._active = 0
+        self._waiters: Deque[_Waiter] = deque()
+
+    @classmethod
+    def from_settings(cls, config: Settings) -> AdmissionController:
+        return cls(
+            ReportLimits(
+                max_body_bytes=config.max_request_body_bytes,
+                max_blocks=config.max_report_blocks,
+                max_depth=config.max_report_depth,
+            ),
+            concurrency=config.report_concurrency,
+            queue_size=config.report_queue_size,
+            queue_timeout=config.report_queue_timeout_ms / 1000,
+        )
+
+    async def read_body(self, request: Request) -> bytes:
+        """
+        Читает тело запроса, прерывая чтение (``413``), как только оно
+        превысило ``max_body_bytes``; заголовок Content-Length проверяется
+        до начала чтения.
+        """
+
+        limit = self.limits.max_body_bytes
+        declared = request.headers.get("content-length")
+        if declared is not None and declared.isdigit() and int(declared) > limit:
+            raise _too_large(f"Тело запроса больше {limit} байт.")
+
+        chunks: List[bytes] = []
+        size = 0
+        async for chunk in request.stream():
+            size += len(chunk)
+            if size > limit:
+                raise _too_large(f"Тело запроса больше {limit} байт.")
+            chunks.append(chunk)
+        return b"".join(chunks)
+
+    def report_parser(self) -> ReportParser:
+        """
+        Потоковый разборщик отчёта с ограничениями на число блоков и глубину
+        вложенности: они проверяются по мере открытия блоков, до конца разбора.
+        """
+
+        return ReportParser(self.limits.max_blocks, self.limits.max_depth)
+
+    def _retry_after(self) -> Dict[str, str]:
+        return {"Retry-After": str(max(1, math.ceil(self.queue_timeout)))}
+
+    async def acquire(self) -> Admission:
+        """
+        Занимает место в обработке, при необходимости дождавшись очереди.
+
+        Выбрасывает HTTPException ``429``, если очередь заполнена, и ``503``,
+        если место не освободилось за ``queue_timeout``.
+        """
+
+        with self._lock:
+            if self._active < self.concurrency and not self._waiters:
+                self._active += 1
+                return Admission(self)
+            if len(self._waiters) >= self.queue_size:
+                raise HTTPException(
+                    status_code=429,
+                    detail="Сервер перегружен: очередь проверки заполнена.",
+                    headers=self._retry_after(),
+                )
+            waiter = _Waiter(asyncio.get_running_loop().create_future())
+            self._waiters.append(waiter)
+
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter.future), self.queue_timeout)
+        except BaseException as exc:
+            with self._lock:
+                granted = waiter.granted
+                if not granted:
+                    self._waiters.remove(waiter)
+            if granted and isinstance(exc, asyncio.TimeoutError):
+                # Место передали в последний момент — пользуемся им.
+                return Admission(self)
+            if granted:
+                self._release()
+            if isinstance(exc, asyncio.TimeoutError):
+                raise HTTPException(
+                    status_code=503,
+                    detail="Сервер перегружен: превышено время ожидания в очереди.",
+                    headers=self._retry_after(),
+                ) from None
+            raise
+        return Admission(self)
+
+    def _release(self) -> None:
+        with self._lock:
+            while self._waiters:
+                waiter = self._waiters.popleft()
+                try:
+                    waiter.future.get_loop().call_soon_threadsafe(_wake, waiter.future)
+                except RuntimeError:
+                    # Цикл событий ожидающего уже закрыт.
+                    continue
+                waiter.granted = True
+                return
+            self._active -= 1
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """Контекст, в котором занято одно место в обработке."""
+
+        admission = await self.acquire()
+        try:
+            yield
+        finally:
+            admission.release()
+
+    def stats(self) -> Dict[str, Any]:
+        """Ограничения и текущая загрузка (для ``/health``)."""
+
+        with self._lock:
+            active, queued = self._active, len(self._waiters)
+        return {
+            "limits": {
+                **asdict(self.limits),
+                "concurrency": self.concurrency,
+                "queue_size": self.queue_size,
+                "queue_timeout_ms": round(self.queue_timeout * 1000),
+            },
+            "active": active,
+            "queued": queued,
+        }
+
+
+#: Контроль допуска для эндпоинтов отчётов.
+report_admission = AdmissionController.from_settings(settings)
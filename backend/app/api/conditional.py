@@ -0,0 +1,18 @@
+from __future__ import annotations
+
+from typing import Optional
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Совпадает ли ETag ответа с одним из тегов заголовка ``If-None-Match``
+    (слабое сравнение, ``*`` совпадает с любым тегом).
+    """
+
+    if if_none_match is None:
+        return False
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag == "*" or tag.removeprefix("W/") == etag:
+            return True
+    return False
@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+from dataclasses import asdict
+from typing import Any, Dict
+
+from fastapi import APIRouter
+
+from app.services.export.docx import export_metrics, fragment_cache
+from app.services.layout.estimator import layout_cache
+from app.services.validation.engine import rule_cache
+from app.services.validation.metrics import rule_metrics
+from app.services.validation.result_cache import result_cache
+from app.services.validation.text_analysis import text_analyzer
+
+router = APIRouter(
+    prefix="/diagnostics",
+    tags=["diagnostics"],
+)
+
+
+@router.get("/validation")
+def validation_diagnostics_endpoint() -> Dict[str, Any]:
+    """
+    Накопленная с момента запуска статистика валидации: гистограммы времени
+    работы и число замечаний по каждому правилу, а также счётчики кэшей:
+    результатов поблочных правил, анализа текста блоков, измерений блоков для
+    оценки вёрстки и ответов ``POST /reports/validate`` (попадания, промахи,
+    вытеснения, истечения срока, занятая память).
+    """
+
+    cache_stats = rule_cache.stats()
+    text_stats = text_analyzer.cache.stats()
+    layout_stats = layout_cache.stats()
+    return {
+        "rules": rule_metrics.snapshot(),
+        "rule_cache": {**asdict(cache_stats), "hit_ratio": cache_stats.hit_ratio},
+        "text_cache": {**asdict(text_stats), "hit_ratio": text_stats.hit_ratio},
+        "layout_cache": {**asdict(layout_stats), "hit_ratio": layout_stats.hit_ratio},
+        "result_cache": result_cache.stats(),
+    }
+
+
+@router.get("/export")
+def export_diagnostics_endpoint() -> Dict[str, Any]:
+    """
+    Статистика экспорта в DOCX: число экспортов, блоков и обращений к кэшу
+    фрагментов (всего и за последний экспорт) и счётчики самого кэша.
+    """
+
+    cache_stats = fragment_cache.stats()
+    return {
+        **export_metrics.snapshot(),
+        "fragment_cache": {**asdict(cache_stats), "hit_ratio": cache_stats.hit_ratio},
+    }
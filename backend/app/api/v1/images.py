@@ -0,0 +1,166 @@
+from __future__ import annotations
+
+import os
+from typing import Annotated, Optional
+
+from fastapi import APIRouter, Header, HTTPException, Path, Request, Response
+from fastapi.responses import FileResponse
+
+from app.api.conditional import etag_matches
+from app.models import ImageStatus, StoredImage
+from app.services.images.pipeline import ImageProcessingError, image_pipeline
+from app.services.images.store import (
+    IMAGE_HASH_PATTERN,
+    ImageTooLargeError,
+    UnsupportedImageError,
+    file_media_type,
+    image_store,
+)
+from app.settings import settings
+
+router = APIRouter(
+    prefix="/images",
+    tags=["images"],
+)
+
+#: Хэш изображения в пути запроса.
+ImageHash = Annotated[str, Path(pattern=IMAGE_HASH_PATTERN.pattern)]
+
+#: Содержимое по хэшу не меняется, поэтому ответ можно кэшировать бессрочно.
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+@router.post(
+    "",
+    response_model=StoredImage,
+    responses={
+        201: {"model": StoredImage, "description": "Изображение сохранено."},
+        413: {"description": "Изображение больше GHOST_MAX_IMAGE_BYTES."},
+        415: {"description": "Формат изображения не поддерживается."},
+    },
+)
+async def upload_image(request: Request) -> Response:
+    """
+    Загружает изображение рисунка (тело запроса — содержимое файла).
+
+    Тело читается потоково и хэшируется по ходу записи на диск, целиком в
+    памяти оно не держится. Ответ — хэш, по которому рисунок ссылается на
+    изображение (``FigureBlock.image_hash``): ``201``, если изображение новое,
+    и ``200``, если такое уже было загружено (файл хранится один раз).
+
+    После загрузки изображение в фоне готовится к экспорту и предпросмотру
+    (``image_pipeline``); состояние — ``GET /images/{hash}/status``.
+    """
+
+    max_bytes = settings.max_image_bytes
+    declared = request.headers.get("content-length")
+    if declared is not None and declared.isdigit() and int(declared) > max_bytes:
+        raise HTTPException(
+            status_code=413, detail=f"Изображение больше {max_bytes} байт."
+        )
+
+    try:
+        stored = await image_store.save(request.stream(), max_bytes)
+    except ImageTooLargeError as exc:
+        raise HTTPException(status_code=413, detail=str(exc)) from exc
+    except UnsupportedImageError as exc:
+        raise HTTPException(status_code=415, detail=str(exc)) from exc
+    image_pipeline.submit(stored.hash)
+
+    return Response(
+        content=stored.model_dump_json(),
+        status_code=201 if stored.created else 200,
+        media_type="application/json",
+        headers={"ETag": f'"{stored.hash}"'},
+    )
+
+
+@router.get(
+    "/{image_hash}",
+    response_class=FileResponse,
+    responses={
+        200: {"description": "Содержимое изображения."},
+        304: {"description": "Изображение не изменилось (совпал If-None-Match)."},
+        404: {"description": "Изображения нет в хранилище."},
+    },
+)
+async def get_image(
+    image_hash: ImageHash,
+    if_none_match: Optional[str] = Header(None),
+) -> Response:
+    """
+    Отдаёт исходное изображение по хэшу содержимого.
+
+    Файл отдаётся ``FileResponse`` напрямую с диска (сервер может использовать
+    ``sendfile``), с поддержкой ``Range``. ETag — сам хэш, то есть сильный
+    валидатор; на совпадающий ``If-None-Match`` возвращается ``304``.
+    """
+
+    media_type = image_store.media_type(image_hash)
+    if media_type is None:
+        raise HTTPException(status_code=404, detail="Изображение не найдено.")
+
+    return _immutable_file(
+        image_store.path(image_hash), media_type, f'"{image_hash}"', if_none_match
+    )
+
+
+@router.get("/{image_hash}/status", response_model=ImageStatus)
+async def get_image_status(image_hash: ImageHash) -> ImageStatus:
+    """
+    Состояние подготовки изображения: ``pending``, ``processing``, ``ready``,
+    ``failed`` (с причиной в ``error``) или ``missing``.
+    """
+
+    return ImageStatus(
+        hash=image_hash,
+        state=image_pipeline.state(image_hash),
+        error=image_pipeline.error(image_hash),
+    )
+
+
+@router.get(
+    "/{image_hash}/{variant}",
+    response_class=FileResponse,
+    responses={
+        200: {"description": "Подготовленный вариант изображения."},
+        304: {"description": "Вариант не изменился (совпал If-None-Match)."},
+        404: {"description": "Изображения или варианта нет."},
+        422: {"description": "Изображение не удалось подготовить."},
+    },
+)
+async def get_image_variant(
+    image_hash: ImageHash,
+    variant: str,
+    if_none_match: Optional[str] = Header(None),
+) -> Response:
+    """
+    Отдаёт подготовленный вариант изображения: ``export`` (для DOCX) или
+    ``thumbnail`` (для предпросмотра). Если вариант ещё не готов, запрос
+    дожидается его подготовки.
+    """
+
+    if variant not in image_pipeline.variants:
+        raise HTTPException(status_code=404, detail="Неизвестный вариант.")
+    try:
+        path = await image_pipeline.derive(image_hash, variant)
+    except FileNotFoundError as exc:
+        raise HTTPException(status_code=404, detail="Изображение не найдено.") from exc
+    except ImageProcessingError as exc:
+        raise HTTPException(status_code=422, detail=str(exc)) from exc
+
+    return _immutable_file(
+        path, file_media_type(str(path)), f'"{path.name}"', if_none_match
+    )
+
+
+def _immutable_file(
+    path: os.PathLike[str],
+    media_type: Optional[str],
+    etag: str,
+    if_none_match: Optional[str],
+) -> Response:
+    headers = {"ETag": etag, "Cache-Control": IMMUTABLE_CACHE_CONTROL}
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    return FileResponse(path, media_type=media_type, headers=headers)
@@ -0,0 +1,33 @@
+from __future__ import annotations
+
+from typing import List, Optional
+
+from fastapi import APIRouter, Header, Response
+
+from app.api.conditional import etag_matches
+from app.models import PresetInfo
+from app.services.validation.presets import presets_payload
+
+router = APIRouter(
+    prefix="/presets",
+    tags=["presets"],
+)
+
+
+@router.get("", response_model=List[PresetInfo])
+def list_presets_endpoint(
+    if_none_match: Optional[str] = Header(None),
+) -> Response:
+    """
+    Список пресетов оформления с итоговым набором правил каждого пресета.
+
+    Ответ собирается один раз при компиляции пресетов и отдаётся как есть
+    вместе с ETag; на запрос с совпадающим ``If-None-Match`` возвращается
+    ``304 Not Modified`` без тела.
+    """
+
+    payload, etag = presets_payload()
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=payload, media_type="application/json", headers=headers)
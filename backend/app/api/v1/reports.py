@@ -1,23 +1,773 @@
 from __future__ import annotations
 
-from fastapi import APIRouter
+import json
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Type,
+    TypeVar,
+)
+from urllib.parse import quote
+from uuid import UUID
+
+from fastapi import APIRouter, Header, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import FileResponse, StreamingResponse
+from pydantic import BaseModel, TypeAdapter, ValidationError
+from starlette.background import BackgroundTask
 
-from app.models import Report, ValidationResult
+from app.api.admission import Admission, report_admission
+from app.api.conditional import etag_matches
+from app.models import (
+    BlockLocation,
+    ExportJobStatus,
+    FigureBlock,
+    FigureImageStatus,
+    LayoutEstimate,
+    Report,
+    ReportChange,
+    ValidationDiagnostics,
+    ValidationIssueLevel,
+    ValidationResult,
+    VersionedValidationResult,
+)
+from app.services.export.docx import DOCX_MEDIA_TYPE, export_file_name, iter_docx
+from app.services.export.jobs import ExportJob, export_jobs
+from app.services.images.pipeline import image_pipeline
+from app.services.layout.estimator import estimate_layout
+from app.services.reports.changes import ReportChangeError, apply_change
+from app.services.reports.parser import (
+    ReportLimitError,
+    ReportSyntaxError,
+    ReportValidationError,
+)
+from app.services.reports.project_file import (
+    PROJECT_MEDIA_TYPE,
+    PROJECT_SUFFIX,
+    ProjectEncodingError,
+    ProjectFormatError,
+    dump_project,
+    load_project,
+)
+from app.services.reports.store import report_store
 from app.services.validation.engine import validate_report
+from app.services.validation.incremental import validate_incremental
+from app.services.validation.result_cache import result_cache, validation_etag
+from app.services.validation.streaming import (
+    format_ndjson,
+    format_sse,
+    iter_validation_events,
+)
 
 router = APIRouter(
     prefix="/reports",
     tags=["reports"],
 )
 
+ModelT = TypeVar("ModelT", bound=BaseModel)
+T = TypeVar("T")
+
+#: Server-Timing ответа, взятого из кэша результатов.
+CACHE_HIT_TIMING = "cache;desc=hit"
+
+#: По сколько байт тело запроса передаётся разборщику отчёта.
+PARSE_CHUNK_BYTES = 64 * 1024
+
+#: Ответ ``POST /reports/figure-images``.
+FIGURE_IMAGES = TypeAdapter(List[FigureImageStatus])
+
+
+def server_timing(diagnostics: ValidationDiagnostics) -> str:
+    """Формирует значение заголовка Server-Timing из диагностики проверки."""
+
+    metrics = [f"validate;dur={diagnostics.total_ms:.3f}"]
+    metrics.extend(
+        f"{rule.rule};dur={rule.duration_ms:.3f}" for rule in diagnostics.rules
+    )
+    return ", ".join(metrics)
+
+
+def _missing_body() -> RequestValidationError:
+    return RequestValidationError(
+        [{"type": "missing", "loc": ("body",), "msg": "Field required"}]
+    )
+
+
+def _invalid_json(msg: str, pos: int, body: bytes) -> RequestValidationError:
+    return RequestValidationError(
+        [
+            {
+                "type": "json_invalid",
+                "loc": ("body", pos),
+                "msg": "JSON decode error",
+                "input": {},
+                "ctx": {"error": msg},
+            }
+        ],
+        body=body,
+    )
+
+
+def _body_errors(
+    errors: Iterable[Dict[str, Any]], body: bytes
+) -> RequestValidationError:
+    return RequestValidationError(
+        [{**error, "loc": ("body", *error["loc"])} for error in errors], body=body
+    )
+
+
+def _load_body(body: bytes) -> Any:
+    if not body:
+        raise _missing_body()
+    try:
+        data = json.loads(body)
+    except json.JSONDecodeError as exc:
+        raise _invalid_json(exc.msg, exc.pos, body) from exc
+    except RecursionError as exc:
+        raise HTTPException(
+            status_code=413, detail="Слишком глубокая вложенность JSON."
+        ) from exc
+    return data
+
 
-@router.post("/validate", response_model=ValidationResult)
-def validate_report_endpoint(report: Report) -> ValidationResult:
+def _validate_body(model: Type[ModelT], data: Any, body: bytes) -> ModelT:
+    try:
+        return model.model_validate(data)
+    except ValidationError as exc:
+        raise _body_errors(exc.errors(include_url=False), body) from exc
+
+
+def parse_report(body: bytes) -> Report:
+    """
+    Разбирает тело запроса в Report потоковым разборщиком
+    ``report_admission.report_parser()``: тело передаётся ему частями по
+    ``PARSE_CHUNK_BYTES``, так что ни декодированная строка всего тела, ни
+    дерево dict всего отчёта не создаются. Ограничения на число блоков и
+    глубину вложенности (``413``) проверяются по ходу разбора. Ошибки разбора
+    возвращаются клиенту так же, как при обычной валидации тела FastAPI (422 с
+    ``loc``, начинающимся с ``"body"``).
+    """
+
+    if not body:
+        raise _missing_body()
+    parser = report_admission.report_parser()
+    view = memoryview(body)
+    try:
+        for start in range(0, len(view), PARSE_CHUNK_BYTES):
+            parser.feed(view[start : start + PARSE_CHUNK_BYTES])
+        return parser.close()
+    except ReportSyntaxError as exc:
+        raise _invalid_json(exc.msg, exc.pos, body) from exc
+    except ReportValidationError as exc:
+        raise _body_errors(exc.errors, body) from exc
+    except ReportLimitError as exc:
+        raise HTTPException(status_code=413, detail=str(exc)) from exc
+
+
+def parse_project(body: bytes) -> Report:
+    """
+    Читает отчёт из тела запроса в бинарном формате проекта с ограничениями
+    ``report_admission`` (``413``). Повреждённый файл — ``422`` с описанием,
+    ошибки полей — ``422`` в формате валидации тела FastAPI.
+    """
+
+    limits = report_admission.limits
+    try:
+        return load_project(body, limits.max_blocks, limits.max_depth)
+    except ProjectFormatError as exc:
+        raise HTTPException(status_code=422, detail=str(exc)) from exc
+    except ReportLimitError as exc:
+        raise HTTPException(status_code=413, detail=str(exc)) from exc
+    except ValidationError as exc:
+        # Входные значения не включаются: в них есть id блоков в виде байтов.
+        errors = exc.errors(include_url=False, include_input=False)
+        raise _body_errors(errors, body) from exc
+
+
+def parse_change(body: bytes) -> ReportChange:
+    """Разбирает тело запроса в ReportChange (ошибки — как у ``parse_report``)."""
+
+    return _validate_body(ReportChange, _load_body(body), body)
+
+
+_REPORT_REQUEST_BODY = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "application/json": {"schema": {"$ref": "#/components/schemas/Report"}}
+        },
+    }
+}
+
+
+def _result_response(
+    payload: bytes, etag: str, timing: str, if_none_match: Optional[str]
+) -> Response:
+    headers = {"ETag": etag, "Server-Timing": timing}
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=payload, media_type="application/json", headers=headers)
+
+
+@router.post(
+    "/validate",
+    response_model=ValidationResult,
+    openapi_extra=_REPORT_REQUEST_BODY,
+)
+async def validate_report_endpoint(
+    request: Request,
+    diagnostics: bool = Query(
+        False, description="Добавить в ответ время работы каждого правила."
+    ),
+    x_validation_diagnostics: Optional[str] = Header(None),
+    if_none_match: Optional[str] = Header(None),
+    fail_fast: bool = Query(False, description="Остановиться на первой ошибке."),
+    codes: Optional[List[str]] = Query(
+        None, description="Проверять только правила с этими кодами замечаний."
+    ),
+    level: Optional[ValidationIssueLevel] = Query(
+        None, description="Проверять только замечания этого уровня."
+    ),
+    max_issues_per_rule: Optional[int] = Query(
+        None, ge=1, description="Не больше стольких замечаний от каждого правила."
+    ),
+) -> Response:
     """
     Проверяет отчёт по всем подключённым правилам валидации.
 
     Тело запроса: Report (JSON).
     Ответ: ValidationResult (JSON) со списками ошибок и предупреждений.
+    Время работы правил всегда возвращается в заголовке Server-Timing, а при
+    ``?diagnostics=true`` или заголовке ``X-Validation-Diagnostics: 1`` —
+    ещё и в поле ``diagnostics`` ответа.
+
+    Параметры ``fail_fast``, ``codes`` (можно повторять), ``level`` и
+    ``max_issues_per_rule`` соответствуют одноимённым аргументам
+    ``validate_report``. Например, для проверки перед экспортом достаточно
+    ``?fail_fast=true&level=error``.
+
+    Ответ содержит ETag — хэш содержимого отчёта, пресета, версии набора
+    правил и параметров проверки. На запрос с совпадающим ``If-None-Match``
+    возвращается ``304 Not Modified`` без тела, а готовые ответы хранятся в
+    ``result_cache``, так что повторная проверка того же отчёта (например, при
+    автосохранении) не запускает правила. Побайтно повторяющееся тело
+    находится в кэше даже без разбора JSON; о попадании в кэш сообщает
+    ``Server-Timing: cache;desc=hit``. С диагностикой кэш не используется.
+
+    Тело читается как есть и разбирается ``parse_report``, а результат
+    сериализуется ``model_dump_json`` прямо в байты ответа: без промежуточных
+    dict и без повторной проверки через ``response_model`` (он остаётся только
+    для документации). Разбор и проверка выполняются в
+    пуле потоков, чтобы не блокировать цикл событий.
+
+    Размер тела, число блоков и глубина вложенности ограничены (``413``), а
+    число одновременно проверяемых отчётов — очередью ``report_admission``
+    (``429``/``503`` с ``Retry-After`` при перегрузке).
+    """
+
+    body = await report_admission.read_body(request)
+    include_diagnostics = diagnostics or x_validation_diagnostics in ("1", "true")
+    options = (
+        fail_fast,
+        tuple(sorted(set(codes))) if codes else None,
+        level.value if level else None,
+        max_issues_per_rule,
+    )
+    body_key = result_cache.body_key(body, options)
+
+    if not include_diagnostics:
+        cached = result_cache.lookup(body_key)
+        if cached is not None:
+            etag, payload = cached
+            return _result_response(payload, etag, CACHE_HIT_TIMING, if_none_match)
+
+    def run() -> Response:
+        report = parse_report(body)
+        # ETag и проверка используют один индекс и одни хэши блоков.
+        with report.frozen():
+            etag = validation_etag(report, options)
+            if not include_diagnostics:
+                if etag_matches(if_none_match, etag):
+                    return Response(
+                        status_code=304,
+                        headers={"ETag": etag, "Server-Timing": CACHE_HIT_TIMING},
+                    )
+                payload = result_cache.get(etag)
+                if payload is not None:
+                    result_cache.remember(etag, body_key)
+                    return _result_response(payload, etag, CACHE_HIT_TIMING, None)
+
+            result = validate_report(
+                report,
+                diagnostics=True,
+                fail_fast=fail_fast,
+                codes=codes,
+                level=level,
+                max_issues_per_rule=max_issues_per_rule,
+            )
+            timing = server_timing(result.diagnostics)
+            if include_diagnostics:
+                return Response(
+                    content=result.model_dump_json(),
+                    media_type="application/json",
+                    headers={"Server-Timing": timing},
+                )
+
+            result.diagnostics = None
+            payload = result.model_dump_json().encode()
+            result_cache.put(etag, payload, body_key)
+            return _result_response(payload, etag, timing, None)
+
+    async with report_admission.slot():
+        return await run_in_threadpool(run)
+
+
+def _release_after(chunks: Iterable[T], admission: Admission) -> Iterator[T]:
+    try:
+        yield from chunks
+    finally:
+        admission.release()
+
+
+@router.post(
+    "/validate/stream",
+    response_class=StreamingResponse,
+    responses={
+        200: {
+            "content": {"application/x-ndjson": {}, "text/event-stream": {}},
+            "description": "Поток событий issue, rule и summary.",
+        }
+    },
+    openapi_extra=_REPORT_REQUEST_BODY,
+)
+async def validate_report_stream_endpoint(
+    request: Request, accept: Optional[str] = Header(None)
+) -> StreamingResponse:
+    """
+    Проверяет отчёт и передаёт замечания потоком по мере завершения правил.
+
+    Тело запроса: Report (JSON).
+    Ответ: NDJSON (по умолчанию) или Server-Sent Events, если клиент передал
+    ``Accept: text/event-stream``. На каждое замечание приходит событие
+    ``issue``, на каждое завершённое правило — ``rule``, в конце — ``summary``
+    с числом ошибок и предупреждений.
+
+    Ограничения те же, что у ``POST /reports/validate``; место в очереди
+    проверки занято, пока передаётся поток.
+    """
+
+    if accept and "text/event-stream" in accept:
+        media_type, formatter = "text/event-stream", format_sse
+    else:
+        media_type, formatter = "application/x-ndjson", format_ndjson
+
+    body = await report_admission.read_body(request)
+    admission = await report_admission.acquire()
+    try:
+        report = await run_in_threadpool(parse_report, body)
+        events = iter_validation_events(report)
+    except BaseException:
+        admission.release()
+        raise
+
+    return StreamingResponse(
+        _release_after(map(formatter, events), admission),
+        media_type=media_type,
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        background=BackgroundTask(admission.release),
+    )
+
+
+@router.post(
+    "/estimate-layout",
+    response_model=LayoutEstimate,
+    openapi_extra=_REPORT_REQUEST_BODY,
+)
+async def estimate_layout_endpoint(request: Request) -> Response:
+    """
+    Оценивает вёрстку отчёта: число страниц, заполнение каждой страницы
+    основной части и блоки на ней (например, для счётчика страниц в редакторе).
+
+    Тело запроса: Report (JSON).
+    Ответ: LayoutEstimate (JSON).
+    Измерения блоков кэшируются по их содержимому, поэтому повторная оценка
+    после правки заново измеряет только изменённые блоки. Ограничения те же,
+    что у ``POST /reports/validate``.
+    """
+
+    body = await report_admission.read_body(request)
+
+    def run() -> Response:
+        estimate = estimate_layout(parse_report(body))
+        return Response(
+            content=estimate.model_dump_json(), media_type="application/json"
+        )
+
+    async with report_admission.slot():
+        return await run_in_threadpool(run)
+
+
+@router.post(
+    "/figure-images",
+    response_model=List[FigureImageStatus],
+    openapi_extra=_REPORT_REQUEST_BODY,
+)
+async def figure_images_endpoint(request: Request) -> Response:
+    """
+    Состояние подготовки изображений рисунков отчёта (см. ``POST /images``).
+
+    Тело запроса: Report (JSON).
+    Ответ: по элементу на каждый рисунок со ссылкой на изображение
+    (``image_hash``), в порядке документа. Изображения в состоянии
+    ``pending`` ставятся в очередь подготовки.
+    """
+
+    body = await report_admission.read_body(request)
+
+    def run() -> List[FigureImageStatus]:
+        figures = parse_report(body).index().of_type(FigureBlock)
+        return [
+            FigureImageStatus(
+                block_id=figure.id,
+                hash=figure.image_hash,
+                state=image_pipeline.state(figure.image_hash),
+                error=image_pipeline.error(figure.image_hash),
+            )
+            for figure in figures
+            if figure.image_hash
+        ]
+
+    async with report_admission.slot():
+        statuses = await run_in_threadpool(run)
+    for status in statuses:
+        if status.state == "pending":
+            image_pipeline.submit(status.hash)
+    return Response(
+        content=FIGURE_IMAGES.dump_json(statuses), media_type="application/json"
+    )
+
+
+def _prepare_export(body: bytes) -> Tuple[Report, ValidationResult]:
+    report = parse_report(body)
+    result = validate_report(report, fail_fast=True, level=ValidationIssueLevel.ERROR)
+    return report, result
+
+
+def _export_rejected(result: ValidationResult) -> Response:
+    return Response(
+        content=result.model_dump_json(),
+        status_code=422,
+        media_type="application/json",
+    )
+
+
+def _attachment(file_name: str) -> str:
+    return f"attachment; filename=\"report.docx\"; filename*=UTF-8''{quote(file_name)}"
+
+
+def _export_job_response(job: ExportJob) -> Response:
+    return Response(
+        content=export_jobs.status(job).model_dump_json(),
+        media_type="application/json",
+    )
+
+
+@router.post(
+    "/export/docx",
+    response_class=StreamingResponse,
+    responses={
+        200: {"content": {DOCX_MEDIA_TYPE: {}}, "description": "Файл DOCX."},
+        202: {"model": ExportJobStatus, "description": "Задача экспорта (async=1)."},
+        422: {
+            "model": ValidationResult,
+            "description": "В отчёте есть ошибки оформления, экспорт невозможен.",
+        },
+    },
+    openapi_extra=_REPORT_REQUEST_BODY,
+)
+async def export_docx_endpoint(
+    request: Request, run_async: bool = Query(False, alias="async")
+) -> Response:
+    """
+    Экспортирует отчёт в DOCX по требованиям МИСИС.
+
+    Тело запроса: Report (JSON).
+    Ответ: файл DOCX, который передаётся по частям по мере формирования —
+    первые байты уходят сразу, а память не растёт с размером отчёта.
+    Отчёт с ошибками (уровень ``error``) не экспортируется: ответ ``422``
+    с первой найденной ошибкой (REQUIREMENTS §6.1).
+
+    С ``?async=1`` документ строится в фоне (``app.services.export.jobs``):
+    ответ ``202`` — состояние задачи, за которым следят через
+    ``GET /reports/export/jobs/{id}``. Одинаковые отчёты получают одну задачу.
+
+    Ограничения те же, что у ``POST /reports/validate``; место в очереди
+    проверки занято, пока передаётся файл (в фоновом режиме — только на
+    время разбора и проверки).
+    """
+
+    body = await report_admission.read_body(request)
+    if run_async:
+        async with report_admission.slot():
+            report, result = await run_in_threadpool(_prepare_export, body)
+        if result.errors:
+            return _export_rejected(result)
+        job = export_jobs.submit(report, body)
+        response = _export_job_response(job)
+        response.status_code = 202
+        response.headers["Location"] = str(
+            request.url_for("get_export_job_endpoint", job_id=job.id)
+        )
+        return response
+
+    admission = await report_admission.acquire()
+    try:
+        report, result = await run_in_threadpool(_prepare_export, body)
+    except BaseException:
+        admission.release()
+        raise
+    if result.errors:
+        admission.release()
+        return _export_rejected(result)
+
+    return StreamingResponse(
+        _release_after(iter_docx(report), admission),
+        media_type=DOCX_MEDIA_TYPE,
+        headers={"Content-Disposition": _attachment(export_file_name(report.meta))},
+        background=BackgroundTask(admission.release),
+    )
+
+
+def _get_export_job(job_id: str) -> ExportJob:
+    job = export_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Задача экспорта не найдена.")
+    return job
+
+
+@router.get(
+    "/export/jobs/{job_id}",
+    response_model=ExportJobStatus,
+    responses={404: {"description": "Задачи нет или её файл уже удалён."}},
+)
+async def get_export_job_endpoint(job_id: str) -> Response:
+    """
+    Состояние задачи фонового экспорта: ``queued``, ``running`` (с числом
+    обработанных блоков ``blocks_done`` из ``blocks_total``), ``done``,
+    ``failed`` (с причиной в ``error``) или ``cancelled``.
+    """
+
+    return _export_job_response(_get_export_job(job_id))
+
+
+@router.delete(
+    "/export/jobs/{job_id}",
+    response_model=ExportJobStatus,
+    responses={404: {"description": "Задачи нет или её файл уже удалён."}},
+)
+async def cancel_export_job_endpoint(job_id: str) -> Response:
+    """
+    Отменяет задачу фонового экспорта; если файл уже готов, удаляет его.
+    Ответ — состояние задачи после отмены.
+    """
+
+    job = _get_export_job(job_id)
+    export_jobs.cancel(job)
+    return _export_job_response(job)
+
+
+@router.get(
+    "/export/jobs/{job_id}/file",
+    response_class=FileResponse,
+    responses={
+        200: {"content": {DOCX_MEDIA_TYPE: {}}, "description": "Файл DOCX."},
+        404: {"description": "Задачи нет или её файл уже удалён."},
+        409: {"description": "Файл ещё не готов (или задача не удалась)."},
+    },
+)
+async def get_export_job_file_endpoint(job_id: str) -> Response:
+    """Отдаёт готовый файл задачи фонового экспорта."""
+
+    job = _get_export_job(job_id)
+    if job.state != "done":
+        raise HTTPException(
+            status_code=409, detail=f"Задача экспорта в состоянии {job.state}."
+        )
+    return FileResponse(
+        export_jobs.path(job.id),
+        media_type=DOCX_MEDIA_TYPE,
+        headers={"Content-Disposition": _attachment(job.file_name)},
+    )
+
+
+@router.post(
+    "/project/save",
+    response_class=Response,
+    responses={200: {"content": {PROJECT_MEDIA_TYPE: {}}}},
+    openapi_extra=_REPORT_REQUEST_BODY,
+)
+async def save_project_endpoint(request: Request) -> Response:
     """
+    Сохраняет отчёт в бинарном формате проекта.
+
+    Тело запроса: Report (JSON).
+    Ответ: файл проекта (``application/vnd.ghost.project``), который
+    загружается обратно через ``POST /reports/project/load`` без потерь.
+    Ограничения те же, что у ``POST /reports/validate``. Отчёт с одиночным
+    суррогатом в тексте (``"\\ud800"``) не сохраняется: ``422``.
+    """
+
+    body = await report_admission.read_body(request)
+
+    def run() -> Response:
+        try:
+            content = dump_project(parse_report(body))
+        except ProjectEncodingError as exc:
+            raise HTTPException(status_code=422, detail=str(exc)) from exc
+        return Response(
+            content=content,
+            media_type=PROJECT_MEDIA_TYPE,
+            headers={
+                "Content-Disposition": f'attachment; filename="report{PROJECT_SUFFIX}"'
+            },
+        )
+
+    async with report_admission.slot():
+        return await run_in_threadpool(run)
+
+
+@router.post(
+    "/project/load",
+    response_model=Report,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                PROJECT_MEDIA_TYPE: {"schema": {"type": "string", "format": "binary"}}
+            },
+        }
+    },
+)
+async def load_project_endpoint(request: Request) -> Response:
+    """
+    Загружает отчёт из файла проекта в бинарном формате.
+
+    Тело запроса: файл проекта (``application/vnd.ghost.project``).
+    Ответ: Report (JSON). Ограничения те же, что у ``POST /reports/validate``.
+    """
+
+    body = await report_admission.read_body(request)
+
+    def run() -> Response:
+        return Response(
+            content=parse_project(body).model_dump_json(),
+            media_type="application/json",
+        )
+
+    async with report_admission.slot():
+        return await run_in_threadpool(run)
+
+
+@router.post(
+    "/versions",
+    response_model=VersionedValidationResult,
+    openapi_extra=_REPORT_REQUEST_BODY,
+)
+async def create_report_version_endpoint(
+    request: Request,
+) -> VersionedValidationResult:
+    """
+    Проверяет отчёт и сохраняет его на сервере как версию для последующих
+    инкрементальных проверок.
+
+    Тело запроса: Report (JSON).
+    Ответ: идентификатор версии и ValidationResult.
+    """
+
+    body = await report_admission.read_body(request)
+
+    def run() -> VersionedValidationResult:
+        report = parse_report(body)
+        result = validate_report(report)
+        version = report_store.put(report, result)
+        return VersionedValidationResult(version=version, result=result)
+
+    async with report_admission.slot():
+        return await run_in_threadpool(run)
+
+
+@router.post(
+    "/versions/{version}/validate",
+    response_model=VersionedValidationResult,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/json": {
+                    "schema": {"$ref": "#/components/schemas/ReportChange"}
+                }
+            },
+        }
+    },
+)
+async def validate_report_change_endpoint(
+    version: str, request: Request
+) -> VersionedValidationResult:
+    """
+    Применяет правку к сохранённой версии отчёта и перепроверяет только то,
+    что затронуто правкой.
+
+    Тело запроса: ReportChange (JSON).
+    Ответ: идентификатор новой версии и ValidationResult.
+    Если версия неизвестна (например, вытеснена из памяти), возвращается 404 —
+    клиенту нужно заново отправить отчёт целиком в ``POST /reports/versions``.
+    """
+
+    body = await report_admission.read_body(request)
+    stored = report_store.get(version)
+    if stored is None:
+        raise HTTPException(status_code=404, detail="Версия отчёта не найдена.")
+
+    previous_report, previous_result = stored
+
+    def run() -> VersionedValidationResult:
+        change = parse_change(body)
+        try:
+            report, changed_block_ids = apply_change(previous_report, change)
+        except ReportChangeError as exc:
+            raise HTTPException(status_code=422, detail=str(exc)) from exc
+
+        result = validate_incremental(
+            previous_report, previous_result, report, changed_block_ids
+        )
+        new_version = report_store.put(report, result)
+        return VersionedValidationResult(version=new_version, result=result)
+
+    async with report_admission.slot():
+        return await run_in_threadpool(run)
+
+
+@router.get("/versions/{version}/blocks/{block_id}", response_model=BlockLocation)
+def get_report_block_endpoint(version: str, block_id: UUID) -> BlockLocation:
+    """
+    Возвращает блок сохранённой версии отчёта вместе с его положением в дереве
+    (родитель, путь от верхнего уровня, глубина, позиция в документе) — например,
+    чтобы UI мог перейти к блоку из замечания валидации по ``block_id``.
+
+    Если версия или блок неизвестны, возвращается 404.
+    """
+
+    stored = report_store.get(version)
+    if stored is None:
+        raise HTTPException(status_code=404, detail="Версия отчёта не найдена.")
 
-    return validate_report(report)
+    location = stored[0].index().locate(block_id)
+    if location is None:
+        raise HTTPException(status_code=404, detail="Блок не найден в отчёте.")
+    return location
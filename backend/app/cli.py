@@ -0,0 +1,338 @@
+"""
+Командная строка бэкенда GHOST.
+
+Пакетная проверка сохранённых проектов (JSON-сериализаций ``Report`` или
+бинарных файлов ``.ghp``)::
+
+    python -m app.cli validate projects/ --jobs 8 --format csv > summary.csv
+    python -m app.cli validate "group-*/**/*.json"
+
+Преобразование проекта между JSON и бинарным форматом (направление — по
+расширению выходного файла)::
+
+    python -m app.cli convert report.json report.ghp
+
+Файлы проверяются в пуле процессов; каждый рабочий процесс читает и разбирает
+по одному отчёту за раз, а в основной процесс возвращается только короткая
+сводка, которая сразу же выводится. Поэтому память не растёт с числом файлов.
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import functools
+import glob
+import json
+import multiprocessing
+import sys
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, TextIO
+
+from pydantic import ValidationError
+
+from app.models import ValidationIssueLevel
+from app.services.reports.project_file import (
+    PROJECT_SUFFIX,
+    ProjectFormatError,
+    dump_project,
+    read_report,
+)
+from app.services.validation.engine import validate_report
+from app.services.validation.presets import UnknownPresetError
+from app.settings import settings
+
+STATUS_OK = "ok"
+STATUS_FAILED = "failed"
+STATUS_INVALID = "invalid"
+
+CSV_FIELDS = ("file", "status", "errors", "warnings", "error_codes", "warning_codes")
+
+_GLOB_CHARS = frozenset("*?[")
+
+#: Расширения файлов проектов, которые ищутся в каталогах.
+PROJECT_SUFFIXES = (".json", PROJECT_SUFFIX)
+
+
+@dataclass
+class FileSummary:
+    """Итог проверки одного файла проекта."""
+
+    file: str
+    status: str
+    errors: int = 0
+    warnings: int = 0
+    error_codes: Dict[str, int] = field(default_factory=dict)
+    warning_codes: Dict[str, int] = field(default_factory=dict)
+    detail: Optional[str] = None
+
+
+def collect_paths(patterns: Iterable[str]) -> List[Path]:
+    """
+    Раскрывает аргументы командной строки в список файлов: каталог — все
+    ``*.json`` и ``*.ghp`` в нём рекурсивно, шаблон — ``glob`` (с поддержкой ``**``),
+    иначе — путь к файлу как есть. Порядок стабильный, повторы убираются.
+    """
+
+    seen: Dict[Path, None] = {}
+    for pattern in patterns:
+        path = Path(pattern)
+        if _GLOB_CHARS & set(pattern):
+            matches = sorted(Path(item) for item in glob.glob(pattern, recursive=True))
+        elif path.is_dir():
+            matches = sorted(
+                item for item in path.rglob("*") if item.suffix in PROJECT_SUFFIXES
+            )
+        else:
+            matches = [path]
+        for match in matches:
+            if not match.is_dir():
+                seen.setdefault(match, None)
+    return list(seen)
+
+
+def validate_file(
+    path: Path,
+    level: Optional[ValidationIssueLevel] = None,
+    max_issues_per_rule: Optional[int] = None,
+) -> FileSummary:
+    """
+    Читает, разбирает и проверяет один файл проекта так же, как
+    ``POST /api/v1/reports/validate``: правила пресета отчёта, ``level`` и
+    ``max_issues_per_rule`` — как у ``validate_report``. Любая ошибка при этом
+    (превышены ограничения разбора, упало правило) попадает в сводку файла,
+    а не прерывает проверку остальных.
+    """
+
+    try:
+        return _validate_file(path, level, max_issues_per_rule)
+    except Exception as exc:
+        detail = str(exc) or type(exc).__name__
+        return FileSummary(str(path), STATUS_INVALID, detail=detail)
+
+
+def _validate_file(
+    path: Path,
+    level: Optional[ValidationIssueLevel],
+    max_issues_per_rule: Optional[int],
+) -> FileSummary:
+    try:
+        report = read_report(path.read_bytes())
+    except OSError as exc:
+        return FileSummary(str(path), STATUS_INVALID, detail=exc.strerror or str(exc))
+    except ProjectFormatError as exc:
+        return FileSummary(str(path), STATUS_INVALID, detail=str(exc))
+    except ValidationError as exc:
+        return FileSummary(
+            str(path), STATUS_INVALID, detail=f"{exc.error_count()} ошибок схемы"
+        )
+    try:
+        result = validate_report(
+            report, level=level, max_issues_per_rule=max_issues_per_rule
+        )
+    except UnknownPresetError as exc:
+        return FileSummary(str(path), STATUS_INVALID, detail=str(exc))
+
+    error_codes = Counter(issue.code for issue in result.errors)
+    warning_codes = Counter(issue.code for issue in result.warnings)
+    errors = sum(error_codes.values())
+    return FileSummary(
+        file=str(path),
+        status=STATUS_FAILED if errors else STATUS_OK,
+        errors=errors,
+        warnings=sum(warning_codes.values()),
+        error_codes=dict(error_codes),
+        warning_codes=dict(warning_codes),
+    )
+
+
+def iter_summaries(
+    paths: Sequence[Path],
+    jobs: int,
+    level: Optional[ValidationIssueLevel] = None,
+    max_issues_per_rule: Optional[int] = None,
+) -> Iterator[FileSummary]:
+    """
+    Проверяет файлы и выдаёт сводки в порядке ``paths`` по мере готовности.
+    При ``jobs > 1`` файлы распределяются по пулу процессов.
+    """
+
+    check = functools.partial(
+        validate_file, level=level, max_issues_per_rule=max_issues_per_rule
+    )
+    if jobs <= 1 or len(paths) <= 1:
+        yield from map(check, paths)
+        return
+
+    with ProcessPoolExecutor(
+        max_workers=jobs, mp_context=multiprocessing.get_context("spawn")
+    ) as pool:
+        chunksize = max(1, min(16, len(paths) // (jobs * 4)))
+        yield from pool.map(check, paths, chunksize=chunksize)
+
+
+def _format_codes(codes: Dict[str, int]) -> str:
+    return ";".join(f"{code}={count}" for code, count in sorted(codes.items()))
+
+
+class _Writer:
+    def __init__(self, stream: TextIO, output_format: str) -> None:
+        self.stream = stream
+        self.csv = None
+        if output_format == "csv":
+            self.csv = csv.writer(stream, lineterminator="\n")
+            self.csv.writerow(CSV_FIELDS)
+
+    def write(self, summary: FileSummary) -> None:
+        if self.csv is not None:
+            self.csv.writerow(
+                (
+                    summary.file,
+                    summary.status,
+                    summary.errors,
+                    summary.warnings,
+                    _format_codes(summary.error_codes),
+                    _format_codes(summary.warning_codes),
+                )
+            )
+        else:
+            record = asdict(summary)
+            if summary.detail is None:
+                del record["detail"]
+            self.stream.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self.stream.flush()
+
+
+def _run_validate(args: argparse.Namespace) -> int:
+    paths = collect_paths(args.paths)
+    if not paths:
+        print("Не найдено ни одного файла проекта.", file=sys.stderr)
+        return 2
+
+    progress = args.progress if args.progress is not None else sys.stderr.isatty()
+    output: TextIO = (
+        open(args.output, "w", encoding="utf-8", newline="")
+        if args.output
+        else sys.stdout
+    )
+    totals: Counter[str] = Counter()
+    try:
+        writer = _Writer(output, args.format)
+        summaries = iter_summaries(
+            paths, args.jobs, args.level, args.max_issues_per_rule
+        )
+        for done, summary in enumerate(summaries, start=1):
+            writer.write(summary)
+            totals[summary.status] += 1
+            if progress:
+                sys.stderr.write(f"\rПроверено {done}/{len(paths)}")
+                sys.stderr.flush()
+    finally:
+        if output is not sys.stdout:
+            output.close()
+
+    if progress:
+        sys.stderr.write("\n")
+    print(
+        f"Файлов: {len(paths)}; без ошибок: {totals[STATUS_OK]}, "
+        f"с ошибками: {totals[STATUS_FAILED]}, "
+        f"не разобрано: {totals[STATUS_INVALID]}.",
+        file=sys.stderr,
+    )
+    return 0 if totals[STATUS_OK] == len(paths) else 1
+
+
+def _run_convert(args: argparse.Namespace) -> int:
+    try:
+        report = read_report(Path(args.source).read_bytes())
+    except OSError as exc:
+        print(f"{args.source}: {exc.strerror or exc}", file=sys.stderr)
+        return 2
+    except (ProjectFormatError, ValidationError) as exc:
+        print(
+            f"{args.source}: файл не является проектом отчёта: {exc}", file=sys.stderr
+        )
+        return 1
+
+    target = Path(args.target)
+    if target.suffix == PROJECT_SUFFIX:
+        target.write_bytes(dump_project(report))
+    else:
+        target.write_text(report.model_dump_json(indent=2), encoding="utf-8")
+    return 0
+
+
+def _positive_int(value: str) -> int:
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError("ожидается целое число не меньше 1")
+    return number
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m app.cli")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    validate = commands.add_parser(
+        "validate", help="Проверить сохранённые проекты отчётов."
+    )
+    validate.add_argument(
+        "paths", nargs="+", help="Файлы, каталоги или glob-шаблоны с JSON-проектами."
+    )
+    validate.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=max(1, settings.validation_workers),
+        help="Число рабочих процессов (по умолчанию GHOST_VALIDATION_WORKERS).",
+    )
+    validate.add_argument(
+        "-f",
+        "--format",
+        choices=("ndjson", "csv"),
+        default="ndjson",
+        help="Формат вывода: строка JSON на файл или CSV-сводка.",
+    )
+    validate.add_argument(
+        "-o", "--output", help="Файл для результатов (по умолчанию stdout)."
+    )
+    validate.add_argument(
+        "--level",
+        type=ValidationIssueLevel,
+        choices=[level.value for level in ValidationIssueLevel],
+        help="Проверять только замечания этого уровня.",
+    )
+    validate.add_argument(
+        "--max-issues-per-rule",
+        type=_positive_int,
+        help="Не больше стольких замечаний от каждого правила.",
+    )
+    validate.add_argument(
+        "--progress",
+        action=argparse.BooleanOptionalAction,
+        default=None,
+        help="Показывать прогресс в stderr (по умолчанию — если это терминал).",
+    )
+    validate.set_defaults(handler=_run_validate)
+
+    convert = commands.add_parser(
+        "convert", help="Преобразовать проект между JSON и бинарным форматом."
+    )
+    convert.add_argument("source", help="Файл проекта (JSON или .ghp).")
+    convert.add_argument(
+        "target", help="Выходной файл: .ghp — бинарный формат, иначе JSON."
+    )
+    convert.set_defaults(handler=_run_convert)
+    return parser
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
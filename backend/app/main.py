@@ -1,6 +1,17 @@
-from fastapi import FastAPI
+from typing import Any, Dict
 
+from fastapi import FastAPI, Request
+from fastapi.openapi.utils import get_openapi
+from fastapi.responses import JSONResponse
+from pydantic.json_schema import models_json_schema
+
+from app.api.admission import report_admission
+from app.api.v1.diagnostics import router as diagnostics_router
+from app.api.v1.images import router as images_router
+from app.api.v1.presets import router as presets_router
 from app.api.v1.reports import router as reports_router
+from app.models import Report, ReportChange
+from app.services.validation.presets import UnknownPresetError
 
 app = FastAPI(
     title="API конструктора отчётов GHOST",
@@ -10,9 +21,48 @@ app = FastAPI(
 
 
 @app.get("/health")
-async def health_check() -> dict[str, str]:
-    """Простой эндпоинт проверки состояния для проверки работы бэкенда."""
-    return {"status": "ok"}
+async def health_check() -> Dict[str, Any]:
+    """
+    Проверка работы бэкенда: статус, ограничения эндпоинтов отчётов и текущая
+    загрузка очереди проверки (``active`` — обрабатываются, ``queued`` — ждут).
+    """
+    return {"status": "ok", "reports": report_admission.stats()}
+
 
+@app.exception_handler(UnknownPresetError)
+async def unknown_preset_handler(request: Request, exc: UnknownPresetError):
+    """Отчёт с неизвестным пресетом оформления нельзя проверить: 422."""
+    return JSONResponse(status_code=422, content={"detail": str(exc)})
 
+
+app.include_router(presets_router, prefix="/api/v1")
 app.include_router(reports_router, prefix="/api/v1")
+app.include_router(diagnostics_router, prefix="/api/v1")
+app.include_router(images_router, prefix="/api/v1")
+
+
+def openapi() -> Dict[str, Any]:
+    """
+    Схема OpenAPI. Эндпоинты отчётов читают тело сами (с ограничениями
+    размера), поэтому схемы Report и ReportChange добавляются в компоненты
+    явно — на них ссылаются ``requestBody`` этих эндпоинтов.
+    """
+    if app.openapi_schema is None:
+        schema = get_openapi(
+            title=app.title,
+            version=app.version,
+            description=app.description,
+            routes=app.routes,
+        )
+        _, definitions = models_json_schema(
+            [(Report, "validation"), (ReportChange, "validation")],
+            ref_template="#/components/schemas/{model}",
+        )
+        components = schema.setdefault("components", {}).setdefault("schemas", {})
+        for name, definition in definitions["$defs"].items():
+            components.setdefault(name, definition)
+        app.openapi_schema = schema
+    return app.openapi_schema
+
+
+app.openapi = openapi  # type: ignore[method-assign]
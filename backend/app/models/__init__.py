@@ -1,3 +1,9 @@
+from .changes import BlockInsertion, ReportChange
+from .exports import ExportJobStatus
+from .images import FigureImageStatus, ImageStatus, StoredImage
+from .index import BlockLocation, ReportIndex
+from .layout import LayoutEstimate, PageEstimate
+from .presets import Preset, PresetInfo, PresetRule
 from .report import (
     AppendixBlock,
     BaseBlock,
@@ -14,7 +20,15 @@ from .report import (
     TextBlock,
     WorkType,
 )
-from .validation import ValidationIssue, ValidationIssueLevel, ValidationResult
+from .validation import (
+    RuleDiagnostics,
+    ValidationDiagnostics,
+    ValidationIssue,
+    ValidationIssueLevel,
+    ValidationResult,
+    ValidationSummary,
+    VersionedValidationResult,
+)
 
 __all__ = [
     "ReportMeta",
@@ -31,7 +45,24 @@ __all__ = [
     "AppendixBlock",
     "ReportBlock",
     "Report",
+    "ReportIndex",
+    "BlockLocation",
+    "BlockInsertion",
+    "StoredImage",
+    "ImageStatus",
+    "FigureImageStatus",
+    "ExportJobStatus",
+    "LayoutEstimate",
+    "PageEstimate",
+    "Preset",
+    "PresetRule",
+    "PresetInfo",
+    "ReportChange",
     "ValidationIssueLevel",
     "ValidationIssue",
     "ValidationResult",
+    "RuleDiagnostics",
+    "ValidationDiagnostics",
+    "ValidationSummary",
+    "VersionedValidationResult",
 ]
@@ -0,0 +1,39 @@
+from __future__ import annotations
+
+from typing import List, Optional
+from uuid import UUID
+
+from pydantic import BaseModel, Field
+
+from .report import ReportBlock, ReportMeta
+
+
+class BlockInsertion(BaseModel):
+    """
+    Вставка нового блока (вместе с вложенными блоками).
+
+    - parent_id: блок-родитель; None — вставка на верхний уровень отчёта.
+    - index: позиция среди детей родителя (после применения удалений).
+    """
+
+    parent_id: Optional[UUID] = None
+    index: int = Field(ge=0)
+    block: ReportBlock
+
+
+class ReportChange(BaseModel):
+    """
+    Описание правки относительно версии отчёта, уже сохранённой на сервере.
+
+    Операции применяются в порядке: удаление, замена, вставка.
+
+    - meta: новые метаданные (если изменились).
+    - removed_block_ids: удаляемые блоки (вместе с вложенными).
+    - replaced_blocks: блоки, заменяемые по id вместе со всем поддеревом.
+    - inserted_blocks: вставляемые блоки.
+    """
+
+    meta: Optional[ReportMeta] = None
+    removed_block_ids: List[UUID] = Field(default_factory=list)
+    replaced_blocks: List[ReportBlock] = Field(default_factory=list)
+    inserted_blocks: List[BlockInsertion] = Field(default_factory=list)
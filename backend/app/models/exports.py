@@ -0,0 +1,32 @@
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Literal, Optional
+
+from pydantic import BaseModel
+
+#: Состояние задачи фонового экспорта.
+ExportJobState = Literal["queued", "running", "done", "failed", "cancelled"]
+
+
+class ExportJobStatus(BaseModel):
+    """
+    Состояние задачи фонового экспорта отчёта в DOCX.
+
+    - id: идентификатор задачи;
+    - state: ``queued`` — ждёт свободного процесса, ``running`` — документ
+      строится, ``done`` — файл готов (``GET /reports/export/jobs/{id}/file``),
+      ``failed`` — экспорт не удался, ``cancelled`` — задача отменена;
+    - blocks_done, blocks_total: сколько блоков отчёта обработано из скольких;
+    - file_name: имя готового файла;
+    - error: причина сбоя для ``failed``;
+    - expires_at: когда готовый файл будет удалён.
+    """
+
+    id: str
+    state: ExportJobState
+    blocks_done: int
+    blocks_total: int
+    file_name: str
+    error: Optional[str] = None
+    expires_at: Optional[datetime] = None
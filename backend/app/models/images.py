@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+from typing import Literal, Optional
+from uuid import UUID
+
+from pydantic import BaseModel
+
+#: Состояние подготовки изображения к экспорту и предпросмотру.
+ImageState = Literal["pending", "processing", "ready", "failed", "missing"]
+
+
+class StoredImage(BaseModel):
+    """
+    Изображение в хранилище (ответ ``POST /images``).
+
+    - hash: SHA-256 содержимого — по нему рисунок ссылается на изображение
+      (``FigureBlock.image_hash``) и оно отдаётся из ``GET /images/{hash}``;
+    - size: размер файла, байт;
+    - media_type: MIME-тип, определённый по содержимому;
+    - created: ``False``, если такое изображение уже было в хранилище.
+    """
+
+    hash: str
+    size: int
+    media_type: str
+    created: bool
+
+
+class ImageStatus(BaseModel):
+    """
+    Состояние подготовки изображения к экспорту и предпросмотру.
+
+    - hash: SHA-256 изображения;
+    - state: ``pending`` — ещё не подготовлено, ``processing`` — готовится,
+      ``ready`` — варианты готовы, ``failed`` — не удалось подготовить,
+      ``missing`` — изображения нет в хранилище;
+    - error: причина сбоя для ``failed``.
+    """
+
+    hash: str
+    state: ImageState
+    error: Optional[str] = None
+
+
+class FigureImageStatus(ImageStatus):
+    """Состояние изображения рисунка ``block_id``."""
+
+    block_id: UUID
@@ -0,0 +1,231 @@
+from __future__ import annotations
+
+from heapq import merge
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence, Tuple, Type
+from uuid import UUID
+
+from pydantic import BaseModel, Field
+
+from .report import BaseBlock, ReportBlock
+
+if TYPE_CHECKING:
+    from .report import Report
+
+
+class BlockLocation(BaseModel):
+    """
+    Блок отчёта вместе с его положением в дереве (для поиска блока по id в UI).
+
+    - block: сам блок (со вложенными блоками);
+    - parent_id: блок-родитель; None — блок верхнего уровня;
+    - path: id предков от верхнего уровня до родителя;
+    - depth: глубина вложенности (0 — верхний уровень);
+    - position: номер блока в порядке документа (обход в глубину).
+    """
+
+    block: ReportBlock
+    parent_id: Optional[UUID] = None
+    path: List[UUID] = Field(default_factory=list)
+    depth: int
+    position: int
+
+
+class ReportIndex:
+    """
+    Структурный индекс отчёта, построенный за один обход дерева.
+
+    Хранит блоки в порядке документа, отображение id → позиция, для каждой
+    позиции — родителя, глубину и номер среди соседей, а также позиции блоков
+    каждого типа. Выборки по типам (``of_type``, ``top_level``) и хэши блоков
+    (``content_hash``) запоминаются.
+
+    Индекс не следит за изменениями отчёта: его получают через
+    ``Report.index()``, который запоминает индекс только на время прохода
+    ``Report.frozen``.
+    """
+
+    __slots__ = (
+        "blocks",
+        "positions",
+        "_top_level",
+        "_parents",
+        "_depths",
+        "_offsets",
+        "_by_type",
+        "_of_type",
+        "_top_level_of_type",
+        "_hashes",
+    )
+
+    def __init__(self, report: Report) -> None:
+        blocks: List[BaseBlock] = []
+        positions: Dict[UUID, int] = {}
+        parents: List[int] = []
+        depths: List[int] = []
+        offsets: List[int] = []
+        by_type: Dict[type, List[int]] = {}
+
+        # (блок, позиция родителя или -1, глубина, номер среди соседей)
+        stack: List[Tuple[BaseBlock, int, int, int]] = [
+            (block, -1, 0, offset) for offset, block in enumerate(report.blocks)
+        ]
+        stack.reverse()
+        while stack:
+            block, parent, depth, offset = stack.pop()
+            position = len(blocks)
+            blocks.append(block)
+            positions[block.id] = position
+            parents.append(parent)
+            depths.append(depth)
+            offsets.append(offset)
+            block_type = type(block)
+            same_type = by_type.get(block_type)
+            if same_type is None:
+                by_type[block_type] = [position]
+            else:
+                same_type.append(position)
+            children = block.children
+            if children:
+                last = len(children) - 1
+                stack.extend(
+                    (child, position, depth + 1, last - index)
+                    for index, child in enumerate(reversed(children))
+                )
+
+        #: Все блоки отчёта в порядке документа (как ``iter_blocks``).
+        self.blocks: Sequence[BaseBlock] = blocks
+        #: id блока → позиция в ``blocks``.
+        self.positions: Dict[UUID, int] = positions
+        self._top_level: Sequence[BaseBlock] = report.blocks
+        self._parents = parents
+        self._depths = depths
+        self._offsets = offsets
+        self._by_type = by_type
+        self._of_type: Dict[Tuple[type, ...], Tuple[BaseBlock, ...]] = {}
+        self._top_level_of_type: Dict[Tuple[type, ...], Tuple[BaseBlock, ...]] = {}
+        self._hashes: Dict[int, bytes] = {}
+
+    def content_hash(self, block: BaseBlock) -> bytes:
+        """
+        Хэш поддерева блока этого отчёта (``BaseBlock.content_hash``).
+        Запоминается в индексе, поэтому за время жизни индекса каждый блок
+        хэшируется один раз.
+        """
+
+        return block.content_hash(self._hashes)
+
+    def __len__(self) -> int:
+        return len(self.blocks)
+
+    def __contains__(self, block_id: object) -> bool:
+        return block_id in self.positions
+
+    def get(self, block_id: UUID) -> Optional[BaseBlock]:
+        """Блок с указанным id или None, если такого блока в отчёте нет."""
+
+        position = self.positions.get(block_id)
+        return None if position is None else self.blocks[position]
+
+    def position(self, block_id: UUID) -> int:
+        """Номер блока в порядке документа (KeyError, если блока нет)."""
+
+        return self.positions[block_id]
+
+    def depth(self, block_id: UUID) -> int:
+        """Глубина вложенности блока: 0 — блок верхнего уровня."""
+
+        return self._depths[self.positions[block_id]]
+
+    def parent(self, block_id: UUID) -> Optional[BaseBlock]:
+        """Блок-родитель или None для блока верхнего уровня."""
+
+        parent = self._parents[self.positions[block_id]]
+        return None if parent < 0 else self.blocks[parent]
+
+    def parent_id(self, block_id: UUID) -> Optional[UUID]:
+        """id блока-родителя или None для блока верхнего уровня."""
+
+        parent = self.parent(block_id)
+        return None if parent is None else parent.id
+
+    def ancestors(self, block_id: UUID) -> List[BaseBlock]:
+        """Предки блока от родителя до блока верхнего уровня."""
+
+        result: List[BaseBlock] = []
+        parent = self._parents[self.positions[block_id]]
+        while parent >= 0:
+            result.append(self.blocks[parent])
+            parent = self._parents[parent]
+        return result
+
+    def siblings(self, block_id: UUID) -> Sequence[BaseBlock]:
+        """
+        Блоки того же уровня, включая сам блок: дети родителя или блоки
+        верхнего уровня отчёта.
+        """
+
+        parent = self.parent(block_id)
+        return self._top_level if parent is None else parent.children
+
+    def previous_sibling(self, block_id: UUID) -> Optional[BaseBlock]:
+        """Предыдущий блок того же уровня или None для первого блока."""
+
+        offset = self._offsets[self.positions[block_id]]
+        return self.siblings(block_id)[offset - 1] if offset > 0 else None
+
+    def next_sibling(self, block_id: UUID) -> Optional[BaseBlock]:
+        """Следующий блок того же уровня или None для последнего блока."""
+
+        offset = self._offsets[self.positions[block_id]]
+        siblings = self.siblings(block_id)
+        return siblings[offset + 1] if offset + 1 < len(siblings) else None
+
+    def of_type(self, *block_types: Type[BaseBlock]) -> Tuple[BaseBlock, ...]:
+        """
+        Блоки указанных типов (с учётом наследников) в порядке документа.
+
+        Результат запоминается, поэтому правила, которым нужны одни и те же
+        блоки, получают один и тот же кортеж.
+        """
+
+        cached = self._of_type.get(block_types)
+        if cached is not None:
+            return cached
+
+        groups = [
+            positions
+            for block_type, positions in self._by_type.items()
+            if issubclass(block_type, block_types)
+        ]
+        ordered = groups[0] if len(groups) == 1 else merge(*groups)
+        blocks = self.blocks
+        result = tuple(blocks[position] for position in ordered)
+        self._of_type[block_types] = result
+        return result
+
+    def top_level(self, *block_types: Type[BaseBlock]) -> Tuple[BaseBlock, ...]:
+        """Блоки верхнего уровня указанных типов в порядке документа (запоминаются)."""
+
+        cached = self._top_level_of_type.get(block_types)
+        if cached is None:
+            cached = tuple(
+                block for block in self._top_level if isinstance(block, block_types)
+            )
+            self._top_level_of_type[block_types] = cached
+        return cached
+
+    def locate(self, block_id: UUID) -> Optional[BlockLocation]:
+        """Блок и его положение в дереве или None, если блока нет в отчёте."""
+
+        position = self.positions.get(block_id)
+        if position is None:
+            return None
+
+        path = [ancestor.id for ancestor in reversed(self.ancestors(block_id))]
+        return BlockLocation(
+            block=self.blocks[position],
+            parent_id=path[-1] if path else None,
+            path=path,
+            depth=self._depths[position],
+            position=position,
+        )
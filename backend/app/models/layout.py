@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+from typing import List, Literal
+from uuid import UUID
+
+from pydantic import BaseModel, Field
+
+
+class PageEstimate(BaseModel):
+    """
+    Оценка одной страницы основной части отчёта.
+
+    - number: номер страницы с учётом титульного листа и содержания;
+    - fill: доля высоты области текста, занятая содержимым (0–1);
+    - block_ids: блоки, содержимое которых попало на страницу, в порядке
+      документа (блок, разорванный между страницами, есть на обеих);
+    - ends_with: чем заканчивается страница: ``overflow`` — следующий блок не
+      поместился на неё, ``page_break`` — следующий раздел начинается с новой
+      страницы, ``end`` — конец отчёта.
+    """
+
+    number: int
+    fill: float
+    block_ids: List[UUID] = Field(default_factory=list)
+    ends_with: Literal["overflow", "page_break", "end"]
+
+
+class LayoutEstimate(BaseModel):
+    """
+    Приблизительная вёрстка отчёта (ответ ``POST /reports/estimate-layout``).
+
+    - page_count: число страниц вместе с титульным листом и содержанием;
+    - front_matter_pages: страницы перед основной частью (титульный лист и
+      содержание), которые не оцениваются;
+    - pages: страницы основной части по порядку.
+    """
+
+    page_count: int
+    front_matter_pages: int
+    pages: List[PageEstimate] = Field(default_factory=list)
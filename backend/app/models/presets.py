@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+from typing import Any, Dict, List
+
+from pydantic import BaseModel, ConfigDict, Field
+
+from .validation import ValidationIssueLevel
+
+
+class Preset(BaseModel):
+    """
+    Декларативное описание пресета оформления (``ReportMeta.preset``).
+
+    - id: идентификатор пресета, указываемый в ``ReportMeta.preset``;
+    - title, description: название и описание для UI;
+    - disabled_rules: имена правил валидации, которые пресет отключает;
+    - severity: переопределение уровня замечаний по коду;
+    - params: параметры правил по имени правила (например, шаблоны подписей).
+    """
+
+    model_config = ConfigDict(frozen=True)
+
+    id: str
+    title: str
+    description: str = ""
+    disabled_rules: List[str] = Field(default_factory=list)
+    severity: Dict[str, ValidationIssueLevel] = Field(default_factory=dict)
+    params: Dict[str, Dict[str, Any]] = Field(default_factory=dict)
+
+
+class PresetRule(BaseModel):
+    """
+    Правило валидации в составе пресета.
+
+    - rule: имя правила;
+    - codes: коды замечаний правила с уровнями с учётом ``Preset.severity``;
+    - params: параметры правила, заданные пресетом.
+    """
+
+    rule: str
+    codes: Dict[str, ValidationIssueLevel] = Field(default_factory=dict)
+    params: Dict[str, Any] = Field(default_factory=dict)
+
+
+class PresetInfo(BaseModel):
+    """
+    Пресет в ответе ``GET /api/v1/presets``: описание и итоговый набор правил.
+    """
+
+    id: str
+    title: str
+    description: str = ""
+    default: bool = False
+    rules: List[PresetRule] = Field(default_factory=list)
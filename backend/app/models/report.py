@@ -1,11 +1,24 @@
 from __future__ import annotations
 
+from contextlib import contextmanager
 from datetime import date
 from enum import Enum
-from typing import Annotated, List, Literal, Optional, Union
+from functools import lru_cache
+from hashlib import blake2b
+from typing import (
+    Annotated,
+    Any,
+    Dict,
+    Iterator,
+    List,
+    Literal,
+    Optional,
+    Tuple,
+    Union,
+)
 from uuid import UUID, uuid4
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, PrivateAttr
 
 
 class WorkType(str, Enum):
@@ -67,6 +80,59 @@ class BaseBlock(BaseModel):
     type: ReportBlockType
     children: List["ReportBlock"] = Field(default_factory=list)
 
+    def content_hash(self, memo: Optional[Dict[int, bytes]] = None) -> bytes:
+        """
+        Стабильный хэш поддерева блока (16 байт): тип, id и собственные поля
+        блока плюс хэши дочерних блоков (дерево Меркла).
+
+        Блоки изменяемы (в том числе на месте: ``items.append``,
+        ``children.clear`` и т.п.), поэтому хэш не запоминается на экземпляре и
+        каждый вызов обходит поддерево. Хэши поддеревьев складываются в
+        ``memo`` (id объекта блока → хэш), если он передан: так в пределах
+        одного прохода по отчёту каждый блок хэшируется один раз (см.
+        ``ReportIndex.content_hash``).
+        """
+
+        hashes: Dict[int, bytes] = {} if memo is None else memo
+        known = hashes.get(id(self))
+        if known is not None:
+            return known
+
+        # Обход без рекурсии: сначала дети, затем родитель.
+        stack: List[Tuple[BaseBlock, bool]] = [(self, False)]
+        while stack:
+            block, children_ready = stack.pop()
+            if id(block) in hashes:
+                continue
+            if not children_ready:
+                stack.append((block, True))
+                stack.extend((child, False) for child in block.children)
+                continue
+            digest = blake2b(_own_fields_repr(block), digest_size=16)
+            for child in block.children:
+                digest.update(hashes[id(child)])
+            hashes[id(block)] = digest.digest()
+
+        return hashes[id(self)]
+
+
+@lru_cache(maxsize=None)
+def _own_field_names(block_type: type) -> Tuple[str, ...]:
+    return tuple(
+        name
+        for name in block_type.model_fields
+        if name not in ("id", "type", "children")
+    )
+
+
+def _own_fields_repr(block: BaseBlock) -> bytes:
+    values = tuple(getattr(block, name) for name in _own_field_names(type(block)))
+    return b"%s\x00%s\x00%s" % (
+        type(block).__name__.encode(),
+        block.id.bytes,
+        repr(values).encode(),
+    )
+
 
 class SectionBlock(BaseBlock):
     """
@@ -120,11 +186,15 @@ class TableBlock(BaseBlock):
 class FigureBlock(BaseBlock):
     """
     Рисунок (изображение) с подписью.
+
+    ``image_hash`` — SHA-256 изображения в хранилище (``POST /images``);
+    ``file_name`` остаётся исходным именем файла для показа пользователю.
     """
 
     type: Literal[ReportBlockType.FIGURE] = ReportBlockType.FIGURE
     caption: str
     file_name: str
+    image_hash: Optional[str] = Field(default=None, pattern=r"^[0-9a-f]{64}$")
 
 
 class ReferencesBlock(BaseBlock):
@@ -172,6 +242,71 @@ class Report(BaseModel):
     meta: ReportMeta
     blocks: List[ReportBlock] = Field(default_factory=list)
 
+    _index: Optional[ReportIndex] = PrivateAttr(default=None)
+
+    def index(self) -> ReportIndex:
+        """
+        Структурный индекс отчёта (``ReportIndex``): блоки по типам и по id,
+        родители, соседи, глубина и позиция в порядке документа.
+
+        Индекс не следит за изменениями отчёта, поэтому запоминается только на
+        время прохода ``frozen``: внутри него правила валидации и другие
+        потребители получают один и тот же индекс, а вне прохода каждый вызов
+        строит индекс заново.
+        """
+
+        index = self._index
+        return ReportIndex(self) if index is None else index
+
+    @contextmanager
+    def frozen(self) -> Iterator[ReportIndex]:
+        """
+        Проход по отчёту, который на это время не меняется: ``index()`` внутри
+        прохода возвращает один индекс, построенный при входе, а хэши блоков
+        (``ReportIndex.content_hash``) считаются один раз. При выходе индекс и
+        хэши забываются, поэтому правки между проходами (в том числе на месте,
+        ``children.append`` и т.п.) видны следующему. Вложенный проход
+        использует индекс внешнего.
+        """
+
+        index = self._index
+        if index is not None:
+            yield index
+            return
+        index = self._index = ReportIndex(self)
+        try:
+            yield index
+        finally:
+            self._index = None
+
+    def content_hash(self) -> bytes:
+        """
+        Канонический хэш содержимого отчёта (16 байт): поля метаданных плюс
+        хэши верхнеуровневых блоков (``BaseBlock.content_hash``).
+
+        Не зависит от форматирования и порядка ключей в исходном JSON, поэтому
+        одинаковые по содержанию отчёты дают одинаковый хэш. Внутри прохода
+        ``frozen`` хэши блоков берутся из его индекса и считаются один раз.
+        """
+
+        index = self._index
+        hash_of = BaseBlock.content_hash if index is None else index.content_hash
+        meta = self.meta
+        values = tuple(getattr(meta, name) for name in type(meta).model_fields)
+        digest = blake2b(repr(values).encode(), digest_size=16)
+        for block in self.blocks:
+            digest.update(hash_of(block))
+        return digest.digest()
+
+    def model_copy(
+        self, *, update: Optional[Dict[str, Any]] = None, deep: bool = False
+    ) -> Report:
+        copied = super().model_copy(update=update, deep=deep)
+        copied._index = None
+        return copied
+
+
+from .index import ReportIndex  # noqa: E402
 
 BaseBlock.model_rebuild()
 Report.model_rebuild()
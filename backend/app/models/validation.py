@@ -1,10 +1,16 @@
 from __future__ import annotations
 
 from enum import Enum
-from typing import List, Optional
+from typing import Any, List, Optional
 from uuid import UUID
 
-from pydantic import BaseModel, Field
+from pydantic import (
+    BaseModel,
+    Field,
+    PrivateAttr,
+    SerializerFunctionWrapHandler,
+    model_serializer,
+)
 
 
 class ValidationIssueLevel(str, Enum):
@@ -30,16 +36,57 @@ class ValidationIssue(BaseModel):
     hint: Optional[str] = None
 
 
+class RuleDiagnostics(BaseModel):
+    """
+    Timing of a single validation rule.
+
+    - rule: rule name (function or class name).
+    - duration_ms: time spent in the rule, milliseconds.
+    - issues: number of issues the rule produced.
+    """
+
+    rule: str
+    duration_ms: float
+    issues: int
+
+
+class ValidationDiagnostics(BaseModel):
+    """
+    Optional timing breakdown attached to a ValidationResult on request.
+
+    - total_ms: total validation time, milliseconds.
+    - rules: per-rule timings in rule registry order.
+    """
+
+    total_ms: float
+    rules: List[RuleDiagnostics] = Field(default_factory=list)
+
+
 class ValidationResult(BaseModel):
     """
     Result of validating a report.
 
     - errors: list of validation issues with level=ERROR
     - warnings: list of validation issues with level=WARNING
+    - diagnostics: optional per-rule timings (only when requested; the key
+      is omitted from the serialized result otherwise)
     """
 
     errors: List[ValidationIssue] = Field(default_factory=list)
     warnings: List[ValidationIssue] = Field(default_factory=list)
+    diagnostics: Optional[ValidationDiagnostics] = None
+
+    # No return annotation: the OpenAPI schema then stays the model's own.
+    @model_serializer(mode="wrap")
+    def _omit_missing_diagnostics(self, handler: SerializerFunctionWrapHandler):
+        data = handler(self)
+        if self.diagnostics is None:
+            data.pop("diagnostics", None)
+        return data
+
+    # Per-rule breakdown kept by the validation engine for incremental
+    # re-validation; never serialized.
+    _rule_runs: Any = PrivateAttr(default=None)
 
     @property
     def is_valid(self) -> bool:
@@ -49,3 +96,31 @@ class ValidationResult(BaseModel):
         """
 
         return not self.errors
+
+
+class ValidationSummary(BaseModel):
+    """
+    Final event of a streamed validation.
+
+    - errors: total number of issues with level=ERROR.
+    - warnings: total number of issues with level=WARNING.
+    - is_valid: True if there are no errors.
+    - total_ms: total validation time, milliseconds.
+    """
+
+    errors: int
+    warnings: int
+    is_valid: bool
+    total_ms: float
+
+
+class VersionedValidationResult(BaseModel):
+    """
+    Validation result for a report version stored on the server.
+
+    - version: identifier to send further changes against.
+    - result: validation result for that version.
+    """
+
+    version: str
+    result: ValidationResult
@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from dataclasses import dataclass
+from threading import Lock
+from time import monotonic
+from typing import Callable, Generic, Hashable, Optional, Tuple, TypeVar
+
+V = TypeVar("V")
+
+#: Приблизительные накладные расходы на одну запись (ключ, узел словаря), байт.
+ENTRY_OVERHEAD_BYTES = 200
+
+
+@dataclass(frozen=True)
+class CacheStats:
+    """Снимок счётчиков кэша."""
+
+    hits: int
+    misses: int
+    evictions: int
+    expirations: int
+    entries: int
+    size_bytes: int
+    max_bytes: int
+
+    @property
+    def hit_ratio(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class LRUCache(Generic[V]):
+    """
+    Потокобезопасный LRU-кэш с ограничением по приблизительному объёму памяти.
+
+    Размер значения оценивает функция ``sizeof``; при превышении ``max_bytes``
+    вытесняются записи, к которым дольше всего не обращались. Если задан
+    ``ttl`` (секунды), запись считается отсутствующей через ``ttl`` секунд после
+    добавления.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int,
+        sizeof: Callable[[V], int],
+        ttl: Optional[float] = None,
+        clock: Callable[[], float] = monotonic,
+    ) -> None:
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._sizeof = sizeof
+        self._clock = clock
+        self._entries: OrderedDict[Hashable, Tuple[V, int, float]] = OrderedDict()
+        self._size_bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+        self._lock = Lock()
+
+    def get(self, key: Hashable) -> Optional[V]:
+        """Возвращает значение по ключу или None, если его нет в кэше."""
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+            if self.ttl is not None and entry[2] <= self._clock():
+                del self._entries[key]
+                self._size_bytes -= entry[1]
+                self._expirations += 1
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return entry[0]
+
+    def put(self, key: Hashable, value: V) -> None:
+        """Добавляет значение; слишком большие значения не кэшируются."""
+
+        size = self._sizeof(value) + ENTRY_OVERHEAD_BYTES
+        if size > self.max_bytes:
+            return
+
+        expires = self._clock() + self.ttl if self.ttl is not None else 0.0
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size_bytes -= previous[1]
+            self._entries[key] = (value, size, expires)
+            self._size_bytes += size
+            while self._size_bytes > self.max_bytes:
+                _, (_, evicted_size, _) = self._entries.popitem(last=False)
+                self._size_bytes -= evicted_size
+                self._evictions += 1
+
+    def clear(self) -> None:
+        """Удаляет все записи (счётчики обращений сохраняются)."""
+
+        with self._lock:
+            self._entries.clear()
+            self._size_bytes = 0
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+                expirations=self._expirations,
+                entries=len(self._entries),
+                size_bytes=self._size_bytes,
+                max_bytes=self.max_bytes,
+            )
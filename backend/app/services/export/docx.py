@@ -0,0 +1,950 @@
+"""
+Экспорт отчёта в DOCX по требованиям МИСИС (REQUIREMENTS §5).
+
+Документ не собирается деревом объектов в памяти: ``word/document.xml``
+пишется фрагментами по ходу обхода ``Report.blocks`` прямо в ZIP-архив, а
+архив отдаётся частями (``iter_docx``) по мере сжатия. Поэтому первый байт
+ответа уходит сразу, а память не зависит от размера отчёта — в ней держится
+лишь буфер очередной части архива.
+
+Неизменяемые части пакета (``styles.xml``, ``settings.xml``, заготовка
+``numbering.xml`` и т. п.) для пресета МИСИС строятся один раз на процесс.
+В ``numbering.xml`` добавляются только экземпляры нумерации — по одному на
+нумерованный список, чтобы каждый начинался с 1, — поэтому он, как и
+связи с изображениями, записывается в архив после ``document.xml``.
+
+Разметка блоков кэшируется (``fragment_cache``) по хэшу содержимого блока
+(``BaseBlock.content_hash``), пресету и версии разметки: при повторном
+экспорте после небольшой правки заново строятся только изменённые блоки.
+Части, зависящие от положения блока (интервал после таблицы, экземпляр
+нумерации списка, номер рисунка и id связи с изображением), хранятся во
+фрагменте метками и подставляются при записи, поэтому фрагменты годятся и
+для сдвинувшихся блоков.
+
+Оформление:
+
+- лист A4, поля 3,0/1,5/2,0/2,0 см; основной текст Times New Roman 12 pt,
+  интервал 1,5, отступ первой строки 1,25 см, по ширине;
+- разделы, приложения и список источников верхнего уровня начинаются с новой
+  страницы; заголовки структурных разделов — по центру, остальные — слева;
+  интервалы вокруг заголовков — по сценариям §5.4;
+- таблицы на всю ширину области текста, 10 pt, интервал 1,0, шапка
+  повторяется на каждой странице, после таблицы — интервал 6 pt;
+- рисунки по центру, в пределах полей, из варианта ``export`` подготовленного
+  изображения (``images.pipeline``); рисунок без изображения заменяется
+  строкой с именем файла.
+
+Титульный лист строится из ``ReportMeta``; страница «СОДЕРЖАНИЕ» содержит
+только заголовок — оглавление и нумерацию страниц пользователь добавляет в
+Word (§4.2, §5.11).
+"""
+
+from __future__ import annotations
+
+import re
+import sys
+from datetime import datetime, time, timezone
+from functools import lru_cache
+from pathlib import Path
+from threading import Lock
+from typing import (
+    Callable,
+    Dict,
+    Hashable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+)
+from xml.sax.saxutils import escape
+from zipfile import ZIP_DEFLATED, ZIP_STORED, ZipFile, ZipInfo
+
+from PIL import Image
+
+from app.models import (
+    AppendixBlock,
+    BaseBlock,
+    FigureBlock,
+    ListBlock,
+    ReferencesBlock,
+    Report,
+    ReportMeta,
+    SectionBlock,
+    SubsectionBlock,
+    TableBlock,
+    TextBlock,
+    WorkType,
+)
+from app.services.cache import LRUCache
+from app.services.images.pipeline import ImageProcessingError, image_pipeline
+from app.settings import settings
+
+DOCX_MEDIA_TYPE = (
+    "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+)
+
+#: По сколько байт (не меньше) отдаётся архив.
+CHUNK_BYTES = 64 * 1024
+
+#: По сколько символов XML накапливается перед записью в архив.
+WRITE_BATCH_CHARS = 32 * 1024
+
+#: Версия разметки блоков: входит в ключи кэша фрагментов.
+RENDERER_VERSION = 1
+
+#: Степень сжатия XML: 6 — стандартная для DOCX, заметно быстрее 9.
+COMPRESS_LEVEL = 6
+
+#: Изображение рисунка по хэшу: путь к файлу или None, если его нет.
+ImageSource = Callable[[str], Optional[Path]]
+
+# Единицы OOXML: twip — 1/20 пт, EMU — 1/914400 дюйма.
+TWIPS_PER_CM = 1440 / 2.54
+EMU_PER_TWIP = 635
+
+#: Лист A4 и поля книжной ориентации (§5.1), twip.
+PAGE_WIDTH = 11906
+PAGE_HEIGHT = 16838
+MARGIN_LEFT = round(3.0 * TWIPS_PER_CM)
+MARGIN_RIGHT = round(1.5 * TWIPS_PER_CM)
+MARGIN_TOP = MARGIN_BOTTOM = round(2.0 * TWIPS_PER_CM)
+TEXT_WIDTH = PAGE_WIDTH - MARGIN_LEFT - MARGIN_RIGHT
+TEXT_HEIGHT = PAGE_HEIGHT - MARGIN_TOP - MARGIN_BOTTOM
+
+#: Отступ первой строки и отступ текста списков, 1,25 см.
+INDENT = round(1.25 * TWIPS_PER_CM)
+
+#: Интервал вокруг заголовков (24 pt) и перед абзацем после таблицы (6 pt).
+HEADING_SPACING = 480
+SPACE_AFTER_TABLE = 120
+
+#: Разрешение, в котором показываются изображения без указанного DPI.
+SCREEN_DPI = 96
+
+#: Наибольшая высота рисунка: область текста без строки подписи, twip.
+FIGURE_MAX_HEIGHT = TEXT_HEIGHT - 720
+
+WORK_TYPE_TITLES: Dict[WorkType, str] = {
+    WorkType.PRACTICE: "ОТЧЁТ ПО ПРАКТИЧЕСКОЙ РАБОТЕ",
+    WorkType.LAB: "ОТЧЁТ ПО ЛАБОРАТОРНОЙ РАБОТЕ",
+    WorkType.ESSAY: "РЕФЕРАТ",
+    WorkType.COURSE: "КУРСОВАЯ РАБОТА",
+    WorkType.OTHER: "ОТЧЁТ",
+}
+
+STRUCTURAL_TITLE_REFERENCES = "СПИСОК ИСПОЛЬЗОВАННЫХ ИСТОЧНИКОВ"
+
+_NAMESPACES = (
+    'xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships" '
+    'xmlns:wp="http://schemas.openxmlformats.org/drawingml/2006/wordprocessingDrawing" '
+    'xmlns:a="http://schemas.openxmlformats.org/drawingml/2006/main" '
+    'xmlns:pic="http://schemas.openxmlformats.org/drawingml/2006/picture"'
+)
+_XML_DECLARATION = '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+_W_NS = 'xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"'
+_REL_NS = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+_PKG_REL_NS = "http://schemas.openxmlformats.org/package/2006/relationships"
+
+#: Символы, недопустимые в XML 1.0 (управляющие, кроме табуляции и переводов
+#: строк), и одиночные суррогаты: JSON их допускает, а в UTF-8 они не кодируются.
+_INVALID_XML = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f\ud800-\udfff\ufffe\uffff]")
+
+_MEDIA_EXTENSIONS = {"PNG": "png", "JPEG": "jpeg", "GIF": "gif", "BMP": "bmp"}
+
+
+def _default_images(image_hash: str) -> Optional[Path]:
+    try:
+        return image_pipeline.derive_sync(image_hash, "export")
+    except (FileNotFoundError, ImageProcessingError):
+        return None
+
+
+# --- Неизменяемые части пакета ------------------------------------------------
+
+
+def _style(
+    style_id: str,
+    name: str,
+    ppr: str = "",
+    rpr: str = "",
+    based_on: str = "Normal",
+    kind: str = "paragraph",
+) -> str:
+    default = ' w:default="1"' if style_id == "Normal" else ""
+    parts = [f'<w:style w:type="{kind}"{default} w:styleId="{style_id}">']
+    parts.append(f'<w:name w:val="{name}"/>')
+    if based_on:
+        parts.append(f'<w:basedOn w:val="{based_on}"/>')
+    parts.append("<w:qFormat/>")
+    if ppr:
+        parts.append(f"<w:pPr>{ppr}</w:pPr>")
+    if rpr:
+        parts.append(f"<w:rPr>{rpr}</w:rPr>")
+    parts.append("</w:style>")
+    return "".join(parts)
+
+
+def _heading_style(level: int) -> str:
+    page_break = "<w:pageBreakBefore/>" if level == 1 else ""
+    return _style(
+        f"Heading{level}",
+        f"heading {level}",
+        ppr=(
+            f'<w:keepNext/><w:keepLines/>{page_break}<w:spacing w:before="0" '
+            f'w:after="0"/><w:ind w:firstLine="0"/><w:jc w:val="left"/>'
+            f'<w:outlineLvl w:val="{level - 1}"/>'
+        ),
+        rpr="<w:b/><w:bCs/>",
+    )
+
+
+def _styles_xml() -> str:
+    borders = "".join(
+        f'<w:{side} w:val="single" w:sz="4" w:space="0" w:color="000000"/>'
+        for side in ("top", "left", "bottom", "right", "insideH", "insideV")
+    )
+    styles = [
+        _style(
+            "Normal",
+            "Normal",
+            ppr=f'<w:ind w:firstLine="{INDENT}"/><w:jc w:val="both"/>',
+            based_on="",
+        ),
+        _heading_style(1),
+        _heading_style(2),
+        _heading_style(3),
+        _style(
+            "TocHeading",
+            "TOC Heading",
+            ppr=(
+                '<w:pageBreakBefore/><w:spacing w:after="480"/>'
+                '<w:ind w:firstLine="0"/><w:jc w:val="center"/>'
+            ),
+            rpr="<w:b/><w:bCs/>",
+        ),
+        _style(
+            "TitlePage",
+            "Title Page",
+            ppr='<w:ind w:firstLine="0"/><w:jc w:val="center"/>',
+        ),
+        _style(
+            "ListParagraph",
+            "List Paragraph",
+            ppr='<w:ind w:firstLine="0"/>',
+        ),
+        _style(
+            "Bibliography",
+            "Bibliography",
+            ppr='<w:ind w:firstLine="0"/>',
+        ),
+        _style(
+            "TableCaption",
+            "Table Caption",
+            ppr='<w:keepNext/><w:ind w:firstLine="0"/><w:jc w:val="left"/>',
+        ),
+        _style(
+            "TableText",
+            "Table Text",
+            ppr=(
+                '<w:spacing w:line="240" w:lineRule="auto"/>'
+                '<w:ind w:firstLine="0"/><w:jc w:val="left"/>'
+            ),
+            rpr='<w:sz w:val="20"/><w:szCs w:val="20"/>',
+        ),
+        _style(
+            "Figure",
+            "Figure",
+            ppr=(
+                '<w:keepNext/><w:spacing w:line="240" w:lineRule="auto"/>'
+                '<w:ind w:firstLine="0"/><w:jc w:val="center"/>'
+            ),
+        ),
+        _style(
+            "FigureCaption",
+            "Figure Caption",
+            ppr='<w:ind w:firstLine="0"/><w:jc w:val="center"/>',
+        ),
+        (
+            '<w:style w:type="table" w:styleId="ReportTable">'
+            '<w:name w:val="Report Table"/><w:tblPr><w:jc w:val="center"/>'
+            f"<w:tblBorders>{borders}</w:tblBorders>"
+            '<w:tblCellMar><w:left w:w="108" w:type="dxa"/>'
+            '<w:right w:w="108" w:type="dxa"/></w:tblCellMar></w:tblPr></w:style>'
+        ),
+    ]
+    fonts = (
+        '<w:rFonts w:ascii="Times New Roman" w:hAnsi="Times New Roman" '
+        'w:eastAsia="Times New Roman" w:cs="Times New Roman"/>'
+    )
+    return (
+        f"{_XML_DECLARATION}<w:styles {_W_NS}>"
+        f"<w:docDefaults><w:rPrDefault><w:rPr>{fonts}"
+        '<w:sz w:val="24"/><w:szCs w:val="24"/><w:lang w:val="ru-RU"/>'
+        "</w:rPr></w:rPrDefault><w:pPrDefault><w:pPr>"
+        '<w:spacing w:before="0" w:after="0" w:line="360" w:lineRule="auto"/>'
+        "</w:pPr></w:pPrDefault></w:docDefaults>"
+        f'{"".join(styles)}</w:styles>'
+    )
+
+
+def _abstract_numbering(abstract_id: int, fmt: str, text: str, suffix: str) -> str:
+    tabs = f'<w:tabs><w:tab w:val="num" w:pos="{INDENT}"/></w:tabs>'
+    return (
+        f'<w:abstractNum w:abstractNumId="{abstract_id}">'
+        '<w:multiLevelType w:val="singleLevel"/>'
+        f'<w:lvl w:ilvl="0"><w:start w:val="1"/><w:numFmt w:val="{fmt}"/>'
+        f'<w:suff w:val="{suffix}"/><w:lvlText w:val="{text}"/>'
+        '<w:lvlJc w:val="left"/>'
+        f"<w:pPr>{tabs if suffix == 'tab' else ''}"
+        f'<w:ind w:left="{INDENT}" w:hanging="{INDENT}"/></w:pPr></w:lvl>'
+        "</w:abstractNum>"
+    )
+
+
+#: Экземпляр нумерации маркированных списков (общий для всех).
+BULLET_NUM_ID = 1
+
+
+@lru_cache(maxsize=1)
+def static_parts() -> Tuple[Tuple[str, bytes], ...]:
+    """
+    Части пакета, не зависящие от отчёта: строятся один раз на процесс.
+    Последний элемент — начало ``numbering.xml`` (без экземпляров нумерации
+    и закрывающего тега).
+    """
+
+    content_types = (
+        f"{_XML_DECLARATION}<Types "
+        'xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" '
+        'ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Default Extension="png" ContentType="image/png"/>'
+        '<Default Extension="jpeg" ContentType="image/jpeg"/>'
+        '<Default Extension="gif" ContentType="image/gif"/>'
+        '<Default Extension="bmp" ContentType="image/bmp"/>'
+        '<Override PartName="/word/document.xml" ContentType="application/'
+        'vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+        '<Override PartName="/word/styles.xml" ContentType="application/'
+        'vnd.openxmlformats-officedocument.wordprocessingml.styles+xml"/>'
+        '<Override PartName="/word/settings.xml" ContentType="application/'
+        'vnd.openxmlformats-officedocument.wordprocessingml.settings+xml"/>'
+        '<Override PartName="/word/numbering.xml" ContentType="application/'
+        'vnd.openxmlformats-officedocument.wordprocessingml.numbering+xml"/>'
+        '<Override PartName="/docProps/core.xml" ContentType="application/'
+        'vnd.openxmlformats-package.core-properties+xml"/>'
+        "</Types>"
+    )
+    package_rels = (
+        f'{_XML_DECLARATION}<Relationships xmlns="{_PKG_REL_NS}">'
+        f'<Relationship Id="rId1" Type="{_REL_NS}/officeDocument" '
+        'Target="word/document.xml"/>'
+        '<Relationship Id="rId2" Type="http://schemas.openxmlformats.org/package/'
+        '2006/relationships/metadata/core-properties" Target="docProps/core.xml"/>'
+        "</Relationships>"
+    )
+    document_settings = (
+        f"{_XML_DECLARATION}<w:settings {_W_NS}>"
+        '<w:defaultTabStop w:val="709"/>'
+        '<w:characterSpacingControl w:val="doNotCompress"/>'
+        '<w:compat><w:compatSetting w:name="compatibilityMode" '
+        'w:uri="http://schemas.microsoft.com/office/word" w:val="15"/></w:compat>'
+        "</w:settings>"
+    )
+    numbering = (
+        f"{_XML_DECLARATION}<w:numbering {_W_NS}>"
+        + _abstract_numbering(0, "bullet", "–", "space")
+        + _abstract_numbering(1, "decimal", "%1)", "tab")
+        + f'<w:num w:numId="{BULLET_NUM_ID}"><w:abstractNumId w:val="0"/></w:num>'
+    )
+    return (
+        ("[Content_Types].xml", content_types.encode()),
+        ("_rels/.rels", package_rels.encode()),
+        ("word/styles.xml", _styles_xml().encode()),
+        ("word/settings.xml", document_settings.encode()),
+        ("word/numbering.xml", numbering.encode()),
+    )
+
+
+# --- Текст ------------------------------------------------------------------
+
+
+@lru_cache(maxsize=65536)
+def _runs(text: str) -> str:
+    """Прогоны абзаца с текстом ``text``: табуляции — отдельными элементами."""
+
+    if not text:
+        return ""
+    text = escape(_INVALID_XML.sub("", text))
+    return (
+        '<w:r><w:t xml:space="preserve">'
+        + text.replace("\t", '</w:t><w:tab/><w:t xml:space="preserve">')
+        + "</w:t></w:r>"
+    )
+
+
+def _paragraph(text: str, style: Optional[str] = None, ppr: str = "") -> str:
+    if style is not None:
+        ppr = f'<w:pStyle w:val="{style}"/>{ppr}'
+    if ppr:
+        return f"<w:p><w:pPr>{ppr}</w:pPr>{_runs(text)}</w:p>"
+    return f"<w:p>{_runs(text)}</w:p>"
+
+
+def _spacing(before: int, after: int) -> str:
+    return f'<w:spacing w:before="{before}" w:after="{after}"/>'
+
+
+def _title_page(meta: ReportMeta) -> List[str]:
+    title = WORK_TYPE_TITLES[meta.work_type]
+    if meta.work_number is not None:
+        title = f"{title} № {meta.work_number}"
+    lines = [
+        (meta.department, ""),
+        (f"{meta.direction_code} {meta.direction_name}", ""),
+        (title, _spacing(2400, 0)),
+        (f"по дисциплине «{meta.discipline}»", ""),
+        (f"на тему «{meta.topic}»", _spacing(0, 2400)),
+        (f"Выполнил: студент группы {meta.group}", '<w:jc w:val="right"/>'),
+        (meta.student_full_name, '<w:jc w:val="right"/>'),
+        (f"Проверил: {meta.teacher_full_name}", '<w:jc w:val="right"/>'),
+        (f"Москва {meta.submission_date.year}", _spacing(2400, 0)),
+    ]
+    return [_paragraph(text, "TitlePage", ppr) for text, ppr in lines]
+
+
+# --- Фрагменты блоков -------------------------------------------------------
+
+# Места во фрагменте, которые зависят от положения блока в документе, а не от
+# его содержимого. Управляющие символы удаляются из текста отчёта
+# (``_INVALID_XML``), поэтому с содержимым метки не совпадают.
+_SPACE = "\x01"  # интервал перед первым абзацем после таблицы
+_NUM_ID = "\x02"  # экземпляр нумерации нумерованного списка
+_DRAWING_ID = "\x03"  # номер рисунка в документе
+_IMAGE_RID = "\x04"  # id связи с файлом изображения
+
+
+class Fragment(NamedTuple):
+    """
+    Разметка блока с метками вместо зависящих от положения частей и
+    расширение файла встроенного изображения (у рисунка с изображением).
+    """
+
+    xml: str
+    media: Optional[str] = None
+
+
+class ExportStats:
+    """Число блоков экспорта и обращений к кэшу фрагментов."""
+
+    __slots__ = ("blocks", "hits", "misses")
+
+    def __init__(self) -> None:
+        self.blocks = 0
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def snapshot(self) -> Dict[str, object]:
+        return {
+            "blocks": self.blocks,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hit_ratio,
+        }
+
+
+class ExportMetrics:
+    """Накопленные с момента запуска процесса счётчики экспортов в DOCX."""
+
+    def __init__(self) -> None:
+        self._exports = 0
+        self._totals = ExportStats()
+        self._last: Optional[ExportStats] = None
+        self._lock = Lock()
+
+    def record(self, stats: ExportStats) -> None:
+        with self._lock:
+            self._exports += 1
+            self._totals.blocks += stats.blocks
+            self._totals.hits += stats.hits
+            self._totals.misses += stats.misses
+            self._last = stats
+
+    def snapshot(self) -> Dict[str, object]:
+        with self._lock:
+            return {
+                "exports": self._exports,
+                "total": self._totals.snapshot(),
+                "last": self._last.snapshot() if self._last is not None else None,
+            }
+
+
+def _fragment_size(fragment: Fragment) -> int:
+    return sys.getsizeof(fragment.xml)
+
+
+#: Кэш разметки блоков: (версия разметки, пресет, содержимое) → фрагмент.
+fragment_cache: LRUCache[Fragment] = LRUCache(
+    max_bytes=settings.docx_cache_max_bytes, sizeof=_fragment_size
+)
+
+#: Счётчики экспортов (``GET /diagnostics/export``).
+export_metrics = ExportMetrics()
+
+
+def _heading_fragment(text: str, level: int, ppr: str) -> str:
+    return _paragraph(text, f"Heading{level}", ppr)
+
+
+def _text_fragment(block: TextBlock) -> str:
+    # Пустые абзацы не переносятся в документ (§5.3).
+    paragraphs = [line for line in block.text.split("\n") if line.strip()]
+    return "".join(
+        _paragraph(line, None, _SPACE if number == 0 else "")
+        for number, line in enumerate(paragraphs)
+    )
+
+
+def _list_fragment(block: ListBlock) -> str:
+    num_id = _NUM_ID if block.list_type == "numbered" else str(BULLET_NUM_ID)
+    numbering = f'<w:numPr><w:ilvl w:val="0"/><w:numId w:val="{num_id}"/></w:numPr>'
+    return "".join(
+        _paragraph(item, "ListParagraph", numbering + (_SPACE if number == 0 else ""))
+        for number, item in enumerate(block.items)
+    )
+
+
+def _references_fragment(block: ReferencesBlock) -> str:
+    return "".join(
+        _paragraph(f"{number}. {item}", "Bibliography", _SPACE if number == 1 else "")
+        for number, item in enumerate(block.items, start=1)
+    )
+
+
+def _table_fragment(block: TableBlock) -> str:
+    parts = [_paragraph(block.caption, "TableCaption", _SPACE)]
+    columns = max((len(row) for row in block.rows), default=0)
+    if not columns:
+        return parts[0]
+    width = TEXT_WIDTH // columns
+    grid = f'<w:gridCol w:w="{width}"/>' * columns
+    parts.append(
+        '<w:tbl><w:tblPr><w:tblStyle w:val="ReportTable"/>'
+        '<w:tblW w:w="5000" w:type="pct"/><w:jc w:val="center"/>'
+        f"</w:tblPr><w:tblGrid>{grid}</w:tblGrid>"
+    )
+    header_cell = (
+        '<w:tc><w:p><w:pPr><w:pStyle w:val="TableText"/>'
+        '<w:jc w:val="center"/></w:pPr>'
+    )
+    cell = '<w:tc><w:p><w:pPr><w:pStyle w:val="TableText"/></w:pPr>'
+    for number, row in enumerate(block.rows):
+        if number == 0:
+            # Шапка повторяется на каждой странице (§5.6).
+            parts.append("<w:tr><w:trPr><w:cantSplit/><w:tblHeader/></w:trPr>")
+            opening = header_cell
+        else:
+            parts.append("<w:tr><w:trPr><w:cantSplit/></w:trPr>")
+            opening = cell
+        for value in row:
+            parts.append(f"{opening}{_runs(value)}</w:p></w:tc>")
+        parts.extend([f"{cell}</w:p></w:tc>"] * (columns - len(row)))
+        parts.append("</w:tr>")
+    parts.append("</w:tbl>")
+    return "".join(parts)
+
+
+def _figure_fragment(block: FigureBlock, path: Optional[Path]) -> Fragment:
+    drawing = _drawing(block, path) if path is not None else None
+    caption = _paragraph(block.caption, "FigureCaption")
+    if drawing is None:
+        return Fragment(_paragraph(f"[{block.file_name}]", "Figure", _SPACE) + caption)
+    xml, extension = drawing
+    style = f'<w:pStyle w:val="Figure"/>{_SPACE}'
+    return Fragment(f"<w:p><w:pPr>{style}</w:pPr>{xml}</w:p>{caption}", extension)
+
+
+def _drawing(block: FigureBlock, path: Path) -> Optional[Tuple[str, str]]:
+    try:
+        with Image.open(path) as image:
+            (width, height), kind = image.size, image.format
+    except OSError:
+        return None
+    extension = _MEDIA_EXTENSIONS.get(kind or "")
+    if extension is None or not width or not height:
+        return None
+
+    # Размер при экранном разрешении, уменьшенный до области текста.
+    cx = width * 1440 / SCREEN_DPI
+    cy = height * 1440 / SCREEN_DPI
+    scale = min(1.0, TEXT_WIDTH / cx, FIGURE_MAX_HEIGHT / cy)
+    cx = round(cx * scale * EMU_PER_TWIP)
+    cy = round(cy * scale * EMU_PER_TWIP)
+    name = escape(_INVALID_XML.sub("", block.file_name), {'"': "&quot;"})
+    xml = (
+        '<w:r><w:drawing><wp:inline distT="0" distB="0" distL="0" distR="0">'
+        f'<wp:extent cx="{cx}" cy="{cy}"/>'
+        f'<wp:docPr id="{_DRAWING_ID}" name="Рисунок {_DRAWING_ID}"/>'
+        "<wp:cNvGraphicFramePr>"
+        '<a:graphicFrameLocks noChangeAspect="1"/></wp:cNvGraphicFramePr>'
+        '<a:graphic><a:graphicData uri="http://schemas.openxmlformats.org/'
+        'drawingml/2006/picture"><pic:pic><pic:nvPicPr>'
+        f'<pic:cNvPr id="{_DRAWING_ID}" name="{name}"/><pic:cNvPicPr/>'
+        f'</pic:nvPicPr><pic:blipFill><a:blip r:embed="{_IMAGE_RID}"/>'
+        "<a:stretch><a:fillRect/></a:stretch></pic:blipFill><pic:spPr>"
+        f'<a:xfrm><a:off x="0" y="0"/><a:ext cx="{cx}" cy="{cy}"/></a:xfrm>'
+        '<a:prstGeom prst="rect"><a:avLst/></a:prstGeom></pic:spPr>'
+        "</pic:pic></a:graphicData></a:graphic></wp:inline></w:drawing></w:r>"
+    )
+    return xml, extension
+
+
+# --- Документ ---------------------------------------------------------------
+
+
+class _DocumentWriter:
+    """
+    Фрагменты ``document.xml`` для отчёта. По ходу обхода собирает то, что
+    нужно записать после документа: экземпляры нумерации и изображения.
+
+    Разметка каждого блока берётся из ``fragment_cache`` (или строится и
+    кладётся туда), а зависящие от положения части — интервал после таблицы,
+    экземпляр нумерации списка, номер рисунка и id связи с изображением —
+    подставляются на месте. Так при повторном экспорте заново строятся только
+    изменённые блоки, даже если остальные сдвинулись.
+    """
+
+    def __init__(self, report: Report, images: ImageSource, stats: ExportStats) -> None:
+        self.report = report
+        self.images = images
+        self.stats = stats
+        self.index = report.index()
+        self.preset = report.meta.preset
+        self.numbered_lists = 0
+        #: Хэш изображения → (id связи, имя в архиве, путь к файлу).
+        self.media: Dict[str, Tuple[str, str, Path]] = {}
+        self.drawings = 0
+        self._space_before = 0
+
+    def fragments(self) -> Iterator[str]:
+        yield f"{_XML_DECLARATION}<w:document {_NAMESPACES}><w:body>"
+        yield from _title_page(self.report.meta)
+        yield _paragraph("СОДЕРЖАНИЕ", "TocHeading")
+
+        blocks = self.index.blocks
+        for position, block in enumerate(blocks):
+            following = blocks[position + 1] if position + 1 < len(blocks) else None
+            self.stats.blocks += 1
+            xml = self._block(block, following)
+            if xml:
+                yield xml
+
+        yield (
+            f'<w:sectPr><w:pgSz w:w="{PAGE_WIDTH}" w:h="{PAGE_HEIGHT}"/>'
+            f'<w:pgMar w:top="{MARGIN_TOP}" w:right="{MARGIN_RIGHT}" '
+            f'w:bottom="{MARGIN_BOTTOM}" w:left="{MARGIN_LEFT}" w:header="709" '
+            'w:footer="709" w:gutter="0"/></w:sectPr></w:body></w:document>'
+        )
+
+    def _cached(self, content: Hashable, render: Callable[[], Fragment]) -> Fragment:
+        key = (RENDERER_VERSION, self.preset, content)
+        fragment = fragment_cache.get(key)
+        if fragment is None:
+            self.stats.misses += 1
+            fragment = render()
+            fragment_cache.put(key, fragment)
+        else:
+            self.stats.hits += 1
+        return fragment
+
+    def _starts_page(self, block: Optional[BaseBlock]) -> bool:
+        return (
+            isinstance(block, (SectionBlock, AppendixBlock, ReferencesBlock))
+            and self.index.depth(block.id) == 0
+        )
+
+    def _block(self, block: BaseBlock, following: Optional[BaseBlock]) -> str:
+        if isinstance(block, (SectionBlock, SubsectionBlock, AppendixBlock)):
+            return self._heading(block, following)
+        if isinstance(block, ReferencesBlock):
+            return self._references(block, following)
+        if isinstance(block, FigureBlock):
+            return self._figure(block)
+
+        content = block.content_hash()
+        if isinstance(block, TextBlock):
+            fragment = self._cached(content, lambda: Fragment(_text_fragment(block)))
+        elif isinstance(block, ListBlock):
+            fragment = self._cached(content, lambda: Fragment(_list_fragment(block)))
+        elif isinstance(block, TableBlock):
+            fragment = self._cached(content, lambda: Fragment(_table_fragment(block)))
+        else:
+            return ""
+
+        xml = fragment.xml
+        if isinstance(block, ListBlock) and block.list_type == "numbered":
+            self.numbered_lists += 1
+            xml = xml.replace(_NUM_ID, str(BULLET_NUM_ID + self.numbered_lists))
+        xml = self._fill_space(xml)
+        if isinstance(block, TableBlock):
+            self._space_before = SPACE_AFTER_TABLE
+        return xml
+
+    def _fill_space(self, xml: str) -> str:
+        # Интервал перед первым абзацем после таблицы (§5.6). Блок без абзацев
+        # (пустой текст) оставляет интервал следующему блоку.
+        if _SPACE not in xml:
+            return xml
+        space, self._space_before = self._space_before, 0
+        if space:
+            return xml.replace(_SPACE, f'<w:spacing w:before="{space}"/>')
+        return xml.replace(f"<w:pPr>{_SPACE}</w:pPr>", "").replace(_SPACE, "")
+
+    def _heading_ppr(
+        self,
+        level: int,
+        block: BaseBlock,
+        following: Optional[BaseBlock],
+        centered: bool,
+    ) -> str:
+        # Интервалы по сценариям §5.4: до заголовка в начале страницы — 0,
+        # после заголовка, за которым сразу идёт подзаголовок, — 0.
+        starts_page = self._starts_page(block)
+        before = 0 if starts_page else HEADING_SPACING
+        after = HEADING_SPACING
+        if following is None or self._starts_page(following):
+            after = 0
+        elif isinstance(following, (SectionBlock, SubsectionBlock, AppendixBlock)):
+            after = 0
+        ppr = _spacing(before, after)
+        if level == 1 and not starts_page:
+            ppr = '<w:pageBreakBefore w:val="0"/>' + ppr
+        if centered:
+            ppr += '<w:jc w:val="center"/>'
+        self._space_before = 0
+        return ppr
+
+    def _heading(self, block: BaseBlock, following: Optional[BaseBlock]) -> str:
+        if isinstance(block, SectionBlock):
+            text, level, centered = block.title, 1, bool(block.special_kind)
+        elif isinstance(block, SubsectionBlock):
+            text, level, centered = block.title, block.level, False
+        else:
+            assert isinstance(block, AppendixBlock)
+            text, level, centered = f"ПРИЛОЖЕНИЕ {block.label}", 1, True
+            if block.title:
+                text = f"{text} – {block.title}"
+        # Ключ заголовка — то, из чего он строится, а не хэш блока: хэш раздела
+        # зависит от вложенных блоков, а заголовок — нет.
+        ppr = self._heading_ppr(level, block, following, centered)
+        return self._cached(
+            (text, level, ppr), lambda: Fragment(_heading_fragment(text, level, ppr))
+        ).xml
+
+    def _references(
+        self, block: ReferencesBlock, following: Optional[BaseBlock]
+    ) -> str:
+        heading = ""
+        if self.index.depth(block.id) == 0:
+            ppr = self._heading_ppr(1, block, following, centered=True)
+            heading = _heading_fragment(STRUCTURAL_TITLE_REFERENCES, 1, ppr)
+        items = self._cached(
+            block.content_hash(), lambda: Fragment(_references_fragment(block))
+        ).xml
+        return heading + self._fill_space(items)
+
+    def _figure(self, block: FigureBlock) -> str:
+        path = self.images(block.image_hash) if block.image_hash else None
+        # Файл изображения по пути не меняется (имя — хэш содержимого и
+        # параметры варианта), поэтому путь входит в ключ вместо размеров.
+        fragment = self._cached(
+            (block.content_hash(), str(path) if path is not None else None),
+            lambda: _figure_fragment(block, path),
+        )
+        xml = self._fill_space(fragment.xml)
+        if fragment.media is None or path is None:
+            return xml
+
+        media = self.media.get(block.image_hash)
+        if media is None:
+            number = len(self.media) + 1
+            media = (
+                f"rIdImage{number}",
+                f"media/image{number}.{fragment.media}",
+                path,
+            )
+            self.media[block.image_hash] = media
+        self.drawings += 1
+        return xml.replace(_DRAWING_ID, str(self.drawings)).replace(
+            _IMAGE_RID, media[0]
+        )
+
+    def numbering_tail(self) -> str:
+        nums = "".join(
+            f'<w:num w:numId="{BULLET_NUM_ID + number}"><w:abstractNumId w:val="1"/>'
+            '<w:lvlOverride w:ilvl="0"><w:startOverride w:val="1"/>'
+            "</w:lvlOverride></w:num>"
+            for number in range(1, self.numbered_lists + 1)
+        )
+        return f"{nums}</w:numbering>"
+
+    def document_rels(self) -> str:
+        relationships = [
+            f'<Relationship Id="rIdStyles" Type="{_REL_NS}/styles" '
+            'Target="styles.xml"/>',
+            f'<Relationship Id="rIdSettings" Type="{_REL_NS}/settings" '
+            'Target="settings.xml"/>',
+            f'<Relationship Id="rIdNumbering" Type="{_REL_NS}/numbering" '
+            'Target="numbering.xml"/>',
+        ]
+        relationships.extend(
+            f'<Relationship Id="{relationship}" Type="{_REL_NS}/image" '
+            f'Target="{target}"/>'
+            for relationship, target, _ in self.media.values()
+        )
+        return (
+            f'{_XML_DECLARATION}<Relationships xmlns="{_PKG_REL_NS}">'
+            f'{"".join(relationships)}</Relationships>'
+        )
+
+
+def _core_properties(meta: ReportMeta) -> str:
+    created = datetime.combine(meta.submission_date, time(), tzinfo=timezone.utc)
+
+    def text(value: str) -> str:
+        return escape(_INVALID_XML.sub("", value))
+
+    return (
+        f"{_XML_DECLARATION}<cp:coreProperties "
+        'xmlns:cp="http://schemas.openxmlformats.org/package/2006/metadata/'
+        'core-properties" xmlns:dc="http://purl.org/dc/elements/1.1/" '
+        'xmlns:dcterms="http://purl.org/dc/terms/" '
+        'xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance">'
+        f"<dc:title>{text(meta.topic)}</dc:title>"
+        f"<dc:creator>{text(meta.student_full_name)}</dc:creator>"
+        '<dcterms:created xsi:type="dcterms:W3CDTF">'
+        f'{created.strftime("%Y-%m-%dT%H:%M:%SZ")}</dcterms:created>'
+        "</cp:coreProperties>"
+    )
+
+
+class _Sink:
+    """Приёмник архива без перемотки: ``ZipFile`` пишет в него по порядку."""
+
+    def __init__(self) -> None:
+        self._chunks: List[bytes] = []
+        self.size = 0
+
+    def write(self, data: bytes) -> int:
+        self._chunks.append(bytes(data))
+        self.size += len(data)
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        self.size = 0
+        return data
+
+
+def _entry(name: str, compress_type: int = ZIP_DEFLATED) -> ZipInfo:
+    # Фиксированная дата записей: одинаковые отчёты дают одинаковые архивы.
+    info = ZipInfo(name, date_time=(1980, 1, 1, 0, 0, 0))
+    info.compress_type = compress_type
+    return info
+
+
+def iter_docx(
+    report: Report,
+    images: ImageSource = _default_images,
+    chunk_bytes: int = CHUNK_BYTES,
+    stats: Optional[ExportStats] = None,
+) -> Iterator[bytes]:
+    """
+    DOCX-файл отчёта частями не меньше ``chunk_bytes`` байт (кроме последней).
+
+    Архив пишется без перемотки (записи с дескриптором данных), поэтому каждую
+    часть можно отдавать клиенту сразу. ``images`` возвращает файл изображения
+    рисунка по его хэшу; по умолчанию — вариант ``export`` из
+    ``image_pipeline`` (готовится на месте, если его ещё нет).
+
+    В ``stats`` (если передан) по ходу экспорта считаются блоки и обращения
+    к кэшу фрагментов; по завершении они добавляются в ``export_metrics``.
+    """
+
+    if stats is None:
+        stats = ExportStats()
+    sink = _Sink()
+    writer = _DocumentWriter(report, images, stats)
+    archive = ZipFile(sink, "w", ZIP_DEFLATED, compresslevel=COMPRESS_LEVEL)
+    with archive:
+        *parts, (numbering_name, numbering_head) = static_parts()
+        for name, data in parts:
+            archive.writestr(_entry(name), data)
+        archive.writestr(
+            _entry("docProps/core.xml"), _core_properties(report.meta).encode()
+        )
+        # Начало архива уходит клиенту сразу, до обхода отчёта.
+        yield sink.drain()
+
+        with archive.open(_entry("word/document.xml"), "w") as document:
+            batch: List[str] = []
+            batched = 0
+            for fragment in writer.fragments():
+                batch.append(fragment)
+                batched += len(fragment)
+                if batched >= WRITE_BATCH_CHARS:
+                    document.write("".join(batch).encode())
+                    batch.clear()
+                    batched = 0
+                    if sink.size >= chunk_bytes:
+                        yield sink.drain()
+            document.write("".join(batch).encode())
+        export_metrics.record(stats)
+
+        archive.writestr(
+            _entry(numbering_name), numbering_head + writer.numbering_tail().encode()
+        )
+        archive.writestr(
+            _entry("word/_rels/document.xml.rels"), writer.document_rels().encode()
+        )
+        for _, target, path in writer.media.values():
+            # Изображения уже сжаты: хранятся как есть и копируются частями.
+            with archive.open(_entry(f"word/{target}", ZIP_STORED), "w") as media:
+                with open(path, "rb") as source:
+                    while data := source.read(chunk_bytes):
+                        media.write(data)
+                        if sink.size >= chunk_bytes:
+                            yield sink.drain()
+    yield sink.drain()
+
+
+def export_file_name(meta: ReportMeta) -> str:
+    """
+    Рекомендуемое имя файла (§5.11): фамилия, группа и тип работы с номером,
+    например ``Иванов_ББИ-24-3_ПР№1.docx``.
+    """
+
+    surname = meta.student_full_name.split()[0] if meta.student_full_name else ""
+    kind = {
+        WorkType.PRACTICE: "ПР",
+        WorkType.LAB: "ЛР",
+        WorkType.ESSAY: "Реферат",
+        WorkType.COURSE: "КР",
+        WorkType.OTHER: "Отчёт",
+    }[meta.work_type]
+    if meta.work_number is not None:
+        kind = f"{kind}№{meta.work_number}"
+    parts = [part for part in (surname, meta.group, kind) if part]
+    name = _INVALID_XML.sub("", "_".join(parts))
+    return re.sub(r'[\\/:*?"<>|\s]+', "_", name) + ".docx"
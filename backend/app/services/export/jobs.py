@@ -0,0 +1,316 @@
+"""
+Фоновый экспорт отчётов в DOCX.
+
+Большой отчёт экспортируется секунды, поэтому по запросу с ``?async=1``
+документ строится не в обработчике запроса, а в пуле процессов
+(``GHOST_EXPORT_WORKERS``, без внешнего брокера): клиент сразу получает
+идентификатор задачи, опрашивает её состояние и скачивает готовый файл.
+
+Рабочий процесс общается с сервером через файлы в каталоге
+``GHOST_EXPORT_DIR``: пишет документ в ``<id>.docx.part`` и по готовности
+переименовывает его в ``<id>.docx``, число обработанных блоков записывает в
+``<id>.docx.progress``, а появление ``<id>.docx.cancel`` означает отмену.
+
+Одинаковые запросы (тот же хэш содержимого отчёта и пресет), пока задача
+ждёт, выполняется или её файл ещё хранится, получают одну и ту же задачу.
+Готовые файлы удаляются через ``GHOST_EXPORT_TTL_SECONDS`` после готовности
+и, начиная с самых старых, когда их общий объём превышает
+``GHOST_EXPORT_MAX_BYTES``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import atexit
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from threading import Lock
+from typing import Callable, Dict, Optional, Tuple, Union
+from uuid import uuid4
+
+from app.models import ExportJobStatus, Report
+from app.models.exports import ExportJobState
+from app.services.reports.parser import ReportParser
+from app.settings import settings
+
+from .docx import ExportStats, export_file_name, iter_docx
+
+#: По сколько байт архива рабочий процесс пишет файл и отмечает прогресс.
+JOB_CHUNK_BYTES = 16 * 1024
+
+#: Служебные файлы задачи рядом с итоговым: недописанный документ, прогресс
+#: и признак отмены.
+PART_SUFFIXES = ("part", "progress", "cancel")
+
+#: Сообщение об ошибке задачи для клиента; подробности пишутся в журнал сервера,
+#: так как могут содержать фрагменты отчёта.
+EXPORT_FAILED_MESSAGE = "Не удалось подготовить документ."
+
+logger = logging.getLogger(__name__)
+
+
+class ExportCancelledError(Exception):
+    """Экспорт прерван: задача отменена."""
+
+
+def render_export(body: bytes, target: str) -> int:
+    """
+    Экспортирует отчёт (JSON ``body``, уже прошедший проверку) в файл
+    ``target`` и возвращает его размер.
+
+    Выполняется в рабочем процессе. Тело разбирается тем же потоковым
+    разборщиком, что и при приёме запроса, поэтому принятый отчёт разбирается
+    и здесь. Между частями архива записывает число обработанных блоков в
+    ``<target>.progress`` и проверяет, не появился ли ``<target>.cancel``; при
+    отмене или ошибке недописанный файл удаляется.
+    """
+
+    part, progress, cancel = (f"{target}.{suffix}" for suffix in PART_SUFFIXES)
+    if os.path.exists(cancel):
+        raise ExportCancelledError()
+    parser = ReportParser(settings.max_report_blocks, settings.max_report_depth)
+    parser.feed(body)
+    report = parser.close()
+    stats = ExportStats()
+    reported = -1
+    try:
+        with open(part, "wb") as file:
+            for chunk in iter_docx(report, chunk_bytes=JOB_CHUNK_BYTES, stats=stats):
+                if os.path.exists(cancel):
+                    raise ExportCancelledError()
+                file.write(chunk)
+                if stats.blocks != reported:
+                    reported = stats.blocks
+                    with open(progress, "w") as marker:
+                        marker.write(str(reported))
+        os.replace(part, target)
+    except BaseException:
+        Path(part).unlink(missing_ok=True)
+        raise
+    finally:
+        Path(progress).unlink(missing_ok=True)
+    return os.path.getsize(target)
+
+
+@dataclass
+class ExportJob:
+    """Задача фонового экспорта (хранится в памяти процесса сервера)."""
+
+    id: str
+    key: Tuple[bytes, str]
+    file_name: str
+    blocks_total: int
+    state: ExportJobState = "queued"
+    error: Optional[str] = None
+    size: int = 0
+    finished_at: Optional[float] = None
+    future: Optional[asyncio.Future[int]] = field(default=None, repr=False)
+
+
+class ExportJobs:
+    """
+    Очередь задач экспорта с файлами результатов в каталоге ``root``.
+
+    Методы вызываются из цикла событий. Задачи выполняются в пуле процессов
+    из ``workers`` процессов, создаваемом при первой задаче; готовые файлы
+    хранятся ``ttl`` секунд, а их общий объём ограничен ``max_bytes``.
+    """
+
+    def __init__(
+        self,
+        root: Union[str, Path],
+        workers: int,
+        ttl: float,
+        max_bytes: int,
+        executor: Optional[Executor] = None,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.root = Path(root)
+        self.workers = workers
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._clock = clock
+        self._executor = executor
+        self._executor_lock = Lock()
+        self._jobs: Dict[str, ExportJob] = {}
+        self._by_key: Dict[Tuple[bytes, str], ExportJob] = {}
+        self._prepared = False
+
+    def path(self, job_id: str) -> Path:
+        """Путь к готовому файлу задачи (файла может ещё не быть)."""
+
+        return self.root / f"{job_id}.docx"
+
+    def submit(self, report: Report, body: bytes) -> ExportJob:
+        """
+        Ставит экспорт отчёта ``report`` (``body`` — его JSON) в очередь.
+        Если такой же отчёт уже экспортируется или его файл ещё хранится,
+        возвращает ту задачу.
+        """
+
+        self._sweep()
+        key = (report.content_hash(), report.meta.preset)
+        job = self._by_key.get(key)
+        if job is not None:
+            return job
+
+        if not self._prepared:
+            self._prepare()
+        job = ExportJob(
+            id=uuid4().hex,
+            key=key,
+            file_name=export_file_name(report.meta),
+            blocks_total=len(report.index().blocks),
+        )
+        self._jobs[job.id] = job
+        self._by_key[key] = job
+        job.future = asyncio.get_running_loop().run_in_executor(
+            self._get_executor(), render_export, body, str(self.path(job.id))
+        )
+        job.future.add_done_callback(lambda future: self._finish(job, future))
+        return job
+
+    def get(self, job_id: str) -> Optional[ExportJob]:
+        """Задача по идентификатору или None (нет такой или её файл удалён)."""
+
+        self._sweep()
+        return self._jobs.get(job_id)
+
+    def status(self, job: ExportJob) -> ExportJobStatus:
+        """Состояние задачи; прогресс выполняющейся читается из её файла."""
+
+        state, done = job.state, 0
+        if state == "done":
+            done = job.blocks_total
+        elif state == "queued":
+            try:
+                done = int(self._marker(job, "progress").read_text() or 0)
+                state = "running"
+            except (FileNotFoundError, ValueError):
+                pass
+        expires_at = None
+        if job.finished_at is not None and state == "done":
+            expires_at = datetime.fromtimestamp(
+                job.finished_at + self.ttl, timezone.utc
+            )
+        return ExportJobStatus(
+            id=job.id,
+            state=state,
+            blocks_done=done,
+            blocks_total=job.blocks_total,
+            file_name=job.file_name,
+            error=job.error,
+            expires_at=expires_at,
+        )
+
+    def cancel(self, job: ExportJob) -> None:
+        """
+        Отменяет задачу: ждущая убирается из очереди, выполняющаяся
+        прерывается рабочим процессом, готовый файл удаляется.
+        """
+
+        if job.state == "done":
+            self._forget(job)
+            job.state = "cancelled"
+            return
+        if job.state != "queued":
+            return
+        job.state = "cancelled"
+        self._by_key.pop(job.key, None)
+        self._marker(job, "cancel").touch()
+        assert job.future is not None
+        job.future.cancel()
+
+    def _prepare(self) -> None:
+        # Задачи хранятся в памяти, поэтому файлы прошлых запусков ничьи; они
+        # удаляются по тому же сроку (каталог могут делить несколько процессов).
+        self.root.mkdir(parents=True, exist_ok=True)
+        expired = self._clock() - self.ttl
+        for stale in self.root.glob("*.docx*"):
+            try:
+                if stale.stat().st_mtime <= expired:
+                    stale.unlink()
+            except FileNotFoundError:
+                pass
+        self._prepared = True
+
+    def _marker(self, job: ExportJob, suffix: str) -> Path:
+        return self.root / f"{job.id}.docx.{suffix}"
+
+    def _finish(self, job: ExportJob, future: asyncio.Future[int]) -> None:
+        if job.state == "cancelled" or future.cancelled():
+            job.state = "cancelled"
+        elif isinstance(future.exception(), ExportCancelledError):
+            job.state = "cancelled"
+        elif future.exception() is not None:
+            error = future.exception()
+            job.state = "failed"
+            job.error = EXPORT_FAILED_MESSAGE
+            logger.error("Export job %s failed", job.id, exc_info=error)
+        else:
+            job.state = "done"
+            job.size = future.result()
+        job.finished_at = self._clock()
+        if job.state != "done" and self._by_key.get(job.key) is job:
+            del self._by_key[job.key]
+        self._sweep()
+
+    def _sweep(self) -> None:
+        # Истёкшие задачи забываются (вместе с файлами), затем, пока готовые
+        # файлы занимают больше max_bytes, удаляются самые старые из них.
+        now = self._clock()
+        for job in list(self._jobs.values()):
+            if job.finished_at is not None and job.finished_at + self.ttl <= now:
+                self._forget(job)
+        finished = sorted(
+            (job for job in self._jobs.values() if job.state == "done"),
+            key=lambda job: job.finished_at or 0.0,
+        )
+        total = sum(job.size for job in finished)
+        # Самый новый файл остаётся, даже если он один больше ограничения.
+        for job in finished[:-1]:
+            if total <= self.max_bytes:
+                break
+            total -= job.size
+            self._forget(job)
+
+    def _forget(self, job: ExportJob) -> None:
+        self._jobs.pop(job.id, None)
+        if self._by_key.get(job.key) is job:
+            del self._by_key[job.key]
+        self.path(job.id).unlink(missing_ok=True)
+        for suffix in PART_SUFFIXES:
+            self._marker(job, suffix).unlink(missing_ok=True)
+
+    def _get_executor(self) -> Executor:
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=max(1, self.workers),
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._executor
+
+    def shutdown(self) -> None:
+        """Останавливает пул процессов экспорта."""
+
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+
+#: Очередь фонового экспорта бэкенда (каталог ``GHOST_EXPORT_DIR``).
+export_jobs = ExportJobs(
+    settings.export_dir,
+    workers=settings.export_workers,
+    ttl=settings.export_ttl_seconds,
+    max_bytes=settings.export_max_bytes,
+)
+atexit.register(export_jobs.shutdown)
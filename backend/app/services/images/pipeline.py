@@ -0,0 +1,306 @@
+"""
+Подготовка изображений рисунков к экспорту и предпросмотру.
+
+Загруженное изображение (часто это фотография или снимок экрана на десяток
+мегапикселей) после загрузки в фоне декодируется в пуле процессов,
+уменьшается до размеров варианта и пережимается:
+
+- ``export`` — не больше области текста листа (поля МИСИС, см.
+  ``layout.estimator.TEXT_WIDTH``/``TEXT_HEIGHT``) при
+  ``GHOST_IMAGE_EXPORT_DPI``; его вставляет экспорт в DOCX;
+- ``thumbnail`` — не больше ``GHOST_IMAGE_THUMBNAIL_PX`` по большей стороне,
+  для предпросмотра в редакторе.
+
+Фотографии сохраняются в JPEG, а изображения с прозрачностью или небольшим
+числом цветов (схемы, снимки экрана) — в оптимизированный PNG. Производные
+файлы лежат рядом с хранилищем (``<root>/derived``) под именем из хэша
+исходного изображения и параметров варианта, поэтому изменение параметров
+не отдаёт старых файлов, а готовые файлы переживают перезапуск.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import atexit
+import multiprocessing
+import os
+import tempfile
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from threading import Lock
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from app.models.images import ImageState
+from app.services.layout.estimator import TEXT_HEIGHT, TEXT_WIDTH
+from app.settings import settings
+
+from .store import ImageStore, image_store
+
+#: Версия алгоритма подготовки: входит в имена производных файлов.
+PIPELINE_VERSION = 1
+
+#: Качество JPEG для фотографий.
+JPEG_QUALITY = 85
+
+#: Изображение, в котором больше стольких цветов, считается фотографией.
+PHOTO_MIN_COLORS = 4096
+
+
+class ImageProcessingError(ValueError):
+    """Изображение не удалось подготовить (например, файл повреждён)."""
+
+
+@dataclass(frozen=True)
+class Variant:
+    """Производный вариант изображения: имя и наибольший размер в пикселях."""
+
+    name: str
+    max_width: int
+    max_height: int
+
+    @property
+    def key(self) -> str:
+        """Часть имени файла: параметры варианта и версия алгоритма."""
+
+        return (
+            f"{self.name}-{self.max_width}x{self.max_height}"
+            f"-q{JPEG_QUALITY}-v{PIPELINE_VERSION}"
+        )
+
+
+def export_variant(dpi: int) -> Variant:
+    """Вариант для экспорта: область текста листа при разрешении ``dpi``."""
+
+    return Variant(
+        "export", round(TEXT_WIDTH / 72 * dpi), round(TEXT_HEIGHT / 72 * dpi)
+    )
+
+
+def thumbnail_variant(size: int) -> Variant:
+    """Вариант для предпросмотра: квадрат ``size`` × ``size`` пикселей."""
+
+    return Variant("thumbnail", size, size)
+
+
+def _is_photo(image, source_format: Optional[str]) -> bool:
+    if image.mode in ("RGBA", "LA", "PA") or "transparency" in image.info:
+        return False
+    if source_format == "JPEG":
+        return True
+    # getcolors прекращает подсчёт, как только цветов становится больше порога.
+    return image.getcolors(maxcolors=PHOTO_MIN_COLORS) is None
+
+
+def render_variants(
+    source: str, targets: Sequence[Tuple[str, int, int]]
+) -> List[Tuple[int, int]]:
+    """
+    Строит производные варианты изображения ``source``: для каждой цели
+    ``(путь, ширина, высота)`` — уменьшенную копию, вписанную в размер.
+    Возвращает размеры получившихся изображений.
+
+    Выполняется в рабочем процессе. Изображение декодируется один раз,
+    а варианты строятся от большего к меньшему, каждый — из предыдущего.
+    JPEG по возможности декодируется сразу в уменьшенном масштабе (``draft``).
+    """
+
+    from PIL import Image, ImageOps
+
+    order = sorted(
+        range(len(targets)), key=lambda n: targets[n][1] * targets[n][2], reverse=True
+    )
+    sizes: List[Tuple[int, int]] = [(0, 0)] * len(targets)
+    with Image.open(source) as opened:
+        source_format = opened.format
+        largest = targets[order[0]]
+        opened.draft("RGB", (largest[1], largest[2]))
+        image = ImageOps.exif_transpose(opened)
+        photo = _is_photo(image, source_format)
+        for position in order:
+            target, width, height = targets[position]
+            image.thumbnail((width, height), Image.Resampling.LANCZOS, 3.0)
+            _save(image, target, photo)
+            sizes[position] = image.size
+    return sizes
+
+
+def _save(image, target: str, photo: bool) -> None:
+    # Запись во временный файл рядом с итоговым и атомарное переименование:
+    # читатели видят либо готовый файл, либо никакого.
+    directory = os.path.dirname(target)
+    os.makedirs(directory, exist_ok=True)
+    with tempfile.NamedTemporaryFile(dir=directory, delete=False) as file:
+        try:
+            if photo:
+                image.convert("RGB").save(
+                    file,
+                    "JPEG",
+                    quality=JPEG_QUALITY,
+                    optimize=True,
+                    progressive=True,
+                )
+            else:
+                if image.mode not in ("1", "L", "LA", "P", "RGB", "RGBA"):
+                    image = image.convert("RGBA")
+                image.save(file, "PNG", optimize=True)
+        except BaseException:
+            file.close()
+            os.unlink(file.name)
+            raise
+    os.replace(file.name, target)
+
+
+class ImagePipeline:
+    """
+    Фоновая подготовка вариантов ``variants`` изображений хранилища ``store``.
+
+    Готовность определяется по наличию производных файлов, а в памяти процесса
+    хранятся только выполняющиеся задачи и ошибки. Задачи выполняются в пуле
+    процессов (``GHOST_IMAGE_WORKERS``), создаваемом при первой задаче.
+    """
+
+    def __init__(
+        self,
+        store: ImageStore,
+        variants: Sequence[Variant],
+        workers: int,
+        executor: Optional[Executor] = None,
+    ) -> None:
+        self.store = store
+        self.variants: Dict[str, Variant] = {
+            variant.name: variant for variant in variants
+        }
+        self.workers = workers
+        self._executor = executor
+        self._executor_lock = Lock()
+        self._tasks: Dict[str, asyncio.Future[None]] = {}
+        self._errors: Dict[str, str] = {}
+
+    def path(self, image_hash: str, variant: str) -> Path:
+        """Путь к производному файлу (файла может ещё не быть)."""
+
+        key = self.variants[variant].key
+        return self.store.root / "derived" / image_hash[:2] / f"{image_hash}.{key}"
+
+    def is_ready(self, image_hash: str) -> bool:
+        return all(self.path(image_hash, name).is_file() for name in self.variants)
+
+    def state(self, image_hash: str) -> ImageState:
+        """Состояние подготовки изображения (``missing`` — его нет в хранилище)."""
+
+        if self.is_ready(image_hash):
+            return "ready"
+        if image_hash in self._tasks:
+            return "processing"
+        if image_hash in self._errors:
+            return "failed"
+        if self.store.missing((image_hash,)):
+            return "missing"
+        return "pending"
+
+    def error(self, image_hash: str) -> Optional[str]:
+        return self._errors.get(image_hash)
+
+    def submit(self, image_hash: str) -> asyncio.Future[None]:
+        """
+        Ставит подготовку изображения в очередь (из цикла событий) и возвращает
+        её задачу; повторный вызов для того же изображения её не дублирует.
+        """
+
+        task = self._tasks.get(image_hash)
+        if task is None:
+            task = asyncio.ensure_future(self._process(image_hash))
+            self._tasks[image_hash] = task
+            task.add_done_callback(lambda _: self._tasks.pop(image_hash, None))
+        return task
+
+    async def derive(self, image_hash: str, variant: str) -> Path:
+        """
+        Путь к готовому варианту изображения; если его ещё нет, дожидается
+        подготовки. ``KeyError`` — неизвестный вариант, ``FileNotFoundError``
+        — изображения нет в хранилище, ``ImageProcessingError`` — его не
+        удалось подготовить.
+        """
+
+        path = self.path(image_hash, variant)
+        if path.is_file():
+            return path
+        if self.store.missing((image_hash,)):
+            raise FileNotFoundError(f"Изображения {image_hash} нет в хранилище.")
+        self._errors.pop(image_hash, None)
+        # Задача общая для всех ожидающих: отмена одного запроса её не отменяет.
+        await asyncio.shield(self.submit(image_hash))
+        if not path.is_file():
+            raise ImageProcessingError(self._errors.get(image_hash, ""))
+        return path
+
+    def derive_sync(self, image_hash: str, variant: str) -> Path:
+        """
+        То же, что ``derive``, для вызова вне цикла событий (например, из
+        экспорта в пуле потоков): недостающие варианты строятся в текущем
+        потоке.
+        """
+
+        path = self.path(image_hash, variant)
+        if not path.is_file():
+            source, targets = self._job(image_hash)
+            try:
+                render_variants(source, targets)
+            except Exception as exc:
+                raise ImageProcessingError(str(exc) or type(exc).__name__) from exc
+        return path
+
+    def _job(self, image_hash: str) -> Tuple[str, List[Tuple[str, int, int]]]:
+        source = self.store.path(image_hash)
+        if not source.is_file():
+            raise FileNotFoundError(f"Изображения {image_hash} нет в хранилище.")
+        targets = [
+            (str(self.path(image_hash, name)), variant.max_width, variant.max_height)
+            for name, variant in self.variants.items()
+        ]
+        return str(source), targets
+
+    async def _process(self, image_hash: str) -> None:
+        # Ошибка не выбрасывается: задача обычно никем не ожидается, а причина
+        # сбоя видна в состоянии изображения.
+        if self.is_ready(image_hash):
+            return
+        loop = asyncio.get_running_loop()
+        try:
+            await loop.run_in_executor(
+                self._get_executor(), render_variants, *self._job(image_hash)
+            )
+        except Exception as exc:
+            self._errors[image_hash] = str(exc) or type(exc).__name__
+        else:
+            self._errors.pop(image_hash, None)
+
+    def _get_executor(self) -> Executor:
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=max(1, self.workers),
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._executor
+
+    def shutdown(self) -> None:
+        """Останавливает пул процессов подготовки изображений."""
+
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+
+#: Подготовка изображений хранилища ``image_store``.
+image_pipeline = ImagePipeline(
+    image_store,
+    variants=(
+        export_variant(settings.image_export_dpi),
+        thumbnail_variant(settings.image_thumbnail_px),
+    ),
+    workers=settings.image_workers,
+)
+atexit.register(image_pipeline.shutdown)
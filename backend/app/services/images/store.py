@@ -0,0 +1,213 @@
+"""
+Хранилище изображений рисунков, адресуемое по содержимому.
+
+Изображение хранится в файле, имя которого — SHA-256 его содержимого
+(``<root>/<первые два символа хэша>/<хэш>``), поэтому одинаковые картинки
+из разных отчётов лежат на диске один раз, а файл после записи не меняется:
+хэш годится как сильный ETag, а ответ можно кэшировать бессрочно.
+
+Загрузка потоковая: тело запроса по частям пишется во временный файл и
+хэшируется по ходу чтения, а затем атомарно переименовывается в итоговое имя.
+Одновременные загрузки одной картинки безопасны — выигрывает любая из них,
+содержимое одинаковое.
+"""
+
+from __future__ import annotations
+
+import os
+import re
+import tempfile
+from collections import defaultdict
+from functools import lru_cache
+from hashlib import sha256
+from itertools import count
+from pathlib import Path
+from typing import IO, Any, AsyncIterable, Dict, Iterable, List, Optional, Set, Union
+from uuid import uuid4
+
+from fastapi.concurrency import run_in_threadpool
+
+from app.models import StoredImage
+from app.settings import settings
+
+#: Хэш изображения: SHA-256 в шестнадцатеричной записи.
+IMAGE_HASH_PATTERN = re.compile(r"^[0-9a-f]{64}$")
+
+#: Сколько байт тела запроса накапливается перед записью на диск.
+WRITE_BUFFER_BYTES = 1024 * 1024
+
+#: Сигнатуры поддерживаемых форматов (начало файла → MIME-тип).
+_SIGNATURES = (
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"GIF87a", "image/gif"),
+    (b"GIF89a", "image/gif"),
+    (b"BM", "image/bmp"),
+)
+
+#: Сколько байт начала файла нужно, чтобы определить формат.
+_SNIFF_BYTES = 12
+
+
+class ImageTooLargeError(ValueError):
+    """Изображение больше допустимого размера."""
+
+
+class UnsupportedImageError(ValueError):
+    """Данные не являются изображением поддерживаемого формата."""
+
+
+def sniff_media_type(head: bytes) -> Optional[str]:
+    """MIME-тип изображения по первым байтам файла или None, если формат неизвестен."""
+
+    for signature, media_type in _SIGNATURES:
+        if head.startswith(signature):
+            return media_type
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "image/webp"
+    return None
+
+
+@lru_cache(maxsize=4096)
+def file_media_type(path: str) -> Optional[str]:
+    """
+    MIME-тип изображения в файле ``path``. Файлы хранилища не меняются после
+    записи, поэтому результат запоминается.
+    """
+
+    with open(path, "rb") as file:
+        return sniff_media_type(file.read(_SNIFF_BYTES))
+
+
+def _append(file: IO[bytes], digest: Any, data: bytes) -> None:
+    digest.update(data)
+    file.write(data)
+
+
+class ImageStore:
+    """
+    Каталог ``root`` с изображениями, адресуемыми по SHA-256 содержимого.
+
+    ``generation`` меняется при каждом добавлении нового изображения: от него
+    зависят ETag и кэш результатов проверки отчётов со ссылками на картинки
+    (правило FIGURE_IMAGE_EXISTS). Счётчик свой у каждого процесса.
+    """
+
+    def __init__(self, root: Union[str, Path]) -> None:
+        self.root = Path(root)
+        self._boot = uuid4().hex[:8]
+        self._counter = count(1)
+        self.generation = f"{self._boot}.0"
+
+    def path(self, image_hash: str) -> Path:
+        """Путь к файлу изображения (файла может не быть)."""
+
+        return self.root / image_hash[:2] / image_hash
+
+    def media_type(self, image_hash: str) -> Optional[str]:
+        """MIME-тип сохранённого изображения или None, если его нет."""
+
+        try:
+            return file_media_type(str(self.path(image_hash)))
+        except FileNotFoundError:
+            return None
+
+    async def save(self, chunks: AsyncIterable[bytes], max_bytes: int) -> StoredImage:
+        """
+        Сохраняет изображение из потока ``chunks``.
+
+        Запись и хэширование идут в пуле потоков порциями по
+        ``WRITE_BUFFER_BYTES``, чтобы не занимать цикл событий. Поток длиннее
+        ``max_bytes`` прерывается ``ImageTooLargeError``, данные неизвестного
+        формата отклоняются ``UnsupportedImageError``; временный файл при
+        этом удаляется.
+        """
+
+        incoming = self.root / "incoming"
+        incoming.mkdir(parents=True, exist_ok=True)
+        digest = sha256()
+        size = 0
+        head = b""
+        buffer: List[bytes] = []
+        buffered = 0
+        file = tempfile.NamedTemporaryFile(dir=incoming, delete=False)
+        try:
+            try:
+                async for chunk in chunks:
+                    size += len(chunk)
+                    if size > max_bytes:
+                        raise ImageTooLargeError(
+                            f"Изображение больше {max_bytes} байт."
+                        )
+                    if len(head) < _SNIFF_BYTES:
+                        head += chunk[: _SNIFF_BYTES - len(head)]
+                    buffer.append(chunk)
+                    buffered += len(chunk)
+                    if buffered >= WRITE_BUFFER_BYTES:
+                        await run_in_threadpool(_append, file, digest, b"".join(buffer))
+                        buffer.clear()
+                        buffered = 0
+                media_type = sniff_media_type(head)
+                if media_type is None:
+                    raise UnsupportedImageError(
+                        "Поддерживаются изображения PNG, JPEG, GIF, BMP и WebP."
+                    )
+                await run_in_threadpool(_append, file, digest, b"".join(buffer))
+                await run_in_threadpool(self._sync, file)
+            finally:
+                file.close()
+            image_hash = digest.hexdigest()
+            created = await run_in_threadpool(self._commit, Path(file.name), image_hash)
+        except BaseException:
+            Path(file.name).unlink(missing_ok=True)
+            raise
+        return StoredImage(
+            hash=image_hash, size=size, media_type=media_type, created=created
+        )
+
+    @staticmethod
+    def _sync(file: IO[bytes]) -> None:
+        file.flush()
+        os.fsync(file.fileno())
+
+    def _commit(self, temporary: Path, image_hash: str) -> bool:
+        target = self.path(image_hash)
+        if target.exists():
+            temporary.unlink()
+            return False
+        target.parent.mkdir(exist_ok=True)
+        os.replace(temporary, target)
+        self.generation = f"{self._boot}.{next(self._counter)}"
+        return True
+
+    def missing(self, image_hashes: Iterable[str]) -> Set[str]:
+        """
+        Какие из ``image_hashes`` отсутствуют в хранилище.
+
+        Хэши группируются по подкаталогам: для подкаталога с несколькими
+        искомыми файлами читается его список (один вызов вместо ``stat`` на
+        каждый файл), для одного файла — проверяется только он.
+        """
+
+        by_shard: Dict[str, List[str]] = defaultdict(list)
+        for image_hash in set(image_hashes):
+            by_shard[image_hash[:2]].append(image_hash)
+
+        absent: Set[str] = set()
+        for shard, wanted in by_shard.items():
+            if len(wanted) == 1:
+                if not self.path(wanted[0]).is_file():
+                    absent.update(wanted)
+                continue
+            try:
+                present = set(os.listdir(self.root / shard))
+            except FileNotFoundError:
+                present = set()
+            absent.update(
+                image_hash for image_hash in wanted if image_hash not in present
+            )
+        return absent
+
+
+#: Хранилище изображений бэкенда (каталог ``GHOST_IMAGE_STORE_DIR``).
+image_store = ImageStore(settings.image_store_dir)
@@ -0,0 +1,360 @@
+"""
+Приблизительная вёрстка отчёта: разбиение на страницы без генерации DOCX.
+
+Оценка повторяет параметры оформления из REQUIREMENTS (§5.1–5.7): лист A4 с
+полями 3,0/1,5/2,0/2,0 см, основной текст Times New Roman 12 pt с интервалом
+1,5 и отступом первой строки 1,25 см, заголовки с интервалами 24 pt,
+таблицы 10 pt с интервалом 1,0. Переносы строк оцениваются по таблице ширин
+символов (``fonts``), а затем блоки раскладываются по страницам:
+
+- разделы и приложения верхнего уровня начинаются с новой страницы;
+- абзацы и элементы списков разрываются между страницами, но не оставляют на
+  странице одну строку (запрет висячих строк Word);
+- заголовок не остаётся в конце страницы без начала следующего блока;
+- строки таблиц не разрываются; на новой странице таблица продолжается
+  строкой «Продолжение таблицы X» и повтором шапки;
+- рисунок с подписью переносится целиком. Размеров изображений в модели нет,
+  поэтому высота рисунка принимается равной ``FIGURE_HEIGHT``.
+
+Измерение блока (число строк абзацев, высоты строк таблицы) — самая дорогая
+часть, поэтому оно кэшируется по хэшу измеряемых полей блока: при повторной
+оценке после правки заново измеряются только изменённые блоки, а раскладка
+по страницам — один линейный проход.
+"""
+
+from __future__ import annotations
+
+from hashlib import blake2b
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Type
+from uuid import UUID
+
+from app.models import (
+    AppendixBlock,
+    BaseBlock,
+    FigureBlock,
+    LayoutEstimate,
+    ListBlock,
+    PageEstimate,
+    ReferencesBlock,
+    Report,
+    SectionBlock,
+    SubsectionBlock,
+    TableBlock,
+    TextBlock,
+)
+from app.services.cache import LRUCache
+from app.settings import settings
+
+from .fonts import SINGLE_LINE_FACTOR, count_lines
+
+#: Пунктов в сантиметре.
+CM = 72 / 2.54
+
+#: Область текста листа A4 (21,0 × 29,7 см) в книжной ориентации без полей
+#: (левое 3,0, правое 1,5, верхнее и нижнее по 2,0 см), пт.
+TEXT_WIDTH = (21.0 - 3.0 - 1.5) * CM
+TEXT_HEIGHT = (29.7 - 2.0 - 2.0) * CM
+
+#: Основной текст, заголовки, подписи и список источников: 12 pt, интервал 1,5.
+FONT_SIZE = 12.0
+LINE_HEIGHT = FONT_SIZE * SINGLE_LINE_FACTOR * 1.5
+
+#: Отступ первой строки абзаца, текста элемента списка и номера заголовка.
+PARAGRAPH_INDENT = 1.25 * CM
+
+#: Интервал до заголовка среди текста и после заголовка перед текстом, пт.
+HEADING_SPACING = 24.0
+
+#: Содержимое таблиц: 10 pt, интервал 1,0, поля ячеек Word по 0,19 см.
+TABLE_FONT_SIZE = 10.0
+TABLE_LINE_HEIGHT = TABLE_FONT_SIZE * SINGLE_LINE_FACTOR
+TABLE_CELL_PADDING = 0.19 * CM
+TABLE_BORDER = 0.5
+
+#: Интервал перед первым абзацем после таблицы, пт.
+SPACE_AFTER_TABLE = 6.0
+
+#: Высота рисунка без подписи, пт (размеры изображений в модели не хранятся).
+FIGURE_HEIGHT = 8.0 * CM
+
+#: Титульный лист и содержание: отдельные страницы перед основной частью.
+FRONT_MATTER_PAGES = 2
+
+#: Минимум строк абзаца в конце и в начале страницы при его разрыве.
+MIN_SPLIT_LINES = 2
+
+#: Погрешность сравнения высот, пт.
+EPSILON = 1e-6
+
+Measure = Tuple[float, ...]
+
+
+def _heading_lines(title: str) -> Measure:
+    indent = PARAGRAPH_INDENT if title[:1].isdigit() else 0.0
+    return (count_lines(title, FONT_SIZE, TEXT_WIDTH, indent, bold=True),)
+
+
+def _measure_section(block: SectionBlock) -> Measure:
+    return _heading_lines(block.title)
+
+
+def _measure_subsection(block: SubsectionBlock) -> Measure:
+    return _heading_lines(block.title)
+
+
+def _measure_appendix(block: AppendixBlock) -> Measure:
+    title = f"ПРИЛОЖЕНИЕ {block.label}"
+    return _heading_lines(f"{title} – {block.title}" if block.title else title)
+
+
+def _measure_text(block: TextBlock) -> Measure:
+    return tuple(
+        count_lines(paragraph, FONT_SIZE, TEXT_WIDTH, PARAGRAPH_INDENT)
+        for paragraph in block.text.split("\n")
+    )
+
+
+def _measure_list(block: ListBlock) -> Measure:
+    return tuple(
+        count_lines(item, FONT_SIZE, TEXT_WIDTH, PARAGRAPH_INDENT)
+        for item in block.items
+    )
+
+
+def _measure_references(block: ReferencesBlock) -> Measure:
+    return tuple(
+        count_lines(f"{number}. {item}", FONT_SIZE, TEXT_WIDTH)
+        for number, item in enumerate(block.items, start=1)
+    )
+
+
+def _measure_table(block: TableBlock) -> Measure:
+    """Строки подписи, затем высоты строк таблицы (первая — шапка), пт."""
+
+    caption = count_lines(block.caption, FONT_SIZE, TEXT_WIDTH)
+    columns = max((len(row) for row in block.rows), default=0)
+    if not columns:
+        return (caption,)
+    cell_width = TEXT_WIDTH / columns - 2 * TABLE_CELL_PADDING
+    heights = [
+        max(
+            (count_lines(cell, TABLE_FONT_SIZE, cell_width) for cell in row),
+            default=1,
+        )
+        * TABLE_LINE_HEIGHT
+        + TABLE_BORDER
+        for row in block.rows
+    ]
+    return (caption, *heights)
+
+
+def _measure_figure(block: FigureBlock) -> Measure:
+    return (count_lines(block.caption, FONT_SIZE, TEXT_WIDTH),)
+
+
+#: Измерители блоков и поля, от которых зависит результат измерения.
+MEASURES: Dict[
+    Type[BaseBlock], Tuple[Callable[[BaseBlock], Measure], Tuple[str, ...]]
+] = {
+    SectionBlock: (_measure_section, ("title",)),
+    SubsectionBlock: (_measure_subsection, ("title",)),
+    AppendixBlock: (_measure_appendix, ("label", "title")),
+    TextBlock: (_measure_text, ("text",)),
+    ListBlock: (_measure_list, ("items",)),
+    ReferencesBlock: (_measure_references, ("items",)),
+    TableBlock: (_measure_table, ("caption", "rows")),
+    FigureBlock: (_measure_figure, ("caption",)),
+}
+
+
+def _measure_size(measure: Measure) -> int:
+    return 64 + 8 * len(measure)
+
+
+#: Кэш измерений блоков: хэш измеряемых полей → результат измерения.
+layout_cache: LRUCache[Measure] = LRUCache(
+    max_bytes=settings.layout_cache_max_bytes, sizeof=_measure_size
+)
+
+
+def measure_block(block: BaseBlock) -> Measure:
+    """
+    Измерение блока без вложенных блоков (см. ``MEASURES``). Кэшируется по
+    хэшу измеряемых полей, поэтому не зависит от id и вложенных блоков и общее
+    для блоков с одинаковым содержимым.
+    """
+
+    measure, fields = MEASURES[type(block)]
+    digest = blake2b(type(block).__name__.encode(), digest_size=16)
+    for field in fields:
+        value = getattr(block, field)
+        if not isinstance(value, str):
+            # Элементы списков и ячейки таблиц (строки — списки ячеек).
+            value = "\x1e".join(
+                item if isinstance(item, str) else "\x1f".join(item) for item in value
+            )
+        # Одиночные суррогаты («\ud800») допустимы в JSON, но не в строгом UTF-8.
+        digest.update(b"\x00%s" % value.encode("utf-8", "surrogatepass"))
+    key = digest.digest()
+    measured = layout_cache.get(key)
+    if measured is None:
+        measured = measure(block)
+        layout_cache.put(key, measured)
+    return measured
+
+
+class _Paginator:
+    """Раскладка измеренных блоков по страницам (один проход по документу)."""
+
+    def __init__(self) -> None:
+        self.pages: List[PageEstimate] = []
+        self.used = 0.0
+        self.block_ids: List[UUID] = []
+
+    @property
+    def room(self) -> float:
+        return TEXT_HEIGHT - self.used
+
+    def break_page(self, ends_with: str) -> None:
+        if not self.block_ids:
+            return
+        self.pages.append(
+            PageEstimate(
+                number=FRONT_MATTER_PAGES + len(self.pages) + 1,
+                fill=round(min(self.used / TEXT_HEIGHT, 1.0), 4),
+                block_ids=self.block_ids,
+                ends_with=ends_with,
+            )
+        )
+        self.used = 0.0
+        self.block_ids = []
+
+    def place(self, height: float, block_id: UUID) -> None:
+        self.used += height
+        if not self.block_ids or self.block_ids[-1] != block_id:
+            self.block_ids.append(block_id)
+
+    def ensure(self, height: float) -> None:
+        """Начинает новую страницу, если на текущей не осталось ``height`` пт."""
+
+        if self.block_ids and height > self.room + EPSILON:
+            self.break_page("overflow")
+
+    def keep(self, height: float, block_id: UUID, space_before: float = 0.0) -> None:
+        """Неразрывный фрагмент: целиком на текущей странице или на следующей."""
+
+        self.ensure(space_before + height)
+        self.place((space_before if self.block_ids else 0.0) + height, block_id)
+
+    def lines(
+        self,
+        count: int,
+        block_id: UUID,
+        line_height: float = LINE_HEIGHT,
+        space_before: float = 0.0,
+    ) -> None:
+        """Абзац из ``count`` строк, который можно разорвать между страницами."""
+
+        before = space_before if self.block_ids else 0.0
+        while True:
+            fits = int((self.room - before + EPSILON) // line_height)
+            if fits >= count:
+                self.place(before + count * line_height, block_id)
+                return
+            fits = min(fits, count - MIN_SPLIT_LINES)
+            if fits < MIN_SPLIT_LINES:
+                fits = 0 if self.block_ids else max(1, int(self.room // line_height))
+            if fits:
+                self.place(before + fits * line_height, block_id)
+                count -= fits
+            self.break_page("overflow")
+            before = 0.0
+
+
+HEADINGS = (SectionBlock, SubsectionBlock, AppendixBlock)
+
+#: Блоки, которые на верхнем уровне начинаются с новой страницы.
+PAGE_START_BLOCKS = (SectionBlock, AppendixBlock, ReferencesBlock)
+
+
+def _first_height(block: BaseBlock) -> float:
+    """Высота начала блока, которое должно оказаться на странице с заголовком."""
+
+    measured = measure_block(block)
+    if isinstance(block, HEADINGS):
+        return (measured[0] + MIN_SPLIT_LINES) * LINE_HEIGHT
+    if isinstance(block, TableBlock):
+        return measured[0] * LINE_HEIGHT + sum(measured[1:3])
+    if isinstance(block, FigureBlock):
+        return FIGURE_HEIGHT + measured[0] * LINE_HEIGHT
+    if not measured:
+        return 0.0
+    return min(measured[0], MIN_SPLIT_LINES) * LINE_HEIGHT
+
+
+def estimate_layout(report: Report) -> LayoutEstimate:
+    """
+    Оценивает разбиение отчёта на страницы: число страниц и заполнение каждой
+    страницы основной части. Оценка приблизительная: шрифт не растеризуется,
+    а переносы строк считаются по ширинам символов из ``fonts``.
+    """
+
+    index = report.index()
+    blocks: Sequence[BaseBlock] = index.blocks
+    paginator = _Paginator()
+    space_before = 0.0
+
+    def starts_page(block: BaseBlock) -> bool:
+        return isinstance(block, PAGE_START_BLOCKS) and index.depth(block.id) == 0
+
+    for position, block in enumerate(blocks):
+        following: Optional[BaseBlock] = (
+            blocks[position + 1] if position + 1 < len(blocks) else None
+        )
+        if starts_page(block):
+            paginator.break_page("page_break")
+            space_before = 0.0
+
+        measured = measure_block(block)
+        if isinstance(block, HEADINGS):
+            height = measured[0] * LINE_HEIGHT
+            after = keep_with = 0.0
+            if following is not None and not starts_page(following):
+                keep_with = _first_height(following)
+                if not isinstance(following, HEADINGS):
+                    after = HEADING_SPACING
+            # Интервал до заголовка в начале страницы не нужен (§5.4).
+            paginator.ensure(HEADING_SPACING + height + after + keep_with)
+            before = HEADING_SPACING if paginator.block_ids else 0.0
+            paginator.place(before + height + after, block.id)
+            space_before = 0.0
+        elif isinstance(block, TableBlock):
+            caption, rows = measured[0] * LINE_HEIGHT, measured[1:]
+            header = rows[0] if rows else 0.0
+            # Подпись не отрывается от шапки и первой строки таблицы.
+            paginator.ensure(space_before + caption + sum(rows[:2]))
+            before = space_before if paginator.block_ids else 0.0
+            paginator.place(before + caption, block.id)
+            for row in rows:
+                if row > paginator.room + EPSILON:
+                    paginator.break_page("overflow")
+                    # «Продолжение таблицы X» и повтор шапки.
+                    paginator.place(LINE_HEIGHT + header, block.id)
+                paginator.place(row, block.id)
+            space_before = SPACE_AFTER_TABLE
+        elif isinstance(block, FigureBlock):
+            paginator.keep(
+                FIGURE_HEIGHT + measured[0] * LINE_HEIGHT, block.id, space_before
+            )
+            space_before = 0.0
+        else:
+            for count in measured:
+                paginator.lines(int(count), block.id, space_before=space_before)
+                space_before = 0.0
+
+    paginator.break_page("end")
+    return LayoutEstimate(
+        page_count=FRONT_MATTER_PAGES + len(paginator.pages),
+        front_matter_pages=FRONT_MATTER_PAGES,
+        pages=paginator.pages,
+    )
@@ -0,0 +1,138 @@
+"""
+Метрики шрифта Times New Roman для оценки переносов строк.
+
+Ширины символов — в тысячных долях кегля (как в AFM-файлах): ширина строки
+в пунктах равна сумме ширин её символов, умноженной на ``кегль / 1000``.
+Таблица покрывает латиницу, кириллицу, цифры и типичную пунктуацию отчётов;
+для остальных символов используется средняя ширина ``DEFAULT_WIDTH``.
+Полужирное начертание оценивается множителем ``BOLD_FACTOR``.
+"""
+
+from __future__ import annotations
+
+from bisect import bisect_right
+from functools import lru_cache
+from itertools import accumulate
+from math import ceil
+from typing import Dict
+
+#: Ширина символа, которого нет в таблице.
+DEFAULT_WIDTH = 500
+
+#: Во сколько раз полужирный Times New Roman в среднем шире обычного.
+BOLD_FACTOR = 1.05
+
+#: Межстрочный интервал «одинарный» для Times New Roman в долях кегля
+#: (восходящие + нисходящие элементы + межстрочный зазор шрифта).
+SINGLE_LINE_FACTOR = 1.15
+
+
+def _widths(characters: str, *widths: int) -> Dict[str, int]:
+    return dict(zip(characters, widths, strict=True))
+
+
+TIMES_NEW_ROMAN: Dict[str, int] = {
+    **_widths(" ", 250),
+    **_widths(
+        "abcdefghijklmnopqrstuvwxyz",
+        *(444, 500, 444, 500, 444, 333, 500, 500, 278, 278, 500, 278, 778),
+        *(500, 500, 500, 500, 333, 389, 278, 500, 500, 722, 500, 500, 444),
+    ),
+    **_widths(
+        "ABCDEFGHIJKLMNOPQRSTUVWXYZ",
+        *(722, 667, 667, 722, 611, 556, 722, 722, 333, 389, 722, 611, 889),
+        *(722, 722, 556, 722, 667, 556, 611, 722, 722, 944, 722, 722, 611),
+    ),
+    **_widths(
+        "абвгдеёжзийклмнопрстуфхцчшщъыьэюя",
+        *(444, 509, 472, 410, 509, 444, 444, 691, 395, 535, 535, 486, 499),
+        *(633, 535, 500, 535, 500, 444, 437, 500, 648, 500, 535, 503, 770),
+        *(770, 517, 672, 456, 429, 747, 460),
+    ),
+    **_widths(
+        "АБВГДЕЁЖЗИЙКЛМНОПРСТУФХЦЧШЩЪЫЬЭЮЯ",
+        *(722, 574, 667, 578, 682, 611, 611, 896, 501, 722, 722, 667, 678),
+        *(889, 722, 722, 722, 556, 667, 611, 637, 757, 722, 727, 651, 1009),
+        *(1009, 700, 878, 560, 663, 1014, 661),
+    ),
+    **dict.fromkeys("0123456789", 500),
+    **_widths(
+        "!\"#$%&'()*+,-./:;<=>?@[\\]^_`{|}~",
+        *(333, 408, 500, 500, 833, 778, 180, 333, 333, 500, 564, 250, 333, 250),
+        *(278, 278, 278, 564, 564, 564, 444, 921, 333, 278, 333, 469, 500, 333),
+        *(480, 200, 480, 541),
+    ),
+    **_widths(
+        "–—«»„“”‘’…№°±×·•",
+        *(500, 1000, 500, 500, 444, 444, 444, 333, 333, 1000, 1000, 400, 564),
+        *(564, 250, 350),
+    ),
+    "\t": 1000,
+}
+
+
+@lru_cache(maxsize=65536)
+def word_width(word: str) -> int:
+    """
+    Ширина слова в тысячных долях кегля. Запоминается: в тексте отчёта слова
+    повторяются, и большая часть обращений попадает в кэш.
+    """
+
+    get = TIMES_NEW_ROMAN.get
+    return sum(get(character, DEFAULT_WIDTH) for character in word)
+
+
+@lru_cache(maxsize=65536)
+def _advance(word: str) -> int:
+    # Ширина слова вместе с пробелом после него.
+    return word_width(word) + TIMES_NEW_ROMAN[" "]
+
+
+def count_lines(
+    text: str,
+    size: float,
+    width: float,
+    first_indent: float = 0.0,
+    bold: bool = False,
+) -> int:
+    """
+    Число строк абзаца ``text`` кеглем ``size`` в колонке шириной ``width`` пт
+    с отступом первой строки ``first_indent`` пт.
+
+    Переносы расставляются жадно по пробелам, как в Word без автоматической
+    расстановки переносов; слово длиннее строки занимает столько строк,
+    сколько нужно. Пустой абзац занимает одну строку.
+    """
+
+    words = text.split()
+    if not words:
+        return 1
+
+    scale = size / 1000 * (BOLD_FACTOR if bold else 1.0)
+    capacity = width / scale
+    space = TIMES_NEW_ROMAN[" "]
+    offset = first_indent / scale
+    advances = list(map(_advance, words))
+    if sum(advances) - space + offset <= capacity:
+        return 1
+
+    # prefix[k] — ширина первых k слов, каждое с пробелом после него.
+    prefix = list(accumulate(advances, initial=0))
+    # Конец строки ищется двоичным поиском: цикл идёт по строкам, а не словам.
+    lines = 0
+    start = 0
+    while start < len(words):
+        # Первое слово, не поместившееся в строку, начинающуюся со слова start.
+        end = (
+            bisect_right(prefix, prefix[start] + capacity - offset + space, start + 1)
+            - 1
+        )
+        if end == start:
+            # Слово длиннее строки.
+            end = start + 1
+            lines += ceil((prefix[end] - prefix[start] - space + offset) / capacity)
+        else:
+            lines += 1
+        start = end
+        offset = 0.0
+    return lines
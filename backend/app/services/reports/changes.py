@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+from typing import Dict, List, Optional, Set, Tuple
+from uuid import UUID
+
+from app.models import BaseBlock, BlockInsertion, Report, ReportChange
+
+
+class ReportChangeError(ValueError):
+    """Правку нельзя применить к отчёту (например, указан несуществующий блок)."""
+
+
+def _subtree_ids(block: BaseBlock) -> Set[UUID]:
+    ids: Set[UUID] = set()
+    stack: List[BaseBlock] = [block]
+    while stack:
+        current = stack.pop()
+        ids.add(current.id)
+        stack.extend(current.children)
+    return ids
+
+
+def apply_change(report: Report, change: ReportChange) -> Tuple[Report, Set[UUID]]:
+    """
+    Применяет правку к отчёту и возвращает новую версию отчёта вместе с
+    идентификаторами изменённых, вставленных и удалённых блоков.
+
+    Исходный отчёт не изменяется: копируются только блоки на пути от корня к
+    изменённым местам, остальные поддеревья разделяются между версиями.
+    """
+
+    index = report.index()
+
+    removed = set(change.removed_block_ids)
+    replaced: Dict[UUID, BaseBlock] = {
+        block.id: block for block in change.replaced_blocks
+    }
+    insertions: Dict[Optional[UUID], List[BlockInsertion]] = {}
+    for insertion in change.inserted_blocks:
+        insertions.setdefault(insertion.parent_id, []).append(insertion)
+
+    for block_id in (*removed, *replaced):
+        if block_id not in index:
+            raise ReportChangeError(f"Блок {block_id} не найден в отчёте.")
+    for parent_id in insertions:
+        if parent_id is not None and parent_id not in index:
+            raise ReportChangeError(f"Блок-родитель {parent_id} не найден в отчёте.")
+
+    changed: Set[UUID] = set()
+    for block_id in removed:
+        changed |= _subtree_ids(index.get(block_id))
+    for block in replaced.values():
+        changed |= _subtree_ids(block)
+    for insertion in change.inserted_blocks:
+        inserted_ids = _subtree_ids(insertion.block)
+        if any(
+            block_id in index and block_id not in changed for block_id in inserted_ids
+        ):
+            raise ReportChangeError("Вставляемый блок уже есть в отчёте.")
+        changed |= inserted_ids
+
+    dirty: Set[UUID] = set()
+    for block_id in (*removed, *replaced, *insertions):
+        parent_id = index.parent_id(block_id) if block_id in removed else block_id
+        while parent_id is not None and parent_id not in dirty:
+            dirty.add(parent_id)
+            parent_id = index.parent_id(parent_id)
+
+    def rebuild(children: List[BaseBlock], parent_id: Optional[UUID]) -> List:
+        result: List[BaseBlock] = []
+        for child in children:
+            if child.id in removed:
+                continue
+            if child.id in replaced:
+                child = replaced[child.id]
+            if child.id in dirty:
+                child = child.model_copy(
+                    update={"children": rebuild(child.children, child.id)}
+                )
+            result.append(child)
+        for insertion in insertions.get(parent_id, []):
+            result.insert(min(insertion.index, len(result)), insertion.block)
+        return result
+
+    updated = report.model_copy(
+        update={
+            "meta": change.meta or report.meta,
+            "blocks": rebuild(report.blocks, None),
+        }
+    )
+
+    return updated, changed
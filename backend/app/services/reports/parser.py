@@ -0,0 +1,409 @@
+"""
+Потоковый разбор тела запроса в Report.
+
+``ReportParser`` получает JSON по частям (``feed``) и строит блоки по ходу
+разбора — пачками, как только закрывается массив ``children`` или набирается
+``BATCH_BLOCKS`` блоков. Вложенность обходится явным стеком, а не рекурсией,
+промежуточное дерево dict для всего отчёта не создаётся, и в памяти
+одновременно находятся только готовые модели, последняя пачка блоков и ещё не
+разобранный хвост текста. Листовые значения (``meta``, ``text``, ``rows`` и т.п.)
+разбираются C-декодером модуля ``json``.
+
+Ограничения на число блоков и глубину вложенности проверяются в момент
+открытия очередного блока, так что слишком большой отчёт отклоняется, не
+дожидаясь конца тела.
+"""
+
+from __future__ import annotations
+
+import codecs
+import json
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+from pydantic import TypeAdapter, ValidationError
+
+from app.models import Report
+from app.models.report import ReportBlock
+
+_BLOCK_ADAPTER: TypeAdapter[Any] = TypeAdapter(ReportBlock)
+_BLOCKS_ADAPTER: TypeAdapter[List[Any]] = TypeAdapter(List[ReportBlock])
+_DECODER = json.JSONDecoder()
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_EMPTY_ARRAY = re.compile(r"\[[ \t\n\r]*\]")
+_FIRST_MEMBER = re.compile(r'"([^"\\\x00-\x1f]*)"[ \t\n\r]*:[ \t\n\r]*')
+_NEXT_MEMBER = re.compile(
+    r'[ \t\n\r]*,[ \t\n\r]*"([^"\\\x00-\x1f]*)"[ \t\n\r]*:[ \t\n\r]*'
+)
+
+# Виды кадров стека разбора.
+_ROOT, _BLOCK, _ARRAY = range(3)
+
+# Состояния кадра: после открывающей скобки, после запятой в объекте, перед
+# двоеточием, перед значением, после значения.
+_OPEN, _KEY, _COLON, _VALUE, _NEXT = range(5)
+
+# Ключ, значение которого разбирается поблочно, для каждого вида объекта.
+_STREAMED_KEYS = {_ROOT: "blocks", _BLOCK: "children"}
+
+_MISSING = object()
+
+#: Сколько разобранных блоков одного массива копится до общей валидации:
+#: один вызов валидатора на пачку блоков заметно быстрее вызова на каждый.
+BATCH_BLOCKS = 256
+
+
+class ReportSyntaxError(ValueError):
+    """Тело запроса — не JSON; ``pos`` — позиция ошибки в символах."""
+
+    def __init__(self, msg: str, pos: int) -> None:
+        super().__init__(f"{msg} (char {pos})")
+        self.msg = msg
+        self.pos = pos
+
+
+class ReportLimitError(ValueError):
+    """Отчёт превышает ограничения на число блоков или глубину вложенности."""
+
+
+class ReportValidationError(ValueError):
+    """
+    Отчёт не соответствует модели. ``errors`` — ошибки в формате
+    ``ValidationError.errors()`` с ``loc`` от корня отчёта.
+    """
+
+    def __init__(self, errors: List[Dict[str, Any]]) -> None:
+        super().__init__(f"{len(errors)} validation errors for Report")
+        self.errors = errors
+
+
+class _Incomplete(Exception):
+    # Значение обрывается на конце полученного текста.
+    pass
+
+
+class _Frame:
+    __slots__ = (
+        "kind",
+        "state",
+        "path",
+        "depth",
+        "fields",
+        "key",
+        "items",
+        "pending",
+        "index",
+    )
+
+    def __init__(
+        self,
+        kind: int,
+        path: Tuple[Any, ...],
+        depth: int,
+        items: Optional[List[Any]] = None,
+    ) -> None:
+        self.kind = kind
+        self.state = _OPEN
+        # Префикс loc ошибок валидации: для объекта — его собственный, для
+        # массива — общий для его элементов.
+        self.path = path
+        # Глубина блока; у массива — глубина блоков в нём.
+        self.depth = depth
+        self.fields: Dict[str, Any] = {}
+        self.key = ""
+        # Уже построенные блоки (у массива) или список, в который их собирает
+        # вложенный массив (у объекта).
+        self.items = items
+        # Разобранные, но ещё не проверенные блоки массива.
+        self.pending: List[Any] = []
+        # Число элементов массива, разобранных до сих пор.
+        self.index = 0
+
+
+class ReportParser:
+    """
+    Потоковый разборщик отчёта.
+
+    Части тела передаются в ``feed`` в порядке получения, ``close`` завершает
+    разбор и возвращает Report. Ошибки:
+
+    - ``ReportSyntaxError`` — тело не является корректным JSON в UTF-8;
+    - ``ReportLimitError`` — превышено ``max_blocks`` или ``max_depth``
+      (выбрасывается сразу, в том числе из ``feed``);
+    - ``ReportValidationError`` — все ошибки валидации моделей отчёта.
+
+    Незаконченное значение в конце полученного текста разбирается заново,
+    только когда хвост вырос хотя бы вдвое, поэтому даже очень длинный текст
+    блока, пришедший многими частями, разбирается за линейное время.
+    """
+
+    def __init__(self, max_blocks: int, max_depth: int) -> None:
+        self.max_blocks = max_blocks
+        self.max_depth = max_depth
+        self._decoder = codecs.getincrementaldecoder("utf-8-sig")()
+        self._text = ""
+        self._pos = 0
+        # Сколько символов уже отброшено из начала текста.
+        self._offset = 0
+        self._pending: List[str] = []
+        self._pending_size = 0
+        self._resume_at = 0
+        self._stack: List[_Frame] = []
+        self._result: Any = _MISSING
+        self._blocks = 0
+        self._errors: List[Dict[str, Any]] = []
+
+    def feed(self, chunk: bytes) -> None:
+        """Передаёт очередную часть тела запроса."""
+
+        self._append(self._decode(chunk, final=False))
+        if len(self._text) - self._pos + self._pending_size >= self._resume_at:
+            self._advance(final=False)
+
+    def close(self) -> Report:
+        """Завершает разбор и возвращает отчёт."""
+
+        self._append(self._decode(b"", final=True))
+        self._advance(final=True)
+        end = self._offset + len(self._text)
+        if self._result is _MISSING and not self._stack:
+            raise ReportSyntaxError("Expecting value", end)
+        if self._stack:
+            raise ReportSyntaxError("Unexpected end of data", end)
+
+        errors = self._errors
+        try:
+            report = Report.model_validate(self._result)
+        except ValidationError as exc:
+            errors.extend(exc.errors(include_url=False))
+        if errors:
+            raise ReportValidationError(errors)
+        return report
+
+    def _decode(self, chunk: bytes, final: bool) -> str:
+        try:
+            return self._decoder.decode(chunk, final)
+        except UnicodeDecodeError as exc:
+            raise ReportSyntaxError(
+                f"Invalid UTF-8: {exc.reason}", self._offset + len(self._text)
+            ) from exc
+
+    def _append(self, text: str) -> None:
+        if text:
+            self._pending.append(text)
+            self._pending_size += len(text)
+
+    def _advance(self, final: bool) -> None:
+        if self._pending:
+            self._offset += self._pos
+            self._text = "".join([self._text[self._pos :], *self._pending])
+            self._pos = 0
+            self._pending.clear()
+            self._pending_size = 0
+        self._parse(final)
+        self._resume_at = 2 * (len(self._text) - self._pos)
+
+    def _error(self, msg: str, pos: int) -> ReportSyntaxError:
+        return ReportSyntaxError(msg, self._offset + pos)
+
+    def _value(self, text: str, pos: int, final: bool) -> Tuple[Any, int]:
+        # Листовое значение целиком. Значение, которое упирается в конец
+        # текста, может продолжаться в следующей части (например, число).
+        try:
+            value, end = _DECODER.raw_decode(text, pos)
+        except json.JSONDecodeError as exc:
+            if not final:
+                raise _Incomplete from None
+            raise self._error(exc.msg, exc.pos) from None
+        except RecursionError:
+            raise ReportLimitError("Слишком глубокая вложенность JSON.") from None
+        if end == len(text) and not final:
+            raise _Incomplete
+        return value, end
+
+    def _key(self, text: str, pos: int, final: bool) -> Tuple[str, int]:
+        try:
+            return json.decoder.scanstring(text, pos + 1)
+        except json.JSONDecodeError as exc:
+            if not final:
+                raise _Incomplete from None
+            raise self._error(exc.msg, exc.pos) from None
+
+    def _parse(self, final: bool) -> None:
+        text, pos, stack = self._text, self._pos, self._stack
+        try:
+            while True:
+                pos = _WHITESPACE.match(text, pos).end()
+                if pos == len(text):
+                    return
+                char = text[pos]
+
+                if not stack:
+                    if self._result is not _MISSING:
+                        raise self._error("Extra data", pos)
+                    if char == "{":
+                        stack.append(_Frame(_ROOT, (), 0))
+                        pos += 1
+                    else:
+                        self._result, pos = self._value(text, pos, final)
+                    continue
+
+                frame = stack[-1]
+                state = frame.state
+
+                if frame.kind == _ARRAY:
+                    if char == "]" and state != _VALUE:
+                        self._flush(frame)
+                        stack.pop()
+                        pos += 1
+                    elif state == _NEXT:
+                        if char != ",":
+                            raise self._error("Expecting ',' delimiter", pos)
+                        frame.state = _VALUE
+                        pos += 1
+                    elif char == "{":
+                        self._open_block(frame)
+                        pos += 1
+                    else:
+                        value, pos = self._value(text, pos, final)
+                        self._add_block(frame, value)
+                    continue
+
+                if state == _OPEN or state == _NEXT:
+                    if char == "}":
+                        stack.pop()
+                        pos += 1
+                        self._close_object(frame)
+                        continue
+                    end = self._members(frame, text, pos)
+                    if end != pos:
+                        pos = end
+                        continue
+
+                if state == _NEXT:
+                    if char != ",":
+                        raise self._error("Expecting ',' delimiter", pos)
+                    frame.state = _KEY
+                    pos += 1
+                elif state == _OPEN or state == _KEY:
+                    if char != '"':
+                        raise self._error(
+                            "Expecting property name enclosed in double quotes", pos
+                        )
+                    frame.key, pos = self._key(text, pos, final)
+                    frame.state = _COLON
+                elif state == _COLON:
+                    if char != ":":
+                        raise self._error("Expecting ':' delimiter", pos)
+                    frame.state = _VALUE
+                    pos += 1
+                elif char == "[" and frame.key == _STREAMED_KEYS[frame.kind]:
+                    self._open_array(frame)
+                    pos += 1
+                else:
+                    value, pos = self._value(text, pos, final)
+                    frame.fields[frame.key] = value
+                    if frame.key == _STREAMED_KEYS[frame.kind]:
+                        # Повторный ключ с другим значением заменяет массив.
+                        frame.items = None
+                    frame.state = _NEXT
+        except _Incomplete:
+            pass
+        finally:
+            self._pos = pos
+
+    def _members(self, frame: _Frame, text: str, pos: int) -> int:
+        # Быстрый путь для типичных членов объекта: ключ без
+        # escape-последовательностей, за которым следует листовое значение или
+        # пустой массив блоков, разбирается одним регулярным выражением и
+        # C-сканером. Всё остальное, в том числе значения, обрывающиеся на
+        # конце текста, и ошибки, остаётся общему разбору в ``_parse``.
+        member = _FIRST_MEMBER if frame.state == _OPEN else _NEXT_MEMBER
+        streamed = _STREAMED_KEYS[frame.kind]
+        fields = frame.fields
+        scan = _DECODER.scan_once
+        size = len(text)
+        while True:
+            match = member.match(text, pos)
+            if match is None:
+                return pos
+            key, start = match.group(1), match.end()
+            if key == streamed:
+                empty = _EMPTY_ARRAY.match(text, start)
+                if empty is None:
+                    return pos
+                fields.pop(key, None)
+                frame.items = []
+                end = empty.end()
+            else:
+                try:
+                    value, end = scan(text, start)
+                except (StopIteration, ValueError, RecursionError):
+                    return pos
+                if end == size:
+                    return pos
+                fields[key] = value
+            frame.state = _NEXT
+            pos = end
+            member = _NEXT_MEMBER
+
+    def _open_array(self, frame: _Frame) -> None:
+        frame.fields.pop(frame.key, None)
+        frame.items = []
+        frame.state = _NEXT
+        if frame.kind == _ROOT:
+            path: Tuple[Any, ...] = ("blocks",)
+        else:
+            # Как в ошибках валидации всего отчёта: тег блока перед полем.
+            tag = frame.fields.get("type")
+            prefix = (tag,) if isinstance(tag, str) else ()
+            path = (*frame.path, *prefix, "children")
+        self._stack.append(_Frame(_ARRAY, path, frame.depth + 1, frame.items))
+
+    def _open_block(self, array: _Frame) -> None:
+        if array.depth > self.max_depth:
+            raise ReportLimitError(
+                f"Вложенность блоков глубже {self.max_depth} уровней."
+            )
+        self._blocks += 1
+        if self._blocks > self.max_blocks:
+            raise ReportLimitError(f"В отчёте больше {self.max_blocks} блоков.")
+        self._stack.append(_Frame(_BLOCK, (*array.path, array.index), array.depth))
+
+    def _close_object(self, frame: _Frame) -> None:
+        data = frame.fields
+        if frame.items is not None:
+            data[_STREAMED_KEYS[frame.kind]] = frame.items
+        if frame.kind == _ROOT:
+            self._result = data
+        else:
+            self._add_block(self._stack[-1], data)
+
+    def _add_block(self, array: _Frame, data: Any) -> None:
+        array.pending.append(data)
+        array.index += 1
+        array.state = _NEXT
+        if len(array.pending) >= BATCH_BLOCKS:
+            self._flush(array)
+
+    def _flush(self, array: _Frame) -> None:
+        pending = array.pending
+        if not pending:
+            return
+        assert array.items is not None
+        try:
+            array.items.extend(_BLOCKS_ADAPTER.validate_python(pending))
+        except ValidationError:
+            # Блоки с ошибками не попадают в родителя: их ошибки записываются,
+            # а родитель проверяется без них.
+            start = array.index - len(pending)
+            for offset, data in enumerate(pending):
+                try:
+                    array.items.append(_BLOCK_ADAPTER.validate_python(data))
+                except ValidationError as exc:
+                    path = (*array.path, start + offset)
+                    self._errors.extend(
+                        {**error, "loc": (*path, *error["loc"])}
+                        for error in exc.errors(include_url=False)
+                    )
+        pending.clear()
@@ -0,0 +1,498 @@
+"""
+Бинарный формат файла проекта (Report) — компактная альтернатива JSON.
+
+Все числа little-endian. Файл состоит из заголовка и четырёх частей::
+
+    заголовок   magic "GHOSTPRJ", версия u16, флаги u16, число
+                верхнеуровневых блоков u32, смещения таблицы строк,
+                метаданных и индекса u64
+    строки      число строк u32, (число + 1) смещений u32, байты UTF-8
+    meta        запись: длина u32 + поля ReportMeta
+    блоки       по записи (длина u32 + поддерево) на верхнеуровневый блок
+    индекс      на каждый верхнеуровневый блок: смещение записи u64, её
+                длина u32, id (16 байт), ссылки на строки типа и заголовка u32
+
+Все строки (тексты, ячейки таблиц, подписи, имена полей, типы блоков)
+хранятся в таблице строк один раз, а в записях на них ссылаются по номеру;
+id блоков хранятся как 16 байт вместо 36 символов. Поле блока — ссылка на
+имя поля и значение с тегом типа (``_NONE`` … ``_STRS``; списки строк —
+массивом ссылок шириной 1, 2 или 4 байта), поэтому формат не зависит от
+порядка и набора полей моделей: новые поля читаются старым кодом формата как
+есть, а проверку значений выполняют модели.
+
+``ProjectReader`` читает файл через memory map (или из любого буфера):
+метаданные и оглавление верхнего уровня (``outline``) доступны без разбора
+блоков, а строки декодируются по мере обращения к ним.
+"""
+
+from __future__ import annotations
+
+import mmap
+import struct
+from datetime import date
+from enum import Enum
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple, Union
+from uuid import UUID
+
+from pydantic import TypeAdapter
+
+from app.models import BaseBlock, Report, ReportBlockType, ReportMeta
+from app.models.report import ReportBlock
+from app.services.reports.parser import ReportLimitError
+
+#: Сигнатура в начале файла проекта.
+MAGIC = b"GHOSTPRJ"
+
+#: Текущая версия формата; файлы других версий не читаются.
+FORMAT_VERSION = 1
+
+#: Расширение файлов проекта в бинарном формате.
+PROJECT_SUFFIX = ".ghp"
+
+#: Тип содержимого для ответов и запросов с файлом проекта.
+PROJECT_MEDIA_TYPE = "application/vnd.ghost.project"
+
+_HEADER = struct.Struct("<8sHHIQQQ")
+_INDEX_ENTRY = struct.Struct("<QI16sII")
+_U32 = struct.Struct("<I")
+_TAG_U32 = struct.Struct("<BI")
+_INT = struct.Struct("<q")
+_FLOAT = struct.Struct("<d")
+
+# Теги значений.
+_NONE, _FALSE, _TRUE, _INT_TAG, _FLOAT_TAG, _STR, _LIST, _DATE, _UUID, _STRS = range(10)
+
+# Формат struct для ссылок на строки в списке по ширине в байтах и обратно.
+_REF_CODES = {0: "B", 1: "B", 2: "H", 3: "I", 4: "I"}
+_REF_WIDTHS = {"B": 1, "H": 2, "I": 4}
+
+# Ссылка на отсутствующую строку (например, у блока без заголовка).
+_NO_STRING = 0xFFFFFFFF
+
+_BLOCK_ADAPTER: TypeAdapter[Any] = TypeAdapter(ReportBlock)
+
+Buffer = Union[bytes, bytearray, memoryview, mmap.mmap]
+
+
+class ProjectFormatError(ValueError):
+    """Данные не являются файлом проекта поддерживаемой версии или повреждены."""
+
+
+class ProjectEncodingError(ValueError):
+    """
+    Отчёт нельзя сохранить в файл проекта: строка содержит одиночный суррогат
+    (JSON допускает экранирование вроде ``"\\ud800"``, а строки файла — UTF-8).
+    """
+
+
+class OutlineEntry(NamedTuple):
+    """
+    Верхнеуровневый блок в оглавлении файла проекта.
+
+    - id, type: идентификатор и тип блока;
+    - title: заголовок раздела или приложения (у остальных блоков — None).
+    """
+
+    id: UUID
+    type: ReportBlockType
+    title: Optional[str]
+
+
+@lru_cache(maxsize=None)
+def _own_field_names(model: type) -> Tuple[str, ...]:
+    return tuple(
+        name for name in model.model_fields if name not in ("id", "type", "children")
+    )
+
+
+class _Writer:
+    def __init__(self) -> None:
+        self.strings: Dict[str, int] = {}
+        self.out = bytearray()
+
+    def intern(self, value: str) -> int:
+        index = self.strings.get(value)
+        if index is None:
+            index = self.strings[value] = len(self.strings)
+        return index
+
+    def value(self, value: Any) -> None:
+        out = self.out
+        if isinstance(value, Enum):
+            value = value.value
+        if value is None:
+            out.append(_NONE)
+        elif value is True or value is False:
+            out.append(_TRUE if value else _FALSE)
+        elif isinstance(value, str):
+            out += _TAG_U32.pack(_STR, self.intern(value))
+        elif isinstance(value, int):
+            out.append(_INT_TAG)
+            out += _INT.pack(value)
+        elif isinstance(value, float):
+            out.append(_FLOAT_TAG)
+            out += _FLOAT.pack(value)
+        elif isinstance(value, list):
+            if all(type(item) is str for item in value):
+                # Списки строк (пункты, строки таблиц) — одним массивом ссылок
+                # наименьшей достаточной ширины.
+                refs = list(map(self.intern, value))
+                code = _REF_CODES[(max(refs, default=0).bit_length() + 7) // 8]
+                out += _TAG_U32.pack(_STRS, len(refs))
+                out += code.encode()
+                out += struct.pack(f"<{len(refs)}{code}", *refs)
+            else:
+                out += _TAG_U32.pack(_LIST, len(value))
+                for item in value:
+                    self.value(item)
+        elif isinstance(value, date):
+            out += _TAG_U32.pack(_DATE, value.toordinal())
+        elif isinstance(value, UUID):
+            out.append(_UUID)
+            out += value.bytes
+        else:
+            raise TypeError(f"Неподдерживаемое значение поля: {type(value).__name__}")
+
+    def fields(self, model: Any, names: Tuple[str, ...]) -> None:
+        self.out.append(len(names))
+        for name in names:
+            self.out += _U32.pack(self.intern(name))
+            self.value(getattr(model, name))
+
+    def block(self, block: BaseBlock) -> None:
+        self.out += _U32.pack(self.intern(block.type.value))
+        self.out += block.id.bytes
+        self.fields(block, _own_field_names(type(block)))
+        self.out += _U32.pack(len(block.children))
+        for child in block.children:
+            self.block(child)
+
+    def record(self, write: Callable[[], None]) -> Tuple[int, int]:
+        # Запись с префиксом длины; возвращает её смещение от начала тела и
+        # длину вместе с префиксом.
+        start = len(self.out)
+        self.out += b"\0\0\0\0"
+        write()
+        _U32.pack_into(self.out, start, len(self.out) - start - 4)
+        return start, len(self.out) - start
+
+
+def dump_project(report: Report) -> bytes:
+    """
+    Сохраняет отчёт в бинарном формате проекта. Строки с одиночными
+    суррогатами не записываются: ``ProjectEncodingError``.
+    """
+
+    writer = _Writer()
+    meta = report.meta
+    writer.record(lambda: writer.fields(meta, _own_field_names(type(meta))))
+    records = [
+        writer.record(lambda block=block: writer.block(block))
+        for block in report.blocks
+    ]
+    titles = [getattr(block, "title", None) for block in report.blocks]
+    title_refs = [
+        _NO_STRING if title is None else writer.intern(title) for title in titles
+    ]
+
+    try:
+        encoded = [string.encode() for string in writer.strings]
+    except UnicodeEncodeError as exc:
+        surrogate = exc.object[exc.start : exc.end]
+        raise ProjectEncodingError(
+            f"Текст отчёта содержит одиночный суррогат {ascii(surrogate)}, "
+            "который нельзя сохранить в UTF-8."
+        ) from exc
+    offsets = [0]
+    for data in encoded:
+        offsets.append(offsets[-1] + len(data))
+    strings = b"".join(
+        [
+            _U32.pack(len(encoded)),
+            struct.pack(f"<{len(offsets)}I", *offsets),
+            *encoded,
+        ]
+    )
+
+    # Записи идут сразу за таблицей строк; смещения в индексе — от начала файла.
+    meta_offset = _HEADER.size + len(strings)
+    index_offset = meta_offset + len(writer.out)
+    index = b"".join(
+        _INDEX_ENTRY.pack(
+            meta_offset + offset,
+            size,
+            block.id.bytes,
+            writer.intern(block.type.value),
+            title_ref,
+        )
+        for block, (offset, size), title_ref in zip(
+            report.blocks, records, title_refs, strict=True
+        )
+    )
+    header = _HEADER.pack(
+        MAGIC,
+        FORMAT_VERSION,
+        0,
+        len(report.blocks),
+        _HEADER.size,
+        meta_offset,
+        index_offset,
+    )
+    return b"".join([header, strings, writer.out, index])
+
+
+class ProjectReader:
+    """
+    Чтение файла проекта из буфера (``bytes``, ``mmap`` и т.п.).
+
+    Заголовок, индекс и смещения строк разбираются при создании; метаданные,
+    оглавление и отдельные блоки — по запросу. ``max_blocks`` и ``max_depth``
+    ограничивают число и вложенность читаемых блоков (``ReportLimitError``),
+    как и для JSON-тела запроса. Повреждённые данные вызывают
+    ``ProjectFormatError``, неверные значения полей — ``ValidationError``
+    моделей.
+    """
+
+    def __init__(
+        self,
+        buffer: Buffer,
+        max_blocks: Optional[int] = None,
+        max_depth: Optional[int] = None,
+    ) -> None:
+        self.max_blocks = max_blocks
+        self.max_depth = max_depth
+        self._buffer = memoryview(buffer)
+        self._mapped: Optional[mmap.mmap] = None
+        self._blocks = 0
+        try:
+            self._decode(self._read_header)
+        except BaseException:
+            self._buffer.release()
+            raise
+
+    @classmethod
+    def open(cls, path: Union[str, Path], **limits: Optional[int]) -> ProjectReader:
+        """Открывает файл проекта через memory map; закрывается ``close``."""
+
+        with open(path, "rb") as file:
+            mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            reader = cls(mapped, **limits)
+        except BaseException:
+            mapped.close()
+            raise
+        reader._mapped = mapped
+        return reader
+
+    def close(self) -> None:
+        self._buffer.release()
+        if self._mapped is not None:
+            self._mapped.close()
+
+    def __enter__(self) -> ProjectReader:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def _read_header(self) -> None:
+        buffer = self._buffer
+        if bytes(buffer[: len(MAGIC)]) != MAGIC:
+            raise ProjectFormatError("Данные не являются файлом проекта.")
+        (
+            _,
+            version,
+            _,
+            self._count,
+            strings_offset,
+            self._meta_offset,
+            index_offset,
+        ) = _HEADER.unpack_from(buffer)
+        if version != FORMAT_VERSION:
+            raise ProjectFormatError(
+                f"Неподдерживаемая версия формата проекта: {version}."
+            )
+        (count,) = _U32.unpack_from(buffer, strings_offset)
+        self._string_offsets = struct.unpack_from(
+            f"<{count + 1}I", buffer, strings_offset + 4
+        )
+        self._strings_data = strings_offset + 4 + 4 * (count + 1)
+        self._strings: List[Optional[str]] = [None] * count
+        self._index = [
+            _INDEX_ENTRY.unpack_from(buffer, index_offset + number * _INDEX_ENTRY.size)
+            for number in range(self._count)
+        ]
+
+    def _string(self, index: int) -> str:
+        string = self._strings[index]
+        if string is None:
+            start = self._strings_data + self._string_offsets[index]
+            end = self._strings_data + self._string_offsets[index + 1]
+            string = self._strings[index] = str(self._buffer[start:end], "utf-8")
+        return string
+
+    def _value(self, position: int) -> Tuple[Any, int]:
+        buffer = self._buffer
+        tag = buffer[position]
+        position += 1
+        if tag == _STR:
+            (ref,) = _U32.unpack_from(buffer, position)
+            return self._strings[ref] or self._string(ref), position + 4
+        if tag == _STRS:
+            (length,) = _U32.unpack_from(buffer, position)
+            code = chr(buffer[position + 4])
+            width = _REF_WIDTHS.get(code)
+            if width is None:
+                raise ProjectFormatError(f"Неизвестная ширина ссылок: {code!r}.")
+            refs = struct.unpack_from(f"<{length}{code}", buffer, position + 5)
+            strings, string = self._strings, self._string
+            items = [strings[ref] or string(ref) for ref in refs]
+            return items, position + 5 + width * length
+        if tag == _NONE:
+            return None, position
+        if tag == _FALSE or tag == _TRUE:
+            return tag == _TRUE, position
+        if tag == _INT_TAG:
+            return _INT.unpack_from(buffer, position)[0], position + 8
+        if tag == _FLOAT_TAG:
+            return _FLOAT.unpack_from(buffer, position)[0], position + 8
+        if tag == _LIST:
+            (length,) = _U32.unpack_from(buffer, position)
+            position += 4
+            items = []
+            for _ in range(length):
+                item, position = self._value(position)
+                items.append(item)
+            return items, position
+        if tag == _DATE:
+            ordinal = _U32.unpack_from(buffer, position)[0]
+            return date.fromordinal(ordinal), position + 4
+        if tag == _UUID:
+            return UUID(bytes=bytes(buffer[position : position + 16])), position + 16
+        raise ProjectFormatError(f"Неизвестный тег значения: {tag}.")
+
+    def _fields(self, position: int) -> Tuple[Dict[str, Any], int]:
+        buffer, strings = self._buffer, self._strings
+        fields: Dict[str, Any] = {}
+        count = buffer[position]
+        position += 1
+        for _ in range(count):
+            (ref,) = _U32.unpack_from(buffer, position)
+            name = strings[ref] or self._string(ref)
+            fields[name], position = self._value(position + 4)
+        return fields, position
+
+    def _block(self, position: int, depth: int) -> Tuple[Dict[str, Any], int]:
+        if self.max_depth is not None and depth > self.max_depth:
+            raise ReportLimitError(
+                f"Вложенность блоков глубже {self.max_depth} уровней."
+            )
+        self._blocks += 1
+        if self.max_blocks is not None and self._blocks > self.max_blocks:
+            raise ReportLimitError(f"В отчёте больше {self.max_blocks} блоков.")
+
+        buffer = self._buffer
+        (type_ref,) = _U32.unpack_from(buffer, position)
+        # id передаётся модели 16 байтами: pydantic разбирает их быстрее, чем
+        # конструктор UUID.
+        block_id = bytes(buffer[position + 4 : position + 20])
+        fields, position = self._fields(position + 20)
+        (count,) = _U32.unpack_from(buffer, position)
+        position += 4
+        children = []
+        for _ in range(count):
+            child, position = self._block(position, depth + 1)
+            children.append(child)
+        fields["id"] = block_id
+        fields["type"] = self._strings[type_ref] or self._string(type_ref)
+        fields["children"] = children
+        return fields, position
+
+    def _decode(self, read: Callable[[], Any]) -> Any:
+        try:
+            return read()
+        except (struct.error, IndexError, UnicodeDecodeError) as exc:
+            raise ProjectFormatError(f"Повреждённый файл проекта: {exc}") from exc
+        except RecursionError:
+            raise ReportLimitError("Слишком глубокая вложенность блоков.") from None
+
+    def _record(self, offset: int) -> Dict[str, Any]:
+        (size,) = _U32.unpack_from(self._buffer, offset)
+        data, end = self._block(offset + 4, 1)
+        if end != offset + 4 + size:
+            raise ProjectFormatError("Длина записи блока не совпадает с содержимым.")
+        return data
+
+    def __len__(self) -> int:
+        """Число верхнеуровневых блоков."""
+
+        return self._count
+
+    def meta(self) -> ReportMeta:
+        """Метаданные отчёта (без чтения блоков)."""
+
+        fields = self._decode(lambda: self._fields(self._meta_offset + 4)[0])
+        return ReportMeta.model_validate(fields)
+
+    def outline(self) -> List[OutlineEntry]:
+        """Оглавление верхнего уровня из индекса (без чтения блоков)."""
+
+        def read() -> List[OutlineEntry]:
+            return [
+                OutlineEntry(
+                    UUID(bytes=block_id),
+                    ReportBlockType(self._string(type_ref)),
+                    None if title_ref == _NO_STRING else self._string(title_ref),
+                )
+                for _, _, block_id, type_ref, title_ref in self._index
+            ]
+
+        return self._decode(read)
+
+    def block(self, number: int) -> BaseBlock:
+        """Верхнеуровневый блок номер ``number`` со всем поддеревом."""
+
+        offset = self._index[number][0]
+        self._blocks = 0
+        return _BLOCK_ADAPTER.validate_python(
+            self._decode(lambda: self._record(offset))
+        )
+
+    def report(self) -> Report:
+        """Отчёт целиком."""
+
+        def read() -> Dict[str, Any]:
+            meta = self._fields(self._meta_offset + 4)[0]
+            blocks = [self._record(entry[0]) for entry in self._index]
+            return {"meta": meta, "blocks": blocks}
+
+        self._blocks = 0
+        return Report.model_validate(self._decode(read))
+
+
+def load_project(
+    data: Buffer, max_blocks: Optional[int] = None, max_depth: Optional[int] = None
+) -> Report:
+    """Читает отчёт из данных в бинарном формате проекта."""
+
+    with ProjectReader(data, max_blocks, max_depth) as reader:
+        return reader.report()
+
+
+def is_project(data: Buffer) -> bool:
+    """Начинаются ли данные с сигнатуры бинарного файла проекта."""
+
+    return bytes(memoryview(data)[: len(MAGIC)]) == MAGIC
+
+
+def read_report(data: bytes) -> Report:
+    """
+    Читает отчёт из файла проекта любого формата: бинарного (по сигнатуре)
+    или JSON.
+    """
+
+    if is_project(data):
+        return load_project(data)
+    return Report.model_validate_json(data)
@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from threading import Lock
+from typing import Optional, Tuple
+from uuid import uuid4
+
+from app.models import Report, ValidationResult
+
+
+class ReportStore:
+    """
+    Хранилище последних версий отчётов в памяти процесса.
+
+    Хранит не более ``max_versions`` версий; при переполнении вытесняется
+    версия, к которой дольше всего не обращались.
+    """
+
+    def __init__(self, max_versions: int = 256) -> None:
+        self.max_versions = max_versions
+        self._versions: OrderedDict[str, Tuple[Report, ValidationResult]] = (
+            OrderedDict()
+        )
+        self._lock = Lock()
+
+    def put(self, report: Report, result: ValidationResult) -> str:
+        """Сохраняет версию отчёта с результатом её проверки и возвращает её id."""
+
+        version = uuid4().hex
+        with self._lock:
+            self._versions[version] = (report, result)
+            while len(self._versions) > self.max_versions:
+                self._versions.popitem(last=False)
+        return version
+
+    def get(self, version: str) -> Optional[Tuple[Report, ValidationResult]]:
+        """Возвращает сохранённую версию или None, если она неизвестна или вытеснена."""
+
+        with self._lock:
+            stored = self._versions.get(version)
+            if stored is not None:
+                self._versions.move_to_end(version)
+            return stored
+
+
+#: Общее хранилище версий для API.
+report_store = ReportStore()
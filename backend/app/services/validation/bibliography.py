@@ -0,0 +1,202 @@
+"""
+Список источников: разбор библиографических записей и ссылок на них.
+
+- ``parse_reference`` превращает запись списка источников в ``Reference``
+  (авторы, заглавие, год, вид источника) по эвристикам ГОСТ 7.0.100/7.0.5.
+  Результат запоминается по тексту записи, поэтому неизменённые записи при
+  повторных проверках не разбираются.
+- ``BibliographyIndex`` нумерует записи всех блоков ``ReferencesBlock`` в
+  порядке документа (как они нумеруются при экспорте) и отвечает на вопрос,
+  есть ли в списке запись с данным номером.
+- ``parse_citation`` разбирает ссылку в тексте (``[3]``, ``[1, 4–7]``,
+  ``[2, с. 15]``) в диапазоны номеров. Сами ссылки находит общий анализатор
+  текста по шаблону ``CITATION_PATTERN`` за один просмотр каждого блока.
+"""
+
+from __future__ import annotations
+
+import re
+from functools import lru_cache
+from typing import Dict, Iterable, List, Literal, NamedTuple, Optional, Tuple
+from uuid import UUID
+
+from app.models import ReferencesBlock, Report
+
+#: Вид источника:
+#: - standard: стандарт или свод правил (ГОСТ, ISO, СП, ...);
+#: - law: нормативный правовой акт (закон, указ, постановление, кодекс);
+#: - web: электронный ресурс (URL, «[Электронный ресурс]»);
+#: - article: составная часть издания (статья в журнале или сборнике, «//»);
+#: - book: книга или иное самостоятельное издание;
+#: - other: вид определить не удалось.
+ReferenceKind = Literal["standard", "law", "web", "article", "book", "other"]
+
+#: Виды источников, которые цитируются в действующей редакции: их возраст не
+#: проверяется.
+NORMATIVE_KINDS: Tuple[ReferenceKind, ...] = ("standard", "law")
+
+#: Ссылка в тексте: номера и диапазоны через запятую, необязательно с
+#: указанием страниц. Группа 1 — номера.
+CITATION_PATTERN = (
+    r"\[\s*(\d+(?:\s*[-–—]\s*\d+)?(?:\s*[,;]\s*\d+(?:\s*[-–—]\s*\d+)?)*)"
+    r"(?:\s*,\s*[сСcCpP]{1,2}\.\s*[^\]]*)?\s*\]"
+)
+
+
+class Reference(NamedTuple):
+    """
+    Разобранная запись списка источников.
+
+    - authors: авторы из заголовка записи или сведений об ответственности;
+    - title: основное заглавие;
+    - year: год издания (для стандартов — год из обозначения), если найден;
+    - kind: вид источника (``ReferenceKind``).
+    """
+
+    authors: Tuple[str, ...]
+    title: str
+    year: Optional[int]
+    kind: ReferenceKind
+
+
+_STANDARD = re.compile(
+    r"^\s*(?:ГОСТ|ОСТ|СТО|СП|СНиП|РД|ТУ|ISO|IEC|ИСО)\b(?:\s+(?:Р|ИСО|ISO|МЭК))*"
+    r"\s+[\w./]+?[-–:](\d{4}|\d{2})\b"
+)
+_LAW = re.compile(
+    r"\b(?:Федеральный\s+закон|Закон\s+Российской|Указ\s+Президента|"
+    r"Постановление\s+Правительства|[Кк]одекс\s+Российской)"
+)
+_LAW_DATE = re.compile(r"\bот\s+\d{1,2}\.\d{1,2}\.(\d{4})\b")
+_WEB = re.compile(r"URL:|\[Электронный ресурс\]|https?://", re.IGNORECASE)
+_ACCESS_DATE = re.compile(r"\(\s*дата\s+обращения[^)]*\)|https?://\S+", re.IGNORECASE)
+_YEAR = re.compile(r"(?<![\d.])(1[5-9]\d\d|20\d\d)(?![\d])")
+
+_NAME = r"[А-ЯЁA-Z][а-яёa-z]+(?:-[А-ЯЁA-Z][а-яёa-z]+)?"
+_INITIALS = r"[А-ЯЁA-Z]\.\s?(?:[А-ЯЁA-Z]\.)?"
+_HEADING_AUTHOR = re.compile(rf"^\s*({_NAME}),?\s+({_INITIALS})\s*")
+_RESPONSIBILITY_AUTHOR = re.compile(rf"({_INITIALS})\s?({_NAME})")
+_RANGE = re.compile(r"(\d+)(?:\s*[-–—]\s*(\d+))?")
+_TITLE_END = re.compile(r"\s+(?:/|//|:|—|–)\s|\s*\[|\.\s+[—–]\s")
+
+
+def _standard_year(digits: str) -> int:
+    # Двузначные годы встречаются только в обозначениях XX века (ГОСТ 2.105-95).
+    return int(digits) if len(digits) == 4 else 1900 + int(digits)
+
+
+@lru_cache(maxsize=8192)
+def parse_reference(text: str) -> Reference:
+    """
+    Разбирает запись списка источников. Эвристики рассчитаны на записи по
+    ГОСТ 7.0.100 (заголовок с автором, заглавие, «/» сведения об
+    ответственности, «//» для составных частей, область выходных данных);
+    поля, которые не удалось найти, остаются пустыми.
+    """
+
+    standard = _STANDARD.match(text)
+    if standard:
+        title = text[standard.end() :].lstrip(" .")
+        return Reference(
+            (), _title(title), _standard_year(standard.group(1)), "standard"
+        )
+
+    kind: ReferenceKind
+    if _LAW.search(text):
+        kind = "law"
+    elif _WEB.search(text):
+        kind = "web"
+    elif "//" in text:
+        kind = "article"
+    else:
+        kind = "book"
+
+    authors: List[str] = []
+    body = text
+    heading = _HEADING_AUTHOR.match(text)
+    if heading:
+        authors.append(f"{heading.group(1)} {heading.group(2).replace(' ', '')}")
+        body = text[heading.end() :]
+    responsibility = body.split(" / ", 1)
+    if not authors and len(responsibility) == 2:
+        statement = re.split(r"\s//\s|\.\s+[—–]\s", responsibility[1], maxsplit=1)[0]
+        authors.extend(
+            f"{name} {initials.replace(' ', '')}"
+            for initials, name in _RESPONSIBILITY_AUTHOR.findall(statement)
+        )
+
+    title = _title(body)
+    if kind == "law":
+        date = _LAW_DATE.search(text)
+        year = int(date.group(1)) if date else None
+    else:
+        years = _YEAR.findall(_ACCESS_DATE.sub("", body))
+        year = int(years[-1]) if years else None
+
+    if kind == "book" and not authors and year is None and not title:
+        kind = "other"
+    return Reference(tuple(authors), title, year, kind)
+
+
+def _title(text: str) -> str:
+    end = _TITLE_END.search(text)
+    title = text[: end.start()] if end else text
+    return title.strip().rstrip(".").strip()
+
+
+@lru_cache(maxsize=8192)
+def parse_citation(numbers: str) -> Tuple[Tuple[int, int], ...]:
+    """
+    Номера ссылки (группа 1 ``CITATION_PATTERN``) в виде диапазонов
+    ``(первый, последний)``: ``"1, 4–7"`` → ``((1, 1), (4, 7))``.
+    """
+
+    return tuple(
+        (int(first), int(last or first)) for first, last in _RANGE.findall(numbers)
+    )
+
+
+class BibliographyIndex:
+    """
+    Записи списка источников по номерам (с 1, в порядке документа) и блоки,
+    в которых они находятся.
+    """
+
+    __slots__ = ("entries", "blocks")
+
+    def __init__(self, blocks: Iterable[ReferencesBlock]) -> None:
+        self.entries: Dict[int, Reference] = {}
+        self.blocks: Dict[int, UUID] = {}
+        number = 0
+        for block in blocks:
+            for item in block.items:
+                number += 1
+                self.entries[number] = parse_reference(item)
+                self.blocks[number] = block.id
+
+    @classmethod
+    def from_report(cls, report: Report) -> BibliographyIndex:
+        return cls(report.index().of_type(ReferencesBlock))
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __contains__(self, number: object) -> bool:
+        return number in self.entries
+
+    def get(self, number: int) -> Optional[Reference]:
+        return self.entries.get(number)
+
+    def missing(self, ranges: Iterable[Tuple[int, int]]) -> List[str]:
+        """
+        Номера и диапазоны ссылки, для которых в списке нет записей. Записи
+        нумеруются подряд, поэтому диапазон есть в списке целиком, если в нём
+        есть его первый и последний номер.
+        """
+
+        entries = self.entries
+        return [
+            str(first) if first == last else f"{first}–{last}"
+            for first, last in ranges
+            if first > last or first not in entries or last not in entries
+        ]
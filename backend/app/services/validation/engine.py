@@ -1,36 +1,627 @@
 from __future__ import annotations
 
-from typing import Callable, List
+import functools
+import importlib
+import sys
+from time import perf_counter_ns
+from typing import (
+    Any,
+    Callable,
+    Collection,
+    Dict,
+    Iterator,
+    List,
+    Literal,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
+    TypeVar,
+    Union,
+)
+from uuid import UUID
 
-from app.models import Report, ValidationIssue, ValidationIssueLevel, ValidationResult
+from app.models import (
+    BaseBlock,
+    Report,
+    ReportIndex,
+    RuleDiagnostics,
+    ValidationDiagnostics,
+    ValidationIssue,
+    ValidationIssueLevel,
+    ValidationResult,
+)
+from app.services.cache import LRUCache
+from app.settings import settings
+
+from .issues import AnyIssue, render_issue
+from .metrics import rule_metrics
+
+#: Функция-правило: возвращает записи IssueRecord (или готовые ValidationIssue).
+ValidationRule = Callable[[Report], Sequence[AnyIssue]]
+
+#: Оценка памяти одной записи IssueRecord в кэше (кортеж, UUID, аргументы).
+ISSUE_RECORD_BYTES = 160
+
+
+def _issues_size(issues: Tuple[AnyIssue, ...]) -> int:
+    return 56 + ISSUE_RECORD_BYTES * len(issues)
+
+
+#: Кэш результатов поблочных правил: (правило, хэш поддерева блока) → замечания.
+rule_cache: LRUCache[Tuple[AnyIssue, ...]] = LRUCache(
+    max_bytes=settings.rule_cache_max_bytes, sizeof=_issues_size
+)
+
+
+class BlockRule:
+    """
+    Правило, которое получает блоки нужных типов из общего индекса отчёта.
+
+    Вместо собственного обхода правило перечисляет интересующие его типы блоков
+    в ``block_types``. Движок берёт эти блоки из ``Report.index()`` (индекс
+    строится одним обходом дерева и общий для всех правил), передаёт их в
+    порядке документа в ``visit``, а затем вызывает ``finalize``.
+
+    Состояние одного запуска создаётся в ``start`` и передаётся явно, поэтому
+    один экземпляр правила можно использовать для любого числа отчётов.
+    """
+
+    block_types: Tuple[Type[BaseBlock], ...] = ()
+
+    #: Правило зависит только от структуры отчёта (состав, порядок и подписи
+    #: блоков), а не от их текстового содержимого.
+    structural: bool = False
+
+    #: Правило тяжело нагружает процессор (регулярные выражения, разбор текста)
+    #: и при ``executor="process"`` выполняется в отдельном процессе.
+    cpu_heavy: bool = False
+
+    #: Коды замечаний, которые может выдать правило, и их уровни. Позволяет
+    #: не запускать правило, если его коды или уровень не запрошены.
+    codes: Optional[Dict[str, ValidationIssueLevel]] = None
+
+    #: Относительная стоимость запуска для режима fail-fast (см. ``rule_cost``).
+    cost: Optional[int] = None
+
+    def start(self, report: Report) -> Any:
+        """Создаёт состояние правила для одного запуска (по умолчанию — список)."""
+
+        return []
+
+    def visit(self, block: BaseBlock, state: Any) -> None:
+        """Обрабатывает очередной блок одного из типов ``block_types``."""
+
+        raise NotImplementedError
+
+    def finalize(self, report: Report, state: Any) -> Sequence[AnyIssue]:
+        """Возвращает замечания правила после обхода всего отчёта."""
+
+        return state
+
+    def __call__(self, report: Report) -> List[ValidationIssue]:
+        return [render_issue(issue) for issue in run_rules(report, [self])[0]]
+
+    def __reduce__(self) -> Any:
+        # Правила-синглтоны модулей передаются в рабочие процессы по имени,
+        # чтобы там использовался тот же экземпляр (и его кэш), а не копия.
+        module = sys.modules.get(self.__module__)
+        for name, value in vars(module).items() if module else ():
+            if value is self:
+                return (_resolve_rule, (module.__name__, name))
+        return super().__reduce__()
+
+
+def _resolve_rule(module_name: str, name: str) -> BlockRule:
+    return getattr(importlib.import_module(module_name), name)
+
+
+class BlockCheckState(NamedTuple):
+    """
+    Состояние ``BlockCheck`` за один запуск: замечания по id блоков и индекс
+    отчёта, из которого берутся хэши блоков для ``rule_cache``.
+    """
+
+    by_block: Dict[UUID, Sequence[AnyIssue]]
+    index: ReportIndex
+
+
+class BlockCheck(BlockRule):
+    """
+    Правило, проверяющее каждый подходящий блок независимо от остальных.
+
+    Оборачивает функцию ``check(block) -> Sequence[IssueRecord]``; создаётся
+    декоратором ``block_check``. Замечания запоминаются по идентификатору
+    проверенного блока, что позволяет перепроверять только изменённые блоки.
+
+    Если ``cached`` включён, результат проверки кэшируется в ``rule_cache`` по
+    хэшу поддерева блока (``BaseBlock.content_hash``), поэтому неизменённые
+    блоки при повторных проверках не перепроверяются. Кэшировать можно только
+    проверки, зависящие исключительно от поддерева блока.
+    """
+
+    def __init__(
+        self,
+        check: Callable[[Any], Sequence[AnyIssue]],
+        block_types: Tuple[Type[BaseBlock], ...],
+        cached: bool = False,
+        cpu_heavy: bool = False,
+    ) -> None:
+        self.check = check
+        self.block_types = block_types
+        self.cached = cached
+        self.cpu_heavy = cpu_heavy
+        functools.update_wrapper(self, check)
+
+    def evaluate(self, block: BaseBlock, index: ReportIndex) -> Sequence[AnyIssue]:
+        """
+        Проверяет блок отчёта с индексом ``index``, используя кэш, если он
+        включён для правила. Хэш поддерева берётся из индекса текущего прохода.
+        """
+
+        if not self.cached:
+            return self.check(block)
+
+        key = (self, index.content_hash(block))
+        issues = rule_cache.get(key)
+        if issues is None:
+            issues = tuple(self.check(block))
+            rule_cache.put(key, issues)
+        return issues
+
+    def start(self, report: Report) -> BlockCheckState:
+        return BlockCheckState({}, report.index())
+
+    def visit(self, block: BaseBlock, state: BlockCheckState) -> None:
+        issues = self.evaluate(block, state.index)
+        if issues:
+            state.by_block[block.id] = issues
+
+    def finalize(self, report: Report, state: BlockCheckState) -> List[AnyIssue]:
+        return [issue for issues in state.by_block.values() for issue in issues]
+
+
+def block_check(
+    *block_types: Type[BaseBlock],
+    cached: bool = False,
+    cpu_heavy: bool = False,
+) -> Callable[[Callable[[Any], Sequence[AnyIssue]]], BlockCheck]:
+    """
+    Превращает функцию проверки одного блока в правило ``BlockCheck``.
+
+    Пример::
+
+        @block_check(ListBlock)
+        def rule_non_empty_lists(block: ListBlock) -> Sequence[IssueRecord]:
+            if block.items:
+                return NO_ISSUES
+            return (IssueRecord("NON_EMPTY_LISTS", ERROR, block.id),)
+    """
+
+    def decorator(check: Callable[[Any], Sequence[AnyIssue]]) -> BlockCheck:
+        return BlockCheck(check, block_types, cached=cached, cpu_heavy=cpu_heavy)
+
+    return decorator
+
+
+def structural_rule(rule: ValidationRule) -> ValidationRule:
+    """
+    Помечает функцию-правило как зависящую только от структуры отчёта.
+
+    Такие правила не перезапускаются при инкрементальной проверке, если правка
+    затронула лишь содержимое блоков.
+    """
+
+    rule.structural = True  # type: ignore[attr-defined]
+    return rule
+
+
+def cpu_heavy_rule(rule: ValidationRule) -> ValidationRule:
+    """
+    Помечает функцию-правило как тяжёлую для процессора: при
+    ``executor="process"`` она выполняется в отдельном процессе.
+    """
+
+    rule.cpu_heavy = True  # type: ignore[attr-defined]
+    return rule
+
+
+RuleT = TypeVar("RuleT", bound=Callable[[Any], Any])
+
+
+def issue_codes(**codes: ValidationIssueLevel) -> Callable[[RuleT], RuleT]:
+    """
+    Объявляет коды замечаний правила и их уровни.
+
+    Пример::
+
+        @issue_codes(SECTION_ORDER=ValidationIssueLevel.ERROR)
+        def rule_section_order(report: Report) -> List[IssueRecord]:
+            ...
+
+    Подходит и для функций-правил, и для ``block_check`` (ставится над ним).
+    """
+
+    def decorator(rule: RuleT) -> RuleT:
+        rule.codes = dict(codes)  # type: ignore[attr-defined]
+        return rule
+
+    return decorator
+
+
+def configurable(factory: Callable[..., Any]) -> Callable[[RuleT], RuleT]:
+    """
+    Объявляет фабрику, которая создаёт правило с параметрами пресета.
+
+    Пресет с ``params`` для правила вызывает ``rule.configure(**params)`` и
+    использует возвращённое правило вместо исходного. Правила ``BlockRule``
+    могут вместо этого определить метод ``configure``.
+    """
+
+    def decorator(rule: RuleT) -> RuleT:
+        rule.configure = factory  # type: ignore[attr-defined]
+        return rule
+
+    return decorator
+
+
+AnyRule = Union[ValidationRule, BlockRule]
+
+#: Способ запуска правил валидации:
+#: - sequential: все правила в вызывающем потоке, один общий индекс отчёта;
+#: - thread: правила распределяются по пулу потоков;
+#: - process: правила с ``cpu_heavy`` выполняются в пуле процессов,
+#:   остальные — в вызывающем потоке.
+ExecutorKind = Literal["sequential", "thread", "process"]
+
+
+def rule_name(rule: AnyRule) -> str:
+    """Имя правила для диагностики: имя функции или класса правила."""
+
+    return getattr(rule, "__name__", None) or type(rule).__name__
+
+
+#: Стоимость правил по умолчанию, если у правила нет атрибута ``cost``.
+FUNCTION_RULE_COST = 1
+BLOCK_RULE_COST = 10
+CPU_HEAVY_RULE_COST = 100
+
+
+def rule_cost(rule: AnyRule) -> int:
+    """
+    Относительная стоимость правила: явный атрибут ``cost`` или оценка по виду
+    правила — функция дешевле правила с обходом дерева, а ``cpu_heavy`` дороже
+    всех. В режиме fail-fast правила запускаются от дешёвых к дорогим.
+    """
+
+    cost = getattr(rule, "cost", None)
+    if cost is not None:
+        return cost
+    if getattr(rule, "cpu_heavy", False):
+        return CPU_HEAVY_RULE_COST
+    return BLOCK_RULE_COST if isinstance(rule, BlockRule) else FUNCTION_RULE_COST
+
+
+def select_rules(
+    selected_rules: Sequence[AnyRule],
+    codes: Optional[Collection[str]] = None,
+    level: Optional[ValidationIssueLevel] = None,
+) -> List[AnyRule]:
+    """
+    Оставляет правила, которые могут выдать замечания с кодом из ``codes`` и
+    уровнем ``level``. Правила без объявленных кодов (``issue_codes``)
+    оставляются всегда — их замечания фильтруются после запуска.
+    """
+
+    kept = []
+    for rule in selected_rules:
+        declared = getattr(rule, "codes", None)
+        if declared is not None:
+            if codes is not None and not set(codes) & declared.keys():
+                continue
+            if level is not None and level not in declared.values():
+                continue
+        kept.append(rule)
+    return kept
+
+
+class RuleRegistry(List[AnyRule]):
+    """
+    Список правил, который считает свои изменения: ``version`` растёт при
+    каждом изменении списка. По нему ``presets`` узнают, что планы пресетов
+    пора перекомпилировать, не сравнивая реестр поэлементно на каждом запросе.
+    """
+
+    __slots__ = ("version",)
+
+    def __init__(self, *args: Any) -> None:
+        super().__init__(*args)
+        self.version = 0
+
+
+def _counting(name: str) -> Callable[..., Any]:
+    method = getattr(list, name)
+
+    @functools.wraps(method)
+    def wrapper(self: RuleRegistry, *args: Any, **kwargs: Any) -> Any:
+        result = method(self, *args, **kwargs)
+        self.version += 1
+        return result
+
+    return wrapper
+
+
+for _name in (
+    "append",
+    "extend",
+    "insert",
+    "pop",
+    "remove",
+    "clear",
+    "sort",
+    "reverse",
+    "__setitem__",
+    "__delitem__",
+    "__iadd__",
+    "__imul__",
+):
+    setattr(RuleRegistry, _name, _counting(_name))
 
-ValidationRule = Callable[[Report], List[ValidationIssue]]
 
 #: Глобальный реестр правил валидации.
-RULES: List[ValidationRule] = []
+RULES: RuleRegistry = RuleRegistry()
+
 
+class RuleRun:
+    """
+    Результат одного правила за один запуск.
 
-def validate_report(report: Report) -> ValidationResult:
+    - issues: замечания правила в порядке документа (обычно IssueRecord);
+    - by_block: для ``BlockCheck`` — замечания по идентификатору проверенного
+      блока (только для блоков, у которых замечания есть);
+    - duration_ns: время работы правила в этом запуске, нс.
     """
-    Запускает все зарегистрированные правила валидации для переданного отчёта и
-    агрегирует их замечания в единый ValidationResult.
 
-    На текущем этапе (C2) реестр RULES пуст, поэтому функция всегда возвращает
-    пустой результат (без ошибок и предупреждений).
+    __slots__ = ("issues", "by_block", "duration_ns")
+
+    def __init__(
+        self,
+        issues: Sequence[AnyIssue],
+        by_block: Optional[Dict[UUID, Sequence[AnyIssue]]] = None,
+        duration_ns: int = 0,
+    ) -> None:
+        self.issues = issues
+        self.by_block = by_block
+        self.duration_ns = duration_ns
+
+
+def execute_rules(report: Report, selected_rules: Sequence[AnyRule]) -> List[RuleRun]:
+    """
+    Запускает правила для отчёта и возвращает результат каждого правила
+    в том же порядке, в каком правила переданы в ``selected_rules``.
+
+    Обычные функции-правила вызываются как есть. Правила ``BlockRule`` не
+    обходят дерево сами: каждое получает из общего индекса отчёта
+    (``Report.index()``) только блоки объявленных типов в порядке документа.
+    Правила выполняются в одном проходе ``Report.frozen``, поэтому индекс
+    строится один раз на вызов (или на внешний проход).
+    """
+
+    with report.frozen() as index:
+        runs: List[RuleRun] = [RuleRun([]) for _ in selected_rules]
+        block_rules: List[Tuple[int, BlockRule, Any]] = []
+        elapsed: List[int] = [0] * len(selected_rules)
+
+        for position, rule in enumerate(selected_rules):
+            started = perf_counter_ns()
+            if isinstance(rule, BlockRule):
+                block_rules.append((position, rule, rule.start(report)))
+                elapsed[position] = perf_counter_ns() - started
+            else:
+                issues = list(rule(report))
+                runs[position] = RuleRun(
+                    issues, duration_ns=perf_counter_ns() - started
+                )
+
+        if block_rules:
+            for position, rule, state in block_rules:
+                started = perf_counter_ns()
+                visit = rule.visit
+                for block in index.of_type(*rule.block_types):
+                    visit(block, state)
+                elapsed[position] += perf_counter_ns() - started
+
+            for position, rule, state in block_rules:
+                started = perf_counter_ns()
+                issues = list(rule.finalize(report, state))
+                runs[position] = RuleRun(
+                    issues,
+                    state.by_block if isinstance(rule, BlockCheck) else None,
+                    elapsed[position] + perf_counter_ns() - started,
+                )
+
+    for rule, run in zip(selected_rules, runs, strict=True):
+        rule_metrics.record(rule_name(rule), run.duration_ns, len(run.issues))
+
+    return runs
+
+
+def iter_rule_runs(
+    report: Report, selected_rules: Sequence[AnyRule]
+) -> Iterator[Tuple[AnyRule, RuleRun]]:
+    """
+    Запускает правила по одному в порядке ``selected_rules`` и выдаёт результат
+    каждого сразу после его завершения.
+
+    Индекс отчёта строится один раз и общий для всех правил, как и в
+    ``execute_rules``; первые замечания доступны, не дожидаясь самых медленных
+    правил. Используется потоковой проверкой.
+    """
+
+    with report.frozen():
+        for rule in selected_rules:
+            yield rule, execute_rules(report, [rule])[0]
+
+
+def run_rules(
+    report: Report, selected_rules: Sequence[AnyRule]
+) -> List[Sequence[AnyIssue]]:
+    """
+    То же, что ``execute_rules``, но возвращает только списки замечаний —
+    в том виде, в каком их вернули правила (без подстановки сообщений).
+    """
+
+    return [run.issues for run in execute_rules(report, selected_rules)]
+
+
+def build_result(
+    selected_rules: Sequence[AnyRule],
+    runs: List[RuleRun],
+    total_ns: Optional[int] = None,
+) -> ValidationResult:
+    """
+    Собирает ValidationResult из результатов правил и запоминает в нём эти
+    результаты для последующей инкрементальной проверки.
+
+    Только здесь записи IssueRecord превращаются в ValidationIssue и получают
+    текст сообщения из каталога ``messages.MESSAGES``.
+
+    Если передано ``total_ns``, в результат добавляется диагностика: время и
+    число замечаний каждого правила.
     """
 
     errors: List[ValidationIssue] = []
     warnings: List[ValidationIssue] = []
 
-    for rule in RULES:
-        issues = rule(report)
-        for issue in issues:
+    for run in runs:
+        for issue in run.issues:
             if issue.level == ValidationIssueLevel.ERROR:
-                errors.append(issue)
+                errors.append(render_issue(issue))
             else:
-                warnings.append(issue)
+                warnings.append(render_issue(issue))
+
+    result = ValidationResult(errors=errors, warnings=warnings)
+    if total_ns is not None:
+        result.diagnostics = ValidationDiagnostics(
+            total_ms=total_ns / 1e6,
+            rules=[
+                RuleDiagnostics(
+                    rule=rule_name(rule),
+                    duration_ms=run.duration_ns / 1e6,
+                    issues=len(run.issues),
+                )
+                for rule, run in zip(selected_rules, runs, strict=True)
+            ],
+        )
+    result._rule_runs = (tuple(selected_rules), runs)
+    return result
+
+
+def _filter_run(
+    run: RuleRun,
+    codes: Optional[Collection[str]],
+    level: Optional[ValidationIssueLevel],
+    max_issues: Optional[int],
+) -> RuleRun:
+    issues = [
+        issue
+        for issue in run.issues
+        if (codes is None or issue.code in codes)
+        and (level is None or issue.level == level)
+    ]
+    if max_issues is not None:
+        issues = issues[:max_issues]
+    return RuleRun(issues, duration_ns=run.duration_ns)
+
+
+def validate_report(
+    report: Report,
+    diagnostics: bool = False,
+    executor: ExecutorKind = "sequential",
+    *,
+    fail_fast: bool = False,
+    codes: Optional[Collection[str]] = None,
+    level: Optional[ValidationIssueLevel] = None,
+    max_issues_per_rule: Optional[int] = None,
+) -> ValidationResult:
+    """
+    Запускает правила пресета отчёта (``report.meta.preset``, см. ``presets``)
+    для переданного отчёта и агрегирует их замечания в единый ValidationResult.
+    Для неизвестного пресета выбрасывается ``presets.UnknownPresetError``.
+
+    Замечания идут в порядке реестра RULES, поэтому результат не зависит от того,
+    проверяет ли правило отчёт целиком или получает блоки из общего индекса, и от
+    выбранного ``executor`` ("sequential", "thread" или "process", см.
+    ``executors.execute_rules_concurrently``).
+    При ``diagnostics=True`` в результат добавляется время работы каждого
+    правила и число его замечаний.
+
+    Дополнительные режимы:
+
+    - ``codes`` / ``level`` — запускать только правила, которые могут выдать
+      замечания с этими кодами / этим уровнем, и оставлять только такие
+      замечания;
+    - ``max_issues_per_rule`` — не больше стольких замечаний от каждого правила;
+    - ``fail_fast`` — правила запускаются по одному от дешёвых к дорогим
+      (``rule_cost``) до первой ошибки; ``executor`` при этом не используется,
+      а в результат попадают замечания только запущенных правил.
+
+    Результат, полученный с любым из этих режимов, не может служить основой для
+    инкрементальной проверки: ``validate_incremental`` проверит отчёт заново.
+    """
+
+    with report.frozen():
+        started = perf_counter_ns()
+        registry = presets.rule_plan(report.meta.preset).rules
+        filtered = (
+            fail_fast
+            or codes is not None
+            or level is not None
+            or max_issues_per_rule is not None
+        )
+        if not filtered:
+            runs = executors.execute_rules_concurrently(report, registry, executor)
+            total_ns = perf_counter_ns() - started if diagnostics else None
+            return build_result(registry, runs, total_ns)
+
+        if codes is not None:
+            codes = frozenset(codes)
+        candidates = select_rules(registry, codes, level)
+
+        if fail_fast:
+            completed: Dict[int, RuleRun] = {}
+            order = sorted(
+                range(len(candidates)), key=lambda i: rule_cost(candidates[i])
+            )
+            for position in order:
+                run = _filter_run(
+                    execute_rules(report, [candidates[position]])[0],
+                    codes,
+                    level,
+                    max_issues_per_rule,
+                )
+                completed[position] = run
+                if any(
+                    issue.level == ValidationIssueLevel.ERROR for issue in run.issues
+                ):
+                    break
+            positions = sorted(completed)
+            selected = [candidates[position] for position in positions]
+            runs = [completed[position] for position in positions]
+        else:
+            selected = candidates
+            runs = [
+                _filter_run(run, codes, level, max_issues_per_rule)
+                for run in executors.execute_rules_concurrently(
+                    report, candidates, executor
+                )
+            ]
 
-    return ValidationResult(errors=errors, warnings=warnings)
+        total_ns = perf_counter_ns() - started if diagnostics else None
+        result = build_result(selected, runs, total_ns)
+        result._rule_runs = None
+        return result
 
 
-from . import rules  # noqa: F401,E402
+from . import executors, presets, rules  # noqa: F401,E402
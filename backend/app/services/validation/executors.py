@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+import atexit
+import multiprocessing
+import pickle
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from threading import Lock
+from typing import Dict, List, Optional, Sequence
+
+from app.models import Report
+from app.settings import settings
+
+from .engine import AnyRule, ExecutorKind, RuleRun, execute_rules, rule_name
+from .metrics import rule_metrics
+
+_pools: Dict[str, Executor] = {}
+_pools_lock = Lock()
+
+
+def _get_pool(kind: ExecutorKind) -> Executor:
+    with _pools_lock:
+        pool = _pools.get(kind)
+        if pool is None:
+            workers = max(1, settings.validation_workers)
+            if kind == "thread":
+                pool = ThreadPoolExecutor(
+                    max_workers=workers, thread_name_prefix="validation"
+                )
+            else:
+                pool = ProcessPoolExecutor(
+                    max_workers=workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            _pools[kind] = pool
+        return pool
+
+
+@atexit.register
+def shutdown_executors() -> None:
+    """Останавливает пулы потоков и процессов, созданные для валидации."""
+
+    with _pools_lock:
+        for pool in _pools.values():
+            pool.shutdown(wait=False, cancel_futures=True)
+        _pools.clear()
+
+
+def _split(positions: List[int], groups: int) -> List[List[int]]:
+    """Раскладывает позиции правил по группам по кругу; пустые группы убираются."""
+
+    buckets: List[List[int]] = [[] for _ in range(max(1, groups))]
+    for index, position in enumerate(positions):
+        buckets[index % len(buckets)].append(position)
+    return [bucket for bucket in buckets if bucket]
+
+
+def _is_picklable(rule: AnyRule) -> bool:
+    try:
+        pickle.dumps(rule)
+    except (pickle.PicklingError, AttributeError, TypeError):
+        return False
+    return True
+
+
+def _execute_in_worker(
+    report_json: bytes, selected_rules: Sequence[AnyRule]
+) -> List[RuleRun]:
+    """Точка входа рабочего процесса: отчёт разбирается один раз на группу."""
+
+    return execute_rules(Report.model_validate_json(report_json), selected_rules)
+
+
+def execute_rules_concurrently(
+    report: Report,
+    selected_rules: Sequence[AnyRule],
+    kind: ExecutorKind,
+    workers: Optional[int] = None,
+) -> List[RuleRun]:
+    """
+    Запускает правила в пуле потоков или процессов и возвращает их результаты
+    в порядке ``selected_rules`` — так же, как ``execute_rules``.
+
+    Правила раскладываются не более чем на ``workers`` групп; каждая группа
+    выполняется одним заданием с собственным общим обходом дерева. В режиме
+    ``process`` отчёт сериализуется один раз и передаётся один раз на группу,
+    а не на правило; правила, которые нельзя передать в другой процесс
+    (например, локальные функции), выполняются в вызывающем потоке.
+    """
+
+    if kind == "sequential":
+        return execute_rules(report, selected_rules)
+
+    workers = workers or max(1, settings.validation_workers)
+    positions = list(range(len(selected_rules)))
+    if kind == "process":
+        remote = [
+            position
+            for position in positions
+            if getattr(selected_rules[position], "cpu_heavy", False)
+            and _is_picklable(selected_rules[position])
+        ]
+    else:
+        remote = positions
+    remote_set = set(remote)
+    local = [position for position in positions if position not in remote_set]
+
+    runs: List[Optional[RuleRun]] = [None] * len(selected_rules)
+    groups = _split(remote, workers)
+    futures = []
+    if groups:
+        pool = _get_pool(kind)
+        payload = report.model_dump_json().encode() if kind == "process" else None
+        for group in groups:
+            group_rules = [selected_rules[position] for position in group]
+            if payload is not None:
+                future = pool.submit(_execute_in_worker, payload, group_rules)
+            else:
+                future = pool.submit(execute_rules, report, group_rules)
+            futures.append((group, future))
+
+    if local:
+        local_runs = execute_rules(report, [selected_rules[i] for i in local])
+        for position, run in zip(local, local_runs, strict=True):
+            runs[position] = run
+
+    for group, future in futures:
+        for position, run in zip(group, future.result(), strict=True):
+            runs[position] = run
+            if kind == "process":
+                rule_metrics.record(
+                    rule_name(selected_rules[position]),
+                    run.duration_ns,
+                    len(run.issues),
+                )
+
+    return runs  # type: ignore[return-value]
@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+from time import perf_counter_ns
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set
+from uuid import UUID
+
+from app.models import BaseBlock, Report, ReportIndex, ValidationResult
+
+from .engine import (
+    BlockCheck,
+    RuleRun,
+    build_result,
+    execute_rules,
+    rule_name,
+    validate_report,
+)
+from .issues import AnyIssue
+from .metrics import rule_metrics
+from .presets import rule_plan
+
+
+def _structure_key(block: Optional[BaseBlock], parent_id: Optional[UUID]) -> Any:
+    """
+    Ключ структурных полей блока: всё, от чего зависят структурные правила
+    (положение в дереве, заголовки, метки приложений, подписи), но не текст.
+    """
+
+    if block is None:
+        return None
+
+    return (
+        type(block),
+        parent_id,
+        getattr(block, "title", None),
+        getattr(block, "special_kind", None),
+        getattr(block, "level", None),
+        getattr(block, "label", None),
+        getattr(block, "caption", None),
+        tuple(child.id for child in block.children),
+    )
+
+
+def _parent_id(index: ReportIndex, block_id: UUID) -> Optional[UUID]:
+    return index.parent_id(block_id) if block_id in index else None
+
+
+def _with_ancestors(
+    block_id: Optional[UUID], index: ReportIndex, into: Set[UUID]
+) -> None:
+    while block_id is not None and block_id not in into and block_id in index:
+        into.add(block_id)
+        block_id = index.parent_id(block_id)
+
+
+def _recheck_blocks(
+    rule: BlockCheck,
+    previous: RuleRun,
+    affected: Iterable[BaseBlock],
+    affected_ids: Set[UUID],
+    index: ReportIndex,
+) -> RuleRun:
+    started = perf_counter_ns()
+    by_block: Dict[UUID, Sequence[AnyIssue]] = {
+        block_id: issues
+        for block_id, issues in (previous.by_block or {}).items()
+        if block_id in index and block_id not in affected_ids
+    }
+
+    for block in affected:
+        if isinstance(block, rule.block_types):
+            issues = rule.evaluate(block, index)
+            if issues:
+                by_block[block.id] = issues
+
+    positions = index.positions
+    ordered = dict(sorted(by_block.items(), key=lambda item: positions[item[0]]))
+    issues = [issue for issues in ordered.values() for issue in issues]
+    duration_ns = perf_counter_ns() - started
+    rule_metrics.record(rule_name(rule), duration_ns, len(issues))
+    return RuleRun(issues, ordered, duration_ns)
+
+
+def validate_incremental(
+    previous_report: Report,
+    previous_result: ValidationResult,
+    report: Report,
+    changed_block_ids: Iterable[UUID],
+) -> ValidationResult:
+    """
+    Перепроверяет отчёт, используя результат проверки его предыдущей версии.
+
+    - previous_report / previous_result: предыдущая версия отчёта и результат,
+      полученный для неё от ``validate_report`` или ``validate_incremental``;
+    - report: новая версия отчёта;
+    - changed_block_ids: блоки, которые были изменены, вставлены или удалены.
+
+    Поблочные правила (``BlockCheck``) перезапускаются только для изменённых
+    блоков и их предков. Структурные правила перезапускаются, только если правка
+    затронула структурные поля (состав и порядок блоков, заголовки, метки,
+    подписи) или метаданные; остальные правила перезапускаются всегда.
+
+    Результат совпадает с ``validate_report(report)``. Если предыдущий результат
+    не содержит разбивки по правилам или набор правил изменился, выполняется
+    полная проверка.
+    """
+
+    recorded = previous_result._rule_runs
+    registry = rule_plan(report.meta.preset).rules
+    if recorded is None or recorded[0] != registry:
+        return validate_report(report)
+
+    previous_runs: List[RuleRun] = recorded[1]
+    changed = set(changed_block_ids)
+
+    old_index = previous_report.index()
+    with report.frozen() as index:
+
+        structural = (
+            previous_report.meta != report.meta
+            or [block.id for block in previous_report.blocks]
+            != [block.id for block in report.blocks]
+            or any(
+                _structure_key(old_index.get(block_id), _parent_id(old_index, block_id))
+                != _structure_key(index.get(block_id), _parent_id(index, block_id))
+                for block_id in changed
+            )
+        )
+
+        affected_ids: Set[UUID] = set()
+        for block_id in changed:
+            if block_id in index:
+                _with_ancestors(block_id, index, affected_ids)
+            _with_ancestors(_parent_id(old_index, block_id), index, affected_ids)
+        affected = [index.get(block_id) for block_id in affected_ids]
+
+        rerun_positions = [
+            position
+            for position, rule in enumerate(registry)
+            if not isinstance(rule, BlockCheck)
+            and (structural or not getattr(rule, "structural", False))
+        ]
+        fresh_runs = execute_rules(report, [registry[i] for i in rerun_positions])
+
+        # Переиспользованные результаты в этом запуске времени не заняли.
+        runs = [RuleRun(run.issues, run.by_block) for run in previous_runs]
+        for position, run in zip(rerun_positions, fresh_runs, strict=True):
+            runs[position] = run
+        for position, rule in enumerate(registry):
+            if isinstance(rule, BlockCheck):
+                runs[position] = _recheck_blocks(
+                    rule, previous_runs[position], affected, affected_ids, index
+                )
+
+        return build_result(registry, runs)
@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+from typing import Any, NamedTuple, Optional, Tuple, Union
+from uuid import UUID
+
+from app.models import ValidationIssue, ValidationIssueLevel
+
+from .messages import MESSAGES
+
+
+class IssueRecord(NamedTuple):
+    """
+    Компактное замечание правила: без текста сообщения и без Pydantic.
+
+    Правила возвращают такие записи, а текст по шаблону из ``MESSAGES``
+    подставляется только при сборке ValidationResult (``render_issue``).
+
+    - code, level: как в ValidationIssue;
+    - block_id: блок, к которому относится замечание;
+    - variant: вариант сообщения, если у кода их несколько;
+    - args: позиционные аргументы шаблона сообщения.
+    """
+
+    code: str
+    level: ValidationIssueLevel
+    block_id: Optional[UUID] = None
+    variant: Optional[str] = None
+    args: Tuple[Any, ...] = ()
+
+
+#: Замечание в результатах правил: запись или (для сторонних правил) готовый
+#: ValidationIssue.
+AnyIssue = Union[IssueRecord, ValidationIssue]
+
+#: Общий пустой результат правила, чтобы не создавать новый список на каждый блок.
+NO_ISSUES: Tuple[IssueRecord, ...] = ()
+
+
+def render_message(record: IssueRecord) -> str:
+    """Текст сообщения по шаблону ``MESSAGES`` (или код, если шаблона нет)."""
+
+    template = MESSAGES.get((record.code, record.variant), record.code)
+    return template.format(*record.args) if record.args else template
+
+
+def render_issue(issue: AnyIssue) -> ValidationIssue:
+    """Превращает запись в ValidationIssue; готовые ValidationIssue не меняются."""
+
+    if isinstance(issue, ValidationIssue):
+        return issue
+    return ValidationIssue(
+        code=issue.code,
+        level=issue.level,
+        message=render_message(issue),
+        block_id=issue.block_id,
+    )
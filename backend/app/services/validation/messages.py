@@ -0,0 +1,102 @@
+"""
+Каталог сообщений правил валидации.
+
+Ключ — (код замечания, вариант); значение — шаблон ``str.format`` с
+позиционными аргументами из ``IssueRecord.args``.
+"""
+
+from typing import Dict, Optional, Tuple
+
+MESSAGES: Dict[Tuple[str, Optional[str]], str] = {
+    ("REQUIRED_SECTIONS_PRESENT", "intro"): "В отчёте отсутствует раздел ВВЕДЕНИЕ.",
+    (
+        "REQUIRED_SECTIONS_PRESENT",
+        "conclusion",
+    ): "В отчёте отсутствует раздел ЗАКЛЮЧЕНИЕ.",
+    (
+        "REQUIRED_SECTIONS_PRESENT",
+        "references",
+    ): "В отчёте отсутствует раздел СПИСОК ИСПОЛЬЗОВАННЫХ ИСТОЧНИКОВ.",
+    (
+        "SECTION_ORDER",
+        "intro_first",
+    ): "Раздел ВВЕДЕНИЕ должен быть первым разделом отчёта.",
+    (
+        "SECTION_ORDER",
+        "conclusion_last",
+    ): "Раздел ЗАКЛЮЧЕНИЕ должен быть последним разделом отчёта.",
+    (
+        "SECTION_ORDER",
+        "intro_before_conclusion",
+    ): "Раздел ВВЕДЕНИЕ должен располагаться перед ЗАКЛЮЧЕНИЕМ.",
+    ("HEADING_NUMBERING_STYLE", "unnumbered"): (
+        "Заголовок структурного раздела «{0}» оформляется без номера."
+    ),
+    ("HEADING_NUMBERING_STYLE", "missing"): (
+        "Заголовок «{0}» должен начинаться с номера вида «{1}»."
+    ),
+    ("HEADING_NUMBERING_STYLE", "level"): (
+        "Номер заголовка «{0}» не соответствует уровню {1}: "
+        "ожидается номер вида «{2}»."
+    ),
+    ("HEADING_NUMBERING_STYLE", "format"): (
+        "В заголовке «{0}» после номера ставится один пробел; точка после "
+        "номера и отступ перед ним не допускаются."
+    ),
+    ("NON_EMPTY_LISTS", None): "Список не должен быть пустым.",
+    ("LIST_MARKER_FORMAT", "marker"): (
+        "Элемент {0} списка начинается с маркера «{1}»: маркеры и номера "
+        "добавляются при экспорте, уберите их из текста."
+    ),
+    ("LIST_MARKER_FORMAT", "indent"): (
+        "Элемент {0} списка начинается с пробелов или табуляции: отступы "
+        "списка задаются стилем, уберите ручной отступ."
+    ),
+    ("FIGURE_HAS_CAPTION", None): "У каждого рисунка должна быть подпись.",
+    ("FIGURE_IMAGE_EXISTS", None): (
+        "Изображение рисунка не найдено на сервере: загрузите файл заново."
+    ),
+    ("TABLE_HAS_CAPTION", None): "У каждой таблицы должна быть подпись.",
+    ("SECTION_ENDS_WITH_MEDIA", None): (
+        "Раздел или подраздел не должен оканчиваться рисунком "
+        "или таблицей. После рисунка/таблицы должен следовать "
+        "текст."
+    ),
+    ("APPENDIX_LABELS_UNIQUE", None): (
+        "Метка приложения '{0}' используется более одного раза."
+    ),
+    ("APPENDIX_LABELS_ORDER", None): (
+        "Приложения должны идти в алфавитном порядке (А, Б, В, ...)."
+    ),
+    (
+        "FIGURE_TABLE_NUMBERING_CONSISTENT",
+        "figure_caption",
+    ): "Подпись рисунка должна начинаться с 'Рисунок N'.",
+    (
+        "FIGURE_TABLE_NUMBERING_CONSISTENT",
+        "table_caption",
+    ): "Подпись таблицы должна начинаться с 'Таблица N'.",
+    ("FIGURE_TABLE_NUMBERING_CONSISTENT", "sequence"): (
+        "Нумерация {0} должна быть последовательной (ожидалось {1}, найдено {2})."
+    ),
+    ("REFERENCES_PRESENT_IF_NEEDED", None): (
+        "В отчёте отсутствует список использованных источников. "
+        "Если при подготовке отчёта использовалась литература, "
+        "добавьте раздел со списком источников."
+    ),
+    ("LIST_OF_REFERENCES_NOT_EMPTY", None): (
+        "Список использованных источников не должен быть пустым."
+    ),
+    ("REFERENCES_LINKS_VALID", None): (
+        "Ссылка {0} указывает на источники, которых нет в списке: {1}."
+    ),
+    ("REFERENCES_AGE_WARNING", None): (
+        "Источник {0} издан в {1} году — более {2} лет назад на момент сдачи "
+        "отчёта. Проверьте, нет ли более новых источников."
+    ),
+    ("REPORT_EMPTY_SPACE_LIMIT", None): (
+        "Около {1}% страницы {0} останется пустым (допустимо не более {2}%): "
+        "следующий блок не помещается на ней целиком. Сократите блок или "
+        "измените порядок блоков."
+    ),
+}
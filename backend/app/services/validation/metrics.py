@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+from bisect import bisect_left
+from threading import Lock
+from typing import Dict, List, Tuple
+
+#: Верхние границы корзин гистограммы времени выполнения правила, мкс.
+BUCKET_BOUNDS_US: Tuple[int, ...] = (10, 50, 100, 500, 1_000, 5_000, 10_000, 50_000)
+
+
+class RuleHistogram:
+    """Накопленная статистика одного правила: гистограмма времени и замечания."""
+
+    __slots__ = ("calls", "total_ns", "max_ns", "issues", "buckets")
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.total_ns = 0
+        self.max_ns = 0
+        self.issues = 0
+        self.buckets: List[int] = [0] * (len(BUCKET_BOUNDS_US) + 1)
+
+    def record(self, duration_ns: int, issues: int) -> None:
+        self.calls += 1
+        self.total_ns += duration_ns
+        self.max_ns = max(self.max_ns, duration_ns)
+        self.issues += issues
+        self.buckets[bisect_left(BUCKET_BOUNDS_US, duration_ns / 1000)] += 1
+
+    def snapshot(self) -> Dict[str, object]:
+        labels = [f"le_{bound}us" for bound in BUCKET_BOUNDS_US] + ["inf"]
+        return {
+            "calls": self.calls,
+            "total_ms": self.total_ns / 1e6,
+            "mean_ms": self.total_ns / self.calls / 1e6 if self.calls else 0.0,
+            "max_ms": self.max_ns / 1e6,
+            "issues": self.issues,
+            "buckets": dict(zip(labels, self.buckets, strict=True)),
+        }
+
+
+class RuleMetrics:
+    """Накопленные с момента запуска процесса гистограммы по всем правилам."""
+
+    def __init__(self) -> None:
+        self._histograms: Dict[str, RuleHistogram] = {}
+        self._lock = Lock()
+
+    def record(self, rule: str, duration_ns: int, issues: int) -> None:
+        with self._lock:
+            histogram = self._histograms.get(rule)
+            if histogram is None:
+                histogram = self._histograms[rule] = RuleHistogram()
+            histogram.record(duration_ns, issues)
+
+    def snapshot(self) -> Dict[str, Dict[str, object]]:
+        with self._lock:
+            return {
+                rule: histogram.snapshot()
+                for rule, histogram in sorted(self._histograms.items())
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._histograms.clear()
+
+
+rule_metrics = RuleMetrics()
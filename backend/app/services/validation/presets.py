@@ -0,0 +1,290 @@
+"""
+Пресеты оформления и скомпилированные планы правил.
+
+Пресет (``Preset``) описывает декларативно, какие правила отключены, какие
+уровни замечаний переопределены и с какими параметрами создаются правила.
+Каждый пресет один раз компилируется в неизменяемый ``RulePlan`` — кортеж
+готовых правил, — который ``validate_report`` берёт по ``report.meta.preset``.
+Планы и ответ ``GET /api/v1/presets`` пересобираются, только если изменился
+реестр ``RULES``; читаются они без блокировок.
+
+``ruleset_version()`` — отпечаток набора правил: исходного кода пакета
+валидации и скомпилированных планов. Он меняется при выкладке новых правил
+или изменении пресетов и входит в ключ кэша результатов проверки.
+"""
+
+from __future__ import annotations
+
+import functools
+from dataclasses import dataclass
+from hashlib import blake2b
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from pydantic import TypeAdapter
+
+from app.models import (
+    Preset,
+    PresetInfo,
+    PresetRule,
+    ValidationIssueLevel,
+)
+
+from .engine import RULES, AnyRule, BlockCheck, BlockRule, ValidationRule, rule_name
+from .issues import AnyIssue, IssueRecord
+
+#: Пресет, который используется по умолчанию (``ReportMeta.preset``).
+DEFAULT_PRESET = "misis_v1"
+
+#: Встроенные пресеты оформления.
+PRESETS: Tuple[Preset, ...] = (
+    Preset(
+        id=DEFAULT_PRESET,
+        title="НИТУ МИСИС",
+        description="Требования методических указаний НИТУ МИСИС (ГОСТ 7.32).",
+    ),
+    Preset(
+        id="misis_v1_draft",
+        title="НИТУ МИСИС (черновик)",
+        description=(
+            "Промежуточная проверка черновика: нумерация рисунков и таблиц и "
+            "разделы, оканчивающиеся рисунком или таблицей, дают предупреждения, "
+            "наличие списка источников не проверяется."
+        ),
+        disabled_rules=["ReferencesPresentRule"],
+        severity={
+            "SECTION_ENDS_WITH_MEDIA": ValidationIssueLevel.WARNING,
+            "FIGURE_TABLE_NUMBERING_CONSISTENT": ValidationIssueLevel.WARNING,
+        },
+    ),
+)
+
+
+class UnknownPresetError(ValueError):
+    """В отчёте указан пресет, которого нет среди ``PRESETS``."""
+
+    def __init__(self, preset: str) -> None:
+        super().__init__(f"Неизвестный пресет оформления: {preset!r}.")
+        self.preset = preset
+
+
+@dataclass(frozen=True)
+class RulePlan:
+    """
+    Скомпилированный пресет: правила с применёнными параметрами и уровнями в
+    порядке реестра ``RULES`` и описание для ``GET /api/v1/presets``.
+    """
+
+    preset: Preset
+    rules: Tuple[AnyRule, ...]
+    info: PresetInfo
+
+
+def _with_level(issue: AnyIssue, level: ValidationIssueLevel) -> AnyIssue:
+    if isinstance(issue, IssueRecord):
+        return issue._replace(level=level)
+    return issue.model_copy(update={"level": level})
+
+
+def _override_levels(
+    issues: Sequence[AnyIssue], levels: Dict[str, ValidationIssueLevel]
+) -> Sequence[AnyIssue]:
+    if not any(issue.code in levels for issue in issues):
+        return issues
+    return [
+        _with_level(issue, levels[issue.code]) if issue.code in levels else issue
+        for issue in issues
+    ]
+
+
+class _LevelOverrideCheck:
+    """Проверка блока для ``BlockCheck`` с переопределёнными уровнями замечаний."""
+
+    __slots__ = ("check", "levels", "__name__")
+
+    def __init__(self, check: Any, levels: Dict[str, ValidationIssueLevel]) -> None:
+        self.check = check
+        self.levels = levels
+        self.__name__ = getattr(check, "__name__", type(check).__name__)
+
+    def __call__(self, block: Any) -> Sequence[AnyIssue]:
+        return _override_levels(self.check(block), self.levels)
+
+
+class _LevelOverrideRule(BlockRule):
+    """Правило ``BlockRule`` с переопределёнными уровнями замечаний."""
+
+    def __init__(
+        self, rule: BlockRule, levels: Dict[str, ValidationIssueLevel]
+    ) -> None:
+        self.rule = rule
+        self.levels = levels
+        self.__name__ = rule_name(rule)
+        self.block_types = rule.block_types
+        self.structural = rule.structural
+        self.cpu_heavy = rule.cpu_heavy
+        self.cost = rule.cost
+        # Блоки передаются исходному правилу напрямую, без лишнего вызова.
+        self.visit = rule.visit  # type: ignore[method-assign]
+
+    def start(self, report: Any) -> Any:
+        return self.rule.start(report)
+
+    def finalize(self, report: Any, state: Any) -> Sequence[AnyIssue]:
+        return _override_levels(self.rule.finalize(report, state), self.levels)
+
+
+def _override_rule(rule: AnyRule, severity: Dict[str, ValidationIssueLevel]) -> AnyRule:
+    declared: Optional[Dict[str, ValidationIssueLevel]] = getattr(rule, "codes", None)
+    levels = {
+        code: level
+        for code, level in severity.items()
+        if declared is None or declared.get(code, level) != level
+    }
+    if not levels:
+        return rule
+
+    overridden: Any
+    if isinstance(rule, BlockCheck):
+        overridden = BlockCheck(
+            _LevelOverrideCheck(rule.check, levels),
+            rule.block_types,
+            cached=rule.cached,
+            cpu_heavy=rule.cpu_heavy,
+        )
+        overridden.structural = rule.structural
+        overridden.cost = rule.cost
+    elif isinstance(rule, BlockRule):
+        overridden = _LevelOverrideRule(rule, levels)
+    else:
+        function_rule: ValidationRule = rule
+
+        @functools.wraps(function_rule)
+        def overridden(report: Any) -> Sequence[AnyIssue]:
+            return _override_levels(function_rule(report), levels)
+
+    if declared is not None:
+        overridden.codes = {
+            code: levels.get(code, level) for code, level in declared.items()
+        }
+    return overridden
+
+
+def compile_preset(preset: Preset, registry: Sequence[AnyRule]) -> RulePlan:
+    """
+    Компилирует пресет для набора правил ``registry``: отбрасывает отключённые
+    правила, создаёт правила с параметрами пресета (``configure``) и
+    переопределяет уровни замечаний.
+
+    Имена правил и коды, которых нет в ``registry``, пропускаются: пресет
+    остаётся применимым к изменённому реестру.
+    """
+
+    rules: List[AnyRule] = []
+    described: List[PresetRule] = []
+    for rule in registry:
+        name = rule_name(rule)
+        if name in preset.disabled_rules:
+            continue
+        params = preset.params.get(name)
+        if params:
+            rule = rule.configure(**params)  # type: ignore[union-attr]
+        rule = _override_rule(rule, preset.severity)
+        rules.append(rule)
+        described.append(
+            PresetRule(
+                rule=name,
+                codes=getattr(rule, "codes", None) or {},
+                params=params or {},
+            )
+        )
+
+    info = PresetInfo(
+        id=preset.id,
+        title=preset.title,
+        description=preset.description,
+        default=preset.id == DEFAULT_PRESET,
+        rules=described,
+    )
+    return RulePlan(preset, tuple(rules), info)
+
+
+class _CompiledPresets(NamedTuple):
+    registry_version: int
+    plans: Dict[str, RulePlan]
+    payload: bytes
+    etag: str
+    version: str
+
+
+_PRESET_LIST = TypeAdapter(List[PresetInfo])
+
+
+#: Пакеты, от кода которых зависят результаты правил: сам пакет валидации и
+#: оценка вёрстки (REPORT_EMPTY_SPACE_LIMIT).
+_SOURCE_PACKAGES = (
+    Path(__file__).parent,
+    Path(__file__).parent.parent / "layout",
+)
+
+
+def _source_digest() -> bytes:
+    digest = blake2b(digest_size=16)
+    for package in _SOURCE_PACKAGES:
+        for path in sorted(package.glob("*.py")):
+            digest.update(f"{package.name}/{path.name}".encode())
+            digest.update(path.read_bytes())
+    return digest.digest()
+
+
+#: Отпечаток исходного кода правил (правила, сообщения, движок, вёрстка).
+_SOURCE_DIGEST = _source_digest()
+
+
+def _compile_presets() -> _CompiledPresets:
+    registry_version = RULES.version
+    registry = tuple(RULES)
+    plans = {preset.id: compile_preset(preset, registry) for preset in PRESETS}
+    payload = _PRESET_LIST.dump_json([plan.info for plan in plans.values()])
+    etag = f'"{blake2b(payload, digest_size=8).hexdigest()}"'
+    version = blake2b(_SOURCE_DIGEST + payload, digest_size=8).hexdigest()
+    return _CompiledPresets(registry_version, plans, payload, etag, version)
+
+
+_compiled = _compile_presets()
+
+
+def _current() -> _CompiledPresets:
+    global _compiled
+
+    # Снимок читается и заменяется целиком, поэтому блокировка не нужна:
+    # при гонке два потока лишь скомпилируют одинаковые планы.
+    compiled = _compiled
+    if RULES.version != compiled.registry_version:
+        compiled = _compiled = _compile_presets()
+    return compiled
+
+
+def rule_plan(preset: str = DEFAULT_PRESET) -> RulePlan:
+    """План правил пресета; ``UnknownPresetError``, если пресет неизвестен."""
+
+    plan = _current().plans.get(preset)
+    if plan is None:
+        raise UnknownPresetError(preset)
+    return plan
+
+
+def ruleset_version() -> str:
+    """
+    Версия набора правил: меняется вместе с кодом пакета валидации, пресетами
+    и реестром ``RULES``.
+    """
+
+    return _current().version
+
+
+def presets_payload() -> Tuple[bytes, str]:
+    """Готовый JSON-ответ ``GET /api/v1/presets`` и его ETag."""
+
+    compiled = _current()
+    return compiled.payload, compiled.etag
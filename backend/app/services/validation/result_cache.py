@@ -0,0 +1,133 @@
+"""
+Кэш готовых ответов ``POST /api/v1/reports/validate``.
+
+Ключ ответа — ETag: хэш канонического содержимого отчёта
+(``Report.content_hash``), пресета, версии набора правил
+(``presets.ruleset_version``) и параметров проверки. Поэтому одинаковые по
+содержанию отчёты находят один и тот же ответ, а выкладка новых правил или
+изменение пресетов делает старые записи недостижимыми — их вытесняет LRU.
+
+Автосохранение обычно присылает побайтно одинаковые тела, поэтому хэш тела
+запроса дополнительно запоминается как синоним ETag: такой повтор отдаётся без
+разбора JSON и построения моделей.
+
+Результат правила FIGURE_IMAGE_EXISTS зависит ещё и от хранилища изображений,
+поэтому ETag отчёта со ссылками на изображения и ключи синонимов включают
+``image_store.generation``: после загрузки нового изображения такие отчёты
+проверяются заново.
+"""
+
+from __future__ import annotations
+
+from dataclasses import asdict
+from hashlib import blake2b
+from time import monotonic
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from app.models import FigureBlock, Report
+from app.services.cache import CacheStats, LRUCache
+from app.services.images.store import image_store
+from app.settings import settings
+
+from .presets import ruleset_version
+
+#: Оценка памяти одной записи «хэш тела → ETag».
+BODY_ALIAS_BYTES = 120
+
+#: Ключ синонима: хэш тела запроса, версия набора правил, поколение хранилища
+#: изображений и параметры проверки.
+BodyKey = Tuple[bytes, str, str, Hashable]
+
+
+def validation_etag(report: Report, options: Hashable) -> str:
+    """
+    ETag результата проверки ``report`` с параметрами ``options``: зависит
+    только от содержимого отчёта, пресета, версии набора правил и параметров,
+    а для отчёта со ссылками на изображения — и от поколения их хранилища.
+    """
+
+    digest = blake2b(report.content_hash(), digest_size=16)
+    digest.update(f"\x00{report.meta.preset}\x00{ruleset_version()}".encode())
+    if any(block.image_hash for block in report.index().of_type(FigureBlock)):
+        digest.update(f"\x00{image_store.generation}".encode())
+    digest.update(f"\x00{options!r}".encode())
+    return f'"{digest.hexdigest()}"'
+
+
+def _stats(stats: CacheStats) -> Dict[str, Any]:
+    return {**asdict(stats), "hit_ratio": stats.hit_ratio}
+
+
+class ResultCache:
+    """
+    LRU готовых ответов проверки (ETag → JSON ``ValidationResult``),
+    ограниченный по памяти и по времени жизни записей, и синонимы
+    «хэш тела запроса → ETag» для побайтно повторяющихся запросов.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int,
+        ttl: Optional[float],
+        clock: Callable[[], float] = monotonic,
+    ) -> None:
+        self.results: LRUCache[bytes] = LRUCache(
+            max_bytes=max_bytes, sizeof=len, ttl=ttl, clock=clock
+        )
+        self.bodies: LRUCache[str] = LRUCache(
+            max_bytes=max(max_bytes // 16, 1),
+            sizeof=lambda etag: BODY_ALIAS_BYTES,
+            ttl=ttl,
+            clock=clock,
+        )
+
+    @staticmethod
+    def body_key(body: bytes, options: Hashable) -> BodyKey:
+        return (
+            blake2b(body, digest_size=16).digest(),
+            ruleset_version(),
+            image_store.generation,
+            options,
+        )
+
+    def lookup(self, body_key: BodyKey) -> Optional[Tuple[str, bytes]]:
+        """ETag и ответ для уже встречавшегося тела запроса, если они в кэше."""
+
+        etag = self.bodies.get(body_key)
+        if etag is None:
+            return None
+        payload = self.results.get(etag)
+        if payload is None:
+            return None
+        return etag, payload
+
+    def get(self, etag: str) -> Optional[bytes]:
+        return self.results.get(etag)
+
+    def put(self, etag: str, payload: bytes, body_key: BodyKey) -> None:
+        self.results.put(etag, payload)
+        self.bodies.put(body_key, etag)
+
+    def remember(self, etag: str, body_key: BodyKey) -> None:
+        """Запоминает синоним для тела, чей ответ уже лежит в кэше."""
+
+        self.bodies.put(body_key, etag)
+
+    def clear(self) -> None:
+        self.results.clear()
+        self.bodies.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Счётчики и занятая память: ответы и синонимы тел запросов."""
+
+        return {
+            **_stats(self.results.stats()),
+            "bodies": _stats(self.bodies.stats()),
+        }
+
+
+#: Кэш ответов ``POST /api/v1/reports/validate``.
+result_cache = ResultCache(
+    max_bytes=settings.result_cache_max_bytes,
+    ttl=settings.result_cache_ttl_seconds or None,
+)
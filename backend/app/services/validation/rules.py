@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 import re
-from typing import Iterable, List
+from typing import List, Optional, Sequence, Tuple
 
 from app.models import (
     AppendixBlock,
@@ -13,195 +13,295 @@ from app.models import (
     SectionBlock,
     SubsectionBlock,
     TableBlock,
-    ValidationIssue,
+    TextBlock,
     ValidationIssueLevel,
 )
+from app.services.images.store import image_store
+from app.services.layout.estimator import estimate_layout
+
+from .bibliography import (
+    CITATION_PATTERN,
+    NORMATIVE_KINDS,
+    BibliographyIndex,
+    parse_citation,
+)
+from .engine import (
+    CPU_HEAVY_RULE_COST,
+    RULES,
+    BlockRule,
+    ValidationRule,
+    block_check,
+    configurable,
+    issue_codes,
+    structural_rule,
+)
+from .issues import NO_ISSUES, IssueRecord
+from .text_analysis import TextMatch, TextMatches, text_analyzer, text_check
+from .traversal import iter_blocks  # noqa: F401 (re-exported for callers)
 
-from .engine import RULES
+#: special_kind разделов, обязательных по умолчанию.
+REQUIRED_SPECIAL_KINDS = ("INTRO", "CONCLUSION")
 
 
-def iter_blocks(report: Report) -> Iterable[BaseBlock]:
+def required_sections_rule(
+    required_special_kinds: Sequence[str] = REQUIRED_SPECIAL_KINDS,
+) -> ValidationRule:
     """
-    Depth-first traversal of all blocks in the report, including nested children.
+    Builds the REQUIRED_SECTIONS_PRESENT rule: every special kind listed in
+    ``required_special_kinds`` must be present among top-level sections.
     """
 
-    stack: List[BaseBlock] = list(report.blocks)
-    while stack:
-        block = stack.pop()
-        yield block
-        if block.children:
-            stack.extend(reversed(block.children))
-
-
-def rule_required_sections_present(report: Report) -> List[ValidationIssue]:
-    issues: List[ValidationIssue] = []
-
-    sections: List[SectionBlock] = [
-        block for block in report.blocks if isinstance(block, SectionBlock)
-    ]
-
-    has_intro = any(section.special_kind == "INTRO" for section in sections)
-    has_conclusion = any(section.special_kind == "CONCLUSION" for section in sections)
-
-    if not has_intro:
-        issues.append(
-            ValidationIssue(
-                code="REQUIRED_SECTIONS_PRESENT",
-                level=ValidationIssueLevel.ERROR,
-                message="В отчёте отсутствует раздел ВВЕДЕНИЕ.",
+    required = tuple(required_special_kinds)
+
+    @configurable(required_sections_rule)
+    @issue_codes(REQUIRED_SECTIONS_PRESENT=ValidationIssueLevel.ERROR)
+    @structural_rule
+    def rule_required_sections_present(report: Report) -> List[IssueRecord]:
+        present = {
+            section.special_kind for section in report.index().top_level(SectionBlock)
+        }
+
+        return [
+            IssueRecord(
+                "REQUIRED_SECTIONS_PRESENT",
+                ValidationIssueLevel.ERROR,
+                variant=kind.lower(),
             )
-        )
+            for kind in required
+            if kind not in present
+        ]
 
-    if not has_conclusion:
-        issues.append(
-            ValidationIssue(
-                code="REQUIRED_SECTIONS_PRESENT",
-                level=ValidationIssueLevel.ERROR,
-                message="В отчёте отсутствует раздел ЗАКЛЮЧЕНИЕ.",
-            )
-        )
+    return rule_required_sections_present
 
-    return issues
 
+rule_required_sections_present = required_sections_rule()
 
-def rule_section_order(report: Report) -> List[ValidationIssue]:
-    issues: List[ValidationIssue] = []
 
-    indexed_sections = [
-        (idx, block)
-        for idx, block in enumerate(report.blocks)
-        if isinstance(block, SectionBlock)
-    ]
+@issue_codes(SECTION_ORDER=ValidationIssueLevel.ERROR)
+@structural_rule
+def rule_section_order(report: Report) -> List[IssueRecord]:
+    issues: List[IssueRecord] = []
 
-    if not indexed_sections:
+    sections = report.index().top_level(SectionBlock)
+
+    if not sections:
         return issues
 
     intro_positions = [
-        idx for idx, section in indexed_sections if section.special_kind == "INTRO"
+        idx for idx, section in enumerate(sections) if section.special_kind == "INTRO"
     ]
     conclusion_positions = [
-        idx for idx, section in indexed_sections if section.special_kind == "CONCLUSION"
+        idx
+        for idx, section in enumerate(sections)
+        if section.special_kind == "CONCLUSION"
     ]
 
     if intro_positions:
-        first_section_idx = indexed_sections[0][0]
-        if min(intro_positions) != first_section_idx:
+        if min(intro_positions) != 0:
             issues.append(
-                ValidationIssue(
-                    code="SECTION_ORDER",
-                    level=ValidationIssueLevel.ERROR,
-                    message="Раздел ВВЕДЕНИЕ должен быть первым разделом отчёта.",
+                IssueRecord(
+                    "SECTION_ORDER", ValidationIssueLevel.ERROR, variant="intro_first"
                 )
             )
 
     if conclusion_positions:
-        last_section_idx = indexed_sections[-1][0]
-        if max(conclusion_positions) != last_section_idx:
+        if max(conclusion_positions) != len(sections) - 1:
             issues.append(
-                ValidationIssue(
-                    code="SECTION_ORDER",
-                    level=ValidationIssueLevel.ERROR,
-                    message="Раздел ЗАКЛЮЧЕНИЕ должен быть последним разделом отчёта.",
+                IssueRecord(
+                    "SECTION_ORDER",
+                    ValidationIssueLevel.ERROR,
+                    variant="conclusion_last",
                 )
             )
 
     if intro_positions and conclusion_positions:
         if max(intro_positions) >= min(conclusion_positions):
             issues.append(
-                ValidationIssue(
-                    code="SECTION_ORDER",
-                    level=ValidationIssueLevel.ERROR,
-                    message="Раздел ВВЕДЕНИЕ должен располагаться перед ЗАКЛЮЧЕНИЕМ.",
+                IssueRecord(
+                    "SECTION_ORDER",
+                    ValidationIssueLevel.ERROR,
+                    variant="intro_before_conclusion",
                 )
             )
 
     return issues
 
 
-def rule_non_empty_lists(report: Report) -> List[ValidationIssue]:
-    issues: List[ValidationIssue] = []
+#: Заголовки структурных разделов, которые оформляются без номера.
+STRUCTURAL_TITLES = frozenset(
+    {
+        "СОДЕРЖАНИЕ",
+        "ВВЕДЕНИЕ",
+        "ЗАКЛЮЧЕНИЕ",
+        "СПИСОК ИСПОЛЬЗОВАННЫХ ИСТОЧНИКОВ",
+        "ПРИЛОЖЕНИЕ",
+    }
+)
 
-    for block in iter_blocks(report):
-        if isinstance(block, ListBlock) and not block.items:
-            issues.append(
-                ValidationIssue(
-                    code="NON_EMPTY_LISTS",
-                    level=ValidationIssueLevel.ERROR,
-                    message="Список не должен быть пустым.",
-                    block_id=block.id,
-                )
-            )
 
-    return issues
+@issue_codes(HEADING_NUMBERING_STYLE=ValidationIssueLevel.ERROR)
+@text_check(
+    SectionBlock,
+    SubsectionBlock,
+    cached=False,
+    heading_number=r"^(\s*)(\d+(?:\.\d+)*)(\.?)(\s*)",
+)
+def rule_heading_numbering_style(
+    block: BaseBlock, matches: TextMatches
+) -> Sequence[IssueRecord]:
+    """
+    Structural sections (INTRO, CONCLUSION, ...) are not numbered; other
+    sections are numbered ``1``, subsections ``1.1`` and ``1.1.1`` by level,
+    with a single space after the number and no trailing dot.
+    """
 
+    title = block.title  # type: ignore[attr-defined]
+    found = matches.get("heading_number")
+    number = found[0] if found else None
+
+    def issue(variant: str, *args: object) -> Sequence[IssueRecord]:
+        return (
+            IssueRecord(
+                "HEADING_NUMBERING_STYLE",
+                ValidationIssueLevel.ERROR,
+                block.id,
+                variant=variant,
+                args=(title, *args),
+            ),
+        )
 
-def rule_figure_has_caption(report: Report) -> List[ValidationIssue]:
-    issues: List[ValidationIssue] = []
+    if isinstance(block, SectionBlock) and (
+        block.special_kind or title.strip().upper() in STRUCTURAL_TITLES
+    ):
+        return issue("unnumbered") if number else NO_ISSUES
 
-    for block in iter_blocks(report):
-        if isinstance(block, FigureBlock):
-            if not block.caption or not block.caption.strip():
-                issues.append(
-                    ValidationIssue(
-                        code="FIGURE_HAS_CAPTION",
-                        level=ValidationIssueLevel.ERROR,
-                        message="У каждого рисунка должна быть подпись.",
-                        block_id=block.id,
-                    )
-                )
+    level = block.level if isinstance(block, SubsectionBlock) else 1
+    example = ".".join("1" * level)
+    if number is None:
+        return issue("missing", example)
 
-    return issues
+    indent, digits, dot, gap = number.groups
+    if digits.count(".") + 1 != level:
+        return issue("level", level, example)
+    if indent or dot or gap != " ":
+        return issue("format")
+    return NO_ISSUES
 
 
-def rule_table_has_caption(report: Report) -> List[ValidationIssue]:
-    issues: List[ValidationIssue] = []
+@issue_codes(NON_EMPTY_LISTS=ValidationIssueLevel.ERROR)
+@block_check(ListBlock, cached=True)
+def rule_non_empty_lists(block: ListBlock) -> Sequence[IssueRecord]:
+    if block.items:
+        return NO_ISSUES
 
-    for block in iter_blocks(report):
-        if isinstance(block, TableBlock):
-            if not block.caption or not block.caption.strip():
-                issues.append(
-                    ValidationIssue(
-                        code="TABLE_HAS_CAPTION",
-                        level=ValidationIssueLevel.ERROR,
-                        message="У каждой таблицы должна быть подпись.",
-                        block_id=block.id,
-                    )
-                )
+    return (IssueRecord("NON_EMPTY_LISTS", ValidationIssueLevel.ERROR, block.id),)
 
-    return issues
 
+@issue_codes(LIST_MARKER_FORMAT=ValidationIssueLevel.ERROR)
+@text_check(
+    ListBlock,
+    list_item_marker=r"^[ \t]*([-–—•*·]|\d+[.)]|[а-яё][.)])(?=\s)",
+    list_item_indent=r"^[ \t]+",
+)
+def rule_list_marker_format(
+    block: ListBlock, matches: TextMatches
+) -> Sequence[IssueRecord]:
+    """
+    List items are stored without markers: the marker («–», «1)», «а)») and
+    the indents come from the list style on export. Items that start with a
+    typed marker or a manual indent are reported.
+    """
 
-def rule_section_ends_with_media(report: Report) -> List[ValidationIssue]:
-    issues: List[ValidationIssue] = []
+    markers = [
+        (match.index, "marker", (match.index + 1, match.groups[0]))
+        for match in matches.get("list_item_marker", ())
+    ]
+    # An indent before a typed marker is covered by the marker issue.
+    marked = {index for index, _, _ in markers}
+    indents = [
+        (match.index, "indent", (match.index + 1,))
+        for match in matches.get("list_item_indent", ())
+        if match.index not in marked
+    ]
+    if not markers and not indents:
+        return NO_ISSUES
+
+    return tuple(
+        IssueRecord(
+            "LIST_MARKER_FORMAT",
+            ValidationIssueLevel.ERROR,
+            block.id,
+            variant=variant,
+            args=args,
+        )
+        for _, variant, args in sorted(markers + indents)
+    )
 
-    for block in iter_blocks(report):
-        if isinstance(block, (SectionBlock, SubsectionBlock)):
-            if not block.children:
-                continue
-            last_child = block.children[-1]
-            if isinstance(last_child, (FigureBlock, TableBlock)):
-                issues.append(
-                    ValidationIssue(
-                        code="SECTION_ENDS_WITH_MEDIA",
-                        level=ValidationIssueLevel.ERROR,
-                        message=(
-                            "Раздел или подраздел не должен оканчиваться рисунком "
-                            "или таблицей. После рисунка/таблицы должен следовать "
-                            "текст."
-                        ),
-                        block_id=last_child.id,
-                    )
-                )
 
-    return issues
+@issue_codes(FIGURE_HAS_CAPTION=ValidationIssueLevel.ERROR)
+@block_check(FigureBlock, cached=True)
+def rule_figure_has_caption(block: FigureBlock) -> Sequence[IssueRecord]:
+    if block.caption and block.caption.strip():
+        return NO_ISSUES
+
+    return (IssueRecord("FIGURE_HAS_CAPTION", ValidationIssueLevel.ERROR, block.id),)
 
 
-def rule_appendix_labels_unique(report: Report) -> List[ValidationIssue]:
-    issues: List[ValidationIssue] = []
+@issue_codes(FIGURE_IMAGE_EXISTS=ValidationIssueLevel.ERROR)
+def rule_figure_image_exists(report: Report) -> List[IssueRecord]:
+    """
+    Every figure that references an image by hash must point to an image that
+    is present in the image store. All referenced hashes are checked in one
+    batched ``ImageStore.missing`` call instead of a lookup per figure.
+    """
 
-    appendices: List[AppendixBlock] = [
-        block for block in report.blocks if isinstance(block, AppendixBlock)
+    figures = [
+        block for block in report.index().of_type(FigureBlock) if block.image_hash
     ]
+    if not figures:
+        return []
+    missing = image_store.missing(figure.image_hash for figure in figures)
+    return [
+        IssueRecord("FIGURE_IMAGE_EXISTS", ValidationIssueLevel.ERROR, figure.id)
+        for figure in figures
+        if figure.image_hash in missing
+    ]
+
+
+@issue_codes(TABLE_HAS_CAPTION=ValidationIssueLevel.ERROR)
+@block_check(TableBlock, cached=True)
+def rule_table_has_caption(block: TableBlock) -> Sequence[IssueRecord]:
+    if block.caption and block.caption.strip():
+        return NO_ISSUES
+
+    return (IssueRecord("TABLE_HAS_CAPTION", ValidationIssueLevel.ERROR, block.id),)
+
+
+# Без кэша: проверка смотрит только на последний дочерний блок, а ключ кэша —
+# хэш всего поддерева раздела, который считать дороже самой проверки.
+@issue_codes(SECTION_ENDS_WITH_MEDIA=ValidationIssueLevel.ERROR)
+@block_check(SectionBlock, SubsectionBlock)
+def rule_section_ends_with_media(block: BaseBlock) -> Sequence[IssueRecord]:
+    if not block.children:
+        return NO_ISSUES
+
+    last_child = block.children[-1]
+    if not isinstance(last_child, (FigureBlock, TableBlock)):
+        return NO_ISSUES
+
+    return (
+        IssueRecord(
+            "SECTION_ENDS_WITH_MEDIA", ValidationIssueLevel.ERROR, last_child.id
+        ),
+    )
+
+
+@issue_codes(APPENDIX_LABELS_UNIQUE=ValidationIssueLevel.ERROR)
+@structural_rule
+def rule_appendix_labels_unique(report: Report) -> List[IssueRecord]:
+    issues: List[IssueRecord] = []
+
+    appendices = report.index().top_level(AppendixBlock)
 
     by_label: dict[str, List[AppendixBlock]] = {}
     for appendix in appendices:
@@ -211,26 +311,23 @@ def rule_appendix_labels_unique(report: Report) -> List[ValidationIssue]:
         if len(blocks) > 1:
             for block in blocks:
                 issues.append(
-                    ValidationIssue(
-                        code="APPENDIX_LABELS_UNIQUE",
-                        level=ValidationIssueLevel.ERROR,
-                        message=(
-                            f"Метка приложения '{label}' используется более одного "
-                            "раза."
-                        ),
-                        block_id=block.id,
+                    IssueRecord(
+                        "APPENDIX_LABELS_UNIQUE",
+                        ValidationIssueLevel.ERROR,
+                        block.id,
+                        args=(label,),
                     )
                 )
 
     return issues
 
 
-def rule_appendix_labels_order(report: Report) -> List[ValidationIssue]:
-    issues: List[ValidationIssue] = []
+@issue_codes(APPENDIX_LABELS_ORDER=ValidationIssueLevel.WARNING)
+@structural_rule
+def rule_appendix_labels_order(report: Report) -> List[IssueRecord]:
+    issues: List[IssueRecord] = []
 
-    appendices: List[AppendixBlock] = [
-        block for block in report.blocks if isinstance(block, AppendixBlock)
-    ]
+    appendices = report.index().top_level(AppendixBlock)
 
     if len(appendices) <= 1:
         return issues
@@ -240,152 +337,320 @@ def rule_appendix_labels_order(report: Report) -> List[ValidationIssue]:
 
     if labels != sorted_labels:
         issues.append(
-            ValidationIssue(
-                code="APPENDIX_LABELS_ORDER",
-                level=ValidationIssueLevel.WARNING,
-                message="Приложения должны идти в алфавитном порядке (А, Б, В, ...).",
-            )
+            IssueRecord("APPENDIX_LABELS_ORDER", ValidationIssueLevel.WARNING)
         )
 
     return issues
 
 
+#: Шаблоны подписей по умолчанию; номер — последняя группа шаблона.
 FIGURE_PATTERN = re.compile(r"^\s*(Рисунок|Рис\.|Figure|Fig\.)\s+(\d+)")
 TABLE_PATTERN = re.compile(r"^\s*(Таблица|Табл\.|Table|Tab\.)\s+(\d+)")
 
 
-def rule_figure_table_numbering_consistent(report: Report) -> List[ValidationIssue]:
-    issues: List[ValidationIssue] = []
+def _compile_caption_pattern(
+    pattern: Optional[str], default: re.Pattern[str]
+) -> re.Pattern[str]:
+    if pattern is None:
+        return default
+    compiled = re.compile(pattern)
+    if not compiled.groups:
+        raise ValueError(f"В шаблоне подписи нет группы с номером: {pattern!r}")
+    return compiled
+
+
+class _NumberingState:
+    __slots__ = ("issues", "figures", "tables")
+
+    def __init__(self) -> None:
+        self.issues: List[IssueRecord] = []
+        self.figures: List[Tuple[int, FigureBlock]] = []
+        self.tables: List[Tuple[int, TableBlock]] = []
 
-    figure_numbers: List[int] = []
-    figure_blocks: List[FigureBlock] = []
-    table_numbers: List[int] = []
-    table_blocks: List[TableBlock] = []
 
-    for block in iter_blocks(report):
+class FigureTableNumberingRule(BlockRule):
+    """
+    Checks that figure and table captions start with 'Рисунок N' / 'Таблица N'
+    and that both sequences are numbered consecutively in document order.
+
+    Caption patterns can be replaced by a preset (see ``configure``); the
+    number is taken from the last group of the pattern.
+    """
+
+    block_types = (FigureBlock, TableBlock)
+    structural = True
+    cpu_heavy = True
+    codes = {"FIGURE_TABLE_NUMBERING_CONSISTENT": ValidationIssueLevel.ERROR}
+
+    def __init__(
+        self,
+        figure_pattern: re.Pattern[str] = FIGURE_PATTERN,
+        table_pattern: re.Pattern[str] = TABLE_PATTERN,
+    ) -> None:
+        self.figure_pattern = figure_pattern
+        self.table_pattern = table_pattern
+
+    def configure(
+        self,
+        figure_caption_pattern: Optional[str] = None,
+        table_caption_pattern: Optional[str] = None,
+    ) -> FigureTableNumberingRule:
+        return FigureTableNumberingRule(
+            _compile_caption_pattern(figure_caption_pattern, self.figure_pattern),
+            _compile_caption_pattern(table_caption_pattern, self.table_pattern),
+        )
+
+    def start(self, report: Report) -> _NumberingState:
+        return _NumberingState()
+
+    def visit(self, block: BaseBlock, state: _NumberingState) -> None:
         if isinstance(block, FigureBlock):
-            caption = block.caption or ""
-            match = FIGURE_PATTERN.match(caption)
-            if not match:
-                issues.append(
-                    ValidationIssue(
-                        code="FIGURE_TABLE_NUMBERING_CONSISTENT",
-                        level=ValidationIssueLevel.ERROR,
-                        message="Подпись рисунка должна начинаться с 'Рисунок N'.",
-                        block_id=block.id,
+            number = self._caption_number(block.caption, self.figure_pattern)
+            if number is None:
+                state.issues.append(
+                    IssueRecord(
+                        "FIGURE_TABLE_NUMBERING_CONSISTENT",
+                        ValidationIssueLevel.ERROR,
+                        block.id,
+                        "figure_caption",
                     )
                 )
-                continue
-            number = int(match.group(2))
-            figure_numbers.append(number)
-            figure_blocks.append(block)
+                return
+            state.figures.append((number, block))
         elif isinstance(block, TableBlock):
-            caption = block.caption or ""
-            match = TABLE_PATTERN.match(caption)
-            if not match:
-                issues.append(
-                    ValidationIssue(
-                        code="FIGURE_TABLE_NUMBERING_CONSISTENT",
-                        level=ValidationIssueLevel.ERROR,
-                        message="Подпись таблицы должна начинаться с 'Таблица N'.",
-                        block_id=block.id,
+            number = self._caption_number(block.caption, self.table_pattern)
+            if number is None:
+                state.issues.append(
+                    IssueRecord(
+                        "FIGURE_TABLE_NUMBERING_CONSISTENT",
+                        ValidationIssueLevel.ERROR,
+                        block.id,
+                        "table_caption",
                     )
                 )
-                continue
-            number = int(match.group(2))
-            table_numbers.append(number)
-            table_blocks.append(block)
+                return
+            state.tables.append((number, block))
+
+    def finalize(self, report: Report, state: _NumberingState) -> List[IssueRecord]:
+        issues = state.issues
+        issues.extend(self._check_sequence(state.figures, "рисунков"))
+        issues.extend(self._check_sequence(state.tables, "таблиц"))
+        return issues
+
+    @staticmethod
+    def _caption_number(caption: str, pattern: re.Pattern[str]) -> Optional[int]:
+        match = pattern.match(caption or "")
+        if not match:
+            return None
+        return int(match.group(pattern.groups))
+
+    @staticmethod
+    def _check_sequence(
+        numbered: List[Tuple[int, BaseBlock]], kind: str
+    ) -> List[IssueRecord]:
+        issues: List[IssueRecord] = []
 
-    if figure_numbers:
         expected = 1
-        for number, block in zip(figure_numbers, figure_blocks, strict=False):
+        for number, block in numbered:
             if number != expected:
                 issues.append(
-                    ValidationIssue(
-                        code="FIGURE_TABLE_NUMBERING_CONSISTENT",
-                        level=ValidationIssueLevel.ERROR,
-                        message=(
-                            "Нумерация рисунков должна быть последовательной "
-                            f"(ожидалось {expected}, найдено {number})."
-                        ),
-                        block_id=block.id,
+                    IssueRecord(
+                        "FIGURE_TABLE_NUMBERING_CONSISTENT",
+                        ValidationIssueLevel.ERROR,
+                        block.id,
+                        "sequence",
+                        (kind, expected, number),
                     )
                 )
                 expected = number + 1
             else:
                 expected += 1
 
-    if table_numbers:
-        expected = 1
-        for number, block in zip(table_numbers, table_blocks, strict=False):
-            if number != expected:
-                issues.append(
-                    ValidationIssue(
-                        code="FIGURE_TABLE_NUMBERING_CONSISTENT",
-                        level=ValidationIssueLevel.ERROR,
-                        message=(
-                            "Нумерация таблиц должна быть последовательной "
-                            f"(ожидалось {expected}, найдено {number})."
-                        ),
-                        block_id=block.id,
+        return issues
+
+
+rule_figure_table_numbering_consistent = FigureTableNumberingRule()
+
+
+class ReferencesPresentRule(BlockRule):
+    """
+    Warns when the report has no references block anywhere in the tree.
+    """
+
+    block_types = (ReferencesBlock,)
+    structural = True
+    codes = {"REFERENCES_PRESENT_IF_NEEDED": ValidationIssueLevel.WARNING}
+
+    def visit(self, block: BaseBlock, state: List[BaseBlock]) -> None:
+        state.append(block)
+
+    def finalize(self, report: Report, state: List[BaseBlock]) -> List[IssueRecord]:
+        if state:
+            return []
+
+        return [
+            IssueRecord("REFERENCES_PRESENT_IF_NEEDED", ValidationIssueLevel.WARNING)
+        ]
+
+
+rule_references_present_if_needed = ReferencesPresentRule()
+
+
+text_analyzer.register("citation", CITATION_PATTERN, (TextBlock, ListBlock))
+
+
+class ReferenceLinksRule(BlockRule):
+    """
+    Every in-text citation (``[3]``, ``[1, 4–7]``, ``[2, с. 15]``) in text and
+    list blocks must point to entries of the references list.
+
+    Citations come from the shared text analyzer (one scan per block), and
+    each cited number or range is checked with a lookup in the
+    ``BibliographyIndex``.
+    """
+
+    block_types = (TextBlock, ListBlock)
+    codes = {"REFERENCES_LINKS_VALID": ValidationIssueLevel.ERROR}
+
+    def visit(
+        self, block: BaseBlock, state: List[Tuple[BaseBlock, Tuple[TextMatch, ...]]]
+    ) -> None:
+        citations = text_analyzer.analyze(block).get("citation")
+        if citations:
+            state.append((block, citations))
+
+    def finalize(
+        self, report: Report, state: List[Tuple[BaseBlock, Tuple[TextMatch, ...]]]
+    ) -> List[IssueRecord]:
+        if not state:
+            return []
+
+        bibliography = BibliographyIndex.from_report(report)
+        issues: List[IssueRecord] = []
+        for block, citations in state:
+            for citation in citations:
+                missing = bibliography.missing(parse_citation(citation.groups[0]))
+                if missing:
+                    issues.append(
+                        IssueRecord(
+                            "REFERENCES_LINKS_VALID",
+                            ValidationIssueLevel.ERROR,
+                            block.id,
+                            args=(citation.text, ", ".join(missing)),
+                        )
                     )
-                )
-                expected = number + 1
-            else:
-                expected += 1
+        return issues
 
-    return issues
 
+rule_references_links_valid = ReferenceLinksRule()
 
-def rule_references_present_if_needed(report: Report) -> List[ValidationIssue]:
-    issues: List[ValidationIssue] = []
+#: Возраст источника (лет до года сдачи отчёта), после которого он помечается.
+MAX_REFERENCE_AGE_YEARS = 5
 
-    has_references_block = any(
-        isinstance(block, ReferencesBlock) for block in iter_blocks(report)
-    )
 
-    if not has_references_block:
-        issues.append(
-            ValidationIssue(
-                code="REFERENCES_PRESENT_IF_NEEDED",
-                level=ValidationIssueLevel.WARNING,
-                message=(
-                    "В отчёте отсутствует список использованных источников. "
-                    "Если при подготовке отчёта использовалась литература, "
-                    "добавьте раздел со списком источников."
-                ),
+class ReferencesAgeRule(BlockRule):
+    """
+    Warns about sources published more than ``max_age_years`` years before the
+    submission year of the report. Standards and legal acts are cited in their
+    current edition and are not checked, neither are sources without a year.
+    """
+
+    block_types = (ReferencesBlock,)
+    codes = {"REFERENCES_AGE_WARNING": ValidationIssueLevel.WARNING}
+
+    def __init__(self, max_age_years: int = MAX_REFERENCE_AGE_YEARS) -> None:
+        self.max_age_years = max_age_years
+
+    def configure(self, max_age_years: Optional[int] = None) -> ReferencesAgeRule:
+        if max_age_years is None:
+            return ReferencesAgeRule(self.max_age_years)
+        return ReferencesAgeRule(max_age_years)
+
+    def visit(self, block: BaseBlock, state: List[BaseBlock]) -> None:
+        state.append(block)
+
+    def finalize(
+        self, report: Report, state: List[ReferencesBlock]
+    ) -> List[IssueRecord]:
+        oldest = report.meta.submission_date.year - self.max_age_years
+        bibliography = BibliographyIndex(state)
+        return [
+            IssueRecord(
+                "REFERENCES_AGE_WARNING",
+                ValidationIssueLevel.WARNING,
+                bibliography.blocks[number],
+                args=(number, reference.year, self.max_age_years),
             )
-        )
+            for number, reference in bibliography.entries.items()
+            if reference.year is not None
+            and reference.year < oldest
+            and reference.kind not in NORMATIVE_KINDS
+        ]
 
-    return issues
 
+rule_references_age_warning = ReferencesAgeRule()
 
-def rule_list_of_references_not_empty(report: Report) -> List[ValidationIssue]:
-    issues: List[ValidationIssue] = []
 
-    for block in iter_blocks(report):
-        if isinstance(block, ReferencesBlock):
-            if not block.items:
-                issues.append(
-                    ValidationIssue(
-                        code="LIST_OF_REFERENCES_NOT_EMPTY",
-                        level=ValidationIssueLevel.ERROR,
-                        message=(
-                            "Список использованных источников не должен быть пустым."
-                        ),
-                        block_id=block.id,
-                    )
-                )
+@issue_codes(LIST_OF_REFERENCES_NOT_EMPTY=ValidationIssueLevel.ERROR)
+@block_check(ReferencesBlock)
+def rule_list_of_references_not_empty(block: ReferencesBlock) -> Sequence[IssueRecord]:
+    if block.items:
+        return NO_ISSUES
 
-    return issues
+    return (
+        IssueRecord(
+            "LIST_OF_REFERENCES_NOT_EMPTY", ValidationIssueLevel.ERROR, block.id
+        ),
+    )
+
+
+#: Доля страницы, которая может остаться пустой (REQUIREMENTS §5.2).
+MAX_EMPTY_PAGE_SHARE = 0.25
+
+
+def empty_space_rule(max_empty_share: float = MAX_EMPTY_PAGE_SHARE) -> ValidationRule:
+    """
+    Builds the REPORT_EMPTY_SPACE_LIMIT rule: warns about pages that the layout
+    estimate (``estimate_layout``) leaves more than ``max_empty_share`` blank
+    because the next block does not fit on them. Pages followed by a forced
+    page break (a new top-level section) and the last page are not checked.
+    """
+
+    @configurable(empty_space_rule)
+    @issue_codes(REPORT_EMPTY_SPACE_LIMIT=ValidationIssueLevel.WARNING)
+    def rule_report_empty_space_limit(report: Report) -> List[IssueRecord]:
+        pages = estimate_layout(report).pages
+        return [
+            IssueRecord(
+                "REPORT_EMPTY_SPACE_LIMIT",
+                ValidationIssueLevel.WARNING,
+                following.block_ids[0],
+                args=(
+                    page.number,
+                    round((1 - page.fill) * 100),
+                    round(max_empty_share * 100),
+                ),
+            )
+            for page, following in zip(pages, pages[1:], strict=False)
+            if page.ends_with == "overflow" and 1 - page.fill > max_empty_share
+        ]
+
+    rule_report_empty_space_limit.cost = CPU_HEAVY_RULE_COST  # type: ignore[attr-defined]
+    return rule_report_empty_space_limit
+
+
+rule_report_empty_space_limit = empty_space_rule()
 
 
 RULES.extend(
     [
         rule_required_sections_present,
         rule_section_order,
+        rule_heading_numbering_style,
         rule_non_empty_lists,
+        rule_list_marker_format,
         rule_figure_has_caption,
+        rule_figure_image_exists,
         rule_table_has_caption,
         rule_section_ends_with_media,
         rule_appendix_labels_unique,
@@ -393,5 +658,8 @@ RULES.extend(
         rule_figure_table_numbering_consistent,
         rule_references_present_if_needed,
         rule_list_of_references_not_empty,
+        rule_references_links_valid,
+        rule_references_age_warning,
+        rule_report_empty_space_limit,
     ]
 )
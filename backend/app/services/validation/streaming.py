@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import json
+from time import perf_counter_ns
+from typing import Iterator, Tuple
+
+from app.models import Report, ValidationIssueLevel, ValidationSummary
+
+from .engine import AnyRule, iter_rule_runs, rule_name
+from .issues import render_issue
+from .presets import rule_plan
+
+#: Событие потоковой проверки: (тип события, JSON-объект с данными).
+StreamEvent = Tuple[str, str]
+
+
+def iter_validation_events(report: Report) -> Iterator[StreamEvent]:
+    """
+    Проверяет отчёт и выдаёт события по мере завершения правил пресета отчёта:
+
+    - ``issue`` — одно замечание: ``{"rule": ..., "issue": ValidationIssue}``;
+    - ``rule`` — правило завершено: ``{"rule": ..., "duration_ms": ...,
+      "issues": ...}``;
+    - ``summary`` — последнее событие, ValidationSummary.
+
+    Замечания не накапливаются: генератор хранит только счётчики, поэтому
+    память не растёт с их числом.
+
+    Пресет выбирается сразу при вызове, поэтому ``UnknownPresetError``
+    выбрасывается до первого события.
+    """
+
+    return _iter_events(report, rule_plan(report.meta.preset).rules)
+
+
+def _iter_events(
+    report: Report, selected_rules: Tuple[AnyRule, ...]
+) -> Iterator[StreamEvent]:
+    started = perf_counter_ns()
+    errors = warnings = 0
+
+    for rule, run in iter_rule_runs(report, selected_rules):
+        name = json.dumps(rule_name(rule))
+        for issue in run.issues:
+            if issue.level == ValidationIssueLevel.ERROR:
+                errors += 1
+            else:
+                warnings += 1
+            rendered = render_issue(issue).model_dump_json()
+            yield "issue", f'{{"rule":{name},"issue":{rendered}}}'
+        yield "rule", (
+            f'{{"rule":{name},"duration_ms":{run.duration_ns / 1e6},'
+            f'"issues":{len(run.issues)}}}'
+        )
+
+    summary = ValidationSummary(
+        errors=errors,
+        warnings=warnings,
+        is_valid=not errors,
+        total_ms=(perf_counter_ns() - started) / 1e6,
+    )
+    yield "summary", summary.model_dump_json()
+
+
+def format_ndjson(event: StreamEvent) -> str:
+    """Строка NDJSON: данные события с полем ``event``."""
+
+    kind, data = event
+    return f'{{"event":"{kind}",{data[1:]}\n'
+
+
+def format_sse(event: StreamEvent) -> str:
+    """Событие Server-Sent Events."""
+
+    kind, data = event
+    return f"event: {kind}\ndata: {data}\n\n"
@@ -0,0 +1,337 @@
+"""
+Общий этап анализа текста для текстовых правил валидации.
+
+Правила не просматривают текст блоков сами, а регистрируют именованные
+шаблоны для типов блоков (``text_check``). ``TextAnalyzer`` собирает все
+шаблоны, подписанные на тип блока, в одно регулярное выражение, поэтому
+каждое текстовое поле блока (абзац, элемент списка, заголовок)
+просматривается один раз, сколько бы правил его ни проверяло. Найденные
+совпадения раскладываются по именам шаблонов и передаются правилам.
+
+Результат анализа кэшируется по хэшу просматриваемых полей блока: все
+текстовые правила блока используют один просмотр, а неизменённый текст при
+повторных проверках не просматривается. В отличие от
+``BaseBlock.content_hash``, этот хэш не зависит от id и вложенных блоков: он
+не требует обхода поддерева раздела и общий для блоков с одинаковым текстом.
+"""
+
+from __future__ import annotations
+
+import functools
+import re
+from hashlib import blake2b
+from threading import Lock
+from types import MappingProxyType
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
+)
+
+from app.models import (
+    AppendixBlock,
+    BaseBlock,
+    FigureBlock,
+    ListBlock,
+    SectionBlock,
+    SubsectionBlock,
+    TableBlock,
+    TextBlock,
+)
+from app.services.cache import LRUCache
+from app.settings import settings
+
+from .issues import AnyIssue
+
+if TYPE_CHECKING:
+    # Движок при импорте загружает правила, а они — этот модуль.
+    from .engine import BlockCheck
+
+
+class TextMatch(NamedTuple):
+    """
+    Совпадение шаблона в текстовом поле блока.
+
+    - field: поле блока (``text``, ``items``, ``title``, ``caption``);
+    - index: номер элемента для полей-списков (для строковых полей — 0);
+    - start, end: границы совпадения в тексте поля;
+    - text: совпавший текст;
+    - groups: группы шаблона (``None`` для несовпавших групп).
+    """
+
+    field: str
+    index: int
+    start: int
+    end: int
+    text: str
+    groups: Tuple[Optional[str], ...] = ()
+
+
+#: Совпадения по имени шаблона; шаблоны без совпадений в словаре отсутствуют.
+TextMatches = Mapping[str, Tuple[TextMatch, ...]]
+
+#: Общий пустой результат анализа.
+NO_MATCHES: TextMatches = MappingProxyType({})
+
+#: Текстовые поля блоков, которые просматривает анализатор.
+TEXT_FIELDS: Dict[Type[BaseBlock], Tuple[str, ...]] = {
+    TextBlock: ("text",),
+    ListBlock: ("items",),
+    SectionBlock: ("title",),
+    SubsectionBlock: ("title",),
+    AppendixBlock: ("title",),
+    FigureBlock: ("caption",),
+    TableBlock: ("caption",),
+}
+
+#: Оценка памяти результата анализа: словарь плюс запись на каждое совпадение.
+MATCH_BYTES = 200
+
+
+def _matches_size(matches: TextMatches) -> int:
+    return 64 + MATCH_BYTES * sum(len(found) for found in matches.values())
+
+
+def keywords(*words: str) -> str:
+    """
+    Шаблон для набора ключевых слов или фраз: без учёта регистра и только
+    целыми словами. Более длинные фразы проверяются раньше коротких.
+    """
+
+    alternation = "|".join(
+        re.escape(word) for word in sorted(set(words), key=len, reverse=True)
+    )
+    return rf"(?i:\b(?:{alternation})\b)"
+
+
+class _Pattern(NamedTuple):
+    name: str
+    source: str
+    block_types: Tuple[Type[BaseBlock], ...]
+    groups: int
+    group_names: Tuple[str, ...]
+
+
+class _Matcher:
+    """Объединённый шаблон для одного типа блока."""
+
+    __slots__ = ("regex", "fields", "slots")
+
+    def __init__(self, patterns: Sequence[_Pattern], fields: Tuple[str, ...]) -> None:
+        # Каждый шаблон проверяется в своей опережающей проверке, поэтому в
+        # одной позиции срабатывают все подходящие шаблоны, а не только первый.
+        # Условия в конце отбрасывают позиции, где не совпал ни один шаблон.
+        lookaheads = "".join(f"(?:(?=({p.source})))?" for p in patterns)
+        self.fields = fields
+        # Номер внешней группы шаблона → (имя шаблона, число его групп).
+        self.slots: Dict[int, Tuple[str, int]] = {}
+        group = 1
+        for pattern in patterns:
+            self.slots[group] = (pattern.name, pattern.groups)
+            group += pattern.groups + 1
+        any_matched = "(?!)"
+        for group in reversed(self.slots):
+            any_matched = f"(?({group})|{any_matched})"
+        self.regex = re.compile(lookaheads + any_matched)
+
+    def texts(self, block: BaseBlock) -> Iterator[Tuple[str, int, str]]:
+        """Непустые текстовые поля блока: (поле, номер элемента, текст)."""
+
+        for field in self.fields:
+            value = getattr(block, field)
+            if value is None or isinstance(value, str):
+                if value:
+                    yield field, 0, value
+                continue
+            for index, text in enumerate(value):
+                if text:
+                    yield field, index, text
+
+    def digest(self, block: BaseBlock) -> bytes:
+        digest = blake2b(type(block).__name__.encode(), digest_size=16)
+        for field, index, text in self.texts(block):
+            digest.update(b"\x00%s\x00%d\x00" % (field.encode(), index))
+            # JSON допускает одиночные суррогаты («\ud800»), а строгий UTF-8 — нет.
+            digest.update(text.encode("utf-8", "surrogatepass"))
+        return digest.digest()
+
+    def scan(self, block: BaseBlock) -> TextMatches:
+        """
+        Совпадения шаблонов в полях блока — те же, что дал бы ``finditer``
+        каждого шаблона по отдельности: совпадения разных шаблонов могут
+        перекрываться, одного шаблона — нет.
+        """
+
+        found: Dict[str, List[TextMatch]] = {}
+        finditer, slots = self.regex.finditer, self.slots
+        for field, index, text in self.texts(block):
+            # Позиция, с которой шаблон может совпасть снова.
+            resume = dict.fromkeys(slots, 0)
+            for match in finditer(text):
+                for group, (name, count) in slots.items():
+                    start, end = match.span(group)
+                    if start < resume[group]:
+                        continue
+                    resume[group] = end if end > start else start + 1
+                    found.setdefault(name, []).append(
+                        TextMatch(
+                            field,
+                            index,
+                            start,
+                            end,
+                            match.group(group),
+                            match.groups()[group : group + count],
+                        )
+                    )
+        if not found:
+            return NO_MATCHES
+        return MappingProxyType({name: tuple(items) for name, items in found.items()})
+
+
+class TextAnalyzer:
+    """
+    Реестр именованных шаблонов и их однопроходное применение к блокам.
+
+    Шаблоны одного типа блока объединяются в одно выражение, но каждый
+    находит те же совпадения, что и при отдельном просмотре: совпадения разных
+    шаблонов могут перекрываться и не зависят от порядка регистрации. Группы внутри
+    шаблона допустимы (в ``TextMatch.groups``), обратные ссылки по номеру — нет;
+    имена именованных групп должны быть уникальны среди всех шаблонов.
+    """
+
+    def __init__(
+        self,
+        fields: Mapping[Type[BaseBlock], Tuple[str, ...]] = TEXT_FIELDS,
+        cache_max_bytes: int = settings.text_cache_max_bytes,
+    ) -> None:
+        self.fields = dict(fields)
+        self.cache: LRUCache[TextMatches] = LRUCache(
+            max_bytes=cache_max_bytes, sizeof=_matches_size
+        )
+        self._patterns: Dict[str, _Pattern] = {}
+        self._matchers: Dict[Type[BaseBlock], Optional[_Matcher]] = {}
+        self._version = 0
+        self._lock = Lock()
+
+    def register(
+        self, name: str, pattern: str, block_types: Sequence[Type[BaseBlock]]
+    ) -> None:
+        """
+        Регистрирует шаблон ``pattern`` под именем ``name`` для блоков типов
+        ``block_types``. Повторная регистрация того же шаблона ничего не
+        меняет; другой шаблон под занятым именем — ``ValueError``.
+        """
+
+        block_types = tuple(block_types)
+        compiled = re.compile(f"(?:{pattern})")
+        with self._lock:
+            existing = self._patterns.get(name)
+            if existing is not None:
+                if (existing.source, existing.block_types) == (pattern, block_types):
+                    return
+                raise ValueError(f"Шаблон {name!r} уже зарегистрирован.")
+            taken = {
+                group
+                for other in self._patterns.values()
+                for group in other.group_names
+            }
+            clashing = taken.intersection(compiled.groupindex)
+            if clashing:
+                raise ValueError(
+                    f"Имена групп {sorted(clashing)} уже используются другими "
+                    "шаблонами."
+                )
+            self._patterns[name] = _Pattern(
+                name,
+                pattern,
+                block_types,
+                compiled.groups,
+                tuple(compiled.groupindex),
+            )
+            self._matchers = {}
+            self._version += 1
+
+    def _matcher(self, block_type: Type[BaseBlock]) -> Optional[_Matcher]:
+        matchers = self._matchers
+        if block_type in matchers:
+            return matchers[block_type]
+
+        fields = self.fields.get(block_type)
+        patterns = [
+            pattern
+            for pattern in self._patterns.values()
+            if issubclass(block_type, pattern.block_types)
+        ]
+        matcher = _Matcher(patterns, fields) if fields and patterns else None
+        matchers[block_type] = matcher
+        return matcher
+
+    def analyze(self, block: BaseBlock) -> TextMatches:
+        """
+        Совпадения всех шаблонов, подписанных на тип блока, в его текстовых
+        полях. Блоки без подписанных шаблонов не просматриваются.
+        """
+
+        matcher = self._matcher(type(block))
+        if matcher is None:
+            return NO_MATCHES
+
+        key = (self._version, matcher.digest(block))
+        matches = self.cache.get(key)
+        if matches is None:
+            matches = matcher.scan(block)
+            self.cache.put(key, matches)
+        return matches
+
+
+#: Общий анализатор текста правил валидации.
+text_analyzer = TextAnalyzer()
+
+TextCheck = Callable[[Any, TextMatches], Sequence[AnyIssue]]
+
+
+def text_check(
+    *block_types: Type[BaseBlock],
+    cached: bool = True,
+    cpu_heavy: bool = False,
+    **patterns: str,
+) -> Callable[[TextCheck], BlockCheck]:
+    """
+    Превращает функцию ``check(block, matches)`` в правило ``BlockCheck``,
+    получающее совпадения своих шаблонов из общего анализатора текста.
+
+    Шаблоны передаются именованными аргументами и регистрируются в
+    ``text_analyzer`` для ``block_types``. Как и у ``block_check``, ``cached``
+    кэширует замечания по хэшу поддерева блока; для блоков с вложенными блоками
+    (разделы) его лучше отключить: хэш поддерева требует его обхода. В
+    ``matches`` приходят совпадения всех шаблонов блока; правило берёт свои по
+    имени. Пример::
+
+        @text_check(TextBlock, work_goal=keywords("Цель работы"))
+        def rule_work_goal(block: TextBlock, matches: TextMatches) -> ...:
+            if "work_goal" in matches:
+                ...
+    """
+
+    for name, pattern in patterns.items():
+        text_analyzer.register(name, pattern, block_types)
+
+    def decorator(check: TextCheck) -> BlockCheck:
+        from .engine import BlockCheck
+
+        @functools.wraps(check)
+        def run(block: BaseBlock) -> Sequence[AnyIssue]:
+            return check(block, text_analyzer.analyze(block))
+
+        return BlockCheck(run, block_types, cached=cached, cpu_heavy=cpu_heavy)
+
+    return decorator
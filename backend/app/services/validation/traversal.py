@@ -0,0 +1,18 @@
+from __future__ import annotations
+
+from typing import Iterable, List
+
+from app.models import BaseBlock, Report
+
+
+def iter_blocks(report: Report) -> Iterable[BaseBlock]:
+    """
+    Depth-first traversal of all blocks in the report, including nested children.
+    """
+
+    stack: List[BaseBlock] = list(reversed(report.blocks))
+    while stack:
+        block = stack.pop()
+        yield block
+        if block.children:
+            stack.extend(reversed(block.children))
@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+import os
+from dataclasses import dataclass
+
+
+def _env_int(name: str, default: int) -> int:
+    value = os.environ.get(name)
+    return int(value) if value else default
+
+
+def _env_str(name: str, default: str) -> str:
+    return os.environ.get(name) or default
+
+
+@dataclass(frozen=True)
+class Settings:
+    """
+    Настройки бэкенда. Значения по умолчанию можно переопределить переменными
+    окружения с префиксом ``GHOST_`` (например, ``GHOST_RULE_CACHE_MAX_BYTES``).
+    """
+
+    #: Ограничение памяти кэша результатов поблочных правил, байт.
+    rule_cache_max_bytes: int = 32 * 1024 * 1024
+
+    #: Ограничение памяти кэша результатов анализа текста блоков, байт.
+    text_cache_max_bytes: int = 8 * 1024 * 1024
+
+    #: Ограничение памяти кэша измерений блоков для оценки вёрстки, байт.
+    layout_cache_max_bytes: int = 16 * 1024 * 1024
+
+    #: Ограничение памяти кэша готовых ответов ``POST /reports/validate``, байт.
+    result_cache_max_bytes: int = 16 * 1024 * 1024
+
+    #: Сколько хранится готовый ответ проверки в кэше, с.
+    result_cache_ttl_seconds: int = 600
+
+    #: Ограничение памяти кэша фрагментов документа при экспорте в DOCX, байт.
+    docx_cache_max_bytes: int = 32 * 1024 * 1024
+
+    #: Число потоков/процессов для параллельного запуска правил валидации.
+    validation_workers: int = os.cpu_count() or 1
+
+    #: Максимальный размер тела запроса с отчётом, байт.
+    max_request_body_bytes: int = 16 * 1024 * 1024
+
+    #: Максимальное число блоков в отчёте (с учётом вложенных).
+    max_report_blocks: int = 50_000
+
+    #: Максимальная глубина вложенности блоков.
+    max_report_depth: int = 32
+
+    #: Сколько отчётов эндпоинты проверки обрабатывают одновременно.
+    report_concurrency: int = os.cpu_count() or 1
+
+    #: Сколько запросов может ждать своей очереди; остальные получают 429.
+    report_queue_size: int = 64
+
+    #: Сколько запрос может ждать в очереди, мс; затем он получает 503.
+    report_queue_timeout_ms: int = 5000
+
+    #: Каталог хранилища изображений рисунков.
+    image_store_dir: str = os.path.join("data", "images")
+
+    #: Максимальный размер загружаемого изображения, байт.
+    max_image_bytes: int = 20 * 1024 * 1024
+
+    #: Разрешение, до которого уменьшаются изображения для экспорта, точек на дюйм.
+    image_export_dpi: int = 300
+
+    #: Наибольшая сторона миниатюры изображения для предпросмотра, пикселей.
+    image_thumbnail_px: int = 320
+
+    #: Число процессов для подготовки изображений.
+    image_workers: int = os.cpu_count() or 1
+
+    #: Каталог готовых файлов фонового экспорта.
+    export_dir: str = os.path.join("data", "exports")
+
+    #: Число процессов фонового экспорта.
+    export_workers: int = os.cpu_count() or 1
+
+    #: Сколько хранится готовый файл фонового экспорта, с.
+    export_ttl_seconds: int = 3600
+
+    #: Ограничение общего объёма готовых файлов фонового экспорта, байт.
+    export_max_bytes: int = 1024 * 1024 * 1024
+
+
+def load_settings() -> Settings:
+    """Читает настройки из переменных окружения."""
+
+    defaults = Settings()
+    return Settings(
+        rule_cache_max_bytes=_env_int(
+            "GHOST_RULE_CACHE_MAX_BYTES", defaults.rule_cache_max_bytes
+        ),
+        text_cache_max_bytes=_env_int(
+            "GHOST_TEXT_CACHE_MAX_BYTES", defaults.text_cache_max_bytes
+        ),
+        layout_cache_max_bytes=_env_int(
+            "GHOST_LAYOUT_CACHE_MAX_BYTES", defaults.layout_cache_max_bytes
+        ),
+        result_cache_max_bytes=_env_int(
+            "GHOST_RESULT_CACHE_MAX_BYTES", defaults.result_cache_max_bytes
+        ),
+        result_cache_ttl_seconds=_env_int(
+            "GHOST_RESULT_CACHE_TTL_SECONDS", defaults.result_cache_ttl_seconds
+        ),
+        docx_cache_max_bytes=_env_int(
+            "GHOST_DOCX_CACHE_MAX_BYTES", defaults.docx_cache_max_bytes
+        ),
+        validation_workers=_env_int(
+            "GHOST_VALIDATION_WORKERS", defaults.validation_workers
+        ),
+        max_request_body_bytes=_env_int(
+            "GHOST_MAX_REQUEST_BODY_BYTES", defaults.max_request_body_bytes
+        ),
+        max_report_blocks=_env_int(
+            "GHOST_MAX_REPORT_BLOCKS", defaults.max_report_blocks
+        ),
+        max_report_depth=_env_int("GHOST_MAX_REPORT_DEPTH", defaults.max_report_depth),
+        report_concurrency=_env_int(
+            "GHOST_REPORT_CONCURRENCY", defaults.report_concurrency
+        ),
+        report_queue_size=_env_int(
+            "GHOST_REPORT_QUEUE_SIZE", defaults.report_queue_size
+        ),
+        report_queue_timeout_ms=_env_int(
+            "GHOST_REPORT_QUEUE_TIMEOUT_MS", defaults.report_queue_timeout_ms
+        ),
+        image_store_dir=_env_str("GHOST_IMAGE_STORE_DIR", defaults.image_store_dir),
+        max_image_bytes=_env_int("GHOST_MAX_IMAGE_BYTES", defaults.max_image_bytes),
+        image_export_dpi=_env_int("GHOST_IMAGE_EXPORT_DPI", defaults.image_export_dpi),
+        image_thumbnail_px=_env_int(
+            "GHOST_IMAGE_THUMBNAIL_PX", defaults.image_thumbnail_px
+        ),
+        image_workers=_env_int("GHOST_IMAGE_WORKERS", defaults.image_workers),
+        export_dir=_env_str("GHOST_EXPORT_DIR", defaults.export_dir),
+        export_workers=_env_int("GHOST_EXPORT_WORKERS", defaults.export_workers),
+        export_ttl_seconds=_env_int(
+            "GHOST_EXPORT_TTL_SECONDS", defaults.export_ttl_seconds
+        ),
+        export_max_bytes=_env_int("GHOST_EXPORT_MAX_BYTES", defaults.export_max_bytes),
+    )
+
+
+settings = load_settings()
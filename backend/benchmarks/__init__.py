@@ -0,0 +1,4 @@
+"""
+Бенчмарки бэкенда: генератор синтетических отчётов, замеры этапов проверки
+(``python -m benchmarks.run``) и тесты масштабирования (``pytest benchmarks``).
+"""
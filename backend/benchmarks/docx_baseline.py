@@ -0,0 +1,68 @@
+"""
+Наивный экспорт в DOCX через python-docx: всё дерево документа строится в
+памяти и сохраняется целиком. Точка сравнения для потокового
+``app.services.export.docx.iter_docx`` (время до первого байта и пик памяти);
+нужен пакет ``python-docx`` (``requirements-dev.txt``).
+"""
+
+from __future__ import annotations
+
+from io import BytesIO
+
+from app.models import (
+    AppendixBlock,
+    FigureBlock,
+    ListBlock,
+    ReferencesBlock,
+    Report,
+    SectionBlock,
+    SubsectionBlock,
+    TableBlock,
+    TextBlock,
+)
+from app.services.validation.traversal import iter_blocks
+
+
+def build_docx(report: Report) -> bytes:
+    """DOCX отчёта, собранный python-docx из дерева объектов."""
+
+    from docx import Document
+    from docx.shared import Pt
+
+    document = Document()
+    normal = document.styles["Normal"]
+    normal.font.name = "Times New Roman"
+    normal.font.size = Pt(12)
+
+    for block in iter_blocks(report):
+        if isinstance(block, SectionBlock):
+            document.add_heading(block.title, level=1)
+        elif isinstance(block, SubsectionBlock):
+            document.add_heading(block.title, level=block.level)
+        elif isinstance(block, AppendixBlock):
+            document.add_heading(f"ПРИЛОЖЕНИЕ {block.label} – {block.title}", 1)
+        elif isinstance(block, TextBlock):
+            for paragraph in block.text.split("\n"):
+                document.add_paragraph(paragraph)
+        elif isinstance(block, ListBlock):
+            style = "List Number" if block.list_type == "numbered" else "List Bullet"
+            for item in block.items:
+                document.add_paragraph(item, style=style)
+        elif isinstance(block, TableBlock):
+            document.add_paragraph(block.caption)
+            columns = max((len(row) for row in block.rows), default=0)
+            if columns:
+                table = document.add_table(rows=len(block.rows), cols=columns)
+                for row, values in zip(table.rows, block.rows, strict=False):
+                    for cell, value in zip(row.cells, values, strict=False):
+                        cell.text = value
+        elif isinstance(block, FigureBlock):
+            document.add_paragraph(f"[{block.file_name}]")
+            document.add_paragraph(block.caption)
+        elif isinstance(block, ReferencesBlock):
+            for number, item in enumerate(block.items, start=1):
+                document.add_paragraph(f"{number}. {item}")
+
+    buffer = BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
@@ -0,0 +1,211 @@
+from __future__ import annotations
+
+import random
+from dataclasses import dataclass, replace
+from datetime import date
+from typing import List, Optional
+from uuid import UUID
+
+from app.models import (
+    AppendixBlock,
+    BaseBlock,
+    FigureBlock,
+    ListBlock,
+    ReferencesBlock,
+    Report,
+    ReportBlock,
+    ReportMeta,
+    SectionBlock,
+    SubsectionBlock,
+    TableBlock,
+    TextBlock,
+    WorkType,
+)
+
+APPENDIX_LABELS = "АБВГДЕЖИКЛМНПРСТУФХЦШЩЭЮЯ"
+
+_WORDS = (
+    "анализ данных процесс система модель производство технология схема "
+    "показатель результат метод расчёт оборудование контроль качество этап "
+    "исследование параметр структура управление проект разработка отчёт"
+).split()
+
+
+@dataclass(frozen=True)
+class ReportShape:
+    """
+    Форма синтетического отчёта.
+
+    - sections: число основных разделов между ВВЕДЕНИЕМ и ЗАКЛЮЧЕНИЕМ;
+    - depth: глубина вложенности (1 — только разделы, 2 и 3 — подразделы
+      соответствующего уровня);
+    - fanout: число подразделов в каждом разделе/подразделе;
+    - paragraphs: текстовых блоков в каждом разделе/подразделе;
+    - words: слов в одном текстовом блоке;
+    - table_rows, table_cols: размер таблиц;
+    - appendices: число приложений.
+    """
+
+    sections: int = 10
+    depth: int = 2
+    fanout: int = 2
+    paragraphs: int = 3
+    words: int = 120
+    table_rows: int = 5
+    table_cols: int = 4
+    appendices: int = 2
+
+    @property
+    def blocks_per_section(self) -> int:
+        units = sum(self.fanout**level for level in range(self.depth))
+        # Сам раздел/подраздел, абзацы, список, таблица и рисунок.
+        return units * (1 + self.paragraphs + 3)
+
+
+def shape_for_blocks(blocks: int, **overrides: int) -> ReportShape:
+    """Подбирает число разделов так, чтобы в отчёте было около ``blocks`` блоков."""
+
+    shape = replace(ReportShape(), **overrides)
+    sections = max(1, round(blocks / shape.blocks_per_section))
+    return replace(shape, sections=sections)
+
+
+class _Builder:
+    def __init__(self, shape: ReportShape, seed: int) -> None:
+        self.shape = shape
+        self.random = random.Random(seed)
+        self.figures = 0
+        self.tables = 0
+
+    def uuid(self) -> UUID:
+        return UUID(int=self.random.getrandbits(128), version=4)
+
+    def sentence(self, words: int) -> str:
+        text = " ".join(self.random.choices(_WORDS, k=words))
+        return text[0].upper() + text[1:] + "."
+
+    def text(self) -> TextBlock:
+        return TextBlock(id=self.uuid(), text=self.sentence(self.shape.words))
+
+    def content(self) -> List[ReportBlock]:
+        shape = self.shape
+        self.figures += 1
+        self.tables += 1
+        # Рисунок сразу после упоминающего его абзаца, затем таблица и список.
+        blocks: List[ReportBlock] = [self.text()]
+        blocks.append(
+            FigureBlock(
+                id=self.uuid(),
+                caption=f"Рисунок {self.figures} – {self.sentence(4)}",
+                file_name=f"figure{self.figures}.png",
+            )
+        )
+        blocks.append(
+            TableBlock(
+                id=self.uuid(),
+                caption=f"Таблица {self.tables} – {self.sentence(4)}",
+                rows=[
+                    [self.sentence(2) for _ in range(shape.table_cols)]
+                    for _ in range(shape.table_rows)
+                ],
+            )
+        )
+        blocks.append(
+            ListBlock(
+                id=self.uuid(),
+                list_type=self.random.choice(("bulleted", "numbered")),
+                items=[self.sentence(6) for _ in range(3)],
+            )
+        )
+        blocks.extend(self.text() for _ in range(shape.paragraphs - 1))
+        return blocks
+
+    def unit(self, number: str, level: int) -> BaseBlock:
+        children = self.content()
+        if level < self.shape.depth:
+            children.extend(
+                self.unit(f"{number}.{index}", level + 1)
+                for index in range(1, self.shape.fanout + 1)
+            )
+        title = f"{number} {self.sentence(3)}"
+        if level == 1:
+            return SectionBlock(id=self.uuid(), title=title, children=children)
+        return SubsectionBlock(
+            id=self.uuid(), title=title, level=level, children=children
+        )
+
+
+def generate_report(shape: Optional[ReportShape] = None, seed: int = 0) -> Report:
+    """
+    Строит детерминированный (при одном и том же ``seed``) отчёт заданной формы,
+    проходящий все правила валидации: ВВЕДЕНИЕ, основные разделы с подразделами,
+    таблицами, рисунками и списками, ЗАКЛЮЧЕНИЕ, список источников и приложения.
+    """
+
+    shape = shape or ReportShape()
+    if not 1 <= shape.depth <= 3:
+        raise ValueError("depth должен быть от 1 до 3")
+    if shape.paragraphs < 1:
+        raise ValueError("paragraphs должен быть не меньше 1")
+
+    builder = _Builder(shape, seed)
+    meta = ReportMeta(
+        work_type=WorkType.COURSE,
+        discipline="Технологические основы производства",
+        topic="Синтетический отчёт для бенчмарков",
+        student_full_name="Иванов Иван Иванович",
+        group="ББИ-24-3",
+        semester="2",
+        direction_code="38.03.05",
+        direction_name="Бизнес-информатика",
+        department="Кафедра бизнес-информатики",
+        teacher_full_name="Петров Петр Петрович",
+        submission_date=date(2025, 3, 15),
+    )
+    blocks: List[ReportBlock] = [
+        SectionBlock(
+            id=builder.uuid(),
+            title="ВВЕДЕНИЕ",
+            special_kind="INTRO",
+            children=[builder.text()],
+        )
+    ]
+    blocks.extend(
+        builder.unit(str(number), 1) for number in range(1, shape.sections + 1)
+    )
+    blocks.append(
+        SectionBlock(
+            id=builder.uuid(),
+            title="ЗАКЛЮЧЕНИЕ",
+            special_kind="CONCLUSION",
+            children=[builder.text()],
+        )
+    )
+    blocks.append(
+        ReferencesBlock(
+            id=builder.uuid(),
+            items=[builder.sentence(8) for _ in range(max(3, shape.sections))],
+        )
+    )
+    blocks.extend(
+        AppendixBlock(
+            id=builder.uuid(),
+            label=APPENDIX_LABELS[index % len(APPENDIX_LABELS)],
+            title=builder.sentence(3),
+            children=[builder.text()],
+        )
+        for index in range(min(shape.appendices, len(APPENDIX_LABELS)))
+    )
+    return Report(meta=meta, blocks=blocks)
+
+
+def count_blocks(report: Report) -> int:
+    """Число блоков в отчёте с учётом вложенных."""
+
+    stack = list(report.blocks)
+    count = 0
+    while stack:
+        block = stack.pop()
+        count += 1
+        stack.extend(block.children)
+    return count
@@ -0,0 +1,293 @@
+"""
+Замеры этапов проверки на синтетических отчётах разного размера.
+
+    python -m benchmarks.run --blocks 100 1000 10000 --output bench.json
+
+Результат — JSON, который можно сравнивать между коммитами: для каждого
+размера отчёта время разбора JSON, сохранения и загрузки бинарного файла
+проекта, проверки (с пустым и заполненным кэшем
+правил), каждого правила отдельно и полного запроса через TestClient.
+Для экспорта в DOCX дополнительно замеряются время до первой части архива и
+пик памяти — у потокового экспорта (с пустым и заполненным кэшем
+фрагментов) и, если установлен python-docx, у наивной сборки документа
+деревом (``docx_baseline``).
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import tracemalloc
+from dataclasses import replace
+from datetime import datetime, timezone
+from time import perf_counter_ns
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+
+from fastapi.testclient import TestClient
+
+from app.api.admission import report_admission
+from app.main import app
+from app.models import Report
+from app.services.export.docx import fragment_cache, iter_docx
+from app.services.layout.estimator import layout_cache
+from app.services.reports.project_file import dump_project, load_project
+from app.services.validation.engine import (
+    RULES,
+    execute_rules,
+    rule_cache,
+    rule_name,
+    validate_report,
+)
+from app.services.validation.result_cache import result_cache
+from app.services.validation.text_analysis import text_analyzer
+
+from .generator import count_blocks, generate_report, shape_for_blocks
+
+DEFAULT_SIZES = (100, 1_000, 10_000)
+
+STAGES = (
+    "parse",
+    "project_save",
+    "project_load",
+    "validate",
+    "validate_cached",
+    "api_round_trip",
+    "export_docx",
+    "export_docx_cached",
+)
+
+#: Этапы для сравнения, которые не входят в тесты масштабирования.
+BASELINE_STAGES = ("export_docx_baseline",)
+
+
+def measure(
+    action: Callable[[], Any],
+    repeat: int,
+    setup: Optional[Callable[[], None]] = None,
+) -> Dict[str, float]:
+    """Выполняет ``action`` ``repeat`` раз и возвращает min/median в миллисекундах."""
+
+    samples: List[int] = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        started = perf_counter_ns()
+        action()
+        samples.append(perf_counter_ns() - started)
+    return {
+        "min_ms": min(samples) / 1e6,
+        "median_ms": statistics.median(samples) / 1e6,
+    }
+
+
+def measure_stream(
+    produce: Callable[[], Iterable[bytes]],
+    repeat: int,
+    setup: Optional[Callable[[], None]] = None,
+) -> Dict[str, float]:
+    """
+    Как ``measure``, но для потока частей: дополнительно время до первой части
+    (``first_chunk_ms``, минимум) и пик памяти Python за один прогон
+    (``peak_kib``, по ``tracemalloc``, отдельно от замеров времени).
+    """
+
+    totals: List[int] = []
+    firsts: List[int] = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        started = perf_counter_ns()
+        first: Optional[int] = None
+        for _chunk in produce():
+            if first is None:
+                first = perf_counter_ns() - started
+        totals.append(perf_counter_ns() - started)
+        firsts.append(first if first is not None else totals[-1])
+
+    if setup is not None:
+        setup()
+    tracemalloc.start()
+    try:
+        for _chunk in produce():
+            pass
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {
+        "min_ms": min(totals) / 1e6,
+        "median_ms": statistics.median(totals) / 1e6,
+        "first_chunk_ms": min(firsts) / 1e6,
+        "peak_kib": peak / 1024,
+    }
+
+
+def run_benchmark(
+    blocks: int,
+    seed: int = 0,
+    repeat: int = 5,
+    stages: Sequence[str] = STAGES,
+    per_rule: bool = True,
+) -> Dict[str, Any]:
+    """Замеряет этапы ``stages`` на отчёте примерно из ``blocks`` блоков."""
+
+    payload = generate_report(shape_for_blocks(blocks), seed=seed).model_dump_json()
+    report = Report.model_validate_json(payload)
+    fresh: List[Report] = []
+
+    def cold() -> None:
+        # Новый экземпляр отчёта без запомненных хэшей и пустые кэши правил,
+        # анализа текста, измерений вёрстки и готовых ответов.
+        rule_cache.clear()
+        text_analyzer.cache.clear()
+        layout_cache.clear()
+        result_cache.clear()
+        fresh[:] = [Report.model_validate_json(payload)]
+
+    measurements: Dict[str, Dict[str, float]] = {}
+    if "parse" in stages:
+        measurements["parse"] = measure(
+            lambda: Report.model_validate_json(payload), repeat
+        )
+    project = dump_project(report)
+    if "project_save" in stages:
+        measurements["project_save"] = measure(lambda: dump_project(report), repeat)
+    if "project_load" in stages:
+        measurements["project_load"] = measure(lambda: load_project(project), repeat)
+    if "validate" in stages:
+        measurements["validate"] = measure(
+            lambda: validate_report(fresh[0]), repeat, setup=cold
+        )
+    if "validate_cached" in stages:
+        validate_report(report)
+        measurements["validate_cached"] = measure(
+            lambda: validate_report(report), repeat
+        )
+    if "api_round_trip" in stages:
+        client = TestClient(app)
+        body = payload.encode()
+        headers = {"Content-Type": "application/json"}
+
+        def round_trip() -> None:
+            response = client.post(
+                "/api/v1/reports/validate", content=body, headers=headers
+            )
+            response.raise_for_status()
+
+        # Замеряется обработка, а не ограничения размера: снимаем их на время
+        # замера, чтобы проходили и самые большие отчёты.
+        limits = report_admission.limits
+        report_admission.limits = replace(
+            limits,
+            max_body_bytes=max(limits.max_body_bytes, len(body)),
+            max_blocks=max(limits.max_blocks, count_blocks(report)),
+        )
+        try:
+            measurements["api_round_trip"] = measure(round_trip, repeat, setup=cold)
+        finally:
+            report_admission.limits = limits
+
+    if "export_docx" in stages:
+        measurements["export_docx"] = measure_stream(
+            lambda: iter_docx(report), repeat, setup=fragment_cache.clear
+        )
+    if "export_docx_cached" in stages:
+        # Повторный экспорт: разметка всех блоков уже в кэше фрагментов.
+        for _chunk in iter_docx(report):
+            pass
+        measurements["export_docx_cached"] = measure_stream(
+            lambda: iter_docx(report), repeat
+        )
+    if "export_docx_baseline" in stages:
+        try:
+            import docx  # noqa: F401
+
+            from .docx_baseline import build_docx
+        except ImportError:
+            pass
+        else:
+            measurements["export_docx_baseline"] = measure_stream(
+                lambda: [build_docx(report)], repeat
+            )
+
+    rules: Dict[str, float] = {}
+    if per_rule:
+        for rule in RULES:
+            samples = []
+            for _ in range(repeat):
+                cold()
+                samples.append(execute_rules(fresh[0], [rule])[0].duration_ns)
+            rules[rule_name(rule)] = min(samples) / 1e6
+
+    return {
+        "blocks": count_blocks(report),
+        "payload_bytes": len(payload),
+        "project_bytes": len(project),
+        "stages": measurements,
+        "rules_min_ms": rules,
+    }
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.run")
+    parser.add_argument(
+        "--blocks",
+        type=int,
+        nargs="+",
+        default=list(DEFAULT_SIZES),
+        help="Размеры отчётов (число блоков).",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("-o", "--output", help="Файл для JSON (по умолчанию stdout).")
+    args = parser.parse_args(argv)
+
+    results = []
+    for blocks in args.blocks:
+        print(f"{blocks} блоков...", file=sys.stderr)
+        results.append(
+            run_benchmark(
+                blocks,
+                seed=args.seed,
+                repeat=args.repeat,
+                stages=STAGES + BASELINE_STAGES,
+            )
+        )
+
+    document = {
+        "meta": {
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "seed": args.seed,
+            "repeat": args.repeat,
+        },
+        "results": results,
+    }
+    text = json.dumps(document, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output:
+            output.write(text + "\n")
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
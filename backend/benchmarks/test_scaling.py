@@ -0,0 +1,47 @@
+"""
+Тесты масштабирования: время каждого этапа должно расти не быстрее, чем
+примерно линейно от числа блоков. Запускаются отдельно от основных тестов
+(в CI — отдельным шагом, около 20 секунд)::
+
+    pytest benchmarks
+
+Размеры небольшие, поэтому степень роста оценивается по всем точкам сразу
+(наклон прямой в логарифмических координатах), а не между соседними
+размерами: так шум одного замера не решает исход теста.
+"""
+
+import math
+import statistics
+
+import pytest
+
+from .run import STAGES, run_benchmark
+
+SIZES = (500, 2_000, 8_000)
+
+#: Допустимый показатель степени роста:
+#: 1.0 — строго линейный рост, запас — на шум и кэши процессора.
+MAX_EXPONENT = 1.3
+
+
+@pytest.fixture(scope="module")
+def timings():
+    return {blocks: run_benchmark(blocks, repeat=3, per_rule=False) for blocks in SIZES}
+
+
+@pytest.mark.parametrize("stage", STAGES)
+def test_stage_scales_linearly(timings, stage):
+    points = [
+        (result["blocks"], result["stages"][stage]["min_ms"])
+        for result in timings.values()
+    ]
+
+    exponent, _ = statistics.linear_regression(
+        [math.log(blocks) for blocks, _ in points],
+        [math.log(ms) for _, ms in points],
+    )
+    assert exponent <= MAX_EXPONENT, (
+        f"{stage}: "
+        + ", ".join(f"{blocks} блоков — {ms:.1f} мс" for blocks, ms in points)
+        + f" (степень {exponent:.2f})"
+    )
@@ -0,0 +1,176 @@
+import asyncio
+import json
+from dataclasses import replace
+from datetime import date
+
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+
+from app.api.admission import AdmissionController, ReportLimits, report_admission
+from app.main import app
+from app.models import Report, ReportMeta, SectionBlock, TextBlock, WorkType
+
+
+def build_report(sections: int = 2, depth: int = 1) -> Report:
+    meta = ReportMeta(
+        work_type=WorkType.LAB,
+        work_number=1,
+        discipline="Информатика",
+        topic="Ограничения запросов",
+        student_full_name="Иванов Иван Иванович",
+        group="ББИ-24-3",
+        semester="2",
+        direction_code="38.03.05",
+        direction_name="Бизнес-информатика",
+        department="Кафедра бизнес-информатики",
+        teacher_full_name="Петров Петр Петрович",
+        submission_date=date(2025, 3, 15),
+    )
+    blocks = []
+    for number in range(sections):
+        block = TextBlock(text="Текст.")
+        for _ in range(depth - 1):
+            block = SectionBlock(title=f"{number} Раздел", children=[block])
+        blocks.append(block)
+    return Report(meta=meta, blocks=blocks)
+
+
+@pytest.fixture
+def limits(monkeypatch):
+    def apply(**overrides):
+        monkeypatch.setattr(
+            report_admission, "limits", replace(report_admission.limits, **overrides)
+        )
+
+    return apply
+
+
+def test_body_size_is_limited_while_reading(limits):
+    body = build_report().model_dump_json().encode()
+    limits(max_body_bytes=len(body) - 1)
+
+    def chunks():
+        yield body[:100]
+        yield body[100:]
+
+    with TestClient(app) as client:
+        declared = client.post(
+            "/api/v1/reports/validate",
+            content=body,
+            headers={"Content-Type": "application/json"},
+        )
+        streamed = client.post(
+            "/api/v1/reports/validate",
+            content=chunks(),
+            headers={"Content-Type": "application/json"},
+        )
+
+    assert declared.status_code == 413
+    assert streamed.status_code == 413
+
+
+def test_block_count_and_depth_are_limited_before_model_validation(limits):
+    limits(max_blocks=3, max_depth=3)
+    too_many = build_report(sections=4).model_dump(mode="json")
+    too_deep = build_report(sections=1, depth=4).model_dump(mode="json")
+    fitting = build_report(sections=1, depth=3).model_dump(mode="json")
+
+    with TestClient(app) as client:
+        responses = [
+            client.post("/api/v1/reports/validate", json=payload)
+            for payload in (too_many, too_deep, fitting)
+        ]
+        version = client.post("/api/v1/reports/versions", json=too_many)
+
+    assert [response.status_code for response in responses] == [413, 413, 200]
+    assert "блоков" in responses[0].json()["detail"]
+    assert "Вложенность" in responses[1].json()["detail"]
+    assert version.status_code == 413
+
+
+def test_pathologically_nested_json_is_rejected():
+    body = b'{"meta": ' + b"[" * 100_000 + b"]" * 100_000 + b"}"
+
+    with TestClient(app) as client:
+        response = client.post(
+            "/api/v1/reports/validate",
+            content=body,
+            headers={"Content-Type": "application/json"},
+        )
+
+    assert response.status_code == 413
+
+
+def test_controller_queues_rejects_and_hands_over_slots():
+    controller = AdmissionController(
+        ReportLimits(1024, 10, 3), concurrency=1, queue_size=1, queue_timeout=0.05
+    )
+
+    async def scenario():
+        first = await controller.acquire()
+        waiting = asyncio.ensure_future(controller.acquire())
+        await asyncio.sleep(0)
+        assert controller.stats()["queued"] == 1
+
+        with pytest.raises(HTTPException) as full:
+            await controller.acquire()
+        assert full.value.status_code == 429
+        assert full.value.headers == {"Retry-After": "1"}
+
+        first.release()
+        first.release()
+        second = await waiting
+        assert controller.stats()["active"] == 1
+
+        with pytest.raises(HTTPException) as timed_out:
+            await controller.acquire()
+        assert timed_out.value.status_code == 503
+        assert "Retry-After" in timed_out.value.headers
+
+        second.release()
+        assert controller.stats() == {
+            "limits": {
+                "max_body_bytes": 1024,
+                "max_blocks": 10,
+                "max_depth": 3,
+                "concurrency": 1,
+                "queue_size": 1,
+                "queue_timeout_ms": 50,
+            },
+            "active": 0,
+            "queued": 0,
+        }
+
+    asyncio.run(scenario())
+
+
+def test_saturated_endpoint_answers_with_retry_after(monkeypatch):
+    controller = AdmissionController(
+        report_admission.limits, concurrency=1, queue_size=0, queue_timeout=1
+    )
+    monkeypatch.setattr("app.api.v1.reports.report_admission", controller)
+    controller._active = 1
+
+    with TestClient(app) as client:
+        response = client.post(
+            "/api/v1/reports/validate", json=build_report().model_dump(mode="json")
+        )
+
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "1"
+
+
+def test_stream_releases_its_slot_and_health_reports_load():
+    payload = build_report().model_dump(mode="json")
+
+    with TestClient(app) as client:
+        stream = client.post("/api/v1/reports/validate/stream", json=payload)
+        health = client.get("/health").json()
+
+    events = [json.loads(line) for line in stream.text.splitlines()]
+    assert events[-1]["event"] == "summary"
+    assert health["status"] == "ok"
+    assert health["reports"]["active"] == 0
+    assert health["reports"]["queued"] == 0
+    assert health["reports"]["limits"]["max_depth"] == report_admission.limits.max_depth
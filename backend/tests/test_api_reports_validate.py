@@ -15,6 +15,7 @@ from app.models import (
     TextBlock,
     WorkType,
 )
+from app.services.validation.engine import validate_report
 
 
 def build_valid_report_for_api() -> Report:
@@ -114,3 +115,52 @@ def test_validate_report_endpoint_detects_basic_error():
     data = response.json()
     error_codes = {issue["code"] for issue in data.get("errors", [])}
     assert "REQUIRED_SECTIONS_PRESENT" in error_codes
+
+
+def test_validate_report_endpoint_returns_same_body_as_validate_report():
+    client = TestClient(app)
+
+    report = build_valid_report_for_api()
+    report.blocks[1].children[0].items = []
+    payload = report.model_dump_json().encode()
+
+    response = client.post(
+        "/api/v1/reports/validate",
+        content=payload,
+        headers={"Content-Type": "application/json"},
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/json"
+    assert response.json() == validate_report(report).model_dump(mode="json")
+
+
+def test_validate_report_endpoint_rejects_malformed_body_like_fastapi():
+    client = TestClient(app)
+    headers = {"Content-Type": "application/json"}
+
+    response = client.post("/api/v1/reports/validate", content=b"{bad", headers=headers)
+    assert response.status_code == 422
+    assert response.json()["detail"][0]["type"] == "json_invalid"
+    assert response.json()["detail"][0]["loc"][0] == "body"
+
+    response = client.post(
+        "/api/v1/reports/validate", content=b'{"meta": {}}', headers=headers
+    )
+    assert response.status_code == 422
+    assert response.json()["detail"][0]["loc"][:2] == ["body", "meta"]
+
+    response = client.post("/api/v1/reports/validate", content=b"", headers=headers)
+    assert response.status_code == 422
+    assert response.json()["detail"][0]["type"] == "missing"
+
+
+def test_validate_report_endpoint_documents_report_request_body():
+    client = TestClient(app)
+
+    schema = client.get("/openapi.json").json()
+
+    operation = schema["paths"]["/api/v1/reports/validate"]["post"]
+    body_schema = operation["requestBody"]["content"]["application/json"]["schema"]
+    assert body_schema == {"$ref": "#/components/schemas/Report"}
+    assert "ValidationResult" in str(operation["responses"]["200"])
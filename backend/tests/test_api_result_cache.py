@@ -0,0 +1,133 @@
+import json
+from datetime import date
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.models import Report, ReportMeta, SectionBlock, TextBlock, WorkType
+from app.services.cache import LRUCache
+from app.services.validation.engine import RULES
+from app.services.validation.result_cache import result_cache
+
+URL = "/api/v1/reports/validate"
+
+
+def build_report() -> Report:
+    meta = ReportMeta(
+        work_type=WorkType.PRACTICE,
+        work_number=1,
+        discipline="Информатика",
+        topic="Кэширование результатов проверки",
+        student_full_name="Иванов Иван Иванович",
+        group="ББИ-24-3",
+        semester="2",
+        direction_code="38.03.05",
+        direction_name="Бизнес-информатика",
+        department="Кафедра бизнес-информатики",
+        teacher_full_name="Петров Петр Петрович",
+        submission_date=date(2025, 3, 15),
+    )
+    section = SectionBlock(title="1 Раздел", children=[TextBlock(text="Текст.")])
+    return Report(meta=meta, blocks=[section])
+
+
+def post(client: TestClient, body: bytes, **kwargs):
+    headers = {"Content-Type": "application/json", **kwargs.pop("headers", {})}
+    return client.post(URL, content=body, headers=headers, **kwargs)
+
+
+def test_repeated_report_is_served_from_cache_and_revalidated_with_304():
+    body = build_report().model_dump_json().encode()
+
+    with TestClient(app) as client:
+        first = post(client, body)
+        repeated = post(client, body)
+        not_modified = post(
+            client, body, headers={"If-None-Match": first.headers["ETag"]}
+        )
+
+    assert first.status_code == 200
+    assert "cache;desc=hit" not in first.headers["Server-Timing"]
+    assert repeated.headers["ETag"] == first.headers["ETag"]
+    assert repeated.headers["Server-Timing"] == "cache;desc=hit"
+    assert repeated.content == first.content
+    assert not_modified.status_code == 304
+    assert not_modified.content == b""
+    assert not_modified.headers["ETag"] == first.headers["ETag"]
+
+
+def test_etag_is_canonical_and_depends_on_content_and_options():
+    report = build_report()
+    data = report.model_dump(mode="json")
+    compact = json.dumps(data, ensure_ascii=False).encode()
+    reordered = json.dumps(
+        {"blocks": data["blocks"], "meta": data["meta"]}, indent=2
+    ).encode()
+
+    with TestClient(app) as client:
+        first = post(client, compact)
+        same_content = post(client, reordered)
+        other_options = post(client, compact, params={"level": "error"})
+        report.blocks[0].children[0].text = "Другой текст."
+        changed = post(client, report.model_dump_json().encode())
+
+    etag = first.headers["ETag"]
+    assert same_content.headers["ETag"] == etag
+    assert same_content.headers["Server-Timing"] == "cache;desc=hit"
+    assert other_options.headers["ETag"] != etag
+    assert changed.headers["ETag"] != etag
+
+
+def test_rule_set_changes_invalidate_cached_results():
+    body = build_report().model_dump_json().encode()
+
+    with TestClient(app) as client:
+        before = post(client, body).headers["ETag"]
+        RULES.append(RULES[0])
+        try:
+            during = post(client, body)
+        finally:
+            RULES.pop()
+        after = post(client, body)
+
+    assert during.headers["ETag"] != before
+    assert during.headers["Server-Timing"] != "cache;desc=hit"
+    assert after.headers["ETag"] == before
+
+
+def test_diagnostics_bypass_the_cache():
+    body = build_report().model_dump_json().encode()
+
+    with TestClient(app) as client:
+        post(client, body)
+        response = post(client, body, params={"diagnostics": "true"})
+
+    assert "ETag" not in response.headers
+    assert response.json()["diagnostics"]["rules"]
+
+
+def test_cache_entries_expire_and_stats_are_exposed():
+    now = [0.0]
+    cache: LRUCache[bytes] = LRUCache(
+        max_bytes=10_000, sizeof=len, ttl=10, clock=lambda: now[0]
+    )
+    cache.put("key", b"value")
+
+    now[0] = 9.0
+    assert cache.get("key") == b"value"
+    now[0] = 10.0
+    assert cache.get("key") is None
+
+    stats = cache.stats()
+    assert (stats.hits, stats.misses, stats.expirations) == (1, 1, 1)
+    assert (stats.entries, stats.size_bytes) == (0, 0)
+
+    with TestClient(app) as client:
+        post(client, build_report().model_dump_json().encode())
+        diagnostics = client.get("/api/v1/diagnostics/validation").json()
+
+    exposed = diagnostics["result_cache"]
+    assert exposed == {**exposed, **result_cache.stats()}
+    assert exposed["size_bytes"] > 0
+    assert 0.0 <= exposed["hit_ratio"] <= 1.0
+    assert "hit_ratio" in exposed["bodies"]
@@ -0,0 +1,34 @@
+from app.services.validation.engine import validate_report
+from benchmarks.generator import (
+    ReportShape,
+    count_blocks,
+    generate_report,
+    shape_for_blocks,
+)
+
+
+def test_generated_report_is_deterministic_for_seed():
+    first = generate_report(ReportShape(sections=3), seed=7)
+    second = generate_report(ReportShape(sections=3), seed=7)
+    other = generate_report(ReportShape(sections=3), seed=8)
+
+    assert first.model_dump_json() == second.model_dump_json()
+    assert first.model_dump_json() != other.model_dump_json()
+
+
+def test_generated_report_matches_requested_size_and_passes_validation():
+    for blocks in (100, 2_000):
+        report = generate_report(shape_for_blocks(blocks, depth=3, fanout=1))
+
+        assert abs(count_blocks(report) - blocks) <= blocks * 0.2
+        result = validate_report(report)
+        assert result.errors == []
+        assert result.warnings == []
+
+
+def test_table_shape_is_configurable():
+    report = generate_report(ReportShape(sections=1, table_rows=7, table_cols=3))
+
+    table = report.blocks[1].children[2]
+    assert len(table.rows) == 7
+    assert {len(row) for row in table.rows} == {3}
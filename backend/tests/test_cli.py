@@ -0,0 +1,157 @@
+import csv
+import io
+import json
+from datetime import date
+
+import app.cli
+from app.cli import collect_paths, main
+from app.models import (
+    ListBlock,
+    Report,
+    ReportMeta,
+    SectionBlock,
+    TextBlock,
+    WorkType,
+)
+
+
+def build_report(with_empty_list: bool) -> Report:
+    meta = ReportMeta(
+        work_type=WorkType.LAB,
+        work_number=3,
+        discipline="Информатика",
+        topic="Пакетная проверка",
+        student_full_name="Сидоров Сидор Сидорович",
+        group="ББИ-24-3",
+        semester="2",
+        direction_code="38.03.05",
+        direction_name="Бизнес-информатика",
+        department="Кафедра бизнес-информатики",
+        teacher_full_name="Петров Петр Петрович",
+        submission_date=date(2025, 4, 1),
+    )
+    children = [TextBlock(text="Текст.")]
+    if with_empty_list:
+        children.append(ListBlock(list_type="bulleted", items=[]))
+    blocks = [
+        SectionBlock(title="ВВЕДЕНИЕ", special_kind="INTRO", children=children),
+        SectionBlock(
+            title="ЗАКЛЮЧЕНИЕ",
+            special_kind="CONCLUSION",
+            children=[TextBlock(text="Выводы.")],
+        ),
+    ]
+    return Report(meta=meta, blocks=blocks)
+
+
+def write_projects(directory):
+    (directory / "nested").mkdir()
+    (directory / "a.json").write_text(build_report(False).model_dump_json())
+    (directory / "nested" / "b.json").write_text(build_report(True).model_dump_json())
+    (directory / "broken.json").write_text("{}")
+    (directory / "notes.txt").write_text("не проект")
+
+
+def test_collect_paths_expands_directories_and_globs(tmp_path):
+    write_projects(tmp_path)
+
+    by_dir = collect_paths([str(tmp_path)])
+    by_glob = collect_paths([str(tmp_path / "**" / "*.json"), str(tmp_path / "a.json")])
+
+    assert [path.name for path in by_dir] == ["a.json", "broken.json", "b.json"]
+    assert sorted(by_glob) == sorted(by_dir)
+
+
+def test_validate_streams_ndjson_summaries(tmp_path, capsys):
+    write_projects(tmp_path)
+
+    exit_code = main(["validate", str(tmp_path), "--jobs", "1", "--no-progress"])
+
+    assert exit_code == 1
+    records = {
+        record["file"].rsplit("/", 1)[-1]: record
+        for record in map(json.loads, capsys.readouterr().out.splitlines())
+    }
+    assert records["broken.json"]["status"] == "invalid"
+    assert records["b.json"]["status"] == "failed"
+    assert records["b.json"]["error_codes"]["NON_EMPTY_LISTS"] == 1
+    assert "NON_EMPTY_LISTS" not in records["a.json"]["error_codes"]
+
+
+def test_validate_writes_csv_with_process_pool(tmp_path, capsys):
+    write_projects(tmp_path)
+    output = tmp_path / "summary.csv"
+
+    main(["validate", str(tmp_path), "-j", "2", "-f", "csv", "-o", str(output)])
+
+    rows = list(csv.DictReader(io.StringIO(output.read_text(encoding="utf-8"))))
+    assert [row["file"].rsplit("/", 1)[-1] for row in rows] == [
+        "a.json",
+        "broken.json",
+        "b.json",
+    ]
+    assert "NON_EMPTY_LISTS=1" in rows[2]["error_codes"]
+    assert "Файлов: 3" in capsys.readouterr().err
+
+
+def test_validate_reports_unexpected_errors_per_file(tmp_path, capsys, monkeypatch):
+    write_projects(tmp_path)
+    validate_report = app.cli.validate_report
+
+    def failing_validation(report, **options):
+        if report.blocks[0].children[1:]:
+            raise RecursionError("maximum recursion depth exceeded")
+        return validate_report(report, **options)
+
+    monkeypatch.setattr(app.cli, "validate_report", failing_validation)
+
+    exit_code = main(["validate", str(tmp_path), "--jobs", "1", "--no-progress"])
+
+    assert exit_code == 1
+    records = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert [record["status"] for record in records] == ["ok", "invalid", "invalid"]
+    assert records[2]["detail"] == "maximum recursion depth exceeded"
+
+
+def test_validate_applies_level_and_issue_limit_like_the_api(tmp_path, capsys):
+    report = build_report(True)
+    report.blocks[0].children.append(ListBlock(list_type="bulleted", items=[]))
+    (tmp_path / "lists.json").write_text(report.model_dump_json())
+    path = str(tmp_path / "lists.json")
+
+    main(["validate", path, "--no-progress"])
+    main(["validate", path, "--no-progress", "--max-issues-per-rule", "1"])
+    main(["validate", path, "--no-progress", "--level", "warning"])
+
+    full, limited, warnings = map(json.loads, capsys.readouterr().out.splitlines())
+    assert full["error_codes"]["NON_EMPTY_LISTS"] == 2
+    assert limited["error_codes"]["NON_EMPTY_LISTS"] == 1
+    assert warnings["status"] == "ok"
+    assert warnings["errors"] == 0
+
+
+def test_validate_without_matches_returns_usage_error(tmp_path):
+    assert main(["validate", str(tmp_path / "*.json")]) == 2
+
+
+def test_convert_round_trips_between_json_and_binary_projects(tmp_path, capsys):
+    report = build_report(True)
+    source = tmp_path / "report.json"
+    source.write_text(report.model_dump_json())
+
+    assert main(["convert", str(source), str(tmp_path / "report.ghp")]) == 0
+    assert (
+        main(["convert", str(tmp_path / "report.ghp"), str(tmp_path / "b.json")]) == 0
+    )
+    assert main(["convert", str(tmp_path / "b.json"), str(tmp_path / "c.json")]) == 0
+    assert Report.model_validate_json((tmp_path / "c.json").read_text()) == report
+
+    source.unlink()
+    main(["validate", str(tmp_path), "--jobs", "1", "--no-progress"])
+    records = list(map(json.loads, capsys.readouterr().out.splitlines()))
+    assert [record["file"].rsplit("/", 1)[-1] for record in records] == [
+        "b.json",
+        "c.json",
+        "report.ghp",
+    ]
+    assert {record["error_codes"]["NON_EMPTY_LISTS"] for record in records} == {1}
@@ -0,0 +1,146 @@
+from datetime import date
+
+from app.models import (
+    FigureBlock,
+    ListBlock,
+    Report,
+    ReportMeta,
+    SectionBlock,
+    TextBlock,
+    WorkType,
+)
+from app.services.cache import LRUCache
+from app.services.validation import rules as validation_rules
+from app.services.validation.engine import rule_cache, validate_report
+
+
+def build_report() -> Report:
+    meta = ReportMeta(
+        work_type=WorkType.PRACTICE,
+        work_number=1,
+        discipline="Технологические основы производства",
+        topic="Тестовый отчёт",
+        student_full_name="Иванов Иван Иванович",
+        group="ББИ-24-3",
+        semester="2",
+        direction_code="38.03.05",
+        direction_name="Бизнес-информатика",
+        department="Кафедра бизнес-информатики",
+        teacher_full_name="Петров Петр Петрович",
+        submission_date=date(2025, 3, 15),
+    )
+    section = SectionBlock(
+        title="1 Постановка задачи",
+        children=[
+            ListBlock(list_type="numbered", items=[]),
+            FigureBlock(caption="Рисунок 1 – Схема", file_name="figure1.png"),
+            TextBlock(text="Комментарий к рисунку."),
+        ],
+    )
+    return Report(meta=meta, blocks=[section])
+
+
+def test_content_hash_is_stable_across_parses():
+    report = build_report()
+    restored = Report.model_validate_json(report.model_dump_json())
+
+    assert report.blocks[0].content_hash() == restored.blocks[0].content_hash()
+    assert len(report.blocks[0].content_hash()) == 16
+
+
+def test_content_hash_covers_own_fields_and_children():
+    report = build_report()
+    section = report.blocks[0]
+    text = section.children[-1]
+    section_hash = section.content_hash()
+    text_hash = text.content_hash()
+
+    edited = Report.model_validate_json(report.model_dump_json())
+    edited.blocks[0].children[-1].text = "Другой комментарий."
+
+    assert edited.blocks[0].children[-1].content_hash() != text_hash
+    assert edited.blocks[0].content_hash() != section_hash
+    assert edited.blocks[0].children[0].content_hash() == (
+        section.children[0].content_hash()
+    )
+
+
+def test_content_hash_follows_in_place_edits():
+    report = build_report()
+    section = report.blocks[0]
+    items = section.children[0]
+    section_hash, items_hash = section.content_hash(), items.content_hash()
+
+    items.items.append("Пункт")
+    assert items.content_hash() != items_hash
+    assert section.content_hash() != section_hash
+
+    items.items.clear()
+    section.children[-1].text = "Другой комментарий."
+    assert items.content_hash() == items_hash
+    assert section.content_hash() != section_hash
+
+
+def test_revalidation_after_in_place_edits_is_not_served_stale():
+    report = build_report()
+    items = report.blocks[0].children[0].items
+    assert "NON_EMPTY_LISTS" in {issue.code for issue in validate_report(report).errors}
+
+    items.append("Исправленный пункт")
+    fixed = validate_report(report)
+    items.clear()
+    broken = validate_report(report)
+
+    assert "NON_EMPTY_LISTS" not in {issue.code for issue in fixed.errors}
+    assert "NON_EMPTY_LISTS" in {issue.code for issue in broken.errors}
+
+
+def test_cached_block_rules_skip_unchanged_blocks(monkeypatch):
+    report = build_report()
+    first = validate_report(report)
+
+    calls = []
+    original_check = validation_rules.rule_non_empty_lists.check
+
+    def counting_check(block):
+        calls.append(block.id)
+        return original_check(block)
+
+    monkeypatch.setattr(validation_rules.rule_non_empty_lists, "check", counting_check)
+    hits_before = rule_cache.stats().hits
+
+    second = validate_report(Report.model_validate_json(report.model_dump_json()))
+
+    assert calls == []
+    assert rule_cache.stats().hits > hits_before
+    assert second.model_dump() == first.model_dump()
+    assert "NON_EMPTY_LISTS" in {issue.code for issue in second.errors}
+
+
+def test_lru_cache_evicts_by_memory_cap_and_counts():
+    cache: LRUCache[str] = LRUCache(max_bytes=1000, sizeof=len)
+
+    cache.put("a", "x" * 300)
+    cache.put("b", "y" * 300)
+    assert cache.get("a") == "x" * 300
+    cache.put("c", "z" * 300)
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.get("c") is not None
+
+    stats = cache.stats()
+    assert stats.evictions == 1
+    assert stats.entries == 2
+    assert stats.hits == 3
+    assert stats.misses == 1
+    assert stats.size_bytes <= stats.max_bytes
+
+
+def test_lru_cache_skips_values_larger_than_cap():
+    cache: LRUCache[str] = LRUCache(max_bytes=500, sizeof=len)
+
+    cache.put("big", "x" * 1000)
+
+    assert cache.get("big") is None
+    assert cache.stats().entries == 0
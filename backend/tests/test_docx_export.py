@@ -0,0 +1,189 @@
+import io
+import json
+import zipfile
+from xml.etree import ElementTree
+
+import pytest
+from fastapi.testclient import TestClient
+from PIL import Image
+
+from app.main import app
+from app.models import (
+    FigureBlock,
+    ListBlock,
+    Report,
+    SectionBlock,
+    TableBlock,
+    TextBlock,
+)
+from app.services.export.docx import (
+    DOCX_MEDIA_TYPE,
+    EMU_PER_TWIP,
+    TEXT_WIDTH,
+    ExportStats,
+    fragment_cache,
+    iter_docx,
+)
+from benchmarks.generator import generate_report, shape_for_blocks
+from tests.test_validation_rules_basic import build_valid_report
+
+W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+
+client = TestClient(app)
+
+
+def open_docx(chunks) -> zipfile.ZipFile:
+    return zipfile.ZipFile(io.BytesIO(b"".join(chunks)))
+
+
+def test_export_is_a_well_formed_package_with_the_misis_layout():
+    report = build_valid_report()
+    report.blocks[1].children.append(
+        ListBlock(list_type="numbered", items=["Третий пункт", "Четвёртый пункт"])
+    )
+
+    with open_docx(iter_docx(report, images=lambda _: None)) as archive:
+        parts = {name: archive.read(name) for name in archive.namelist()}
+
+    for name, data in parts.items():
+        if name.endswith((".xml", ".rels")):
+            ElementTree.fromstring(data)
+    document = ElementTree.fromstring(parts["word/document.xml"])
+    margins = document.find(f".//{W}sectPr/{W}pgMar")
+    assert (margins.get(f"{W}left"), margins.get(f"{W}right")) == ("1701", "850")
+
+    styles = ElementTree.fromstring(parts["word/styles.xml"])
+    style_ids = {style.get(f"{W}styleId") for style in styles.iter(f"{W}style")}
+    assert {"Normal", "Heading1", "Heading2", "FigureCaption"} <= style_ids
+
+    # Каждый нумерованный список начинается с 1: у него свой экземпляр нумерации.
+    numbering = ElementTree.fromstring(parts["word/numbering.xml"])
+    assert len(numbering.findall(f"{W}num")) == 3
+
+    text = "".join(node.text or "" for node in document.iter(f"{W}t"))
+    assert "ОТЧЁТ ПО ПРАКТИЧЕСКОЙ РАБОТЕ" in text
+    assert "Таблица 1 – Пример данных" in text
+    assert "figure1.png" in text
+
+
+def test_export_is_streamed_in_chunks_before_the_document_is_complete():
+    report = generate_report(shape_for_blocks(2000), seed=7)
+    chunks = iter_docx(report, images=lambda _: None, chunk_bytes=16 * 1024)
+
+    first = next(chunks)
+    assert first.startswith(b"PK")
+    assert b"word/document.xml" not in first
+    rest = list(chunks)
+    assert len(rest) > 2
+    with open_docx([first, *rest]) as archive:
+        assert archive.testzip() is None
+
+
+def test_figure_images_are_embedded_once_per_hash(tmp_path):
+    path = tmp_path / "figure.png"
+    Image.new("RGB", (1920, 480), "navy").save(path)
+    image_hash = "a" * 64
+    figures = [
+        FigureBlock(
+            caption=f"Рисунок {n} – Схема", file_name="a.png", image_hash=image_hash
+        )
+        for n in (1, 2)
+    ]
+    report = build_valid_report()
+    report.blocks[1] = SectionBlock(title="1 Раздел", children=figures)
+
+    with open_docx(iter_docx(report, images=lambda _: path)) as archive:
+        media = [name for name in archive.namelist() if name.startswith("word/media")]
+        document = archive.read("word/document.xml").decode()
+
+    assert media == ["word/media/image1.png"]
+    assert document.count("<w:drawing>") == 2
+    # 1920 px при 96 dpi шире области текста: рисунок уменьшен до её ширины.
+    assert f'cx="{TEXT_WIDTH * EMU_PER_TWIP}"' in document
+
+
+def test_re_export_renders_only_changed_blocks_and_matches_a_cold_export():
+    fragment_cache.clear()
+    report = build_valid_report()
+    first = ExportStats()
+    b"".join(iter_docx(report, images=lambda _: None, stats=first))
+
+    # Тот же отчёт (с теми же id блоков) после правки одного абзаца и вставки
+    # нумерованного списка: остальные блоки сдвигаются, а у прежнего списка
+    # меняется экземпляр нумерации.
+    edited = Report.model_validate_json(report.model_dump_json())
+    edited.blocks[2].children[0] = TextBlock(text="Исправленные выводы.")
+    edited.blocks[1].children.insert(
+        0, ListBlock(list_type="numbered", items=["Новый пункт"])
+    )
+    second = ExportStats()
+    warm = b"".join(iter_docx(edited, images=lambda _: None, stats=second))
+
+    assert (first.hits, first.misses) == (0, first.blocks)
+    assert (second.blocks, second.misses) == (first.blocks + 1, 2)
+    fragment_cache.clear()
+    assert warm == b"".join(iter_docx(edited, images=lambda _: None))
+
+    diagnostics = client.get("/api/v1/diagnostics/export").json()
+    assert diagnostics["last"]["misses"] == second.blocks
+    assert diagnostics["fragment_cache"]["entries"] == second.blocks
+
+
+def test_export_endpoint_streams_a_docx_and_rejects_reports_with_errors():
+    report = build_valid_report()
+    ok = client.post(
+        "/api/v1/reports/export/docx",
+        content=report.model_dump_json(),
+        headers={"Content-Type": "application/json"},
+    )
+
+    report.blocks[1].children.append(TableBlock(caption="Без номера", rows=[["1"]]))
+    rejected = client.post(
+        "/api/v1/reports/export/docx",
+        content=report.model_dump_json(),
+        headers={"Content-Type": "application/json"},
+    )
+
+    assert ok.status_code == 200
+    assert ok.headers["content-type"] == DOCX_MEDIA_TYPE
+    assert "filename*=UTF-8''" in ok.headers["content-disposition"]
+    with open_docx([ok.content]) as archive:
+        assert "word/document.xml" in archive.namelist()
+    assert rejected.status_code == 422
+    assert len(rejected.json()["errors"]) == 1
+
+
+def test_lone_surrogates_are_dropped_instead_of_breaking_the_stream():
+    # «\ud800» допустим в JSON, но не кодируется в UTF-8: без очистки ответ
+    # обрывался бы посреди архива, уже после статуса 200.
+    report = build_valid_report()
+    data = report.model_dump(mode="json")
+    data["meta"]["student_full_name"] = "Иванов\ud800 Иван"
+    data["blocks"][0]["children"][0]["text"] = "Введение \udfff с ошибкой."
+    data["blocks"][1]["children"][1]["rows"][1][0] = "\ud800"
+
+    response = client.post(
+        "/api/v1/reports/export/docx",
+        content=json.dumps(data),
+        headers={"Content-Type": "application/json"},
+    )
+
+    assert response.status_code == 200
+    assert "%D0%98%D0%B2%D0%B0%D0%BD%D0%BE%D0%B2_" in (
+        response.headers["content-disposition"]
+    )
+    with open_docx([response.content]) as archive:
+        assert archive.testzip() is None
+        document = archive.read("word/document.xml").decode()
+    ElementTree.fromstring(document)
+    assert "Введение  с ошибкой." in document
+
+
+def test_export_opens_in_python_docx():
+    docx = pytest.importorskip("docx")
+
+    document = docx.Document(io.BytesIO(b"".join(iter_docx(build_valid_report()))))
+
+    headings = [p.text for p in document.paragraphs if p.style.name == "Heading 1"]
+    assert headings[:2] == ["ВВЕДЕНИЕ", "1 Постановка задачи"]
+    assert len(document.tables) == 1
@@ -0,0 +1,208 @@
+import asyncio
+import io
+import json
+import logging
+import threading
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.models import Report, TableBlock
+from app.services.export.jobs import (
+    EXPORT_FAILED_MESSAGE,
+    ExportCancelledError,
+    ExportJobs,
+    render_export,
+)
+from tests.test_validation_rules_basic import build_valid_report
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def submit(jobs: ExportJobs, report: Report):
+    return jobs.submit(report, report.model_dump_json().encode())
+
+
+@pytest.fixture
+def executor():
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        yield executor
+
+
+def test_identical_reports_share_a_job_and_the_file_is_kept(tmp_path, executor):
+    jobs = ExportJobs(tmp_path, 1, ttl=60, max_bytes=10**9, executor=executor)
+    report = build_valid_report()
+    copy = Report.model_validate_json(report.model_dump_json())
+
+    async def scenario():
+        job = submit(jobs, report)
+        assert submit(jobs, copy) is job
+        await job.future
+        assert submit(jobs, copy) is job
+        return job
+
+    job = asyncio.run(scenario())
+    status = jobs.status(job)
+    assert status.state == "done"
+    assert status.blocks_done == status.blocks_total == 12
+    assert status.expires_at is not None
+    assert zipfile.is_zipfile(jobs.path(job.id))
+    assert sorted(path.name for path in tmp_path.iterdir()) == [f"{job.id}.docx"]
+
+
+def test_queued_and_running_jobs_can_be_cancelled(tmp_path, executor):
+    jobs = ExportJobs(tmp_path, 1, ttl=60, max_bytes=10**9, executor=executor)
+    release = threading.Event()
+
+    async def scenario():
+        # Единственный поток занят: задача экспорта ждёт в очереди.
+        busy = asyncio.get_running_loop().run_in_executor(executor, release.wait)
+        job = submit(jobs, build_valid_report())
+        assert jobs.status(job).state == "queued"
+        jobs.cancel(job)
+        release.set()
+        await busy
+        with pytest.raises(asyncio.CancelledError):
+            await job.future
+        return job
+
+    job = asyncio.run(scenario())
+    assert jobs.status(job).state == "cancelled"
+    assert not jobs.path(job.id).exists()
+
+    # Выполняющийся экспорт прерывается, увидев признак отмены.
+    target = tmp_path / "running.docx"
+    (tmp_path / "running.docx.cancel").touch()
+    with pytest.raises(ExportCancelledError):
+        render_export(build_valid_report().model_dump_json().encode(), str(target))
+    assert not target.exists() and not (tmp_path / "running.docx.part").exists()
+
+
+def test_finished_files_are_evicted_by_ttl_and_total_size(tmp_path, executor):
+    clock = Clock()
+    jobs = ExportJobs(tmp_path, 1, ttl=60, max_bytes=1, executor=executor, clock=clock)
+    first_report = build_valid_report()
+    second_report = build_valid_report()
+    second_report.blocks[1].children.append(
+        TableBlock(caption="Таблица 2 – Ещё данные", rows=[["1"]])
+    )
+
+    async def scenario():
+        first = submit(jobs, first_report)
+        await first.future
+        clock.now += 1
+        second = submit(jobs, second_report)
+        await second.future
+        return first, second
+
+    first, second = asyncio.run(scenario())
+    # Оба файла не помещаются в max_bytes: остаётся только более новый.
+    assert jobs.get(first.id) is None and not jobs.path(first.id).exists()
+    assert jobs.get(second.id) is second
+
+    clock.now += 60
+    assert jobs.get(second.id) is None
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_worker_accepts_what_admission_accepted(tmp_path):
+    # Потоковый разборщик запроса принимает одиночный суррогат «\ud800»,
+    # а model_validate_json — нет: рабочий процесс разбирает тело так же.
+    data = build_valid_report().model_dump(mode="json")
+    data["blocks"][0]["children"][0]["text"] = "Введение \ud800."
+    target = tmp_path / "report.docx"
+
+    size = render_export(json.dumps(data).encode(), str(target))
+
+    assert size == target.stat().st_size
+    assert zipfile.is_zipfile(target)
+
+
+def test_failed_job_reports_a_fixed_message(tmp_path, executor, monkeypatch, caplog):
+    jobs = ExportJobs(tmp_path, 1, ttl=60, max_bytes=10**9, executor=executor)
+
+    def broken_export(*args, **kwargs):
+        raise ValueError("Секретный текст отчёта")
+
+    monkeypatch.setattr("app.services.export.jobs.iter_docx", broken_export)
+
+    async def scenario():
+        job = submit(jobs, build_valid_report())
+        with pytest.raises(ValueError):
+            await job.future
+        return job
+
+    with caplog.at_level(logging.ERROR, logger="app.services.export.jobs"):
+        job = asyncio.run(scenario())
+
+    status = jobs.status(job)
+    assert (status.state, status.error) == ("failed", EXPORT_FAILED_MESSAGE)
+    assert "Секретный текст отчёта" in caplog.text
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_export_runs_in_a_worker_process(tmp_path):
+    jobs = ExportJobs(tmp_path, 1, ttl=60, max_bytes=10**9)
+
+    async def scenario():
+        job = submit(jobs, build_valid_report())
+        await job.future
+        return job
+
+    try:
+        job = asyncio.run(scenario())
+    finally:
+        jobs.shutdown()
+    assert jobs.status(job).state == "done"
+    assert zipfile.is_zipfile(jobs.path(job.id))
+
+
+def test_export_jobs_over_http(tmp_path, monkeypatch, executor):
+    jobs = ExportJobs(tmp_path, 1, ttl=60, max_bytes=10**9, executor=executor)
+    monkeypatch.setattr("app.api.v1.reports.export_jobs", jobs)
+    body = build_valid_report().model_dump_json()
+    headers = {"Content-Type": "application/json"}
+
+    with TestClient(app) as client:
+        created = client.post(
+            "/api/v1/reports/export/docx?async=1", content=body, headers=headers
+        )
+        location = created.headers["Location"]
+        deadline = time.monotonic() + 30
+        status = created.json()
+        while status["state"] in ("queued", "running"):
+            assert time.monotonic() < deadline
+            time.sleep(0.05)
+            status = client.get(location).json()
+        download = client.get(f"{location}/file")
+        cancelled = client.delete(location)
+        gone = client.get(location)
+
+        invalid = build_valid_report()
+        invalid.blocks[1].children.append(TableBlock(caption="Без номера", rows=[]))
+        rejected = client.post(
+            "/api/v1/reports/export/docx?async=1",
+            content=invalid.model_dump_json(),
+            headers=headers,
+        )
+
+    assert created.status_code == 202
+    assert location.endswith(f"/api/v1/reports/export/jobs/{created.json()['id']}")
+    assert status["state"] == "done"
+    assert download.status_code == 200
+    assert "filename*=UTF-8''" in download.headers["content-disposition"]
+    with zipfile.ZipFile(io.BytesIO(download.content)) as archive:
+        assert "word/document.xml" in archive.namelist()
+    assert cancelled.json()["state"] == "cancelled"
+    assert gone.status_code == 404
+    assert rejected.status_code == 422
@@ -0,0 +1,132 @@
+import asyncio
+import io
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from fastapi.testclient import TestClient
+from PIL import Image
+
+from app.main import app
+from app.services.images.pipeline import (
+    ImagePipeline,
+    ImageProcessingError,
+    export_variant,
+    thumbnail_variant,
+)
+from app.services.images.store import ImageStore, image_store
+from tests.test_images import build_report
+
+
+def encode(image: Image.Image, fmt: str = "PNG") -> bytes:
+    buffer = io.BytesIO()
+    image.save(buffer, fmt)
+    return buffer.getvalue()
+
+
+def photo(width: int, height: int) -> Image.Image:
+    channels = [Image.effect_noise((width, height), 40 + 10 * n) for n in range(3)]
+    return Image.merge("RGB", channels)
+
+
+def screenshot(width: int, height: int) -> Image.Image:
+    image = Image.new("RGB", (width, height), "white")
+    for top in range(0, height, 40):
+        image.paste((30, 60, 200), (20, top, width - 20, top + 12))
+    return image
+
+
+async def stored(store: ImageStore, data: bytes) -> str:
+    async def chunks():
+        yield data
+
+    return (await store.save(chunks(), len(data))).hash
+
+
+@pytest.fixture
+def pipeline(tmp_path):
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        yield ImagePipeline(
+            ImageStore(tmp_path),
+            variants=(export_variant(150), thumbnail_variant(200)),
+            workers=2,
+            executor=executor,
+        )
+
+
+def test_variants_fit_the_printable_area_and_keep_a_suitable_format(pipeline):
+    export = pipeline.variants["export"]
+    assert (export.max_width, export.max_height) == (974, 1518)
+
+    sources = {
+        "photo": encode(photo(3000, 2000)),
+        "screenshot": encode(screenshot(2400, 3600)),
+        "transparent": encode(Image.new("RGBA", (500, 300), (255, 0, 0, 128))),
+    }
+    results = {}
+    hashes = {}
+    for name, data in sources.items():
+        image_hash = hashes[name] = asyncio.run(stored(pipeline.store, data))
+        with Image.open(pipeline.derive_sync(image_hash, "export")) as exported:
+            results[name] = (exported.format, exported.size)
+        with Image.open(pipeline.path(image_hash, "thumbnail")) as thumbnail:
+            assert max(thumbnail.size) <= 200
+        assert pipeline.state(image_hash) == "ready"
+
+    assert results == {
+        "photo": ("JPEG", (974, 649)),
+        "screenshot": ("PNG", (974, 1461)),
+        "transparent": ("PNG", (500, 300)),
+    }
+    exported = pipeline.path(hashes["photo"], "export").stat().st_size
+    assert exported < len(sources["photo"]) / 4
+
+
+def test_background_processing_reports_state_and_failures(pipeline):
+    async def scenario():
+        good = await stored(pipeline.store, encode(screenshot(800, 600)))
+        broken = await stored(pipeline.store, b"\x89PNG\r\n\x1a\n" + b"\x00" * 64)
+
+        assert pipeline.state(good) == "pending"
+        task = pipeline.submit(good)
+        assert pipeline.submit(good) is task
+        assert pipeline.state(good) == "processing"
+        await task
+        await pipeline.submit(broken)
+
+        with pytest.raises(ImageProcessingError):
+            await pipeline.derive(broken, "thumbnail")
+        with pytest.raises(FileNotFoundError):
+            await pipeline.derive("0" * 64, "thumbnail")
+        return good, broken
+
+    good, broken = asyncio.run(scenario())
+    assert pipeline.state(good) == "ready"
+    assert pipeline.state(broken) == "failed"
+    assert pipeline.error(broken)
+    assert pipeline.state("0" * 64) == "missing"
+
+
+def test_variants_and_figure_states_are_served_over_http(tmp_path, monkeypatch):
+    monkeypatch.setattr(image_store, "root", tmp_path)
+    data = encode(photo(1200, 900), "JPEG")
+
+    with TestClient(app) as client:
+        image_hash = client.post("/api/v1/images", content=data).json()["hash"]
+        thumbnail = client.get(f"/api/v1/images/{image_hash}/thumbnail")
+        status = client.get(f"/api/v1/images/{image_hash}/status")
+        unknown = client.get(f"/api/v1/images/{image_hash}/poster")
+        figures = client.post(
+            "/api/v1/reports/figure-images",
+            content=build_report(image_hash).model_dump_json(),
+            headers={"Content-Type": "application/json"},
+        )
+
+    assert thumbnail.status_code == 200
+    assert thumbnail.headers["content-type"] == "image/jpeg"
+    assert thumbnail.headers["ETag"].startswith(f'"{image_hash}.thumbnail-')
+    with Image.open(io.BytesIO(thumbnail.content)) as image:
+        assert image.size == (320, 240)
+    assert status.json() == {"hash": image_hash, "state": "ready", "error": None}
+    assert unknown.status_code == 404
+    [figure] = figures.json()
+    assert (figure["hash"], figure["state"]) == (image_hash, "ready")
@@ -0,0 +1,137 @@
+import asyncio
+from dataclasses import replace
+from datetime import date
+from hashlib import sha256
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.models import (
+    FigureBlock,
+    Report,
+    ReportMeta,
+    SectionBlock,
+    TextBlock,
+    WorkType,
+)
+from app.services.images.store import ImageStore, UnsupportedImageError, image_store
+from app.settings import settings
+
+PNG = b"\x89PNG\r\n\x1a\n" + b"\x00" * 200
+JPEG = b"\xff\xd8\xff\xe0" + bytes(range(256)) * 10
+
+
+@pytest.fixture(autouse=True)
+def store_root(tmp_path, monkeypatch):
+    monkeypatch.setattr(image_store, "root", tmp_path)
+    return tmp_path
+
+
+def build_report(image_hash: str) -> Report:
+    meta = ReportMeta(
+        work_type=WorkType.COURSE,
+        discipline="Информатика",
+        topic="Хранилище изображений",
+        student_full_name="Иванов Иван Иванович",
+        group="ББИ-24-3",
+        semester="2",
+        direction_code="38.03.05",
+        direction_name="Бизнес-информатика",
+        department="Кафедра бизнес-информатики",
+        teacher_full_name="Петров Петр Петрович",
+        submission_date=date(2025, 3, 15),
+    )
+    figure = FigureBlock(
+        caption="Рисунок 1 – Схема", file_name="s.png", image_hash=image_hash
+    )
+    section = SectionBlock(
+        title="1 Раздел", children=[figure, TextBlock(text="Пояснение.")]
+    )
+    return Report(meta=meta, blocks=[section])
+
+
+def test_upload_stores_each_image_once_and_serves_it_with_a_strong_etag(store_root):
+    image_hash = sha256(PNG).hexdigest()
+
+    with TestClient(app) as client:
+        first = client.post("/api/v1/images", content=PNG)
+        again = client.post("/api/v1/images", content=iter([PNG[:5], PNG[5:]]))
+        image = client.get(f"/api/v1/images/{image_hash}")
+        not_modified = client.get(
+            f"/api/v1/images/{image_hash}",
+            headers={"If-None-Match": image.headers["ETag"]},
+        )
+        missing = client.get(f"/api/v1/images/{'0' * 64}")
+        malformed = client.get("/api/v1/images/not-a-hash")
+
+    assert first.status_code == 201
+    assert first.json() == {
+        "hash": image_hash,
+        "size": len(PNG),
+        "media_type": "image/png",
+        "created": True,
+    }
+    assert again.status_code == 200
+    assert again.json()["created"] is False
+    assert [p.name for p in store_root.rglob("*") if p.is_file()] == [image_hash]
+
+    assert image.content == PNG
+    assert image.headers["content-type"] == "image/png"
+    assert image.headers["ETag"] == f'"{image_hash}"'
+    assert "immutable" in image.headers["Cache-Control"]
+    assert not_modified.status_code == 304
+    assert missing.status_code == 404
+    assert malformed.status_code == 422
+
+
+def test_oversized_and_unknown_uploads_are_rejected_without_leftovers(
+    store_root, monkeypatch
+):
+    small = replace(settings, max_image_bytes=100)
+    monkeypatch.setattr("app.api.v1.images.settings", small)
+    with TestClient(app) as client:
+        declared = client.post("/api/v1/images", content=PNG)
+        streamed = client.post("/api/v1/images", content=iter([PNG[:60], PNG[60:]]))
+    assert declared.status_code == streamed.status_code == 413
+
+    async def chunks():
+        yield b"GIF8"
+        yield b"text"
+
+    with pytest.raises(UnsupportedImageError):
+        asyncio.run(ImageStore(store_root).save(chunks(), 1000))
+    assert not [p for p in store_root.rglob("*") if p.is_file()]
+
+
+def test_missing_images_are_found_with_one_listing_per_shard(store_root, monkeypatch):
+    store = ImageStore(store_root)
+    present = "ab" + "1" * 62
+    (store_root / "ab").mkdir()
+    store.path(present).write_bytes(PNG)
+    wanted = [present, "ab" + "2" * 62, "ab" + "3" * 62, "cd" + "4" * 62]
+
+    calls = []
+    monkeypatch.setattr(
+        "app.services.images.store.os.listdir",
+        lambda path: calls.append(path) or [present],
+    )
+
+    assert store.missing(wanted) == set(wanted[1:])
+    assert calls == [store_root / "ab"]
+
+
+def test_figure_image_exists_is_rechecked_after_upload():
+    report = build_report(sha256(JPEG).hexdigest())
+    body = report.model_dump_json().encode()
+    headers = {"Content-Type": "application/json"}
+
+    with TestClient(app) as client:
+        before = client.post("/api/v1/reports/validate", content=body, headers=headers)
+        client.post("/api/v1/images", content=JPEG)
+        after = client.post("/api/v1/reports/validate", content=body, headers=headers)
+
+    codes = [issue["code"] for issue in before.json()["errors"]]
+    assert codes.count("FIGURE_IMAGE_EXISTS") == 1
+    assert "FIGURE_IMAGE_EXISTS" not in [i["code"] for i in after.json()["errors"]]
+    assert after.headers["ETag"] != before.headers["ETag"]
@@ -0,0 +1,167 @@
+import json
+from datetime import date
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.models import (
+    FigureBlock,
+    Report,
+    ReportMeta,
+    SectionBlock,
+    TableBlock,
+    TextBlock,
+    WorkType,
+)
+from app.services.layout.estimator import (
+    FRONT_MATTER_PAGES,
+    TEXT_WIDTH,
+    estimate_layout,
+    layout_cache,
+)
+from app.services.layout.fonts import count_lines
+from app.services.validation.engine import validate_report
+from app.services.validation.rules import rule_report_empty_space_limit
+
+
+def build_report(*sections: SectionBlock) -> Report:
+    meta = ReportMeta(
+        work_type=WorkType.PRACTICE,
+        work_number=1,
+        discipline="Информатика",
+        topic="Оценка вёрстки",
+        student_full_name="Иванов Иван Иванович",
+        group="ББИ-24-3",
+        semester="2",
+        direction_code="38.03.05",
+        direction_name="Бизнес-информатика",
+        department="Кафедра бизнес-информатики",
+        teacher_full_name="Петров Петр Петрович",
+        submission_date=date(2025, 3, 15),
+    )
+    return Report(meta=meta, blocks=list(sections))
+
+
+def lines(count: int) -> TextBlock:
+    """Текст из ``count`` однострочных абзацев."""
+
+    return TextBlock(text="\n".join(["Короткий абзац."] * count))
+
+
+def figure() -> FigureBlock:
+    return FigureBlock(caption="Рисунок 1 – Схема", file_name="scheme.png")
+
+
+def test_lines_are_wrapped_by_character_widths():
+    sentence = "Отчёт о практике содержит введение, основную часть и заключение."
+
+    assert count_lines("", 12, TEXT_WIDTH) == 1
+    assert count_lines(sentence, 12, TEXT_WIDTH) == 1
+    assert count_lines(" ".join([sentence] * 10), 12, TEXT_WIDTH) == 8
+    assert count_lines("Ш" * 100, 12, TEXT_WIDTH) == 3
+    paragraph = " ".join([sentence] * 20)
+    assert count_lines(paragraph, 12, TEXT_WIDTH) < count_lines(
+        paragraph, 12, TEXT_WIDTH, bold=True
+    )
+
+
+def test_sections_start_new_pages_and_text_flows_across_pages():
+    intro = SectionBlock(title="ВВЕДЕНИЕ", special_kind="INTRO", children=[lines(3)])
+    long_text = TextBlock(text=" ".join(["Длинный абзац основной части."] * 600))
+    body = SectionBlock(title="1 Основная часть", children=[long_text])
+
+    estimate = estimate_layout(build_report(intro, body))
+
+    pages = estimate.pages
+    assert estimate.page_count == FRONT_MATTER_PAGES + len(pages) == 10
+    assert [page.number for page in pages] == list(range(3, 11))
+    assert pages[0].block_ids == [intro.id, intro.children[0].id]
+    assert pages[0].ends_with == "page_break" and pages[0].fill < 0.25
+    assert pages[1].block_ids == [body.id, long_text.id]
+    assert all(page.block_ids == [long_text.id] for page in pages[2:])
+    assert [page.ends_with for page in pages[1:]] == ["overflow"] * 6 + ["end"]
+    assert all(page.fill > 0.95 for page in pages[1:-1])
+
+
+def test_tables_continue_on_the_next_page_with_repeated_header():
+    rows = [["Показатель", "Значение"]] + [["Строка", "1"]] * 80
+    table = TableBlock(caption="Таблица 1 – Показатели", rows=rows)
+    report = build_report(SectionBlock(title="1 Данные", children=[table]))
+
+    pages = estimate_layout(report).pages
+
+    assert len(pages) == 2
+    assert pages[0].block_ids == [report.blocks[0].id, table.id]
+    assert pages[1].block_ids == [table.id]
+
+
+def test_figure_that_does_not_fit_leaves_a_blank_page_warning():
+    section = SectionBlock(title="1 Схема", children=[lines(23), figure(), lines(2)])
+    report = build_report(section, SectionBlock(title="2 Итоги", children=[lines(2)]))
+
+    pages = estimate_layout(report).pages
+    warnings = [
+        issue
+        for issue in validate_report(report).warnings
+        if issue.code == "REPORT_EMPTY_SPACE_LIMIT"
+    ]
+
+    assert [page.ends_with for page in pages] == ["overflow", "page_break", "end"]
+    assert len(warnings) == 1
+    assert warnings[0].block_id == section.children[1].id
+    assert warnings[0].message.startswith("Около 29% страницы 3 останется пустым")
+
+    relaxed = rule_report_empty_space_limit.configure(max_empty_share=0.3)
+    assert relaxed(report) == []
+    section.children[0] = lines(10)
+    assert rule_report_empty_space_limit(build_report(section)) == []
+
+
+def test_only_changed_blocks_are_measured_again():
+    paragraphs = [TextBlock(text=f"Абзац {number}.") for number in range(20)]
+    report = build_report(SectionBlock(title="1 Раздел", children=paragraphs))
+    layout_cache.clear()
+    estimate_layout(report)
+    before = layout_cache.stats()
+
+    edited = report.model_copy(deep=True)
+    edited.blocks[0].children[5].text = "Изменённый абзац."
+    estimate_layout(edited)
+    after = layout_cache.stats()
+
+    assert after.misses - before.misses == 1
+
+
+def test_estimate_layout_endpoint_returns_pages():
+    report = build_report(SectionBlock(title="1 Раздел", children=[lines(50)]))
+
+    with TestClient(app) as client:
+        response = client.post(
+            "/api/v1/reports/estimate-layout",
+            content=report.model_dump_json(),
+            headers={"Content-Type": "application/json"},
+        )
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["page_count"] == 4
+    assert [page["number"] for page in data["pages"]] == [3, 4]
+    assert data["pages"][1]["block_ids"] == [str(report.blocks[0].children[0].id)]
+
+
+def test_text_with_lone_surrogates_is_validated_and_measured():
+    # «\ud800» допустим в JSON, но не кодируется в строгий UTF-8.
+    report = build_report(SectionBlock(title="1 Раздел", children=[lines(3)]))
+    data = report.model_dump(mode="json")
+    data["blocks"][0]["children"][0]["text"] = "Абзац \ud800 без пары."
+    body = json.dumps(data)
+    assert "\\ud800" in body
+
+    with TestClient(app) as client:
+        responses = [
+            client.post(url, content=body, headers={"Content-Type": "application/json"})
+            for url in ("/api/v1/reports/validate", "/api/v1/reports/estimate-layout")
+        ]
+
+    assert [response.status_code for response in responses] == [200, 200]
+    assert responses[1].json()["page_count"] == FRONT_MATTER_PAGES + 1
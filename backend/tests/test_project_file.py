@@ -0,0 +1,191 @@
+import json
+from datetime import date
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.models import (
+    AppendixBlock,
+    FigureBlock,
+    ListBlock,
+    ReferencesBlock,
+    Report,
+    ReportBlockType,
+    ReportMeta,
+    SectionBlock,
+    SubsectionBlock,
+    TableBlock,
+    TextBlock,
+    WorkType,
+)
+from app.services.reports.parser import ReportLimitError
+from app.services.reports.project_file import (
+    FORMAT_VERSION,
+    MAGIC,
+    PROJECT_MEDIA_TYPE,
+    OutlineEntry,
+    ProjectFormatError,
+    ProjectReader,
+    dump_project,
+    load_project,
+    read_report,
+)
+
+
+def build_report() -> Report:
+    meta = ReportMeta(
+        work_type=WorkType.COURSE,
+        discipline="Информатика",
+        topic="Бинарный файл проекта",
+        student_full_name="Иванов Иван Иванович",
+        group="ББИ-24-3",
+        semester="2",
+        direction_code="38.03.05",
+        direction_name="Бизнес-информатика",
+        department="Кафедра бизнес-информатики",
+        teacher_full_name="Петров Петр Петрович",
+        submission_date=date(2025, 3, 15),
+    )
+    rows = [["Показатель", "Значение"]] + [["Выручка", "100"]] * 50
+    body = SectionBlock(
+        title="1 Основная часть",
+        children=[
+            SubsectionBlock(
+                level=2,
+                title="1.1 Данные",
+                children=[
+                    TextBlock(text="Ёлка — «ёлочка» 😀\n\tс переносом"),
+                    TextBlock(text=""),
+                    TableBlock(caption="Таблица 1 – Показатели", rows=rows),
+                    FigureBlock(caption="Рисунок 1 – Схема", file_name="s.png"),
+                ],
+            ),
+            ListBlock(list_type="numbered", items=["Первый", "Второй", "Первый"]),
+        ],
+    )
+    return Report(
+        meta=meta,
+        blocks=[
+            SectionBlock(title="ВВЕДЕНИЕ", special_kind="INTRO"),
+            body,
+            ReferencesBlock(items=["Источник 1."]),
+            AppendixBlock(
+                label="А", title="Исходные данные", children=[TextBlock(text="")]
+            ),
+        ],
+    )
+
+
+def test_binary_project_round_trips_losslessly_and_is_smaller_than_json():
+    report = build_report()
+    json_bytes = report.model_dump_json().encode()
+
+    data = dump_project(report)
+
+    assert data.startswith(MAGIC)
+    assert load_project(data) == report
+    assert load_project(data).model_dump_json().encode() == json_bytes
+    assert read_report(data) == read_report(json_bytes) == report
+    assert len(data) < len(json_bytes)
+
+    # Повторяющиеся ячейки хранятся один раз: строка таблицы — это ссылки.
+    table = report.blocks[1].children[0].children[2]
+    table.rows = table.rows + [["Выручка", "100"]] * 100
+    json_growth = len(report.model_dump_json().encode()) - len(json_bytes)
+    assert len(dump_project(report)) - len(data) < json_growth / 2
+
+
+def test_reader_loads_meta_and_outline_without_decoding_blocks():
+    report = build_report()
+    data = bytearray(dump_project(report))
+    reader = ProjectReader(data)
+    # Портим начало записи второго блока: его тип указывает вне таблицы строк.
+    offset = reader._index[1][0]
+    data[offset + 4 : offset + 8] = b"\xff\xff\xff\x7f"
+
+    with ProjectReader(data) as reader:
+        assert reader.meta() == report.meta
+        assert reader.outline() == [
+            OutlineEntry(report.blocks[0].id, ReportBlockType.SECTION, "ВВЕДЕНИЕ"),
+            OutlineEntry(
+                report.blocks[1].id, ReportBlockType.SECTION, "1 Основная часть"
+            ),
+            OutlineEntry(report.blocks[2].id, ReportBlockType.REFERENCES, None),
+            OutlineEntry(
+                report.blocks[3].id, ReportBlockType.APPENDIX, "Исходные данные"
+            ),
+        ]
+        assert len(reader) == 4
+        assert reader.block(3) == report.blocks[3]
+        with pytest.raises(ProjectFormatError):
+            reader.block(1)
+
+
+def test_project_file_is_read_through_a_memory_map(tmp_path):
+    report = build_report()
+    path = tmp_path / "report.ghp"
+    path.write_bytes(dump_project(report))
+
+    with ProjectReader.open(path, max_blocks=100) as reader:
+        assert reader.report() == report
+        assert reader.block(1) == report.blocks[1]
+
+
+def test_damaged_files_and_limits_are_rejected():
+    data = dump_project(build_report())
+
+    with pytest.raises(ProjectFormatError, match="не являются"):
+        load_project(b"{}")
+    newer = data[:8] + (FORMAT_VERSION + 1).to_bytes(2, "little") + data[10:]
+    with pytest.raises(ProjectFormatError, match="версия"):
+        load_project(newer)
+    with pytest.raises(ProjectFormatError, match="Повреждённый"):
+        load_project(data[: len(data) // 2])
+    with pytest.raises(ReportLimitError, match="блоков"):
+        load_project(data, max_blocks=5)
+    with pytest.raises(ReportLimitError, match="Вложенность"):
+        load_project(data, max_depth=2)
+
+
+def test_project_endpoints_convert_between_json_and_binary():
+    report = build_report()
+
+    with TestClient(app) as client:
+        saved = client.post(
+            "/api/v1/reports/project/save",
+            content=report.model_dump_json(),
+            headers={"Content-Type": "application/json"},
+        )
+        loaded = client.post(
+            "/api/v1/reports/project/load",
+            content=saved.content,
+            headers={"Content-Type": PROJECT_MEDIA_TYPE},
+        )
+        broken = client.post(
+            "/api/v1/reports/project/load",
+            content=b"not a project",
+            headers={"Content-Type": PROJECT_MEDIA_TYPE},
+        )
+
+    assert saved.status_code == 200
+    assert saved.headers["content-type"] == PROJECT_MEDIA_TYPE
+    assert saved.content == dump_project(report)
+    assert loaded.status_code == 200
+    assert Report.model_validate_json(loaded.content) == report
+    assert broken.status_code == 422
+
+
+def test_texts_with_lone_surrogates_are_rejected_on_save():
+    data = build_report().model_dump(mode="json")
+    data["meta"]["topic"] = "Тема \ud800"
+
+    with TestClient(app) as client:
+        response = client.post(
+            "/api/v1/reports/project/save",
+            content=json.dumps(data),
+            headers={"Content-Type": "application/json"},
+        )
+
+    assert response.status_code == 422
+    assert "\\ud800" in response.json()["detail"]
@@ -0,0 +1,155 @@
+from datetime import date
+from uuid import uuid4
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.models import (
+    AppendixBlock,
+    BaseBlock,
+    FigureBlock,
+    ListBlock,
+    Report,
+    ReportMeta,
+    SectionBlock,
+    SubsectionBlock,
+    TableBlock,
+    TextBlock,
+    WorkType,
+)
+from app.services.validation.engine import validate_report
+from app.services.validation.traversal import iter_blocks
+
+
+def codes(issues) -> set:
+    return {issue.code for issue in issues}
+
+
+def build_report() -> Report:
+    meta = ReportMeta(
+        work_type=WorkType.PRACTICE,
+        work_number=1,
+        discipline="Технологические основы производства",
+        topic="Тестовый отчёт",
+        student_full_name="Иванов Иван Иванович",
+        group="ББИ-24-3",
+        semester="2",
+        direction_code="38.03.05",
+        direction_name="Бизнес-информатика",
+        department="Кафедра бизнес-информатики",
+        teacher_full_name="Петров Петр Петрович",
+        submission_date=date(2025, 3, 15),
+    )
+    intro = SectionBlock(
+        title="ВВЕДЕНИЕ",
+        special_kind="INTRO",
+        children=[TextBlock(text="Введение.")],
+    )
+    section = SectionBlock(
+        title="1 Раздел",
+        children=[
+            TableBlock(caption="Таблица 1 – Данные", rows=[["1"]]),
+            SubsectionBlock(
+                level=2,
+                title="1.1 Подраздел",
+                children=[
+                    FigureBlock(caption="Рисунок 1 – Схема", file_name="a.png"),
+                    TextBlock(text="Пояснение."),
+                ],
+            ),
+            TextBlock(text="Итог раздела."),
+        ],
+    )
+    conclusion = SectionBlock(
+        title="ЗАКЛЮЧЕНИЕ",
+        special_kind="CONCLUSION",
+        children=[TextBlock(text="Выводы.")],
+    )
+    appendix = AppendixBlock(label="А", title="Приложение")
+    return Report(meta=meta, blocks=[intro, section, conclusion, appendix])
+
+
+def test_index_follows_document_order_and_groups_blocks_by_type():
+    report = build_report()
+    index = report.index()
+
+    assert list(index.blocks) == list(iter_blocks(report))
+    assert [block.title for block in index.of_type(SectionBlock)] == [
+        "ВВЕДЕНИЕ",
+        "1 Раздел",
+        "ЗАКЛЮЧЕНИЕ",
+    ]
+    media = index.of_type(FigureBlock, TableBlock)
+    assert [type(block) for block in media] == [TableBlock, FigureBlock]
+    assert len(index.of_type(BaseBlock)) == len(index)
+    assert index.of_type(FigureBlock, TableBlock) is media
+    assert index.top_level(AppendixBlock) == (report.blocks[3],)
+
+
+def test_index_links_parents_siblings_and_depth():
+    report = build_report()
+    index = report.index()
+    section = report.blocks[1]
+    subsection = section.children[1]
+    figure, text = subsection.children
+
+    assert index.get(figure.id) is figure
+    assert index.parent(figure.id) is subsection
+    assert index.parent_id(section.id) is None
+    assert index.ancestors(figure.id) == [subsection, section]
+    assert index.depth(section.id) == 0 and index.depth(figure.id) == 2
+    assert index.position(figure.id) == index.position(subsection.id) + 1
+    assert index.siblings(section.id) is report.blocks
+    assert index.previous_sibling(subsection.id) is section.children[0]
+    assert index.next_sibling(subsection.id) is section.children[2]
+    assert index.previous_sibling(figure.id) is None
+    assert index.next_sibling(text.id) is None
+
+
+def test_index_is_shared_within_a_frozen_pass():
+    report = build_report()
+
+    with report.frozen() as index:
+        assert report.index() is index
+        with report.frozen() as nested:
+            assert nested is index
+        assert report.model_copy().index() is not index
+    assert report.index() is not index
+
+    # Правка на месте между проходами видна следующему.
+    report.blocks[1].children.append(AppendixBlock(label="Б", title="Ещё"))
+    assert len(report.index().of_type(AppendixBlock)) == 2
+
+
+def test_validation_sees_blocks_appended_in_place():
+    report = build_report()
+    assert "NON_EMPTY_LISTS" not in codes(validate_report(report).errors)
+
+    report.blocks[1].children.append(ListBlock(list_type="bulleted", items=[]))
+
+    assert "NON_EMPTY_LISTS" in codes(validate_report(report).errors)
+    fresh = Report.model_validate_json(report.model_dump_json())
+    assert validate_report(report).errors == validate_report(fresh).errors
+
+
+def test_api_locates_block_in_stored_version():
+    report = build_report()
+    figure = report.blocks[1].children[1].children[0]
+
+    with TestClient(app) as client:
+        created = client.post(
+            "/api/v1/reports/versions", json=report.model_dump(mode="json")
+        )
+        version = created.json()["version"]
+        found = client.get(f"/api/v1/reports/versions/{version}/blocks/{figure.id}")
+        missing = client.get(f"/api/v1/reports/versions/{version}/blocks/{uuid4()}")
+
+    assert found.status_code == 200
+    location = found.json()
+    assert location["block"]["caption"] == figure.caption
+    subsection = report.blocks[1].children[1]
+    assert location["parent_id"] == str(subsection.id)
+    assert location["path"] == [str(report.blocks[1].id), str(subsection.id)]
+    assert location["depth"] == 2
+    assert location["position"] == report.index().position(figure.id)
+    assert missing.status_code == 404
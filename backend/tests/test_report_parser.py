@@ -0,0 +1,105 @@
+import json
+import random
+
+import pytest
+from pydantic import ValidationError
+
+from app.models import Report, SectionBlock, TextBlock
+from app.services.reports.parser import (
+    BATCH_BLOCKS,
+    ReportLimitError,
+    ReportParser,
+    ReportSyntaxError,
+    ReportValidationError,
+)
+from benchmarks.generator import ReportShape, generate_report
+
+
+def parse(body: bytes, chunk_sizes=None, max_blocks=10_000, max_depth=10) -> Report:
+    """Разбирает ``body`` частями случайной длины (или одним куском)."""
+
+    parser = ReportParser(max_blocks, max_depth)
+    position = 0
+    while position < len(body):
+        size = chunk_sizes() if chunk_sizes else len(body)
+        parser.feed(body[position : position + size])
+        position += size
+    return parser.close()
+
+
+def test_chunked_body_is_parsed_into_the_same_report():
+    report = generate_report(ReportShape(sections=3, table_rows=4), seed=3)
+    report.blocks[1].children[0].text = 'Ёлка — «ёлочка»\n\t"в кавычках" 😀 ' * 50
+    bodies = [
+        report.model_dump_json().encode(),
+        report.model_dump_json(indent=2).encode(),
+        b"\xef\xbb\xbf" + report.model_dump_json().encode(),
+    ]
+
+    for body in bodies:
+        assert parse(body) == report
+        for seed in range(3):
+            sizes = random.Random(seed)
+            assert parse(body, lambda sizes=sizes: sizes.randint(1, 50)) == report
+    assert parse(bodies[0], lambda: 1) == report
+
+
+def test_flat_reports_are_validated_in_batches():
+    report = generate_report(ReportShape(sections=1), seed=1)
+    report.blocks = [TextBlock(text=f"Абзац {n}.") for n in range(BATCH_BLOCKS * 2 + 1)]
+
+    assert parse(report.model_dump_json().encode(), lambda: 4096) == report
+
+
+def test_block_limits_are_enforced_before_the_body_ends():
+    section = SectionBlock(title="1 Раздел", children=[TextBlock(text="Текст.")] * 5)
+    report = generate_report(ReportShape(sections=1), seed=1)
+    report.blocks = [section] * 10
+    body = report.model_dump_json().encode()
+    head = body[: len(body) // 4]
+
+    parser = ReportParser(max_blocks=8, max_depth=10)
+    with pytest.raises(ReportLimitError, match="больше 8 блоков"):
+        parser.feed(head)
+
+    parser = ReportParser(max_blocks=100, max_depth=1)
+    with pytest.raises(ReportLimitError, match="глубже 1 уровней"):
+        parser.feed(head)
+
+    deep = b'{"meta": ' + b"[" * 100_000 + b"]" * 100_000 + b"}"
+    with pytest.raises(ReportLimitError, match="вложенность JSON"):
+        parse(deep, lambda: 65536)
+
+
+def test_all_validation_errors_are_reported_from_the_report_root():
+    data = generate_report(ReportShape(sections=2), seed=1).model_dump(mode="json")
+    data["meta"]["group"] = 5
+    data["blocks"][1]["children"][0]["text"] = None
+    data["blocks"][2]["title"] = None
+    data["blocks"].append("не блок")
+    body = json.dumps(data, ensure_ascii=False).encode()
+
+    with pytest.raises(ReportValidationError) as raised:
+        parse(body, lambda: 7)
+
+    with pytest.raises(ValidationError) as expected:
+        Report.model_validate_json(body)
+    assert sorted(error["loc"] for error in raised.value.errors) == sorted(
+        error["loc"] for error in expected.value.errors()
+    )
+    assert len(raised.value.errors) == 4
+
+
+def test_syntax_errors_match_the_json_module():
+    for body in (b'{"meta": 1,}', b'{"blocks": [{} {}]}', b'{"a": tru', b"{} []", b" "):
+        with pytest.raises(json.JSONDecodeError) as expected:
+            json.loads(body)
+        with pytest.raises(ReportSyntaxError) as raised:
+            parse(body, lambda: 1)
+        assert (raised.value.msg, raised.value.pos) == (
+            expected.value.msg,
+            expected.value.pos,
+        )
+
+    with pytest.raises(ReportSyntaxError, match="Invalid UTF-8"):
+        parse(b'{"meta": "\xff"}')
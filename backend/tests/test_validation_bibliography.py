@@ -0,0 +1,131 @@
+from datetime import date
+
+from app.models import (
+    ListBlock,
+    ReferencesBlock,
+    Report,
+    ReportMeta,
+    SectionBlock,
+    TextBlock,
+    WorkType,
+)
+from app.services.validation.bibliography import (
+    BibliographyIndex,
+    Reference,
+    parse_citation,
+    parse_reference,
+)
+from app.services.validation.engine import validate_report
+from app.services.validation.rules import rule_references_age_warning
+
+BOOK = (
+    "Иванов, И. И. Основы технологии производства : учебник / И. И. Иванов, "
+    "П. П. Петров. — Москва : Юрайт, 2017. — 320 с."
+)
+ARTICLE = (
+    "Петров, П. П. Анализ данных в 1990-х годах / П. П. Петров // Вестник "
+    "МИСИС. — 2022. — № 3. — С. 10–15."
+)
+STANDARD = "ГОСТ 2.105-95. Общие требования к текстовым документам."
+WEB = (
+    "Python documentation [Электронный ресурс]. — URL: https://docs.python.org/3/ "
+    "(дата обращения: 01.02.2024)."
+)
+
+
+def build_report(*texts: str, references=(BOOK, ARTICLE, STANDARD, WEB)) -> Report:
+    meta = ReportMeta(
+        work_type=WorkType.ESSAY,
+        discipline="Информатика",
+        topic="Список источников",
+        student_full_name="Иванов Иван Иванович",
+        group="ББИ-24-3",
+        semester="2",
+        direction_code="38.03.05",
+        direction_name="Бизнес-информатика",
+        department="Кафедра бизнес-информатики",
+        teacher_full_name="Петров Петр Петрович",
+        submission_date=date(2025, 3, 15),
+    )
+    section = SectionBlock(
+        title="1 Обзор", children=[TextBlock(text=text) for text in texts]
+    )
+    return Report(meta=meta, blocks=[section, ReferencesBlock(items=list(references))])
+
+
+def issues(report: Report, code: str) -> list:
+    result = validate_report(report)
+    return [issue for issue in [*result.errors, *result.warnings] if issue.code == code]
+
+
+def test_references_are_parsed_with_gost_heuristics():
+    assert parse_reference(BOOK) == Reference(
+        ("Иванов И.И.",), "Основы технологии производства", 2017, "book"
+    )
+    assert parse_reference(ARTICLE) == Reference(
+        ("Петров П.П.",), "Анализ данных в 1990-х годах", 2022, "article"
+    )
+    assert parse_reference(STANDARD) == Reference(
+        (), "Общие требования к текстовым документам", 1995, "standard"
+    )
+    assert parse_reference(WEB) == Reference((), "Python documentation", None, "web")
+    assert parse_reference(
+        "Основы менеджмента / А. А. Смирнов, Б. Б. Кузнецова. — Санкт-Петербург : "
+        "Питер, 2021. — 200 с."
+    ).authors == ("Смирнов А.А.", "Кузнецова Б.Б.")
+    assert parse_reference(
+        "Об информации : Федеральный закон от 27.07.2006 № 149-ФЗ."
+    ) == Reference((), "Об информации", 2006, "law")
+
+
+def test_citations_are_parsed_into_ranges_and_checked_against_the_index():
+    bibliography = BibliographyIndex([ReferencesBlock(items=["А", "Б", "В"])])
+
+    assert parse_citation("1, 4–7") == ((1, 1), (4, 7))
+    assert parse_citation("2 - 3; 1") == ((2, 3), (1, 1))
+    assert len(bibliography) == 3 and 3 in bibliography and 4 not in bibliography
+    assert bibliography.missing(parse_citation("1, 2–3")) == []
+    assert bibliography.missing(parse_citation("0, 2–4, 3–2")) == ["0", "2–4", "3–2"]
+
+
+def test_citations_without_references_produce_links_error():
+    report = build_report(
+        "Как показано в [1], [2, 4] и [3, с. 15], а также [1–4].",
+        "Данные взяты из [5] и [2–6].",
+        "Квадратные скобки без номеров [а] ссылками не считаются.",
+    )
+    report.blocks[0].children.append(
+        ListBlock(list_type="bulleted", items=["Пункт со ссылкой [7]"])
+    )
+
+    messages = [issue.message for issue in issues(report, "REFERENCES_LINKS_VALID")]
+
+    assert messages == [
+        "Ссылка [5] указывает на источники, которых нет в списке: 5.",
+        "Ссылка [2–6] указывает на источники, которых нет в списке: 2–6.",
+        "Ссылка [7] указывает на источники, которых нет в списке: 7.",
+    ]
+
+
+def test_old_sources_produce_age_warning_except_normative_documents():
+    report = build_report("Текст [1–4].")
+
+    warnings = issues(report, "REFERENCES_AGE_WARNING")
+
+    assert [issue.message for issue in warnings] == [
+        "Источник 1 издан в 2017 году — более 5 лет назад на момент сдачи отчёта. "
+        "Проверьте, нет ли более новых источников."
+    ]
+    assert warnings[0].block_id == report.blocks[1].id
+
+    report.meta = report.meta.model_copy(update={"submission_date": date(2022, 9, 1)})
+    assert issues(report, "REFERENCES_AGE_WARNING") == []
+
+
+def test_reference_age_limit_is_configurable():
+    report = build_report(references=(BOOK, ARTICLE))
+    rule = rule_references_age_warning.configure(max_age_years=2)
+
+    records = rule.finalize(report, [report.blocks[1]])
+
+    assert [record.args for record in records] == [(1, 2017, 2), (2, 2022, 2)]
@@ -0,0 +1,107 @@
+from datetime import date
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.models import (
+    ListBlock,
+    Report,
+    ReportMeta,
+    SectionBlock,
+    TextBlock,
+    WorkType,
+)
+from app.services.validation.engine import RULES, rule_name, validate_report
+from app.services.validation.metrics import rule_metrics
+
+
+def build_report() -> Report:
+    meta = ReportMeta(
+        work_type=WorkType.LAB,
+        work_number=2,
+        discipline="Физика",
+        topic="Тест диагностики",
+        student_full_name="Петров Петр Петрович",
+        group="ББИ-24-3",
+        semester="2",
+        direction_code="38.03.05",
+        direction_name="Бизнес-информатика",
+        department="Кафедра физики",
+        teacher_full_name="Иванова Анна Сергеевна",
+        submission_date=date(2025, 2, 1),
+    )
+    section = SectionBlock(
+        title="ВВЕДЕНИЕ",
+        special_kind="INTRO",
+        children=[
+            ListBlock(list_type="bulleted", items=[]),
+            TextBlock(text="Текст."),
+        ],
+    )
+    return Report(meta=meta, blocks=[section])
+
+
+def test_validate_report_reports_per_rule_diagnostics_on_request():
+    report = build_report()
+
+    assert validate_report(report).diagnostics is None
+
+    result = validate_report(report, diagnostics=True)
+
+    diagnostics = result.diagnostics
+    assert diagnostics is not None
+    assert [rule.rule for rule in diagnostics.rules] == [
+        rule_name(rule) for rule in RULES
+    ]
+    by_rule = {rule.rule: rule for rule in diagnostics.rules}
+    assert by_rule["rule_non_empty_lists"].issues == 1
+    assert all(rule.duration_ms >= 0 for rule in diagnostics.rules)
+    assert diagnostics.total_ms >= sum(rule.duration_ms for rule in diagnostics.rules)
+
+
+def test_rule_metrics_accumulate_calls_and_issues():
+    report = build_report()
+    before = rule_metrics.snapshot().get("rule_non_empty_lists", {"calls": 0})
+
+    validate_report(report)
+    validate_report(report)
+
+    after = rule_metrics.snapshot()["rule_non_empty_lists"]
+    assert after["calls"] == before["calls"] + 2
+    assert after["issues"] >= 2
+    assert sum(after["buckets"].values()) == after["calls"]
+
+
+def test_validate_endpoint_sends_server_timing_and_optional_diagnostics():
+    client = TestClient(app)
+    payload = build_report().model_dump(mode="json")
+
+    response = client.post("/api/v1/reports/validate", json=payload)
+
+    assert response.status_code == 200
+    assert "diagnostics" not in response.json()
+    server_timing = response.headers["Server-Timing"]
+    assert server_timing.startswith("validate;dur=")
+    assert "rule_non_empty_lists;dur=" in server_timing
+
+    response = client.post("/api/v1/reports/validate?diagnostics=true", json=payload)
+    assert len(response.json()["diagnostics"]["rules"]) == len(RULES)
+
+    response = client.post(
+        "/api/v1/reports/validate",
+        json=payload,
+        headers={"X-Validation-Diagnostics": "1"},
+    )
+    assert response.json()["diagnostics"]["total_ms"] >= 0
+
+
+def test_diagnostics_endpoint_exposes_histograms_and_cache_counters():
+    client = TestClient(app)
+    client.post("/api/v1/reports/validate", json=build_report().model_dump(mode="json"))
+
+    response = client.get("/api/v1/diagnostics/validation")
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["rules"]["rule_section_order"]["calls"] >= 1
+    assert {"hits", "misses", "evictions", "hit_ratio"} <= set(data["rule_cache"])
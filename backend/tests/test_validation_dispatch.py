@@ -0,0 +1,194 @@
+from datetime import date
+from typing import List
+
+from app.models import (
+    BaseBlock,
+    FigureBlock,
+    Report,
+    ReportIndex,
+    ReportMeta,
+    SectionBlock,
+    TableBlock,
+    TextBlock,
+    ValidationIssue,
+    ValidationIssueLevel,
+    WorkType,
+)
+from app.services.validation import rules as validation_rules
+from app.services.validation.engine import (
+    RULES,
+    BlockRule,
+    block_check,
+    run_rules,
+    validate_report,
+)
+from app.services.validation.traversal import iter_blocks
+
+
+def build_meta() -> ReportMeta:
+    return ReportMeta(
+        work_type=WorkType.PRACTICE,
+        work_number=1,
+        discipline="Технологические основы производства",
+        topic="Тестовый отчёт",
+        student_full_name="Иванов Иван Иванович",
+        group="ББИ-24-3",
+        semester="2",
+        direction_code="38.03.05",
+        direction_name="Бизнес-информатика",
+        department="Кафедра бизнес-информатики",
+        teacher_full_name="Петров Петр Петрович",
+        submission_date=date(2025, 3, 15),
+    )
+
+
+def build_report_with_media() -> Report:
+    first = SectionBlock(
+        title="1 Первый раздел",
+        children=[
+            FigureBlock(caption="Рисунок 1 – Схема", file_name="a.png"),
+            TableBlock(caption="Таблица 1 – Данные", rows=[["a"]]),
+            TextBlock(text="Пояснение."),
+        ],
+    )
+    second = SectionBlock(
+        title="2 Второй раздел",
+        children=[
+            FigureBlock(caption="Рисунок 2 – Схема", file_name="b.png"),
+            TextBlock(text="Пояснение."),
+        ],
+    )
+    return Report(meta=build_meta(), blocks=[first, second])
+
+
+class CountingRule(BlockRule):
+    block_types = (FigureBlock,)
+
+    def __init__(self) -> None:
+        self.visited: List[BaseBlock] = []
+
+    def visit(self, block: BaseBlock, state: List[ValidationIssue]) -> None:
+        self.visited.append(block)
+
+    def finalize(self, report: Report, state: List[ValidationIssue]):
+        return [
+            ValidationIssue(
+                code="FIGURES_SEEN",
+                level=ValidationIssueLevel.WARNING,
+                message=f"{len(self.visited)}",
+            )
+        ]
+
+
+def test_iter_blocks_follows_document_order():
+    report = build_report_with_media()
+
+    kinds = [type(block).__name__ for block in iter_blocks(report)]
+
+    assert kinds == [
+        "SectionBlock",
+        "FigureBlock",
+        "TableBlock",
+        "TextBlock",
+        "SectionBlock",
+        "FigureBlock",
+        "TextBlock",
+    ]
+
+
+def test_block_rule_receives_only_declared_block_types():
+    report = build_report_with_media()
+    rule = CountingRule()
+
+    issues = run_rules(report, [rule])[0]
+
+    assert [type(block) for block in rule.visited] == [FigureBlock, FigureBlock]
+    assert issues[0].message == "2"
+
+
+def test_block_rules_share_a_single_tree_walk(monkeypatch):
+    report = build_report_with_media()
+    builds = []
+    build_index = ReportIndex.__init__
+
+    def counting_build_index(index, indexed_report):
+        builds.append(indexed_report)
+        build_index(index, indexed_report)
+
+    monkeypatch.setattr(ReportIndex, "__init__", counting_build_index)
+
+    with report.frozen():
+        run_rules(report, RULES)
+        run_rules(report, [rule for rule in RULES if isinstance(rule, BlockRule)])
+    assert builds == [report]
+
+    # Вне прохода индекс строится заново при каждом запуске.
+    run_rules(report, RULES)
+    assert builds == [report, report]
+
+
+def test_plain_and_block_rules_keep_registry_order():
+    report = build_report_with_media()
+
+    def plain_rule(report: Report) -> List[ValidationIssue]:
+        return [
+            ValidationIssue(
+                code="PLAIN",
+                level=ValidationIssueLevel.WARNING,
+                message="Обычное правило.",
+            )
+        ]
+
+    @block_check(TableBlock)
+    def table_rule(block: TableBlock) -> List[ValidationIssue]:
+        return [
+            ValidationIssue(
+                code="TABLE_SEEN",
+                level=ValidationIssueLevel.WARNING,
+                message="Таблица.",
+                block_id=block.id,
+            )
+        ]
+
+    original_rules = list(RULES)
+    RULES.clear()
+    RULES.extend([table_rule, plain_rule, CountingRule()])
+
+    try:
+        result = validate_report(report)
+    finally:
+        RULES.clear()
+        RULES.extend(original_rules)
+
+    assert [issue.code for issue in result.warnings] == [
+        "TABLE_SEEN",
+        "PLAIN",
+        "FIGURES_SEEN",
+    ]
+
+
+def test_block_rule_can_be_called_standalone():
+    report = build_report_with_media()
+    report.blocks[0].children[0].caption = ""
+
+    assert issue_codes(validation_rules.rule_figure_has_caption(report)) == [
+        "FIGURE_HAS_CAPTION"
+    ]
+    assert validation_rules.rule_table_has_caption(report) == []
+
+
+def test_numbering_spans_sections_in_document_order():
+    report = build_report_with_media()
+
+    result = validate_report(report)
+
+    numbering_codes = [
+        issue.code
+        for issue in result.errors
+        if issue.code == "FIGURE_TABLE_NUMBERING_CONSISTENT"
+    ]
+    assert numbering_codes == []
+
+
+def issue_codes(issues: List[ValidationIssue]) -> List[str]:
+    return [issue.code for issue in issues]
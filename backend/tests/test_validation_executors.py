@@ -0,0 +1,102 @@
+from datetime import date
+from typing import List
+
+import pytest
+
+from app.models import (
+    AppendixBlock,
+    FigureBlock,
+    ListBlock,
+    Report,
+    ReportMeta,
+    SectionBlock,
+    TableBlock,
+    TextBlock,
+    ValidationIssue,
+    ValidationIssueLevel,
+    WorkType,
+)
+from app.services.validation.engine import (
+    RULES,
+    cpu_heavy_rule,
+    execute_rules,
+    validate_report,
+)
+from app.services.validation.executors import execute_rules_concurrently
+
+
+def build_broken_report() -> Report:
+    meta = ReportMeta(
+        work_type=WorkType.COURSE,
+        work_number=None,
+        discipline="Технологические основы производства",
+        topic="Курсовой проект",
+        student_full_name="Иванов Иван Иванович",
+        group="ББИ-24-3",
+        semester="2",
+        direction_code="38.03.05",
+        direction_name="Бизнес-информатика",
+        department="Кафедра бизнес-информатики",
+        teacher_full_name="Петров Петр Петрович",
+        submission_date=date(2025, 3, 15),
+    )
+    sections = [
+        SectionBlock(
+            title=f"{number} Раздел",
+            children=[
+                ListBlock(list_type="bulleted", items=[]),
+                FigureBlock(caption=f"Рисунок {number * 2} – Схема", file_name="a"),
+                TableBlock(caption="Без номера", rows=[]),
+            ],
+        )
+        for number in range(1, 6)
+    ]
+    appendices = [
+        AppendixBlock(label=label, title="Приложение", children=[TextBlock(text=".")])
+        for label in ("Б", "А", "А")
+    ]
+    return Report(meta=meta, blocks=[*sections, *appendices])
+
+
+def dump(result):
+    return result.model_dump(mode="json")
+
+
+@pytest.mark.parametrize("executor", ["thread", "process"])
+def test_concurrent_executors_match_sequential_result(executor):
+    report = build_broken_report()
+
+    sequential = validate_report(report)
+    concurrent = validate_report(report, executor=executor)
+
+    assert dump(concurrent) == dump(sequential)
+    assert sequential.errors and sequential.warnings
+
+
+def test_runs_are_returned_in_rule_order_for_any_worker_count():
+    report = build_broken_report()
+    rules = list(RULES)
+
+    expected = [run.issues for run in execute_rules(report, rules)]
+
+    for workers in (1, 2, 3, len(rules) + 1):
+        runs = execute_rules_concurrently(report, rules, "thread", workers=workers)
+        assert [run.issues for run in runs] == expected
+
+
+def test_unpicklable_cpu_heavy_rule_runs_in_calling_process():
+    report = build_broken_report()
+
+    @cpu_heavy_rule
+    def local_heavy_rule(report: Report) -> List[ValidationIssue]:
+        return [
+            ValidationIssue(
+                code="LOCAL_HEAVY",
+                level=ValidationIssueLevel.WARNING,
+                message="Локальное правило.",
+            )
+        ]
+
+    runs = execute_rules_concurrently(report, [local_heavy_rule], "process")
+
+    assert [issue.code for issue in runs[0].issues] == ["LOCAL_HEAVY"]
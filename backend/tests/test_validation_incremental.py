@@ -0,0 +1,216 @@
+from datetime import date
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.models import (
+    BlockInsertion,
+    FigureBlock,
+    ListBlock,
+    ReferencesBlock,
+    Report,
+    ReportChange,
+    ReportMeta,
+    SectionBlock,
+    TableBlock,
+    TextBlock,
+    WorkType,
+)
+from app.services.reports.changes import apply_change
+from app.services.validation import rules as validation_rules
+from app.services.validation.engine import validate_report
+from app.services.validation.incremental import validate_incremental
+
+
+def build_report() -> Report:
+    meta = ReportMeta(
+        work_type=WorkType.PRACTICE,
+        work_number=1,
+        discipline="Технологические основы производства",
+        topic="Тестовый отчёт",
+        student_full_name="Иванов Иван Иванович",
+        group="ББИ-24-3",
+        semester="2",
+        direction_code="38.03.05",
+        direction_name="Бизнес-информатика",
+        department="Кафедра бизнес-информатики",
+        teacher_full_name="Петров Петр Петрович",
+        submission_date=date(2025, 3, 15),
+    )
+
+    intro = SectionBlock(title="ВВЕДЕНИЕ", special_kind="INTRO")
+    intro.children.append(TextBlock(text="Краткое введение."))
+
+    main_section = SectionBlock(title="1 Постановка задачи")
+    main_section.children.append(
+        ListBlock(list_type="numbered", items=["Первый пункт", "Второй пункт"])
+    )
+    main_section.children.append(
+        TableBlock(caption="Таблица 1 – Пример данных", rows=[["1", "2"]])
+    )
+    main_section.children.append(
+        FigureBlock(caption="Рисунок 1 – Схема установки", file_name="figure1.png")
+    )
+    main_section.children.append(TextBlock(text="Комментарий к рисунку."))
+
+    conclusion = SectionBlock(title="ЗАКЛЮЧЕНИЕ", special_kind="CONCLUSION")
+    conclusion.children.append(TextBlock(text="Здесь формулируются выводы."))
+
+    references = ReferencesBlock(items=["ГОСТ 7.0.5-2008."])
+
+    return Report(meta=meta, blocks=[intro, main_section, conclusion, references])
+
+
+def dump(result):
+    return result.model_dump(mode="json")
+
+
+def assert_matches_full_validation(report: Report, change: ReportChange) -> None:
+    previous_result = validate_report(report)
+
+    updated, changed = apply_change(report, change)
+    incremental = validate_incremental(report, previous_result, updated, changed)
+
+    assert dump(incremental) == dump(validate_report(updated))
+
+
+def test_apply_change_copies_only_the_changed_path():
+    report = build_report()
+    main_section = report.blocks[1]
+    text = main_section.children[-1]
+
+    updated, changed = apply_change(
+        report,
+        ReportChange(
+            replaced_blocks=[TextBlock(id=text.id, text="Новый комментарий.")]
+        ),
+    )
+
+    assert changed == {text.id}
+    assert updated.blocks[1] is not main_section
+    assert updated.blocks[1].children[-1].text == "Новый комментарий."
+    assert updated.blocks[0] is report.blocks[0]
+    assert updated.blocks[1].children[0] is main_section.children[0]
+    assert text.text == "Комментарий к рисунку."
+
+
+def test_incremental_matches_full_validation_for_content_edits():
+    report = build_report()
+    list_block = report.blocks[1].children[0]
+
+    assert_matches_full_validation(
+        report,
+        ReportChange(
+            replaced_blocks=[
+                ListBlock(id=list_block.id, list_type="numbered", items=[])
+            ]
+        ),
+    )
+
+
+def test_incremental_matches_full_validation_for_structural_edits():
+    report = build_report()
+    main_section = report.blocks[1]
+
+    assert_matches_full_validation(
+        report,
+        ReportChange(removed_block_ids=[main_section.children[-1].id]),
+    )
+    assert_matches_full_validation(
+        report,
+        ReportChange(removed_block_ids=[report.blocks[0].id]),
+    )
+    assert_matches_full_validation(
+        report,
+        ReportChange(
+            inserted_blocks=[
+                BlockInsertion(
+                    parent_id=main_section.id,
+                    index=0,
+                    block=FigureBlock(caption="Рисунок 3 – Лишний", file_name="x"),
+                )
+            ]
+        ),
+    )
+
+
+def test_content_edit_rechecks_only_changed_blocks_and_skips_structural_rules(
+    monkeypatch,
+):
+    report = build_report()
+    previous_result = validate_report(report)
+    text = report.blocks[1].children[-1]
+
+    checked = []
+    original_check = validation_rules.rule_section_ends_with_media.check
+
+    def counting_check(block):
+        checked.append(block.id)
+        return original_check(block)
+
+    def failing_rule(report):
+        raise AssertionError("structural rule must not be re-run")
+
+    monkeypatch.setattr(
+        validation_rules.rule_section_ends_with_media, "check", counting_check
+    )
+    monkeypatch.setattr(
+        validation_rules.FigureTableNumberingRule, "visit", failing_rule
+    )
+
+    updated, changed = apply_change(
+        report,
+        ReportChange(replaced_blocks=[TextBlock(id=text.id, text="Правка.")]),
+    )
+    result = validate_incremental(report, previous_result, updated, changed)
+
+    assert checked == [report.blocks[1].id]
+    assert result.is_valid is True
+
+
+def test_versions_api_validates_changes_incrementally():
+    client = TestClient(app)
+    report = build_report()
+
+    response = client.post(
+        "/api/v1/reports/versions", json=report.model_dump(mode="json")
+    )
+    assert response.status_code == 200
+    version = response.json()["version"]
+    assert response.json()["result"]["errors"] == []
+
+    list_block = report.blocks[1].children[0]
+    change = ReportChange(
+        replaced_blocks=[ListBlock(id=list_block.id, list_type="bulleted", items=[])]
+    )
+    response = client.post(
+        f"/api/v1/reports/versions/{version}/validate",
+        json=change.model_dump(mode="json"),
+    )
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["version"] != version
+    assert [issue["code"] for issue in data["result"]["errors"]] == ["NON_EMPTY_LISTS"]
+
+
+def test_versions_api_rejects_unknown_version_and_block():
+    client = TestClient(app)
+    report = build_report()
+
+    response = client.post(
+        "/api/v1/reports/versions/unknown/validate",
+        json=ReportChange().model_dump(mode="json"),
+    )
+    assert response.status_code == 404
+
+    version = client.post(
+        "/api/v1/reports/versions", json=report.model_dump(mode="json")
+    ).json()["version"]
+    response = client.post(
+        f"/api/v1/reports/versions/{version}/validate",
+        json=ReportChange(replaced_blocks=[TextBlock(text="Чужой блок.")]).model_dump(
+            mode="json"
+        ),
+    )
+    assert response.status_code == 422
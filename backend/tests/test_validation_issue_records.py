@@ -0,0 +1,98 @@
+from datetime import date
+
+from app.models import (
+    AppendixBlock,
+    FigureBlock,
+    ListBlock,
+    Report,
+    ReportMeta,
+    SectionBlock,
+    TableBlock,
+    TextBlock,
+    ValidationIssue,
+    ValidationIssueLevel,
+    WorkType,
+)
+from app.services.validation.engine import RULES, run_rules, validate_report
+from app.services.validation.issues import IssueRecord, render_issue
+from app.services.validation.messages import MESSAGES
+
+
+def build_broken_report() -> Report:
+    meta = ReportMeta(
+        work_type=WorkType.PRACTICE,
+        work_number=1,
+        discipline="Технологические основы производства",
+        topic="Тестовый отчёт",
+        student_full_name="Иванов Иван Иванович",
+        group="ББИ-24-3",
+        semester="2",
+        direction_code="38.03.05",
+        direction_name="Бизнес-информатика",
+        department="Кафедра бизнес-информатики",
+        teacher_full_name="Петров Петр Петрович",
+        submission_date=date(2025, 3, 15),
+    )
+    section = SectionBlock(
+        title="1 Раздел",
+        children=[
+            ListBlock(list_type="bulleted", items=[]),
+            FigureBlock(caption="Рисунок 3 – Схема", file_name="a.png"),
+            TableBlock(caption="", rows=[]),
+        ],
+    )
+    conclusion = SectionBlock(
+        title="ЗАКЛЮЧЕНИЕ",
+        special_kind="CONCLUSION",
+        children=[TextBlock(text="Выводы.")],
+    )
+    appendices = [
+        AppendixBlock(label=label, title="Приложение") for label in ("Б", "Б", "А")
+    ]
+    return Report(meta=meta, blocks=[conclusion, section, *appendices])
+
+
+def test_rules_emit_records_and_result_renders_messages():
+    report = build_broken_report()
+
+    raw = [issue for issues in run_rules(report, RULES) for issue in issues]
+    result = validate_report(report)
+
+    assert raw and all(isinstance(issue, IssueRecord) for issue in raw)
+    rendered = [*result.errors, *result.warnings]
+    assert all(isinstance(issue, ValidationIssue) for issue in rendered)
+    assert sorted(issue.code for issue in rendered) == sorted(
+        issue.code for issue in raw
+    )
+    assert all(issue.message != issue.code for issue in rendered)
+
+
+def test_messages_are_formatted_from_template_arguments():
+    report = build_broken_report()
+
+    messages = {issue.message for issue in validate_report(report).errors}
+
+    assert "В отчёте отсутствует раздел ВВЕДЕНИЕ." in messages
+    assert "Метка приложения 'Б' используется более одного раза." in messages
+    assert (
+        "Нумерация рисунков должна быть последовательной "
+        "(ожидалось 1, найдено 3)." in messages
+    )
+
+
+def test_catalog_covers_every_declared_code():
+    catalog_codes = {code for code, _ in MESSAGES}
+
+    for rule in RULES:
+        assert set(rule.codes) <= catalog_codes
+
+
+def test_render_issue_passes_through_ready_issues_and_falls_back_to_code():
+    ready = ValidationIssue(
+        code="CUSTOM", level=ValidationIssueLevel.WARNING, message="Готово."
+    )
+
+    assert render_issue(ready) is ready
+    assert render_issue(IssueRecord("UNKNOWN", ValidationIssueLevel.ERROR)).message == (
+        "UNKNOWN"
+    )
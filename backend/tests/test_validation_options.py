@@ -0,0 +1,117 @@
+from datetime import date
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.models import (
+    ListBlock,
+    Report,
+    ReportMeta,
+    SectionBlock,
+    TextBlock,
+    ValidationIssueLevel,
+    WorkType,
+)
+from app.services.validation import rules as validation_rules
+from app.services.validation.engine import RULES, rule_cost, validate_report
+
+
+def build_report(with_intro: bool = True) -> Report:
+    meta = ReportMeta(
+        work_type=WorkType.LAB,
+        work_number=5,
+        discipline="Информатика",
+        topic="Режимы проверки",
+        student_full_name="Иванов Иван Иванович",
+        group="ББИ-24-3",
+        semester="2",
+        direction_code="38.03.05",
+        direction_name="Бизнес-информатика",
+        department="Кафедра бизнес-информатики",
+        teacher_full_name="Петров Петр Петрович",
+        submission_date=date(2025, 3, 15),
+    )
+    blocks = [
+        SectionBlock(
+            title="1 Раздел",
+            children=[
+                TextBlock(text="Текст."),
+                ListBlock(list_type="bulleted", items=[]),
+                ListBlock(list_type="numbered", items=[]),
+                TextBlock(text="Текст."),
+            ],
+        )
+    ]
+    if with_intro:
+        blocks.insert(0, SectionBlock(title="ВВЕДЕНИЕ", special_kind="INTRO"))
+    return Report(meta=meta, blocks=blocks)
+
+
+def test_every_registered_rule_declares_its_codes():
+    assert all(getattr(rule, "codes", None) for rule in RULES)
+
+
+def test_fail_fast_runs_cheap_rules_first_and_stops_at_first_error(monkeypatch):
+    calls = []
+    original_check = validation_rules.rule_non_empty_lists.check
+
+    def counting_check(block):
+        calls.append(block.id)
+        return original_check(block)
+
+    monkeypatch.setattr(validation_rules.rule_non_empty_lists, "check", counting_check)
+
+    result = validate_report(build_report(with_intro=False), fail_fast=True)
+
+    assert {issue.code for issue in result.errors} == {"REQUIRED_SECTIONS_PRESENT"}
+    assert calls == []
+    assert rule_cost(validation_rules.rule_required_sections_present) < rule_cost(
+        validation_rules.rule_non_empty_lists
+    )
+
+
+def test_fail_fast_on_valid_report_matches_full_validation():
+    report = build_report()
+    report.blocks[1].children = [TextBlock(text="Текст.")]
+    report.blocks.append(SectionBlock(title="ЗАКЛЮЧЕНИЕ", special_kind="CONCLUSION"))
+
+    full = validate_report(report)
+    fast = validate_report(report, fail_fast=True)
+
+    assert not full.errors
+    assert fast.model_dump() == full.model_dump()
+
+
+def test_codes_level_and_cap_filter_issues():
+    report = build_report()
+
+    only_lists = validate_report(report, codes={"NON_EMPTY_LISTS"})
+    assert [issue.code for issue in only_lists.errors] == ["NON_EMPTY_LISTS"] * 2
+    assert only_lists.warnings == []
+
+    capped = validate_report(report, codes=["NON_EMPTY_LISTS"], max_issues_per_rule=1)
+    assert len(capped.errors) == 1
+
+    warnings_only = validate_report(report, level=ValidationIssueLevel.WARNING)
+    assert warnings_only.errors == []
+    assert warnings_only.warnings == validate_report(report).warnings
+
+
+def test_validate_endpoint_accepts_option_query_parameters():
+    client = TestClient(app)
+    payload = build_report().model_dump(mode="json")
+
+    response = client.post(
+        "/api/v1/reports/validate"
+        "?codes=NON_EMPTY_LISTS&codes=SECTION_ORDER&max_issues_per_rule=1",
+        json=payload,
+    )
+
+    assert response.status_code == 200
+    assert [issue["code"] for issue in response.json()["errors"]] == ["NON_EMPTY_LISTS"]
+
+    response = client.post(
+        "/api/v1/reports/validate?fail_fast=true&level=error", json=payload
+    )
+    assert response.json()["errors"]
+    assert response.json()["warnings"] == []
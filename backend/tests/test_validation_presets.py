@@ -0,0 +1,200 @@
+from datetime import date
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.models import (
+    FigureBlock,
+    Preset,
+    Report,
+    ReportMeta,
+    SectionBlock,
+    TextBlock,
+    ValidationIssueLevel,
+    WorkType,
+)
+from app.services.validation.engine import (
+    RULES,
+    build_result,
+    execute_rules,
+    rule_name,
+    validate_report,
+)
+from app.services.validation.presets import (
+    DEFAULT_PRESET,
+    PRESETS,
+    UnknownPresetError,
+    compile_preset,
+    rule_plan,
+)
+
+
+def build_report(preset: str = DEFAULT_PRESET) -> Report:
+    meta = ReportMeta(
+        preset=preset,
+        work_type=WorkType.PRACTICE,
+        work_number=2,
+        discipline="Технологические основы производства",
+        topic="Пресеты оформления",
+        student_full_name="Иванов Иван Иванович",
+        group="ББИ-24-3",
+        semester="2",
+        direction_code="38.03.05",
+        direction_name="Бизнес-информатика",
+        department="Кафедра бизнес-информатики",
+        teacher_full_name="Петров Петр Петрович",
+        submission_date=date(2025, 3, 15),
+    )
+    intro = SectionBlock(
+        title="ВВЕДЕНИЕ",
+        special_kind="INTRO",
+        children=[TextBlock(text="Введение.")],
+    )
+    section = SectionBlock(
+        title="1 Раздел",
+        children=[
+            TextBlock(text="Текст."),
+            FigureBlock(caption="Рис. 2 – Схема", file_name="a.png"),
+        ],
+    )
+    conclusion = SectionBlock(
+        title="ЗАКЛЮЧЕНИЕ",
+        special_kind="CONCLUSION",
+        children=[TextBlock(text="Выводы.")],
+    )
+    return Report(meta=meta, blocks=[intro, section, conclusion])
+
+
+def issue_levels(report: Report) -> dict:
+    result = validate_report(report)
+    return {issue.code: issue.level for issue in [*result.errors, *result.warnings]}
+
+
+def test_default_preset_runs_registry_rules_as_is():
+    plan = rule_plan()
+
+    assert plan.rules == tuple(RULES)
+    assert rule_plan(DEFAULT_PRESET) is plan
+
+
+def test_draft_preset_overrides_levels_and_disables_rules():
+    default = issue_levels(build_report())
+    draft = issue_levels(build_report("misis_v1_draft"))
+
+    assert default["SECTION_ENDS_WITH_MEDIA"] == ValidationIssueLevel.ERROR
+    assert default["FIGURE_TABLE_NUMBERING_CONSISTENT"] == ValidationIssueLevel.ERROR
+    assert "REFERENCES_PRESENT_IF_NEEDED" in default
+    assert draft["SECTION_ENDS_WITH_MEDIA"] == ValidationIssueLevel.WARNING
+    assert draft["FIGURE_TABLE_NUMBERING_CONSISTENT"] == ValidationIssueLevel.WARNING
+    assert "REFERENCES_PRESENT_IF_NEEDED" not in draft
+    assert validate_report(build_report("misis_v1_draft")).is_valid
+
+
+def test_draft_preset_results_do_not_depend_on_executor():
+    report = build_report("misis_v1_draft")
+
+    sequential = validate_report(report)
+    parallel = validate_report(report, executor="process")
+
+    assert parallel.model_dump() == sequential.model_dump()
+
+
+def test_preset_params_configure_rules():
+    preset = Preset(
+        id="strict",
+        title="Строгий",
+        params={
+            "rule_required_sections_present": {
+                "required_special_kinds": ["INTRO", "CONCLUSION", "REFERENCES"]
+            },
+            "FigureTableNumberingRule": {
+                "figure_caption_pattern": r"^Рисунок\s+(\d+)",
+            },
+        },
+    )
+    plan = compile_preset(preset, RULES)
+    report = build_report()
+    figure = report.blocks[1].children[1]
+
+    def messages() -> set:
+        result = build_result(plan.rules, execute_rules(report, plan.rules))
+        return {issue.message for issue in [*result.errors, *result.warnings]}
+
+    figure.caption = "Рисунок 1 – Схема"
+    assert "В отчёте отсутствует раздел СПИСОК ИСПОЛЬЗОВАННЫХ ИСТОЧНИКОВ." in (
+        messages()
+    )
+    assert "Подпись рисунка должна начинаться с 'Рисунок N'." not in messages()
+
+    figure.caption = "Рис. 1 – Схема"
+    assert "Подпись рисунка должна начинаться с 'Рисунок N'." in messages()
+
+
+def test_builtin_presets_refer_to_registered_rules_and_codes():
+    names = {rule_name(rule) for rule in RULES}
+    codes = {code for rule in RULES for code in rule.codes}
+
+    for preset in PRESETS:
+        assert set(preset.disabled_rules) <= names
+        assert set(preset.params) <= names
+        assert set(preset.severity) <= codes
+
+
+def test_plans_follow_registry_changes():
+    extra = RULES[0]
+    RULES.append(extra)
+    try:
+        assert rule_plan().rules == tuple(RULES)
+    finally:
+        RULES.pop()
+    assert rule_plan().rules == tuple(RULES)
+
+
+def test_plans_are_recompiled_only_after_registry_changes():
+    plan = rule_plan()
+    assert rule_plan() is plan
+
+    first = RULES[0]
+    RULES[0] = RULES[1]
+    try:
+        assert rule_plan().rules == tuple(RULES)
+    finally:
+        RULES[0] = first
+    assert rule_plan().rules == tuple(RULES)
+    assert rule_plan() is rule_plan()
+
+
+def test_unknown_preset_is_rejected():
+    report = build_report("unknown")
+
+    with pytest.raises(UnknownPresetError):
+        validate_report(report)
+
+    with TestClient(app) as client:
+        response = client.post(
+            "/api/v1/reports/validate", json=report.model_dump(mode="json")
+        )
+
+    assert response.status_code == 422
+    assert "unknown" in response.json()["detail"]
+
+
+def test_presets_endpoint_serves_compiled_plans_with_etag():
+    with TestClient(app) as client:
+        response = client.get("/api/v1/presets")
+        cached = client.get(
+            "/api/v1/presets", headers={"If-None-Match": response.headers["ETag"]}
+        )
+
+    assert response.status_code == 200
+    presets = {preset["id"]: preset for preset in response.json()}
+    assert set(presets) == {preset.id for preset in PRESETS}
+    assert presets[DEFAULT_PRESET]["default"] is True
+    draft_rules = {rule["rule"]: rule for rule in presets["misis_v1_draft"]["rules"]}
+    assert "ReferencesPresentRule" not in draft_rules
+    assert draft_rules["rule_section_ends_with_media"]["codes"] == {
+        "SECTION_ENDS_WITH_MEDIA": "warning"
+    }
+    assert cached.status_code == 304
+    assert cached.content == b""
@@ -8,6 +8,7 @@ from app.models import (
     Report,
     ReportMeta,
     SectionBlock,
+    SubsectionBlock,
     TableBlock,
     TextBlock,
     WorkType,
@@ -254,3 +255,55 @@ def test_empty_references_block_produces_error():
 
     error_codes = {issue.code for issue in result.errors}
     assert "LIST_OF_REFERENCES_NOT_EMPTY" in error_codes
+
+
+def test_typed_list_markers_and_indents_produce_list_marker_format_error():
+    report = build_valid_report()
+    main_section = report.blocks[1]
+    main_section.children[0].items = [
+        "– Первый пункт",
+        "Второй пункт, т.е. без маркера",
+        "  Третий пункт",
+        "  4) Четвёртый пункт",
+        "б) Пятый пункт",
+    ]
+
+    result = validate_report(report)
+
+    messages = [
+        issue.message for issue in result.errors if issue.code == "LIST_MARKER_FORMAT"
+    ]
+    assert len(messages) == 4
+    assert messages[0].startswith("Элемент 1 списка начинается с маркера «–»")
+    assert messages[1].startswith("Элемент 3 списка начинается с пробелов")
+    assert "«4)»" in messages[2]
+    assert "«б)»" in messages[3]
+
+
+def test_heading_numbering_style_follows_heading_levels():
+    report = build_valid_report()
+    main_section = report.blocks[1]
+    main_section.children[-1:-1] = [
+        SubsectionBlock(level=2, title="1.1 Исходные данные"),
+        SubsectionBlock(level=3, title="1.1 Параметры"),
+        SubsectionBlock(level=2, title="1.2. Методика"),
+        SubsectionBlock(level=2, title="Результаты"),
+        TextBlock(text="Текст."),
+    ]
+    report.blocks[0].title = "1 ВВЕДЕНИЕ"
+
+    result = validate_report(report)
+
+    messages = [
+        issue.message
+        for issue in result.errors
+        if issue.code == "HEADING_NUMBERING_STYLE"
+    ]
+    assert messages == [
+        "Заголовок структурного раздела «1 ВВЕДЕНИЕ» оформляется без номера.",
+        "Номер заголовка «1.1 Параметры» не соответствует уровню 3: "
+        "ожидается номер вида «1.1.1».",
+        "В заголовке «1.2. Методика» после номера ставится один пробел; точка "
+        "после номера и отступ перед ним не допускаются.",
+        "Заголовок «Результаты» должен начинаться с номера вида «1.1».",
+    ]
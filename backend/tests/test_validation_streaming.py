@@ -0,0 +1,105 @@
+import json
+from datetime import date
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.models import (
+    FigureBlock,
+    ListBlock,
+    Report,
+    ReportMeta,
+    SectionBlock,
+    WorkType,
+)
+from app.services.validation.engine import RULES, validate_report
+from app.services.validation.streaming import iter_validation_events
+
+
+def build_report() -> Report:
+    meta = ReportMeta(
+        work_type=WorkType.PRACTICE,
+        work_number=4,
+        discipline="Технологические основы производства",
+        topic="Потоковая проверка",
+        student_full_name="Иванов Иван Иванович",
+        group="ББИ-24-3",
+        semester="2",
+        direction_code="38.03.05",
+        direction_name="Бизнес-информатика",
+        department="Кафедра бизнес-информатики",
+        teacher_full_name="Петров Петр Петрович",
+        submission_date=date(2025, 3, 15),
+    )
+    section = SectionBlock(
+        title="1 Раздел",
+        children=[
+            ListBlock(list_type="bulleted", items=[]),
+            FigureBlock(caption="", file_name="a.png"),
+        ],
+    )
+    return Report(meta=meta, blocks=[section])
+
+
+def test_events_cover_every_issue_and_end_with_summary():
+    report = build_report()
+    expected = validate_report(report)
+
+    events = [(kind, json.loads(data)) for kind, data in iter_validation_events(report)]
+
+    issues = [data["issue"] for kind, data in events if kind == "issue"]
+    assert sorted(issue["code"] for issue in issues) == sorted(
+        issue.code for issue in [*expected.errors, *expected.warnings]
+    )
+    assert len([kind for kind, _ in events if kind == "rule"]) == len(RULES)
+
+    kind, summary = events[-1]
+    assert kind == "summary"
+    assert summary["errors"] == len(expected.errors)
+    assert summary["warnings"] == len(expected.warnings)
+    assert summary["is_valid"] is False
+
+
+def test_issue_events_precede_their_rule_event():
+    events = list(iter_validation_events(build_report()))
+
+    first_issue = next(i for i, (kind, _) in enumerate(events) if kind == "issue")
+    rule = json.loads(events[first_issue][1])["rule"]
+    rule_event = next(
+        i
+        for i, (kind, data) in enumerate(events)
+        if kind == "rule" and json.loads(data)["rule"] == rule
+    )
+    assert first_issue < rule_event
+
+
+def test_stream_endpoint_returns_ndjson_by_default():
+    client = TestClient(app)
+    payload = build_report().model_dump(mode="json")
+
+    response = client.post("/api/v1/reports/validate/stream", json=payload)
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert lines[-1]["event"] == "summary"
+    assert any(
+        line["event"] == "issue" and line["issue"]["code"] == "NON_EMPTY_LISTS"
+        for line in lines
+    )
+
+
+def test_stream_endpoint_returns_server_sent_events_on_request():
+    client = TestClient(app)
+    payload = build_report().model_dump(mode="json")
+
+    response = client.post(
+        "/api/v1/reports/validate/stream",
+        json=payload,
+        headers={"Accept": "text/event-stream"},
+    )
+
+    assert response.headers["content-type"].startswith("text/event-stream")
+    frames = [frame for frame in response.text.split("\n\n") if frame]
+    assert frames[-1].startswith("event: summary\ndata: {")
+    assert all(frame.startswith("event: ") for frame in frames)
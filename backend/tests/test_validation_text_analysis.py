@@ -0,0 +1,129 @@
+import re
+
+import pytest
+
+from app.models import ListBlock, SectionBlock, TextBlock
+from app.services.validation.text_analysis import (
+    NO_MATCHES,
+    TextAnalyzer,
+    TextMatch,
+    _Matcher,
+    keywords,
+)
+
+
+def build_analyzer() -> TextAnalyzer:
+    analyzer = TextAnalyzer(cache_max_bytes=1024 * 1024)
+    analyzer.register("work_goal", keywords("Цель работы", "Цель"), [TextBlock])
+    analyzer.register("year", r"\b(19|20)(\d\d)\b", [TextBlock, ListBlock])
+    analyzer.register("number", r"\d+", [TextBlock])
+    return analyzer
+
+
+def test_patterns_of_a_block_type_are_matched_in_one_scan(monkeypatch):
+    analyzer = build_analyzer()
+    scans = []
+    original_scan = _Matcher.scan
+    monkeypatch.setattr(
+        _Matcher,
+        "scan",
+        lambda self, block: scans.append(block) or original_scan(self, block),
+    )
+    text = TextBlock(text="ЦЕЛЬ РАБОТЫ: изучить 3 отчёта 2019 года. Нецелевой.")
+
+    matches = analyzer.analyze(text)
+
+    assert len(scans) == 1
+    assert matches["work_goal"] == (TextMatch("text", 0, 0, 11, "ЦЕЛЬ РАБОТЫ"),)
+    assert [(m.text, m.groups) for m in matches["year"]] == [("2019", ("20", "19"))]
+    # Год достаётся и шаблону «year», и шаблону «number».
+    assert [m.text for m in matches["number"]] == ["3", "2019"]
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "ЦЕЛЬ РАБОТЫ: изучить 3 отчёта 2019 года. Нецелевой.",
+        "1999–2020, 20201, цель 12 и 1920",
+        "",
+        "Цель Цель Цель",
+    ],
+)
+def test_each_pattern_finds_what_a_separate_scan_would(text):
+    analyzer = TextAnalyzer(cache_max_bytes=1024 * 1024)
+    patterns = {
+        "goal": keywords("Цель работы", "Цель"),
+        "year": r"\b(19|20)(\d\d)\b",
+        "number": r"\d+",
+        "pair": r"\d\d",
+        "word": r"\w+",
+    }
+    for name, pattern in patterns.items():
+        analyzer.register(name, pattern, [TextBlock])
+
+    matches = analyzer.analyze(TextBlock(text=text))
+
+    for name, pattern in patterns.items():
+        expected = [
+            (m.start(), m.end(), m.groups()) for m in re.finditer(pattern, text)
+        ]
+        found = [(m.start, m.end, m.groups) for m in matches.get(name, ())]
+        assert found == expected, name
+
+
+def test_fields_without_subscribed_patterns_are_not_scanned():
+    analyzer = build_analyzer()
+    items = ListBlock(list_type="bulleted", items=["Отчёт 2021 года", "Без дат"])
+
+    assert analyzer.analyze(items) == {
+        "year": (TextMatch("items", 0, 6, 10, "2021", ("20", "21")),)
+    }
+    assert analyzer.analyze(SectionBlock(title="1 Раздел 2020")) is NO_MATCHES
+
+
+def test_analysis_is_cached_by_scanned_text():
+    analyzer = build_analyzer()
+    block = TextBlock(text="Цель работы")
+
+    first = analyzer.analyze(block)
+    again = analyzer.analyze(TextBlock(id=block.id, text="Цель работы"))
+    block.text = "Цель работы в 2024 году"
+    changed = analyzer.analyze(block)
+
+    assert again is first
+    assert "year" in changed
+    stats = analyzer.cache.stats()
+    assert (stats.hits, stats.misses) == (1, 2)
+
+
+def test_registration_is_idempotent_and_rejects_conflicts():
+    analyzer = build_analyzer()
+    analyzer.register("number", r"\d+", [TextBlock])
+
+    with pytest.raises(ValueError):
+        analyzer.register("number", r"\d+\.\d+", [TextBlock])
+
+    analyzer.register("named", r"(?P<value>\w+)", [TextBlock])
+    with pytest.raises(ValueError):
+        analyzer.register("other", r"(?P<value>\d+)", [TextBlock])
+
+
+def test_new_patterns_invalidate_cached_analyses():
+    analyzer = build_analyzer()
+    block = TextBlock(text="См. рисунок 1")
+    before = analyzer.analyze(block)
+
+    analyzer.register("figure_ref", keywords("рисунок"), [TextBlock])
+
+    assert "figure_ref" not in before
+    assert analyzer.analyze(block)["figure_ref"][0].text == "рисунок"
+
+
+def test_texts_with_lone_surrogates_are_analyzed():
+    # «\ud800» — допустимая строка JSON, но не кодируется в строгий UTF-8.
+    analyzer = build_analyzer()
+
+    matches = analyzer.analyze(TextBlock(text="Цель \ud800 2019"))
+
+    assert matches["year"][0].text == "2019"
+    assert analyzer.analyze(TextBlock(text="Цель \ud801 2019")) is not matches